@@ -0,0 +1,48 @@
+"""Lazy import module for deferring the import of heavy dependencies.
+
+Importing ``cmor``, ``xarray`` and ``xcdat`` (which imports ``pandas`` and
+``dask``) takes most of the startup time of e3sm_to_cmip. Modules that are
+imported on the command line's startup path (e.g., for ``--help`` and
+``--info``) use ``lazy_import()`` for these dependencies, so they are only
+imported when a handler actually runs.
+"""
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Imports a module when one of its attributes is first accessed.
+
+    Parameters
+    ----------
+    name : str
+        The name of the module (e.g., "xarray").
+
+    Returns
+    -------
+    ModuleType
+        The module, which is loaded on first attribute access. If the module
+        was already imported, it is returned as is.
+
+    Raises
+    ------
+    ModuleNotFoundError
+        If the module is not installed.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    return module
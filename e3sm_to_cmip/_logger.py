@@ -97,7 +97,7 @@ def _setup_child_logger(name: str, propagate: bool = True) -> logging.Logger:
     return logger
 
 
-def _add_filehandler(log_path: str):
+def _add_filehandler(log_path: str, truncate: bool = True):
     """Adds a file handler to the root logger dynamically.
 
     Adding the file handler will also create the log file automatically.
@@ -106,6 +106,10 @@ def _add_filehandler(log_path: str):
     ----------
     log_path : str
         The path to the log file.
+    truncate : bool, optional
+        Whether to truncate the log file first, by default True. The worker
+        processes append to the log file of the main process without
+        truncating it.
 
     Notes
     -----
@@ -113,7 +117,12 @@ def _add_filehandler(log_path: str):
     be captured (e.g,. esmpy VersionWarning). However, they will still be
     captured by the console via the default StreamHandler.
     """
-    file_handler = logging.FileHandler(log_path, mode=LOG_FILEMODE)
+    # The log file is opened in append mode, so the writes of the main process
+    # and the worker processes don't overwrite each other.
+    if truncate:
+        open(log_path, LOG_FILEMODE).close()
+
+    file_handler = logging.FileHandler(log_path, mode="a")
 
     custom_formatter = CustomFormatter(LOG_FORMAT)
     file_handler.setFormatter(custom_formatter)
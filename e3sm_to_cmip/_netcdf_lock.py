@@ -0,0 +1,32 @@
+"""
+This module provides the lock shared by the threads of a process that call the
+netCDF-C and HDF5 libraries.
+
+netCDF-C and HDF5 are not thread-safe unless they are built with thread
+safety, and netCDF4 (when reading) and CMOR (when writing) both call them
+without holding the GIL. xarray already serializes its own netCDF4 calls (e.g.,
+opening a dataset or reading a chunk of a lazy variable) with a process-wide
+lock, so the other calls (e.g., reading a netCDF header with netCDF4 or
+writing with CMOR) hold the same lock, only around each call.
+
+The lock is not reentrant, so it must not be held while xarray reads data
+(e.g., while computing a lazy variable or calling ``.values``).
+"""
+
+from contextlib import AbstractContextManager
+
+
+def get_netcdf_lock() -> AbstractContextManager:
+    """Gets the lock of the netCDF-C and HDF5 calls in this process.
+
+    xarray is imported on first use, so that importing the modules that hold
+    the lock doesn't import it.
+
+    Returns
+    -------
+    AbstractContextManager
+        The lock that xarray's netCDF4 backend holds around its calls.
+    """
+    from xarray.backends.netCDF4_ import NETCDF4_PYTHON_LOCK
+
+    return NETCDF4_PYTHON_LOCK
@@ -2,8 +2,12 @@ import argparse
 import sys
 
 from e3sm_to_cmip import __version__
+from e3sm_to_cmip.prefetch import DEFAULT_PREFETCH_DEPTH
 from e3sm_to_cmip.util import FREQUENCIES
 
+# The multipliers for the units accepted by --max-memory.
+MEMORY_UNITS = {"B": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
 
 def setup_argparser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -65,6 +69,25 @@ def setup_argparser() -> argparse.ArgumentParser:
         help="Run in serial mode (by default parallel). Useful for debugging purposes.",
         action="store_true",
     )
+    optional_mode.add_argument(
+        "--fuse-handlers",
+        help=(
+            "Group handlers that share input variables (e.g., rlut, rsut and "
+            "rtmt, or variables on hybrid sigma levels) and CMORize each group "
+            "with a single read of its input files. Not used with MPAS realms."
+        ),
+        action="store_true",
+    )
+    optional_mode.add_argument(
+        "--segment-parallel",
+        help=(
+            "Split each handler into one job per time segment (input file), "
+            "each with its own CMOR session and output file, so that a single "
+            "large variable can use all of the processes. Not used with MPAS "
+            "realms or when -s, --serial specified."
+        ),
+        action="store_true",
+    )
 
     optional_mode.add_argument(
         "--on-var-failure",
@@ -92,6 +115,64 @@ def setup_argparser() -> argparse.ArgumentParser:
             "--serial specified."
         ),
     )
+    optional.add_argument(
+        "--max-memory",
+        type=_parse_memory_size,
+        metavar="<size>",
+        default=None,
+        help=(
+            "Optional: memory budget for the worker processes (e.g., '64G', "
+            "'512M'). Handlers are only run in parallel while their combined "
+            "predicted peak memory fits in the budget. Not used when -s, "
+            "--serial specified."
+        ),
+    )
+    optional.add_argument(
+        "--handler-timeout",
+        type=float,
+        metavar="<seconds>",
+        default=None,
+        help=(
+            "Optional: wall-clock limit for each handler in seconds per GiB of "
+            "its estimated cost (at least <seconds>). A handler that exceeds "
+            "it has its worker process killed and replaced. Not used when -s, "
+            "--serial specified."
+        ),
+    )
+    optional.add_argument(
+        "--handler-retries",
+        type=int,
+        metavar="<n>",
+        default=0,
+        help=(
+            "Optional: number of times to retry a handler that failed with a "
+            "transient error (an I/O error or a --handler-timeout), with "
+            "exponential backoff. Not used when -s, --serial specified. "
+            "Default is 0."
+        ),
+    )
+    optional.add_argument(
+        "--prefetch-depth",
+        type=int,
+        metavar="<n>",
+        default=DEFAULT_PREFETCH_DEPTH,
+        help=(
+            "Optional: number of time segments of a handler's input files that "
+            "are read on a background thread while the current segment is "
+            "written with CMOR. 0 reads each segment after the previous one is "
+            f"written. Default is {DEFAULT_PREFETCH_DEPTH}."
+        ),
+    )
+    optional.add_argument(
+        "--prefetch-readahead",
+        action="store_true",
+        help=(
+            "Optional: read the whole input files of the time segments that "
+            "are read ahead into the page cache before opening them, which "
+            "can hide the latency of a shared filesystem but also reads the "
+            "variables that are not CMORized (e.g., of history files)."
+        ),
+    )
     optional.add_argument(
         "--debug", help="Set output level to debug.", action="store_true"
     )
@@ -100,6 +181,50 @@ def setup_argparser() -> argparse.ArgumentParser:
         type=int,
         help="Exit with code -1 if execution time exceeds given time in seconds.",
     )
+    optional.add_argument(
+        "--resume",
+        help=(
+            "Resume a previous run in the same output directory. Time segments "
+            "of variables recorded as complete in the run journal are skipped "
+            "if their output files are unchanged."
+        ),
+        action="store_true",
+    )
+    optional.add_argument(
+        "--distributed",
+        type=str,
+        metavar="<run_id>",
+        default=None,
+        help=(
+            "Optional: cooperate with the other e3sm_to_cmip processes (e.g., "
+            "on other nodes) that run the same command with the same <run_id> "
+            "and output directory on a shared filesystem. Each handler (or "
+            "time segment) is claimed in the output directory and run by only "
+            "one process. Not used when -s, --serial specified."
+        ),
+    )
+    optional.add_argument(
+        "--telemetry",
+        help=(
+            "Record the wall-clock time, bytes in and out, array shapes and "
+            "throughput of each phase of each handler (e.g., reading the "
+            "input files and writing with CMOR) to a JSON lines file in the "
+            "output directory, and log a per-phase report at the end of the run."
+        ),
+        action="store_true",
+    )
+    optional.add_argument(
+        "--profile",
+        help=(
+            "Run each handler under the Python profiler (cProfile) in its worker "
+            "process and write one profile per handler to the 'profiles' "
+            "sub-directory of --logdir. The profiles are merged into a summary "
+            "profile, and the functions that spent the most time are logged at "
+            "the end of the run. Dask computations run on the handler's thread "
+            "so that they are profiled, which can slow down the handlers."
+        ),
+        action="store_true",
+    )
 
     # ======================================================================
     # CMOR settings.
@@ -277,6 +402,47 @@ def parse_args(args: list[str] | None) -> argparse.Namespace:
     return parsed_args
 
 
+def _parse_memory_size(value: str) -> int:
+    """Parses a memory size (e.g., "64G", "512MB", "1024") into bytes.
+
+    Parameters
+    ----------
+    value : str
+        The memory size, with an optional unit (B, K, M, G or T, optionally
+        followed by "B" or "iB"). Sizes without a unit are in bytes.
+
+    Returns
+    -------
+    int
+        The memory size in bytes.
+
+    Raises
+    ------
+    argparse.ArgumentTypeError
+        If the memory size is invalid.
+    """
+    size = value.strip().upper()
+    for suffix in ("IB", "B"):
+        if len(size) > 1 and size.endswith(suffix) and size[-len(suffix) - 1].isalpha():
+            size = size[: -len(suffix)]
+            break
+
+    unit = "B"
+    if size and size[-1] in MEMORY_UNITS:
+        unit = size[-1]
+        size = size[:-1]
+
+    try:
+        num_bytes = int(float(size) * MEMORY_UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid memory size: '{value}'") from None
+
+    if num_bytes <= 0:
+        raise argparse.ArgumentTypeError(f"memory size must be positive: '{value}'")
+
+    return num_bytes
+
+
 def _validate_parsed_args(parsed_args: argparse.Namespace):
     if parsed_args.realm == "mpaso" and not parsed_args.map:
         raise ValueError("MPAS ocean handling requires a map file")
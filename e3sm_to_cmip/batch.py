@@ -0,0 +1,572 @@
+"""
+This module provides the batch mode of e3sm_to_cmip, which runs the cases of a
+YAML manifest through one worker pool.
+
+Each case of the manifest is one run of e3sm_to_cmip (e.g., one realm and
+frequency of a simulation), with the same settings as the command line. The
+jobs of every case are ordered by their estimated cost across all of the cases
+and run in one pool, so the small jobs of a case fill the gaps between the big
+jobs of another, and the interpreter startup, handler loading and pool startup
+are only paid once.
+
+Example manifest::
+
+    defaults:
+      tables_path: /path/to/cmip6-cmor-tables/Tables
+      user_metadata: /path/to/user_metadata.json
+      output_path: /path/to/output
+    cases:
+      - case: v2.LR.historical_0101 atm
+        input_path: /path/to/rgr
+        var_list: [tas, pr, ts]
+      - case: v2.LR.historical_0101 fx
+        realm: fx
+        input_path: /path/to/rgr/fixed_vars
+        var_list: [areacella, sftlf, orog]
+
+Usage:
+    e3sm_to_cmip_batch manifest.yaml --num-proc 24 --max-memory 200G
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import yaml
+
+from e3sm_to_cmip import __version__
+from e3sm_to_cmip._logger import _setup_child_logger
+from e3sm_to_cmip.argparser import _parse_memory_size
+
+if TYPE_CHECKING:
+    from e3sm_to_cmip.pool import WorkerPool
+    from e3sm_to_cmip.runner import E3SMtoCMIP
+
+logger = _setup_child_logger(__name__)
+
+# The settings of the worker pool, which are set on the batch command line
+# rather than for each case.
+POOL_SETTINGS = ("num_proc", "max_memory", "handler_timeout", "handler_retries")
+
+# The settings that are not supported for the cases of a batch.
+UNSUPPORTED_SETTINGS = ("serial", "info", "info_out", "timeout")
+
+
+def setup_argparser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Convert the cases of a YAML manifest from ESM model output into CMIP "
+            "compatible format, running the jobs of every case in one process "
+            "pool."
+        ),
+        prog="e3sm_to_cmip_batch",
+    )
+    parser.add_argument(
+        "manifest",
+        help=(
+            "Path to the YAML manifest, with a list of cases under 'cases' and "
+            "optional settings shared by the cases under 'defaults'. The "
+            "settings of a case are the e3sm_to_cmip arguments with '_' instead "
+            "of '-' (e.g., input_path, var_list, realm, freq, user_metadata)."
+        ),
+    )
+    parser.add_argument(
+        "-n",
+        "--num-proc",
+        type=int,
+        metavar="<nproc>",
+        default=6,
+        help="Number of processes shared by the cases, default = 6.",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=str,
+        metavar="<size>",
+        default=None,
+        help="Memory budget for the worker processes (e.g., '64G', '512M').",
+    )
+    parser.add_argument(
+        "--handler-timeout",
+        type=float,
+        metavar="<seconds>",
+        default=None,
+        help=(
+            "Wall-clock limit for each handler in seconds per GiB of its "
+            "estimated cost (at least <seconds>)."
+        ),
+    )
+    parser.add_argument(
+        "--handler-retries",
+        type=int,
+        metavar="<n>",
+        default=0,
+        help=(
+            "Number of times to retry a handler that failed with a transient "
+            "error, default = 0."
+        ),
+    )
+    parser.add_argument(
+        "--version",
+        help="Print the version number and exit.",
+        action="version",
+        version="%(prog)s " + __version__,
+    )
+
+    return parser
+
+
+def parse_args(args: list[str] | None) -> argparse.Namespace:
+    """Parses the batch command line arguments.
+
+    Parameters
+    ----------
+    args : list[str] | None
+        A list of arguments, or None to use ``sys.argv``.
+
+    Returns
+    -------
+    argparse.Namespace
+        The parsed arguments.
+    """
+    parsed_args = setup_argparser().parse_args(args)
+
+    if parsed_args.max_memory is not None:
+        # Validate the memory size, which is passed to each case as is.
+        _parse_memory_size(parsed_args.max_memory)
+
+    return parsed_args
+
+
+def load_manifest(path: str) -> list[tuple[str, dict[str, Any]]]:
+    """Loads the cases of a batch manifest.
+
+    Parameters
+    ----------
+    path : str
+        The path to the YAML manifest, which is either a list of cases or a
+        mapping with the list of cases under "cases" and the settings shared
+        by the cases under "defaults".
+
+    Returns
+    -------
+    list[tuple[str, dict[str, Any]]]
+        The label and the settings of each case. The label is the "case"
+        setting of the case, or its position in the manifest.
+
+    Raises
+    ------
+    ValueError
+        If the manifest has no cases, or a case has a setting that is set on
+        the batch command line or is not supported in batch mode.
+    """
+    with open(path, "r") as infile:
+        manifest = yaml.safe_load(infile) or {}
+
+    defaults: dict[str, Any] = {}
+    entries = manifest
+
+    if isinstance(manifest, dict):
+        defaults = manifest.get("defaults") or {}
+        entries = manifest.get("cases") or []
+
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"The batch manifest '{path}' does not list any cases.")
+
+    cases = []
+    for index, entry in enumerate(entries):
+        settings = {**defaults, **entry}
+        label = str(settings.pop("case", f"case {index + 1}"))
+
+        for key in settings:
+            if key in POOL_SETTINGS:
+                raise ValueError(
+                    f"'{key}' of case '{label}' must be set on the batch command "
+                    f"line (--{key.replace('_', '-')}), not in the manifest."
+                )
+
+            if key in UNSUPPORTED_SETTINGS:
+                raise ValueError(
+                    f"'{key}' of case '{label}' is not supported in batch mode."
+                )
+
+        cases.append((label, settings))
+
+    return cases
+
+
+def get_case_args(settings: dict[str, Any]) -> list[str]:
+    """Converts the settings of a case into e3sm_to_cmip arguments.
+
+    Parameters
+    ----------
+    settings : dict[str, Any]
+        The settings of the case (e.g., ``{"var_list": ["tas", "pr"]}``).
+
+    Returns
+    -------
+    list[str]
+        The command line arguments (e.g., ``["--var-list", "tas", "pr"]``).
+        Flags with a false value are omitted.
+    """
+    args: list[str] = []
+
+    for key, value in settings.items():
+        flag = f"--{key.replace('_', '-')}"
+
+        if isinstance(value, bool):
+            if value:
+                args.append(flag)
+        elif isinstance(value, list):
+            args.extend([flag, *(str(item) for item in value)])
+        elif value is not None:
+            args.extend([flag, str(value)])
+
+    return args
+
+
+@dataclass
+class BatchCase:
+    """A case of a batch, with the status of its handlers."""
+
+    label: str
+    app: E3SMtoCMIP
+    jobs_to_filepaths: dict[str, dict[str, list[str]]] = field(default_factory=dict)
+    num_success: int = 0
+    failed_handlers: list[str] = field(default_factory=list)
+
+
+class BatchRunner:
+    """Runs the cases of a batch manifest through one worker pool.
+
+    Parameters
+    ----------
+    manifest_path : str
+        The path to the YAML manifest.
+    num_proc : int
+        The number of worker processes shared by the cases.
+    max_memory : str | None, optional
+        The memory budget for the worker processes (e.g., "64G"), by default
+        None.
+    handler_timeout : float | None, optional
+        The wall-clock limit of each handler in seconds per GiB of its
+        estimated cost, by default None.
+    handler_retries : int, optional
+        The number of times to retry a handler that failed with a transient
+        error, by default 0.
+
+    Raises
+    ------
+    ValueError
+        If a case is stopped before CMORizing by missing or non-derivable
+        handlers (refer to ``E3SMtoCMIP.execute()``).
+    """
+
+    def __init__(
+        self,
+        manifest_path: str,
+        num_proc: int,
+        max_memory: str | None = None,
+        handler_timeout: float | None = None,
+        handler_retries: int = 0,
+    ):
+        from e3sm_to_cmip.runner import E3SMtoCMIP
+        from e3sm_to_cmip.scheduler import MemoryProfile
+
+        self.num_proc = num_proc
+        self.max_memory = _parse_memory_size(max_memory) if max_memory else None
+
+        pool_args = ["--num-proc", str(num_proc)]
+        if max_memory is not None:
+            pool_args += ["--max-memory", max_memory]
+        if handler_timeout is not None:
+            pool_args += ["--handler-timeout", str(handler_timeout)]
+        pool_args += ["--handler-retries", str(handler_retries)]
+
+        # The cases share one memory profile so that the calibration of every
+        # case is saved.
+        self.memory_profile = MemoryProfile()
+
+        self.cases: list[BatchCase] = []
+        for label, settings in load_manifest(manifest_path):
+            logger.info(f"Setting up case '{label}'.")
+
+            app = E3SMtoCMIP(get_case_args(settings) + pool_args)
+            if app._is_stopped:
+                raise ValueError(f"Case '{label}': {app._stop_reason}")
+
+            app._memory_profile = self.memory_profile
+
+            self.cases.append(BatchCase(label, app))
+
+        self.run_elapsed: float | None = None
+        # Whether the batch was stopped by a failed handler of a case with
+        # --on-var-failure=stop.
+        self.is_stopped = False
+
+    def run(self) -> bool:  # noqa: C901
+        """Runs the jobs of every case through one worker pool.
+
+        The jobs of all of the cases are submitted in the order of their
+        estimated cost (most expensive first) within the memory budget. The
+        ``--on-var-failure`` setting of each case applies to its handlers,
+        except that "stop" stops the whole batch.
+
+        Returns
+        -------
+        bool
+            False if the batch was stopped or a case with
+            ``--on-var-failure=fail`` has failed handlers, otherwise True.
+        """
+        from tqdm import tqdm
+
+        from e3sm_to_cmip.pool import WorkerPool
+        from e3sm_to_cmip.runner import _get_ready_retries, _get_retry_wait
+        from e3sm_to_cmip.scheduler import AdmissionController, sort_by_cost
+
+        jobs, costs = self._get_jobs()
+
+        pool = WorkerPool(max_workers=self.num_proc)
+        admission = AdmissionController(
+            self.max_memory, self.num_proc, self.memory_profile.base_memory
+        )
+        pbar = tqdm(total=len(jobs))
+
+        logger.info(
+            f"========== STARTING BATCH OF {len(self.cases)} CASE(S) WITH "
+            f"{len(jobs)} JOB(S) =========="
+        )
+        start_time = time.perf_counter()
+
+        pending = sort_by_cost(jobs, costs)
+        running: set[Future] = set()
+        future_to_job: dict[Future, dict[str, Any]] = {}
+        retries: list[tuple[float, dict[str, Any]]] = []
+
+        while pending or running or retries:
+            pending = _get_ready_retries(retries) + pending  # type: ignore
+
+            for job in admission.admit_ready(pending, costs):
+                future = self._submit_job(pool, job)
+
+                if future is None:
+                    admission.release(job["name"])
+                    pbar.update(1)
+                    continue
+
+                running.add(future)
+                future_to_job[future] = job
+
+            wait_timeout = _get_retry_wait(retries)  # type: ignore
+
+            if not running:
+                time.sleep(wait_timeout or 0)
+                continue
+
+            done, running = wait(
+                running, timeout=wait_timeout, return_when=FIRST_COMPLETED
+            )
+
+            for future in done:
+                job = future_to_job.pop(future)
+                admission.release(job["name"])
+
+                result = self._get_job_result(job, future, retries)
+                if result is None:
+                    continue
+
+                case, handler = job["case"], job["handler"]
+                case.num_success, case.failed_handlers, result = (
+                    case.app._log_job_status(
+                        result,
+                        handler,
+                        len(case.app.handlers),
+                        case.num_success,
+                        case.failed_handlers,
+                    )
+                )
+
+                if not result and case.app.on_var_failure == "stop":
+                    case.app._stop_with_failed_handler_parallel(
+                        handler["name"], pool, pbar, list(running)
+                    )
+                    self.is_stopped = True
+                    break
+
+                pbar.update(1)
+
+            if self.is_stopped:
+                break
+
+        pbar.close()
+        pool.shutdown()
+        self.run_elapsed = time.perf_counter() - start_time
+        self.memory_profile.save()
+
+        return self._finalize()
+
+    def _get_jobs(self) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+        """Gets the jobs of every case and their estimated costs.
+
+        Returns
+        -------
+        tuple[list[dict[str, Any]], dict[str, Any]]
+            The jobs, each with a name that is unique across the cases, its
+            case and its handler, and a dictionary mapping the job names to
+            their costs.
+        """
+        jobs = []
+        costs = {}
+
+        for index, case in enumerate(self.cases):
+            handlers, case.jobs_to_filepaths = case.app._get_jobs()
+            case.app.handler_costs = case.app._estimate_handler_costs(
+                handlers, case.jobs_to_filepaths
+            )
+            case.num_success = len(case.app._resumed_handlers)
+
+            for handler in handlers:
+                name = f"{index}:{handler['name']}"
+                jobs.append({"name": name, "case": case, "handler": handler})
+                costs[name] = case.app.handler_costs[handler["name"]]
+
+        return jobs, costs
+
+    def _submit_job(self, pool: WorkerPool, job: dict[str, Any]) -> Future | None:
+        """Submits a job to the worker pool.
+
+        Parameters
+        ----------
+        pool : WorkerPool
+            The worker pool.
+        job : dict[str, Any]
+            The job.
+
+        Returns
+        -------
+        Future | None
+            The future of the job, or None if it is claimed by another process
+            (``--distributed``) or could not be submitted.
+        """
+        case, handler = job["case"], job["handler"]
+        vars_to_filepaths = case.jobs_to_filepaths[handler["name"]]
+
+        if not case.app._claim_job(handler, vars_to_filepaths):
+            return None
+
+        future = case.app._submit_handler(pool, handler, vars_to_filepaths)
+        if future is None:
+            case.app._complete_job(handler, vars_to_filepaths, None)
+
+        return future
+
+    def _get_job_result(
+        self,
+        job: dict[str, Any],
+        future: Future,
+        retries: list[tuple[float, dict[str, Any]]],
+    ) -> bool | dict[str, bool] | None:
+        """Gets the result of a completed job, scheduling a retry if needed.
+
+        Parameters
+        ----------
+        job : dict[str, Any]
+            The job.
+        future : Future
+            The future of the job.
+        retries : list[tuple[float, dict[str, Any]]]
+            The jobs waiting to be retried, with the time they are ready.
+
+        Returns
+        -------
+        bool | dict[str, bool] | None
+            The result of the job, or None if it is retried.
+        """
+        case, handler = job["case"], job["handler"]
+        vars_to_filepaths = case.jobs_to_filepaths[handler["name"]]
+
+        handler_retries: list = []
+        result = case.app._get_run_result(
+            handler, future, vars_to_filepaths, handler_retries
+        )
+        if result is None:
+            retries.extend((ready_at, job) for ready_at, _ in handler_retries)
+
+            return None
+
+        case.app._complete_job(handler, vars_to_filepaths, result)
+
+        return result
+
+    def _finalize(self) -> bool:
+        """Logs the final result of every case and adds their custom metadata.
+
+        Returns
+        -------
+        bool
+            False if the batch was stopped or a case with
+            ``--on-var-failure=fail`` has failed handlers, otherwise True.
+        """
+        from e3sm_to_cmip.util import add_metadata
+
+        is_successful = not self.is_stopped
+
+        for case in self.cases:
+            app = case.app
+            app.run_elapsed = self.run_elapsed
+
+            logger.info(f"Final result of case '{case.label}':")
+            app._log_final_result(
+                len(app.handlers), case.num_success, case.failed_handlers
+            )
+
+            if case.failed_handlers and app.on_var_failure == "fail":
+                is_successful = False
+            elif app.custom_metadata and not self.is_stopped:
+                add_metadata(
+                    file_path=app.output_path,
+                    var_list=app.var_list,
+                    metadata_path=app.custom_metadata,
+                )
+
+        logger.info(
+            f"Batch of {len(self.cases)} case(s) completed in {self.run_elapsed:.2f}s."
+        )
+
+        return is_successful
+
+
+def main(args: list[str] | None = None):
+    parsed_args = parse_args(args)
+
+    from e3sm_to_cmip._logger import _setup_root_logger
+    from e3sm_to_cmip.util import exit_failure, exit_success
+
+    _setup_root_logger()
+
+    try:
+        runner = BatchRunner(
+            parsed_args.manifest,
+            parsed_args.num_proc,
+            max_memory=parsed_args.max_memory,
+            handler_timeout=parsed_args.handler_timeout,
+            handler_retries=parsed_args.handler_retries,
+        )
+        is_successful = runner.run()
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}", exc_info=True)
+
+        sys.exit(1)
+
+    if is_successful:
+        exit_success()
+
+    exit_failure()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,481 @@
+"""
+This module provides the input file catalog, which indexes the files in an
+input directory with a single directory listing.
+
+The catalog maps E3SM time series variables to their sorted files and MPAS
+components (e.g., "mpaso", "mpas_mesh") to their files, so that looking up the
+input files for a handler is a dictionary lookup instead of an
+``os.listdir()`` and regex scan per raw variable. The catalog is persisted in
+the user cache directory, rather than in the input directory (which is often
+a read-only or shared archive), and is rebuilt whenever the list of files in
+the input directory or the size or modification time of one of the files
+changes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections import defaultdict
+
+from e3sm_to_cmip._logger import _setup_child_logger
+from e3sm_to_cmip.discovery import TIME_SERIES_FILENAME_PATTERN
+
+logger = _setup_child_logger(__name__)
+
+# The directory that stores the persisted catalogs, with one catalog per input
+# directory.
+CATALOG_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "e3sm_to_cmip",
+    "catalogs",
+)
+
+# The version of the catalog format. Bump this when the structure of the
+# catalog changes so that stale persisted catalogs are rebuilt.
+CATALOG_VERSION = 3
+
+# The filename patterns for each MPAS component. For components with more than
+# one pattern, the patterns are tried in order and the first pattern with
+# matching files is used.
+MPAS_COMPONENT_PATTERNS: dict[str, list[str]] = {
+    "mpaso": [r".*mpaso.hist.am.timeSeriesStatsMonthly.\d{4}-\d{2}-\d{2}.nc"],
+    "mpassi": [
+        r".*mpassi.hist.am.timeSeriesStatsMonthly.\d{4}-\d{2}-\d{2}.nc",
+        r".*mpascice.hist.am.timeSeriesStatsMonthly.\d{4}-\d{2}-\d{2}.nc",
+    ],
+    "mpaso_namelist": ["mpaso_in", "mpas-o_in"],
+    "mpassi_namelist": ["mpassi_in", "mpas-cice_in"],
+    "mpas_mesh": [r".*mpaso.rst.\d{4}-\d{2}-\d{2}_\d{5}.nc"],
+    "mpaso_moc_regions": [r".*_region_", r".*mocBasinsAndTransects"],
+}
+
+# MPAS components that map to a time series of files, rather than a single file.
+MPAS_TIME_SERIES_COMPONENTS = ["mpaso", "mpassi"]
+
+
+class InputCatalog:
+    """An index of the input files in a directory.
+
+    Parameters
+    ----------
+    path : str
+        The path to the input directory.
+    var_files : dict[str, list[str]]
+        A dictionary mapping E3SM time series variables to their filenames.
+    mpas_files : dict[str, list[str]]
+        A dictionary mapping MPAS components to their filenames.
+    nc_files : list[str]
+        The filenames of all `.nc` files in the input directory.
+    file_sizes : dict[str, int] | None, optional
+        A dictionary mapping the `.nc` filenames to their sizes in bytes, by
+        default None.
+    file_stats : dict[str, list[int]] | None, optional
+        A dictionary mapping the filenames in the input directory to their
+        sizes and modification times in nanoseconds (refer to
+        ``_scan_files()``), which validates the persisted catalog, by default
+        None.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        var_files: dict[str, list[str]],
+        mpas_files: dict[str, list[str]],
+        nc_files: list[str],
+        file_sizes: dict[str, int] | None = None,
+        file_stats: dict[str, list[int]] | None = None,
+    ):
+        self.path = os.path.abspath(path)
+
+        self._var_files = {
+            var: [os.path.join(self.path, f) for f in sorted(files)]
+            for var, files in var_files.items()
+        }
+        self._mpas_files = {
+            component: [os.path.join(self.path, f) for f in sorted(files)]
+            for component, files in mpas_files.items()
+        }
+        self._nc_files = [os.path.join(self.path, f) for f in sorted(nc_files)]
+        self._file_sizes = dict(file_sizes or {})
+        self._file_stats = dict(file_stats or {})
+
+    @classmethod
+    def build(cls, path: str) -> "InputCatalog":
+        """Builds the catalog with a single listing of the input directory.
+
+        Parameters
+        ----------
+        path : str
+            The path to the input directory.
+
+        Returns
+        -------
+        InputCatalog
+            The catalog.
+        """
+        return cls._build(path, _scan_files(path))
+
+    @classmethod
+    def _build(cls, path: str, file_stats: dict[str, list[int]]) -> "InputCatalog":
+        """Builds the catalog from the files in the input directory.
+
+        Parameters
+        ----------
+        path : str
+            The path to the input directory.
+        file_stats : dict[str, list[int]]
+            A dictionary mapping the filenames in the input directory to their
+            sizes and modification times (refer to ``_scan_files()``).
+
+        Returns
+        -------
+        InputCatalog
+            The catalog.
+        """
+        filenames = sorted(file_stats)
+        file_sizes = {
+            filename: file_stats[filename][0]
+            for filename in filenames
+            if filename[-3:] == ".nc"
+        }
+
+        var_files: dict[str, list[str]] = defaultdict(list)
+        mpas_files: dict[str, list[str]] = {}
+        nc_files: list[str] = []
+
+        for filename in filenames:
+            if filename[-3:] == ".nc":
+                nc_files.append(filename)
+
+            match = TIME_SERIES_FILENAME_PATTERN.match(filename)
+            if match is not None:
+                var_files[match.group("var")].append(filename)
+
+        for component, patterns in MPAS_COMPONENT_PATTERNS.items():
+            for pattern in patterns:
+                regex = re.compile(pattern)
+                matches = [f for f in filenames if regex.match(f)]
+
+                if matches:
+                    mpas_files[component] = matches
+                    break
+
+        return cls(path, dict(var_files), mpas_files, nc_files, file_sizes, file_stats)
+
+    @classmethod
+    def load_or_build(
+        cls, path: str, persist: bool = True, cache_dir: str | None = None
+    ) -> "InputCatalog":
+        """Loads the persisted catalog for the input directory, or builds it.
+
+        The persisted catalog is only used if the files in the input directory
+        have the same names, sizes and modification times as when it was
+        built. Otherwise, the catalog is rebuilt and (optionally) persisted.
+
+        Parameters
+        ----------
+        path : str
+            The path to the input directory.
+        persist : bool, optional
+            Whether to persist a rebuilt catalog, by default True.
+        cache_dir : str | None, optional
+            The directory that stores the persisted catalogs, by default None
+            to use ``CATALOG_CACHE_DIR``.
+
+        Returns
+        -------
+        InputCatalog
+            The catalog.
+        """
+        file_stats = _scan_files(path)
+        catalog = cls._load(path, file_stats, cache_dir)
+
+        if catalog is not None:
+            logger.info(f"Loaded input file catalog for '{path}'.")
+            return catalog
+
+        catalog = cls._build(path, file_stats)
+        logger.info(
+            f"Built input file catalog for '{path}' with {len(catalog._nc_files)} "
+            "`.nc` file(s)."
+        )
+
+        if persist:
+            catalog.save(cache_dir)
+
+        return catalog
+
+    @classmethod
+    def _load(
+        cls,
+        path: str,
+        file_stats: dict[str, list[int]],
+        cache_dir: str | None = None,
+    ) -> "InputCatalog | None":
+        """Loads the persisted catalog if it is up to date with the directory.
+
+        Parameters
+        ----------
+        path : str
+            The path to the input directory.
+        file_stats : dict[str, list[int]]
+            The current sizes and modification times of the files in the input
+            directory (refer to ``_scan_files()``).
+        cache_dir : str | None, optional
+            The directory that stores the persisted catalogs, by default None
+            to use ``CATALOG_CACHE_DIR``.
+
+        Returns
+        -------
+        InputCatalog | None
+            The catalog, or None if it doesn't exist, is stale or is invalid.
+        """
+        try:
+            with open(get_catalog_path(path, cache_dir), "r") as infile:
+                contents = json.load(infile)
+        except (OSError, ValueError):
+            return None
+
+        if (
+            contents.get("version") != CATALOG_VERSION
+            or contents.get("path") != os.path.abspath(path)
+            or contents.get("file_stats") != file_stats
+        ):
+            return None
+
+        return cls(
+            path,
+            contents["var_files"],
+            contents["mpas_files"],
+            contents["nc_files"],
+            contents["file_sizes"],
+            contents["file_stats"],
+        )
+
+    def save(self, cache_dir: str | None = None) -> bool:
+        """Saves the catalog atomically in the cache directory.
+
+        Parameters
+        ----------
+        cache_dir : str | None, optional
+            The directory that stores the persisted catalogs, by default None
+            to use ``CATALOG_CACHE_DIR``.
+
+        Returns
+        -------
+        bool
+            True if the catalog was saved, False if the cache directory is not
+            writable.
+        """
+        contents = {
+            "version": CATALOG_VERSION,
+            "path": self.path,
+            "var_files": {
+                var: [os.path.basename(f) for f in files]
+                for var, files in self._var_files.items()
+            },
+            "mpas_files": {
+                component: [os.path.basename(f) for f in files]
+                for component, files in self._mpas_files.items()
+            },
+            "nc_files": [os.path.basename(f) for f in self._nc_files],
+            "file_sizes": self._file_sizes,
+            "file_stats": self._file_stats,
+        }
+        catalog_path = get_catalog_path(self.path, cache_dir)
+        dirname = os.path.dirname(catalog_path)
+
+        try:
+            os.makedirs(dirname, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+            with os.fdopen(fd, "w") as outfile:
+                json.dump(contents, outfile)
+
+            os.replace(temp_path, catalog_path)
+        except OSError as e:
+            logger.debug(
+                f"Unable to save the input file catalog to '{catalog_path}': {e}"
+            )
+
+            return False
+
+        return True
+
+    def get_var_files(self, var: str) -> list[str]:
+        """Gets the sorted time series files for an E3SM variable.
+
+        Parameters
+        ----------
+        var : str
+            The E3SM variable.
+
+        Returns
+        -------
+        list[str]
+            The absolute paths of the files, which is empty if there are none.
+        """
+        return list(self._var_files.get(var, []))
+
+    def get_total_bytes(self, filepaths: list[str] | str) -> int:
+        """Gets the total size of a list of files.
+
+        The sizes of `.nc` files in the input directory come from the catalog.
+        Other files (e.g., an MPAS map file in another directory) are stat'ed
+        directly.
+
+        Parameters
+        ----------
+        filepaths : list[str] | str
+            The filepath(s).
+
+        Returns
+        -------
+        int
+            The total size in bytes, with missing files counted as zero bytes.
+        """
+        if isinstance(filepaths, str):
+            filepaths = [filepaths]
+
+        total = 0
+        for filepath in filepaths:
+            dirname, filename = os.path.split(os.path.abspath(filepath))
+            size = self._file_sizes.get(filename) if dirname == self.path else None
+
+            if size is None:
+                try:
+                    size = os.path.getsize(filepath)
+                except OSError:
+                    size = 0
+
+            total += size
+
+        return total
+
+    def get_nc_files(self) -> list[str]:
+        """Gets the sorted `.nc` files in the input directory.
+
+        Returns
+        -------
+        list[str]
+            The absolute paths of the files.
+        """
+        return list(self._nc_files)
+
+    def get_mpas_files(
+        self, component: str, map_path: str | None = None
+    ) -> list[str] | str:
+        """Gets the files for an MPAS component.
+
+        Parameters
+        ----------
+        component : str
+            Either the MPAS component name (e.g., "mpaso", "mpas_mesh") or
+            the E3SM variable name.
+        map_path : str | None, optional
+            The path to the MPAS map file, required if the component is
+            "mpas_map", by default None.
+
+        Returns
+        -------
+        list[str] | str
+            The sorted list of files for time series components and E3SM
+            variables, otherwise the single file for the component.
+
+        Raises
+        ------
+        IOError
+            If no files are found for the MPAS component.
+        ValueError
+            If ``component`` is "mpas_map" and no map path is given.
+        ValueError
+            If ``component`` is not an MPAS component and no files were found
+            for it as an E3SM variable.
+        """
+        var = str(component)
+        component = component.lower()
+
+        logger.info(f"find_mpas_files: component = {component}, path = {self.path}")
+
+        if component == "mpas_map":
+            if not map_path:
+                raise ValueError("No map path given")
+
+            map_path = os.path.abspath(map_path)
+            if os.path.exists(map_path):
+                logger.info(f"component mpas_map found: {map_path}")
+                return map_path
+
+            raise IOError("Unable to find mpas_map in the input directory")
+
+        if component in MPAS_COMPONENT_PATTERNS:
+            files = self._mpas_files.get(component)
+            if not files:
+                raise IOError(f"Unable to find {component} in the input directory")
+
+            if component in MPAS_TIME_SERIES_COMPONENTS:
+                logger.info(f"results found: {len(files)} items")
+                return list(files)
+
+            logger.info(f"component {component} found: {files[0]}")
+            return files[0]
+
+        files = self.get_var_files(var)
+        if len(files) == 0:
+            raise ValueError(
+                f"Unrecognized component {component}, unable to find input files"
+            )
+
+        return files
+
+
+def get_catalog_path(path: str, cache_dir: str | None = None) -> str:
+    """Gets the path to the persisted catalog of an input directory.
+
+    Parameters
+    ----------
+    path : str
+        The path to the input directory.
+    cache_dir : str | None, optional
+        The directory that stores the persisted catalogs, by default None to
+        use ``CATALOG_CACHE_DIR``.
+
+    Returns
+    -------
+    str
+        The path, which is named after a digest of the absolute path to the
+        input directory.
+    """
+    digest = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()
+
+    return os.path.join(cache_dir or CATALOG_CACHE_DIR, f"{digest[:16]}.json")
+
+
+def _scan_files(path: str) -> dict[str, list[int]]:
+    """Lists the files in a directory with their sizes and modification times.
+
+    Parameters
+    ----------
+    path : str
+        The path to the directory.
+
+    Returns
+    -------
+    dict[str, list[int]]
+        A dictionary mapping the filenames to their sizes in bytes and their
+        modification times in nanoseconds. Rewriting a file in place changes
+        its size or modification time, but not the modification time of the
+        directory.
+    """
+    file_stats: dict[str, list[int]] = {}
+
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+
+            stat = entry.stat()
+            file_stats[entry.name] = [stat.st_size, stat.st_mtime_ns]
+
+    return file_stats
@@ -1 +1,11 @@
 FILL_VALUE = 1.0e20
+
+# The names for valid hybrid sigma levels.
+HYBRID_SIGMA_LEVEL_NAMES = [
+    "standard_hybrid_sigma",
+    "standard_hybrid_sigma_half",
+]
+
+# The variables read from the input files of every handler with hybrid sigma
+# levels, in addition to the handler's raw variables.
+HYBRID_SIGMA_INPUT_VARS = ["PS", "hyam", "hybm", "hyai", "hybi"]
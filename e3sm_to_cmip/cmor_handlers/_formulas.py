@@ -5,8 +5,18 @@ arithmetic (e.g., "o3 = O3") or uses the `convert_units` function
 if `unit_conversion` is defined instead.
 """
 
-import numpy as np
-import xarray as xr
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from e3sm_to_cmip._lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+    import xarray as xr
+else:
+    np = lazy_import("numpy")
+    xr = lazy_import("xarray")
 
 # Used by areacella.py
 RADIUS = 6.37122e6
@@ -33,6 +43,16 @@ LEVGRND_BNDS = [
     42.098968505859375,
 ]
 
+# The unit conversion formulas as arithmetic on the raw variable "{var}", which
+# are evaluated by their compiled form (refer to ``compiler.py``). They must
+# compute the same values as ``convert_units()``.
+UNIT_CONVERSION_FORMULAS = {
+    "g-to-kg": "{var} / 1000.0",
+    "1-to-%": "{var} * 100.0",
+    "m/s-to-kg/ms": "{var} * 1000.0",
+    "-1": "{var} * -1.0",
+}
+
 
 def convert_units(var: xr.DataArray, unit_conversion: str) -> xr.DataArray:
     """Convert the variable's units using a unit conversion formula.
@@ -0,0 +1,383 @@
+"""
+This module compiles the arithmetic formulas of handlers into fused evaluations.
+
+The ``formula`` of a handler in ``handlers.yaml`` (e.g.,
+"(PRECC + PRECL) * 1000.0") is parsed into an expression tree of the raw
+variables of the handler, numeric constants and the ``+``, ``-``, ``*`` and
+``/`` operators. A compiled formula is evaluated in blocks along the first
+dimension of its raw variables: the values of each block are read once, each
+operator writes into a reusable scratch buffer of the block, and the result is
+written into a single preallocated output array of the output dtype (e.g.,
+float32, refer to ``precision.py``), in which the missing values are replaced
+with ``FILL_VALUE``. The peak memory of the evaluation is
+the output array and a few blocks, instead of a full-size temporary for each
+operator and for ``fillna()`` as with the xarray arithmetic of
+``_formulas.py``.
+
+Formulas with function calls (e.g., "verticalSum(SOILICE, capped_at=5000)"),
+names that are not raw variables of the handler (e.g., "p0"), or raw variables
+with different dimensions are not compiled, and the formula function of the
+handler in ``_formulas.py`` is used instead.
+"""
+
+from __future__ import annotations
+
+import ast
+import functools
+import math
+import operator
+from typing import TYPE_CHECKING, Any
+
+from e3sm_to_cmip._lazy_import import lazy_import
+from e3sm_to_cmip._logger import _setup_child_logger
+from e3sm_to_cmip.cmor_handlers import FILL_VALUE
+
+if TYPE_CHECKING:
+    import dask
+    import numpy as np
+    import xarray as xr
+else:
+    dask = lazy_import("dask")
+    np = lazy_import("numpy")
+    xr = lazy_import("xarray")
+
+logger = _setup_child_logger(__name__)
+
+# The maximum size of a block of a compiled formula, which includes the values
+# of the raw variables and the scratch buffers of the operators.
+FORMULA_BLOCK_BYTES = 32 * 1024**2
+
+# The supported binary operators, mapped to the names of their numpy ufuncs
+# and to the Python operators that fold constant operands.
+BINARY_OPERATORS = {
+    ast.Add: ("add", operator.add),
+    ast.Sub: ("subtract", operator.sub),
+    ast.Mult: ("multiply", operator.mul),
+    ast.Div: ("true_divide", operator.truediv),
+}
+
+# Type alias for a node of an expression tree, which is either
+# ("var", name), ("const", value), ("neg", operand) or (ufunc, left, right).
+Node = tuple[Any, ...]
+
+
+class CompiledFormula:
+    """A formula compiled into a fused, block-wise evaluation.
+
+    Parameters
+    ----------
+    expression : str
+        The formula (e.g., "(PRECC + PRECL) * 1000.0").
+    tree : Node
+        The expression tree of the formula.
+    variables : list[str]
+        The raw variables used by the formula, in order of appearance.
+    """
+
+    def __init__(self, expression: str, tree: Node, variables: list[str]):
+        self.expression = expression
+        self.tree = tree
+        self.variables = variables
+
+    def __repr__(self) -> str:
+        return f"CompiledFormula({self.expression!r})"
+
+    def can_evaluate(self, ds: xr.Dataset) -> bool:
+        """Checks if the formula can be evaluated on a dataset.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            The dataset containing the raw variables.
+
+        Returns
+        -------
+        bool
+            True if the dataset contains the raw variables of the formula and
+            they have the same dimensions and shape, with at least one
+            dimension, otherwise False.
+        """
+        if not all(name in ds for name in self.variables):
+            return False
+
+        first = ds[self.variables[0]]
+
+        return first.ndim > 0 and all(
+            ds[name].dims == first.dims and ds[name].shape == first.shape
+            for name in self.variables[1:]
+        )
+
+    def evaluate(
+        self,
+        ds: xr.Dataset,
+        dtype: np.dtype | str | None = None,
+        fill_value: float = FILL_VALUE,
+        block_bytes: int = FORMULA_BLOCK_BYTES,
+    ) -> np.ndarray:
+        """Evaluates the formula on a dataset.
+
+        The operators are evaluated in the dtype of the raw variables (at
+        least float32), in the order of the formula, so the result is the same
+        as the xarray arithmetic of the formula.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            The dataset containing the raw variables (refer to
+            ``can_evaluate()``). The raw variables can be lazy, in which case
+            only one block of their values is loaded at a time.
+        dtype : np.dtype | str | None, optional
+            The float dtype of the output array, by default None for the dtype
+            the operators are evaluated in.
+        fill_value : float, optional
+            The value replacing the missing values (NaN), by default
+            ``FILL_VALUE``.
+        block_bytes : int, optional
+            The maximum size of a block, by default ``FORMULA_BLOCK_BYTES``.
+
+        Returns
+        -------
+        np.ndarray
+            The output array.
+        """
+        arrays = [ds[name].data for name in self.variables]
+        shape = arrays[0].shape
+        compute_dtype = np.result_type(np.float32, *[a.dtype for a in arrays])
+
+        output = np.empty(shape, dtype=compute_dtype if dtype is None else dtype)
+
+        # The bytes of a step along the first dimension, for the values of the
+        # raw variables and the scratch buffers.
+        step_size = math.prod(shape[1:])
+        step_bytes = step_size * (
+            sum(array.dtype.itemsize for array in arrays)
+            + _get_num_buffers(self.tree) * compute_dtype.itemsize
+        )
+        block_size = max(1, block_bytes // max(step_bytes, 1))
+
+        buffers: list[np.ndarray] = []
+        for start in range(0, shape[0], block_size):
+            block = slice(start, min(start + block_size, shape[0]))
+            values = _load_block(self.variables, arrays, block)
+
+            block_shape = (block.stop - block.start, *shape[1:])
+            if buffers and buffers[0].shape != block_shape:
+                buffers = []
+
+            pool = _BufferPool(block_shape, compute_dtype, buffers)
+            result, is_buffer = _evaluate_node(self.tree, values, pool)
+
+            out = output[block]
+            np.copyto(out, result, casting="unsafe")
+            np.copyto(out, fill_value, where=np.isnan(out))
+
+            if is_buffer:
+                pool.release(result)  # type: ignore[arg-type]
+
+        return output
+
+
+@functools.lru_cache(maxsize=None)
+def compile_formula(
+    formula: str, raw_variables: tuple[str, ...]
+) -> CompiledFormula | None:
+    """Compiles the formula of a handler.
+
+    Parameters
+    ----------
+    formula : str
+        The formula (e.g., "(PRECC + PRECL) * 1000.0").
+    raw_variables : tuple[str, ...]
+        The raw variables of the handler.
+
+    Returns
+    -------
+    CompiledFormula | None
+        The compiled formula, or None if the formula is not supported (refer
+        to the module docstring).
+    """
+    try:
+        tree = ast.parse(formula.strip(), mode="eval").body
+        variables: list[str] = []
+        node = _compile_node(tree, set(raw_variables), variables)
+    except (SyntaxError, ValueError) as e:
+        logger.debug(f"The formula '{formula}' is not compiled: {e}")
+
+        return None
+
+    if not variables:
+        logger.debug(f"The formula '{formula}' is not compiled: no raw variables.")
+
+        return None
+
+    return CompiledFormula(formula, node, variables)
+
+
+class _BufferPool:
+    """The scratch buffers of a block, which are reused by the operators."""
+
+    def __init__(self, shape: tuple[int, ...], dtype: np.dtype, free: list):
+        self.shape = shape
+        self.dtype = dtype
+        self.free = free
+
+    def take(self) -> np.ndarray:
+        if self.free:
+            return self.free.pop()
+
+        return np.empty(self.shape, dtype=self.dtype)
+
+    def release(self, buffer: np.ndarray):
+        self.free.append(buffer)
+
+
+def _compile_node(node: ast.AST, raw_variables: set[str], variables: list[str]) -> Node:
+    """Compiles a node of the syntax tree of a formula.
+
+    Parameters
+    ----------
+    node : ast.AST
+        The node.
+    raw_variables : set[str]
+        The raw variables of the handler.
+    variables : list[str]
+        The raw variables used by the formula, which is updated in place.
+
+    Returns
+    -------
+    Node
+        The node of the expression tree, with constant operands folded.
+
+    Raises
+    ------
+    ValueError
+        If the node is not supported.
+    """
+    if isinstance(node, ast.Name | ast.Constant):
+        return _compile_leaf(node, raw_variables, variables)
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.UAdd | ast.USub):
+        operand = _compile_node(node.operand, raw_variables, variables)
+
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        if operand[0] == "const":
+            return ("const", -operand[1])
+
+        return ("neg", operand)
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        ufunc, func = BINARY_OPERATORS[type(node.op)]
+        left = _compile_node(node.left, raw_variables, variables)
+        right = _compile_node(node.right, raw_variables, variables)
+
+        if left[0] == "const" and right[0] == "const":
+            return ("const", func(left[1], right[1]))
+
+        return (ufunc, left, right)
+
+    raise ValueError(f"'{ast.unparse(node)}' is not supported.")
+
+
+def _compile_leaf(
+    node: ast.Name | ast.Constant, raw_variables: set[str], variables: list[str]
+) -> Node:
+    """Compiles a raw variable or a numeric constant of a formula."""
+    if isinstance(node, ast.Name):
+        if node.id not in raw_variables:
+            raise ValueError(f"'{node.id}' is not a raw variable.")
+
+        if node.id not in variables:
+            variables.append(node.id)
+
+        return ("var", node.id)
+
+    if isinstance(node.value, bool) or not isinstance(node.value, int | float):
+        raise ValueError(f"'{node.value!r}' is not a number.")
+
+    return ("const", node.value)
+
+
+def _get_num_buffers(node: Node) -> int:
+    """Gets the maximum number of scratch buffers used to evaluate a node."""
+    if node[0] in ("var", "const"):
+        return 0
+    if node[0] == "neg":
+        return max(1, _get_num_buffers(node[1]))
+
+    # The result of the left operand is held in a buffer while the right
+    # operand is evaluated.
+    left = _get_num_buffers(node[1])
+    right = _get_num_buffers(node[2])
+
+    return max(1, left, min(left, 1) + right)
+
+
+def _load_block(
+    names: list[str], arrays: list[Any], block: slice
+) -> dict[str, np.ndarray]:
+    """Loads a block of the values of the raw variables.
+
+    The lazy (dask) arrays are computed together, so the input files are read
+    once for the block.
+    """
+    blocks = [array[block] for array in arrays]
+
+    if any(dask.is_dask_collection(values) for values in blocks):
+        blocks = list(dask.compute(*blocks))
+
+    return {
+        name: np.asarray(values) for name, values in zip(names, blocks, strict=True)
+    }
+
+
+def _evaluate_node(
+    node: Node, values: dict[str, np.ndarray], pool: _BufferPool
+) -> tuple[np.ndarray | int | float, bool]:
+    """Evaluates a node of an expression tree on a block.
+
+    Parameters
+    ----------
+    node : Node
+        The node.
+    values : dict[str, np.ndarray]
+        The values of the raw variables in the block.
+    pool : _BufferPool
+        The scratch buffers of the block.
+
+    Returns
+    -------
+    tuple[np.ndarray | int | float, bool]
+        The result, and whether it is a scratch buffer that can be written to.
+    """
+    kind = node[0]
+
+    if kind == "var":
+        return values[node[1]], False
+    if kind == "const":
+        return node[1], False
+
+    if kind == "neg":
+        operand, is_buffer = _evaluate_node(node[1], values, pool)
+        out = operand if is_buffer else pool.take()
+        np.negative(operand, out=out)
+
+        return out, True
+
+    left, is_left_buffer = _evaluate_node(node[1], values, pool)
+    right, is_right_buffer = _evaluate_node(node[2], values, pool)
+
+    # Write the result into one of the scratch buffers of the operands, which
+    # is safe for element-wise ufuncs, and release the other one.
+    if is_left_buffer:
+        out = left
+        if is_right_buffer:
+            pool.release(right)  # type: ignore[arg-type]
+    elif is_right_buffer:
+        out = right
+    else:
+        out = pool.take()
+
+    getattr(np, kind)(left, right, out=out)
+
+    return out, True
@@ -0,0 +1,810 @@
+"""
+This module provides fused CMORization of variable handlers that share inputs.
+
+Many handlers read the same E3SM raw variables (e.g., "rsut", "rsutcs",
+"rlut" and "rtmt" all read "FSNTOA" and "FSNT"), and every handler with hybrid
+sigma levels also reads "PS" and the hybrid coefficients from its input files.
+Fusing these handlers into a ``VarHandlerGroup`` opens each time range of the
+shared input files once, then reads each time slab of the group's inputs once
+(refer to ``handler.TIME_SLAB_BYTES``) and evaluates and writes every CMIP
+variable in the group against the same in-memory slab.
+
+Groups are capped by the number of handlers and by the size of their input
+files, since a group runs on a single worker process.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from e3sm_to_cmip import telemetry
+from e3sm_to_cmip._lazy_import import lazy_import
+from e3sm_to_cmip._logger import _setup_child_logger
+from e3sm_to_cmip.cmor_handlers import (
+    HYBRID_SIGMA_INPUT_VARS,
+    HYBRID_SIGMA_LEVEL_NAMES,
+)
+from e3sm_to_cmip.cmor_handlers.handler import (
+    VarHandler,
+    VarHandlerDict,
+    _get_log_name,
+    _get_segment_filepaths,
+    _get_time_slab_size,
+)
+from e3sm_to_cmip.field_cache import FieldCache, get_cached_fields
+from e3sm_to_cmip.grid_cache import GridCache
+from e3sm_to_cmip.journal import Journal
+from e3sm_to_cmip.prefetch import (
+    DEFAULT_PREFETCH_DEPTH,
+    SegmentPrefetcher,
+    load_segment,
+)
+
+if TYPE_CHECKING:
+    import cmor
+    import numpy as np
+    import xarray as xr
+else:
+    cmor = lazy_import("cmor")
+    np = lazy_import("numpy")
+    xr = lazy_import("xarray")
+
+logger = _setup_child_logger(__name__)
+
+# The maximum number of handlers in a group. Larger groups read less data but
+# run on a single worker process, which reduces parallelism.
+MAX_GROUP_SIZE = 8
+
+# The maximum size of the input files of a group in bytes, which bounds the
+# work (and the predicted memory, refer to ``scheduler.py``) of the single
+# worker process that runs the group.
+MAX_GROUP_BYTES = 16 * 1024**3
+
+
+@dataclass
+class _CmorVariable:
+    """The CMOR variable of a handler that is written in time slabs."""
+
+    # The time dimension of the output CMIP variable.
+    time_dim: str
+    # The CMOR variable ID.
+    var_id: int
+    # The optional CMOR zfactor ips ID.
+    ips_id: int | None
+    # The key of the time bounds in the input files.
+    time_bnds_key: str
+    # The raw variables that are cast to float32 (refer to ``precision.py``).
+    float32_vars: list[str] = field(default_factory=list)
+
+
+class VarHandlerGroup:
+    """A group of VarHandlers that are CMORized with shared reads.
+
+    Parameters
+    ----------
+    handlers : list[VarHandler]
+        The handlers, which must have the same table and levels.
+    """
+
+    def __init__(self, handlers: list[VarHandler]):
+        self.handlers = handlers
+
+        # The name of the group, which is used for logging.
+        # Example: "rlut+rsut+rtmt"
+        self.name = "+".join(handler.name for handler in handlers)
+
+        # The union of the E3SM raw variables of the handlers.
+        self.raw_variables: list[str] = list(
+            dict.fromkeys(var for h in handlers for var in h.raw_variables)
+        )
+        self.table = handlers[0].table
+        self.levels = handlers[0].levels
+
+    def to_dict(self) -> VarHandlerDict:
+        """Return the dictionary representation of the group.
+
+        The dictionary has the same keys as ``VarHandler.to_dict()`` that are
+        used by e3sm_to_cmip, with the names of the handlers in the group.
+
+        Returns
+        -------
+        VarHandlerDict
+            The dictionary representation of the group.
+        """
+        return {
+            "name": self.name,
+            "table": self.table,
+            "raw_variables": self.raw_variables,
+            "levels": self.levels,
+            "handlers": [handler.name for handler in self.handlers],
+            "method": self.cmorize,
+        }
+
+    def cmorize(
+        self,
+        vars_to_filepaths: dict[str, list[str]],
+        tables_path: str,
+        metadata_path: str,
+        cmor_log_dir: str,
+        table: str | None = None,
+        segment: int | None = None,
+        journal: Journal | None = None,
+        grid_cache: GridCache | None = None,
+        prefetch_depth: int = DEFAULT_PREFETCH_DEPTH,
+        prefetch_readahead: bool = False,
+        field_cache: FieldCache | None = None,
+    ) -> dict[str, bool]:
+        """CMORizes the CMIP variables of the group with shared reads.
+
+        Parameters
+        ----------
+        vars_to_filepaths : dict[str, list[str]]
+            A dictionary mapping E3SM raw variables to a list of filepath(s).
+        tables_path : str
+            The path to directory containing CMOR Tables directory.
+        metadata_path : str
+            The path to user json file for CMIP6 metadata
+        cmor_log_dir : str
+            The directory that stores the CMOR logs.
+        table : str | None
+            The CMOR table filename, derived from a custom `freq`, by default
+            None.
+        segment : int | None
+            The index of the time segment if ``vars_to_filepaths`` only
+            contains the files for one segment of the variables, by default
+            None.
+        journal : Journal | None
+            The resume journal, which records each time segment of each
+            handler once its output is written. With ``--resume``, segments
+            completed by a previous run are skipped. By default None.
+        grid_cache : GridCache | None
+            The grid descriptor cache of the run, by default None.
+        prefetch_depth : int
+            The number of time ranges that are read on a background thread
+            while the current time range is written with CMOR, by default
+            ``DEFAULT_PREFETCH_DEPTH``.
+        prefetch_readahead : bool
+            Whether to read the input files of the time ranges read ahead into
+            the page cache before opening them, by default False.
+        field_cache : FieldCache | None
+            The field cache of the run, which keeps the surface pressure and
+            hybrid coefficients of each time range in memory for the other
+            handlers on this worker, by default None.
+
+        Returns
+        -------
+        dict[str, bool]
+            A dictionary mapping the name of each handler to whether CMORizing
+            was successful.
+        """
+        logger.info(f"{self.name}: Starting fused CMORizing")
+
+        if table is not None:
+            self.table = table
+            for handler in self.handlers:
+                handler.table = table
+
+        results = {handler.name: False for handler in self.handlers}
+        handlers = [
+            handler
+            for handler in self.handlers
+            if handler._all_vars_have_filepaths(
+                _get_handler_filepaths(handler, vars_to_filepaths)
+            )
+        ]
+
+        if len(handlers) == 0:
+            return results
+
+        num_files = {
+            len(vars_to_filepaths[var]) for h in handlers for var in h.raw_variables
+        }
+
+        # Each time range is opened by the index of its file, so the raw
+        # variables must have the same number of files to be read together.
+        if len(num_files) > 1:
+            logger.warning(
+                f"{self.name}: raw variables have a different number of files, "
+                "CMORizing each handler separately."
+            )
+            for handler in handlers:
+                results[handler.name] = handler.cmorize(
+                    _get_handler_filepaths(handler, vars_to_filepaths),
+                    tables_path,
+                    metadata_path,
+                    cmor_log_dir,
+                    segment=segment,
+                    journal=journal,
+                    grid_cache=grid_cache,
+                    prefetch_depth=prefetch_depth,
+                    prefetch_readahead=prefetch_readahead,
+                    field_cache=field_cache,
+                )
+
+            return results
+
+        # Setup the CMOR module once for all of the handlers, which share the
+        # same table.
+        handlers[0]._setup_cmor_module(
+            _get_log_name(self.name, segment), tables_path, metadata_path, cmor_log_dir
+        )
+
+        table_abs_path = os.path.join(tables_path, self.table)
+        failed = self._cmorize_time_ranges(
+            handlers,
+            vars_to_filepaths,
+            num_files.pop(),
+            table_abs_path,
+            journal,
+            grid_cache,
+            prefetch_depth,
+            prefetch_readahead,
+            field_cache,
+        )
+
+        # NOTE: It is important to close the CMOR module AFTER CMORizing all of
+        # the variables. Otherwise, the IDs of cmor objects gets wiped after
+        # every loop.
+        cmor.close()
+        logger.debug(
+            f"{self.name}: CMORized and file write complete, closing CMOR I/O."
+        )
+
+        for handler in handlers:
+            results[handler.name] = handler.name not in failed
+
+        if field_cache is not None and any(h._has_hybrid_levels() for h in handlers):
+            field_cache.log_stats(self.name)
+
+        return results
+
+    def _cmorize_time_ranges(
+        self,
+        handlers: list[VarHandler],
+        vars_to_filepaths: dict[str, list[str]],
+        num_files: int,
+        table_path: str,
+        journal: Journal | None = None,
+        grid_cache: GridCache | None = None,
+        prefetch_depth: int = DEFAULT_PREFETCH_DEPTH,
+        prefetch_readahead: bool = False,
+        field_cache: FieldCache | None = None,
+    ) -> set[str]:
+        """CMORizes the handlers for each time range of the input files.
+
+        Each time range of the input files is opened once, and each of its
+        time slabs is read once for the group, then every handler writes the
+        slab from the same in-memory dataset. The next time ranges are opened
+        while it is written, and loaded if they fit in one slab (refer to
+        ``prefetch.py``).
+
+        Parameters
+        ----------
+        handlers : list[VarHandler]
+            The handlers with input files.
+        vars_to_filepaths : dict[str, list[str]]
+            A dictionary mapping E3SM raw variables to a list of filepath(s).
+        num_files : int
+            The number of files (time ranges) per raw variable.
+        table_path : str
+            The absolute path to the CMOR table.
+        journal : Journal | None, optional
+            The resume journal, by default None.
+        grid_cache : GridCache | None, optional
+            The grid descriptor cache, by default None.
+        prefetch_depth : int, optional
+            The number of time ranges read ahead, by default
+            ``DEFAULT_PREFETCH_DEPTH``.
+        prefetch_readahead : bool, optional
+            Whether to read the input files of the time ranges read ahead into
+            the page cache, by default False.
+        field_cache : FieldCache | None, optional
+            The field cache, which gets the surface pressure and hybrid
+            coefficients of each time slab instead of reading them again, by
+            default None.
+
+        Returns
+        -------
+        set[str]
+            The names of the handlers that failed.
+        """
+        time_dims = {h.name: h._get_var_time_dim(table_path) for h in handlers}
+        output_dtypes = {h.name: h._get_output_dtype(table_path) for h in handlers}
+        group_vars_to_filepaths = {
+            var: vars_to_filepaths[var]
+            for var in dict.fromkeys(v for h in handlers for v in h.raw_variables)
+        }
+        group_input_vars = list(
+            dict.fromkeys(v for h in handlers for v in h._get_input_vars())
+        )
+
+        segments: dict[int, tuple[dict[str, list[str]], list[VarHandler]]] = {}
+        for index in range(num_files):
+            handlers_to_inputs = {
+                h.name: _get_segment_filepaths(
+                    _get_handler_filepaths(h, vars_to_filepaths), index
+                )
+                for h in handlers
+            }
+            remaining = [
+                h
+                for h in handlers
+                if journal is None
+                or not journal.is_complete(h.name, handlers_to_inputs[h.name])
+            ]
+
+            if len(remaining) == 0:
+                logger.info(f"{self.name}: skipping completed segment {index}.")
+                continue
+
+            segments[index] = (handlers_to_inputs, remaining)
+
+        def open_segment(index: int) -> xr.Dataset:
+            logger.info(
+                f"{self.name}: loading E3SM variables {list(group_vars_to_filepaths)}"
+            )
+            with telemetry.span("get_mfdataset", self.name) as span:
+                ds = VarHandler._open_mfdataset(
+                    group_vars_to_filepaths, index, group_input_vars
+                )
+                ds = load_segment(ds, list(group_vars_to_filepaths))
+                span["bytes_in"] = telemetry.get_nbytes(ds)
+                span["shapes"] = telemetry.get_shapes(ds, group_vars_to_filepaths)
+
+            return ds
+
+        failed: set[str] = set()
+        prefetcher = SegmentPrefetcher(
+            self.name,
+            open_segment,
+            lambda index: _get_segment_filepaths(group_vars_to_filepaths, index),
+            segments,
+            prefetch_depth,
+            prefetch_readahead,
+        )
+
+        with prefetcher:
+            for index, ds in prefetcher:
+                handlers_to_inputs, remaining = segments[index]
+                output_paths = self._cmor_write_segment(
+                    ds, remaining, time_dims, output_dtypes, grid_cache, field_cache
+                )
+
+                for handler in remaining:
+                    output_path = output_paths.get(handler.name)
+
+                    if output_path is None:
+                        failed.add(handler.name)
+                    elif journal is not None:
+                        journal.record(
+                            handler.name, handlers_to_inputs[handler.name], output_path
+                        )
+
+                ds.close()
+
+        if len(segments) > 1:
+            prefetcher.log_stats()
+
+        return failed
+
+    def _cmor_write_segment(
+        self,
+        ds: xr.Dataset,
+        handlers: list[VarHandler],
+        time_dims: dict[str, str | None],
+        output_dtypes: dict[str, np.dtype | None],
+        grid_cache: GridCache | None = None,
+        field_cache: FieldCache | None = None,
+    ) -> dict[str, str | None]:
+        """Writes the CMIP variables of the handlers for a time range.
+
+        The CMOR variables of the handlers with time are created first, then
+        the group's inputs of each time slab are read together (refer to
+        ``_read_time_slab()``) and every handler writes the slab before the
+        next one is read, so only one slab of the group's inputs is in memory
+        at a time.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            The lazily opened dataset of the time range, with the inputs of
+            the group.
+        handlers : list[VarHandler]
+            The handlers that have not completed the time range.
+        time_dims : dict[str, str | None]
+            A dictionary mapping the name of each handler to its time
+            dimension.
+        output_dtypes : dict[str, np.dtype | None]
+            A dictionary mapping the name of each handler to the dtype of its
+            output data.
+        grid_cache : GridCache | None, optional
+            The grid descriptor cache, by default None.
+        field_cache : FieldCache | None, optional
+            The field cache, by default None.
+
+        Returns
+        -------
+        dict[str, str | None]
+            A dictionary mapping the name of each handler to the path to its
+            output file, or None if it failed.
+        """
+        output_paths, cmor_vars = self._create_cmor_variables(
+            ds, handlers, time_dims, output_dtypes, grid_cache
+        )
+
+        if len(cmor_vars) == 0:
+            return output_paths
+        elif "time" not in ds.dims:
+            logger.error(f"{self.name}: no time dimension in the input files.")
+
+            return output_paths
+
+        raw_variables = list(
+            dict.fromkeys(v for h in handlers for v in h.raw_variables)
+        )
+        num_times = ds.sizes["time"]
+        slab_size = _get_time_slab_size(ds, "time", raw_variables)
+        logger.info(
+            f"{self.name}: Writing {len(cmor_vars)} variable(s) to file in slabs "
+            f"of {slab_size} of {num_times} time steps..."
+        )
+
+        for start in range(0, num_times, slab_size):
+            ds_slab = _read_time_slab(ds, slice(start, start + slab_size), field_cache)
+
+            for handler in handlers:
+                if handler.name not in cmor_vars:
+                    continue
+
+                cmor_var = cmor_vars[handler.name]
+
+                try:
+                    is_cmor_successful = handler._cmor_write_time_slab(
+                        handler._prepare_dataset(ds_slab, cmor_var.time_dim),
+                        cmor_var.var_id,
+                        cmor_var.time_dim,
+                        cmor_var.time_bnds_key,
+                        cmor_var.ips_id,
+                        output_dtypes[handler.name],
+                        float32_vars=cmor_var.float32_vars,
+                    )
+                except Exception as e:
+                    logger.error(f"{handler.name}: error CMORizing variable: {e}")
+                    is_cmor_successful = False
+
+                if not is_cmor_successful:
+                    del cmor_vars[handler.name]
+                    output_paths[handler.name] = None
+
+        for handler in handlers:
+            if handler.name in cmor_vars:
+                output_paths[handler.name] = handler._close_cmor_variable(
+                    cmor_vars[handler.name].var_id
+                )
+
+        return output_paths
+
+    def _create_cmor_variables(
+        self,
+        ds: xr.Dataset,
+        handlers: list[VarHandler],
+        time_dims: dict[str, str | None],
+        output_dtypes: dict[str, np.dtype | None],
+        grid_cache: GridCache | None = None,
+    ) -> tuple[dict[str, str | None], dict[str, _CmorVariable]]:
+        """Creates the CMOR variables of the handlers for a time range.
+
+        The CMIP variables without time (e.g., "fx" variables) are written
+        at once instead.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            The lazily opened dataset of the time range.
+        handlers : list[VarHandler]
+            The handlers that have not completed the time range.
+        time_dims : dict[str, str | None]
+            A dictionary mapping the name of each handler to its time
+            dimension.
+        output_dtypes : dict[str, np.dtype | None]
+            A dictionary mapping the name of each handler to the dtype of its
+            output data.
+        grid_cache : GridCache | None, optional
+            The grid descriptor cache, by default None.
+
+        Returns
+        -------
+        tuple[dict[str, str | None], dict[str, _CmorVariable]]
+            A dictionary mapping the name of each handler without time (or
+            that failed) to the path to its output file, or None if it failed,
+            and a dictionary mapping the name of each handler with time to its
+            CMOR variable.
+        """
+        output_paths: dict[str, str | None] = {}
+        cmor_vars: dict[str, _CmorVariable] = {}
+
+        for handler in handlers:
+            time_dim = time_dims[handler.name]
+            ds_handler = handler._prepare_dataset(ds, time_dim)
+
+            try:
+                if time_dim is None:
+                    output_paths[handler.name] = handler._cmor_write_dataset(
+                        ds_handler, None, grid_cache, output_dtypes[handler.name]
+                    )
+                else:
+                    cmor_var_id, cmor_ips_id = handler._create_cmor_variable(
+                        ds_handler, time_dim, grid_cache
+                    )
+                    cmor_vars[handler.name] = _CmorVariable(
+                        time_dim=time_dim,
+                        var_id=cmor_var_id,
+                        ips_id=cmor_ips_id,
+                        time_bnds_key=handler._get_time_bnds_key(
+                            ds_handler.data_vars.keys()
+                        ),
+                        # The precision is checked once for the time range.
+                        float32_vars=handler._get_float32_vars(
+                            ds_handler, output_dtypes[handler.name]
+                        ),
+                    )
+            except Exception as e:
+                logger.error(f"{handler.name}: error CMORizing variable: {e}")
+                output_paths[handler.name] = None
+
+        return output_paths, cmor_vars
+
+
+def _read_time_slab(
+    ds: xr.Dataset, time_slice: slice, field_cache: FieldCache | None = None
+) -> xr.Dataset:
+    """Reads a slab of time steps of a group's inputs into memory.
+
+    The surface pressure and hybrid coefficients of the slab are read from the
+    field cache, then the other lazy variables of the slab (e.g., the raw
+    variables, "PS" if it is not cached and the time bounds) are read together
+    with one ``compute()`` of their dask arrays.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        The lazily opened dataset of the time range.
+    time_slice : slice
+        The time steps of the slab.
+    field_cache : FieldCache | None, optional
+        The field cache, by default None.
+
+    Returns
+    -------
+    xr.Dataset
+        The slab of the dataset, with its time-varying variables in memory.
+    """
+    ds_slab = ds.isel(time=time_slice)
+    ds_slab = get_cached_fields(field_cache, ds_slab, HYBRID_SIGMA_INPUT_VARS)
+
+    lazy_vars = [
+        name
+        for name, var in ds_slab.data_vars.items()
+        if var.chunks is not None and "time" in var.dims
+    ]
+    if not lazy_vars:
+        return ds_slab
+
+    return ds_slab.assign(ds_slab[lazy_vars].compute().data_vars)
+
+
+def group_handlers(
+    handlers: list[VarHandlerDict],
+    max_group_size: int = MAX_GROUP_SIZE,
+    var_bytes: dict[str, int] | None = None,
+    max_group_bytes: int = MAX_GROUP_BYTES,
+) -> list[VarHandlerDict]:
+    """Groups VarHandlers that share inputs for fused CMORization.
+
+    Handlers are grouped if they have the same table and levels, and share at
+    least one input (directly or through other handlers in the group). Handlers
+    with hybrid sigma levels share the surface pressure and hybrid
+    coefficients. Groups are split into chunks of at most ``max_group_size``
+    handlers, whose inputs are at most ``max_group_bytes`` in total.
+
+    MPAS and legacy handlers, and handlers that do not share any inputs, are
+    returned as is.
+
+    Parameters
+    ----------
+    handlers : list[VarHandlerDict]
+        The dictionary representations of the handlers.
+    max_group_size : int, optional
+        The maximum number of handlers in a group, by default
+        ``MAX_GROUP_SIZE``.
+    var_bytes : dict[str, int] | None, optional
+        A dictionary mapping the inputs to the size of their input files in
+        bytes, by default None to only cap groups by ``max_group_size``.
+    max_group_bytes : int, optional
+        The maximum size of the input files of a group in bytes, by default
+        ``MAX_GROUP_BYTES``. A handler whose inputs exceed it on its own is
+        not grouped.
+
+    Returns
+    -------
+    list[VarHandlerDict]
+        The handlers and groups of handlers, in the order of the first handler
+        in each group.
+    """
+    # Map the index of each handler to the index of its parent (union-find).
+    parents = list(range(len(handlers)))
+
+    def _find(index: int) -> int:
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+
+        return index
+
+    # Map each (group key, input) to the index of the first handler with it.
+    input_owners: dict[tuple[str, str], int] = {}
+
+    for index, handler in enumerate(handlers):
+        if _get_var_handler(handler) is None:
+            continue
+
+        key = _get_group_key(handler)
+        for var in _get_handler_inputs(handler):
+            owner = input_owners.setdefault((key, var), index)
+            parents[_find(index)] = _find(owner)
+
+    components: dict[int, list[int]] = {}
+    for index in range(len(handlers)):
+        components.setdefault(_find(index), []).append(index)
+
+    result: list[VarHandlerDict] = []
+    for indexes in components.values():
+        for chunk in _split_component(
+            handlers, indexes, max_group_size, var_bytes or {}, max_group_bytes
+        ):
+            if len(chunk) == 1:
+                result.append(handlers[chunk[0]])
+            else:
+                group = VarHandlerGroup(
+                    [_get_var_handler(handlers[i]) for i in chunk]  # type: ignore
+                )
+                result.append(group.to_dict())
+
+    num_groups = sum(1 for handler in result if "handlers" in handler)
+    logger.info(
+        f"Fused {len(handlers)} handlers into {len(result)} jobs "
+        f"({num_groups} group(s) with shared reads)."
+    )
+
+    return result
+
+
+def _split_component(
+    handlers: list[VarHandlerDict],
+    indexes: list[int],
+    max_group_size: int,
+    var_bytes: dict[str, int],
+    max_group_bytes: int,
+) -> list[list[int]]:
+    """Splits the handlers that share inputs into chunks of capped size.
+
+    Parameters
+    ----------
+    handlers : list[VarHandlerDict]
+        The dictionary representations of the handlers.
+    indexes : list[int]
+        The indexes of the handlers that share inputs, in order.
+    max_group_size : int
+        The maximum number of handlers in a chunk.
+    var_bytes : dict[str, int]
+        A dictionary mapping the inputs to the size of their input files in
+        bytes, with unknown inputs counted as zero bytes.
+    max_group_bytes : int
+        The maximum size of the input files of a chunk in bytes.
+
+    Returns
+    -------
+    list[list[int]]
+        The indexes of the handlers in each chunk, in order.
+    """
+    chunks: list[list[int]] = []
+    chunk: list[int] = []
+    chunk_inputs: set[str] = set()
+
+    for index in indexes:
+        inputs = set(_get_handler_inputs(handlers[index]))
+        nbytes = sum(var_bytes.get(var, 0) for var in chunk_inputs | inputs)
+
+        if chunk and (len(chunk) >= max_group_size or nbytes > max_group_bytes):
+            chunks.append(chunk)
+            chunk, chunk_inputs = [], set()
+
+        chunk.append(index)
+        chunk_inputs |= inputs
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+
+def _get_var_handler(handler: VarHandlerDict) -> VarHandler | None:
+    """Gets the VarHandler object of a handler's dictionary representation.
+
+    Parameters
+    ----------
+    handler : VarHandlerDict
+        The dictionary representation of the handler.
+
+    Returns
+    -------
+    VarHandler | None
+        The VarHandler, or None if the handler is an MPAS or legacy handler.
+    """
+    var_handler = getattr(handler["method"], "__self__", None)
+
+    if isinstance(var_handler, VarHandler):
+        return var_handler
+
+    return None
+
+
+def _get_group_key(handler: VarHandlerDict) -> str:
+    """Gets the key of the handlers that can be grouped with a handler.
+
+    Parameters
+    ----------
+    handler : VarHandlerDict
+        The dictionary representation of the handler.
+
+    Returns
+    -------
+    str
+        The key, which is the table and levels of the handler.
+    """
+    return json.dumps([handler["table"], handler.get("levels")], sort_keys=True)
+
+
+def _get_handler_inputs(handler: VarHandlerDict) -> list[str]:
+    """Gets the inputs of a handler, including implicit hybrid sigma inputs.
+
+    Parameters
+    ----------
+    handler : VarHandlerDict
+        The dictionary representation of the handler.
+
+    Returns
+    -------
+    list[str]
+        The inputs of the handler.
+    """
+    inputs = list(handler["raw_variables"])
+    levels: dict[str, Any] | None = handler.get("levels")
+
+    if levels is not None and levels["name"] in HYBRID_SIGMA_LEVEL_NAMES:
+        inputs += HYBRID_SIGMA_INPUT_VARS
+
+    return inputs
+
+
+def _get_handler_filepaths(
+    handler: VarHandler, vars_to_filepaths: dict[str, list[str]]
+) -> dict[str, list[str]]:
+    """Gets the filepaths of a handler's raw variables.
+
+    Parameters
+    ----------
+    handler : VarHandler
+        The handler.
+    vars_to_filepaths : dict[str, list[str]]
+        A dictionary mapping E3SM raw variables to a list of filepath(s).
+
+    Returns
+    -------
+    dict[str, list[str]]
+        A dictionary mapping the handler's raw variables to their filepath(s).
+    """
+    return {var: vars_to_filepaths.get(var, []) for var in handler.raw_variables}
@@ -1,36 +1,80 @@
-import json
+from __future__ import annotations
+
 import logging
 import os
-from typing import Any, KeysView, Literal, TypedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any, KeysView, Literal, TypedDict
 
-import cmor
-import numpy as np
-import xarray as xr
-import xcdat as xc
 import yaml
 
-from e3sm_to_cmip import LEGACY_XARRAY_MERGE_SETTINGS
+from e3sm_to_cmip import LEGACY_XARRAY_MERGE_SETTINGS, telemetry
+from e3sm_to_cmip._lazy_import import lazy_import
 from e3sm_to_cmip._logger import _setup_child_logger
-from e3sm_to_cmip.cmor_handlers import FILL_VALUE, _formulas
+from e3sm_to_cmip._netcdf_lock import get_netcdf_lock
+from e3sm_to_cmip.cmor_handlers import (  # noqa: F401
+    FILL_VALUE,
+    HYBRID_SIGMA_INPUT_VARS,
+    HYBRID_SIGMA_LEVEL_NAMES,
+    _formulas,
+    precision,
+)
+from e3sm_to_cmip.cmor_handlers.compiler import CompiledFormula, compile_formula
+from e3sm_to_cmip.field_cache import FieldCache, get_cached_fields
+from e3sm_to_cmip.grid_cache import Descriptor, GridCache, get_descriptor
+from e3sm_to_cmip.journal import Journal
+from e3sm_to_cmip.prefetch import (
+    DEFAULT_PREFETCH_DEPTH,
+    SegmentPrefetcher,
+    load_segment,
+)
+from e3sm_to_cmip.table_registry import get_table_registry
 from e3sm_to_cmip.util import _get_table_for_non_monthly_freq
 
+if TYPE_CHECKING:
+    import cmor
+    import numpy as np
+    import xarray as xr
+    import xcdat as xc
+else:
+    cmor = lazy_import("cmor")
+    np = lazy_import("numpy")
+    xr = lazy_import("xarray")
+    xc = lazy_import("xcdat")
+
 logger = _setup_child_logger(__name__)
 
-# The names for valid hybrid sigma levels.
-HYBRID_SIGMA_LEVEL_NAMES = [
-    "standard_hybrid_sigma",
-    "standard_hybrid_sigma_half",
-]
-# A list of valid time dimension names, which is used to check if
-# a output CMIP variable has a time dimension based on the CMOR table. If the
-# CMIP variable does have a time dimension, subsequent CMOR operations are
-# handled appropriately.
-TIME_DIMS = ["time", "time1", "time2"]
+# The maximum in-memory size of the raw variables that are evaluated and
+# written with CMOR at once. Variables with a time dimension are written in
+# slabs of time steps that fit in this size, so the peak memory of a handler
+# is bounded by the slab size rather than the length of its input files.
+TIME_SLAB_BYTES = 256 * 1024**2
+
+# The time bounds variables of the input files, which are kept when only some
+# of the data variables are read.
+TIME_BNDS_VARS = ["time_bnds", "time_bounds"]
 
 # Type alias for the dictionary representation of a VarHandler object.
 VarHandlerDict = dict[str, Any]
 
 
+@dataclass
+class InputLayout:
+    """The layout of the input files of a time range, read from their headers."""
+
+    # The variables of the input files that are read.
+    names: set[str] = field(default_factory=set)
+    # The variables of the input files that are not read.
+    drop_variables: list[str] = field(default_factory=list)
+    # The in-memory size of one time step of the time-varying variables that
+    # are read, in bytes.
+    step_bytes: int = 0
+    # The largest on-disk chunk size along the time dimension of the variables
+    # that are read, or 1 if they are stored contiguously.
+    time_chunk: int = 1
+
+
 class BaseVarHandler:
     def __init__(
         self,
@@ -184,6 +228,12 @@ class VarHandler(BaseVarHandler):
         metadata_path: str,
         cmor_log_dir: str,
         table: str | None = None,
+        segment: int | None = None,
+        journal: Journal | None = None,
+        grid_cache: GridCache | None = None,
+        prefetch_depth: int = DEFAULT_PREFETCH_DEPTH,
+        prefetch_readahead: bool = False,
+        field_cache: FieldCache | None = None,
     ) -> bool:
         """CMORizes a list of E3SM raw variables to a CMIP variable.
 
@@ -200,11 +250,37 @@ class VarHandler(BaseVarHandler):
         table : str | None
             The CMOR table filename, derived from a custom `freq`, by default
             None.
+        segment : int | None
+            The index of the time segment if ``vars_to_filepaths`` only
+            contains the files for one segment of the variable, which is run in
+            its own CMOR session with its own log file, by default None.
+        journal : Journal | None
+            The resume journal, which records each time segment once its output
+            is written. With ``--resume``, segments completed by a previous run
+            are skipped. By default None.
+        grid_cache : GridCache | None
+            The grid descriptor cache of the run, which stores the values of
+            the CMOR axes that are shared across handlers and time segments.
+            By default None to read them from each time segment.
+        prefetch_depth : int
+            The number of time segments that are read on a background thread
+            while the current segment is written with CMOR (refer to
+            ``prefetch.py``), by default ``DEFAULT_PREFETCH_DEPTH``. With 0,
+            each segment is read after the previous one is written.
+        prefetch_readahead : bool
+            Whether to read the input files of the segments read ahead into
+            the page cache before opening them, by default False.
+        field_cache : FieldCache | None
+            The field cache of the run, which keeps the surface pressure and
+            hybrid coefficients of each time segment in memory for the other
+            handlers on this worker (refer to ``field_cache.py``). By default
+            None to read them from each handler's input files.
 
         Returns
         -------
         bool
-            If CMORizing was successful, return True, else False.
+            If CMORizing was successful for every time segment, return True,
+            else False.
         """
         logger.info(f"{self.name}: Starting CMORizing")
 
@@ -219,7 +295,9 @@ class VarHandler(BaseVarHandler):
         # Create the logging directory and setup the CMOR module globally before
         # running any CMOR functions.
         # ----------------------------------------------------------------------
-        self._setup_cmor_module(self.name, tables_path, metadata_path, cmor_log_dir)
+        self._setup_cmor_module(
+            _get_log_name(self.name, segment), tables_path, metadata_path, cmor_log_dir
+        )
 
         # Get parameters for running CMOR operations
         # ----------------------------------------------------------------------
@@ -228,42 +306,58 @@ class VarHandler(BaseVarHandler):
         # with or without a time axis.
         table_abs_path = os.path.join(tables_path, self.table)
         time_dim: str | None = self._get_var_time_dim(table_abs_path)
+        output_dtype = self._get_output_dtype(table_abs_path)
 
         # Assuming all year ranges are the same for every variable.
         # TODO: Is this a good keep this legacy assumption?
         num_files_per_variable = len(list(vars_to_filepaths.values())[0])
 
-        # CMORize and write out via cmor.write.
-        # ----------------------------------------------------------------------
+        # The time segments that were not completed by a previous run.
+        indices = []
         for index in range(num_files_per_variable):
-            logger.info(
-                f"{self.name}: loading E3SM variables {vars_to_filepaths.keys()}"
-            )
-            ds = self._get_mfdataset(vars_to_filepaths, index, time_dim)
+            inputs = _get_segment_filepaths(vars_to_filepaths, index)
 
-            # Create the base CMOR variable object using CMOR axis objects,
-            # which are all set globally in the CMOR module with unique IDs (later
-            # referenced when writing out to a file with cmor.write()).
-            logger.info(f"{self.name}: creating CMOR variable with CMOR axis objects.")
-            cmor_axis_id_map, cmor_ips_id = self._get_cmor_axis_ids_and_ips_id(
-                ds=ds, time_dim=time_dim
-            )
-            cmor_axis_ids = list(cmor_axis_id_map.values())
-            cmor_var_id = cmor.variable(
-                self.name,
-                units=self.units,
-                axis_ids=cmor_axis_ids,
-                positive=self.positive,
-            )
+            if journal is not None and journal.is_complete(self.name, inputs):
+                logger.info(f"{self.name}: skipping completed segment {index}.")
+                continue
 
-            if time_dim is None:
-                is_cmor_successful = self._cmor_write(ds, cmor_var_id)
-            else:
-                is_cmor_successful = self._cmor_write_with_time(
-                    ds, cmor_var_id, time_dim, cmor_ips_id
+            indices.append(index)
+
+        # CMORize and write out via cmor.write, while the next time segments
+        # are read.
+        # ----------------------------------------------------------------------
+        is_cmor_successful = True
+        prefetcher = SegmentPrefetcher(
+            self.name,
+            lambda index: self._open_segment(vars_to_filepaths, index, time_dim),
+            lambda index: _get_segment_filepaths(vars_to_filepaths, index),
+            indices,
+            prefetch_depth,
+            prefetch_readahead,
+        )
+
+        with prefetcher:
+            for index, ds in prefetcher:
+                output_path = self._cmor_write_dataset(
+                    ds, time_dim, grid_cache, output_dtype, field_cache
                 )
 
-            ds.close()
+                ds.close()
+
+                if output_path is None:
+                    is_cmor_successful = False
+                elif journal is not None:
+                    journal.record(
+                        self.name,
+                        _get_segment_filepaths(vars_to_filepaths, index),
+                        output_path,
+                    )
+
+        if len(indices) > 1:
+            prefetcher.log_stats()
+
+        if field_cache is not None and self._has_hybrid_levels():
+            field_cache.log_stats(self.name)
 
         # NOTE: It is important to close the CMOR module AFTER CMORizing all of
         # the variables. Otherwise, the IDs of cmor objects gets wiped after
@@ -275,6 +369,117 @@ class VarHandler(BaseVarHandler):
 
         return is_cmor_successful
 
+    def _cmor_write_dataset(
+        self,
+        ds: xr.Dataset,
+        time_dim: str | None,
+        grid_cache: GridCache | None = None,
+        output_dtype: np.dtype | None = None,
+        field_cache: FieldCache | None = None,
+    ) -> str | None:
+        """Creates the CMOR variable, writes the output data and closes its file.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            The dataset containing the E3SM raw variables and axes info.
+        time_dim : str | None
+            The optional time dimension for the output CMIP variable.
+        grid_cache : GridCache | None, optional
+            The grid descriptor cache, by default None.
+        output_dtype : np.dtype | None, optional
+            The dtype of the output data (refer to ``_get_output_data()``), by
+            default None.
+        field_cache : FieldCache | None, optional
+            The field cache, which replaces the surface pressure and hybrid
+            coefficients of each time slab that are not in memory yet, by
+            default None.
+
+        Returns
+        -------
+        str | None
+            The path to the output file if the write succeeded, None otherwise.
+        """
+        cmor_var_id, cmor_ips_id = self._create_cmor_variable(ds, time_dim, grid_cache)
+
+        if time_dim is None:
+            is_cmor_successful = self._cmor_write(ds, cmor_var_id, output_dtype)
+        else:
+            is_cmor_successful = self._cmor_write_with_time(
+                ds, cmor_var_id, time_dim, cmor_ips_id, output_dtype, field_cache
+            )
+
+        if not is_cmor_successful:
+            return None
+
+        return self._close_cmor_variable(cmor_var_id)
+
+    def _create_cmor_variable(
+        self,
+        ds: xr.Dataset,
+        time_dim: str | None,
+        grid_cache: GridCache | None = None,
+    ) -> tuple[int, int | None]:
+        """Creates the CMOR variable with its CMOR axis objects.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            The dataset containing the E3SM raw variables and axes info.
+        time_dim : str | None
+            The optional time dimension for the output CMIP variable.
+        grid_cache : GridCache | None, optional
+            The grid descriptor cache, by default None.
+
+        Returns
+        -------
+        tuple[int, int | None]
+            The CMOR variable ID and the optional CMOR zfactor ips ID.
+        """
+        # Create the base CMOR variable object using CMOR axis objects,
+        # which are all set globally in the CMOR module with unique IDs (later
+        # referenced when writing out to a file with cmor.write()).
+        logger.info(f"{self.name}: creating CMOR variable with CMOR axis objects.")
+        with telemetry.span("get_cmor_axis_ids", self.name):
+            cmor_axis_id_map, cmor_ips_id = self._get_cmor_axis_ids_and_ips_id(
+                ds=ds, time_dim=time_dim, grid_cache=grid_cache
+            )
+        cmor_axis_ids = list(cmor_axis_id_map.values())
+        cmor_var_id = cmor.variable(
+            self.name,
+            units=self.units,
+            axis_ids=cmor_axis_ids,
+            positive=self.positive,
+        )
+
+        return cmor_var_id, cmor_ips_id
+
+    def _close_cmor_variable(self, cmor_var_id: int) -> str | None:
+        """Closes the output file of the CMOR variable.
+
+        Only the variable's output file is closed, not the CMOR module, which
+        keeps the axis IDs for the other time segments.
+
+        Parameters
+        ----------
+        cmor_var_id : int
+            The CMOR variable ID.
+
+        Returns
+        -------
+        str | None
+            The path to the output file, or None if it failed to close.
+        """
+        try:
+            with get_netcdf_lock():
+                output_path = cmor.close(cmor_var_id, file_name=True)
+        except Exception as e:
+            logger.error(f"Error closing variable {self.name} output file: {e}")
+
+            return None
+
+        return str(output_path)
+
     def _all_vars_have_filepaths(
         self, vars_to_filespaths: dict[str, list[str]]
     ) -> bool:
@@ -339,16 +544,42 @@ class VarHandler(BaseVarHandler):
             The optional name of the time dimension if it exists for the CMIP
             variable defined in the CMOR table.
         """
-        with open(table_path, "r") as inputstream:
-            table_info = json.load(inputstream)
+        tables_path, table = os.path.split(table_path)
 
-        axis_info = table_info["variable_entry"][self.name]["dimensions"].split(" ")
+        return get_table_registry(tables_path).get_time_dim(table, self.name)
 
-        for dim in TIME_DIMS:
-            if dim in axis_info:
-                return dim
+    def _open_segment(
+        self, vars_to_filepaths: dict[str, list[str]], index: int, time_dim: str | None
+    ) -> xr.Dataset:
+        """Open the dataset of a time segment, recording its telemetry span.
 
-        return None
+        The raw variables are loaded if they fit in one time slab (refer to
+        ``prefetch.load_segment()``), so the reads of a prefetched segment
+        overlap with the CMOR writes of the current one. Otherwise, they are
+        read in time slabs while they are written.
+
+        Parameters
+        ----------
+        vars_to_filepaths : dict[str, list[str]]
+            A dictionary mapping E3SM raw variables to a list of filepath(s).
+        index : int
+            The index representing the time range for the file.
+        time_dim : str | None
+            Whether or not the output CMIP variable has a time dimension.
+
+        Returns
+        -------
+        xr.Dataset
+            The dataset containing all of the raw variables.
+        """
+        logger.info(f"{self.name}: loading E3SM variables {vars_to_filepaths.keys()}")
+        with telemetry.span("get_mfdataset", self.name) as span:
+            ds = self._get_mfdataset(vars_to_filepaths, index, time_dim)
+            ds = load_segment(ds, self.raw_variables)
+            span["bytes_in"] = telemetry.get_nbytes(ds)
+            span["shapes"] = telemetry.get_shapes(ds, self.raw_variables)
+
+        return ds
 
     def _get_mfdataset(
         self, vars_to_filepaths: dict[str, list[str]], index: int, time_dim: str | None
@@ -376,39 +607,117 @@ class VarHandler(BaseVarHandler):
         xr.Dataset
             The dataset containing all of the rwar variables.
         """
-        # Sort the input filepath names for each variable to ensure time axis data
-        # is aligned and in order across variables.
-        sorted_v_to_fp: dict[str, list[str]] = {
-            var: sorted(vars_to_filepaths[var]) for var in vars_to_filepaths
-        }
+        ds = self._open_mfdataset(vars_to_filepaths, index, self._get_input_vars())
+
+        return self._prepare_dataset(ds, time_dim)
+
+    def _get_input_vars(self) -> list[str]:
+        """Get the data variables read from the input files of this handler.
+
+        Returns
+        -------
+        list[str]
+            The raw variables, and the surface pressure and hybrid coefficients
+            if the handler has hybrid sigma levels.
+        """
+        input_vars = list(self.raw_variables)
+
+        if self._has_hybrid_levels():
+            input_vars += [v for v in HYBRID_SIGMA_INPUT_VARS if v not in input_vars]
+
+        return input_vars
+
+    def _has_hybrid_levels(self) -> bool:
+        """Whether the output CMIP variable has hybrid sigma levels."""
+        return (
+            self.levels is not None and self.levels["name"] in HYBRID_SIGMA_LEVEL_NAMES
+        )
+
+    @staticmethod
+    def _open_mfdataset(
+        vars_to_filepaths: dict[str, list[str]],
+        index: int,
+        data_vars: Iterable[str] | None = None,
+    ) -> xr.Dataset:
+        """Open the xr.Dataset for a time range of all raw variables.
+
+        With ``data_vars``, the other data variables of the input files (e.g.,
+        of multi-variable history files) are not read, and the variables are
+        chunked along time in slabs of ``TIME_SLAB_BYTES``, aligned with their
+        on-disk chunks. The variables are read lazily, when they are written
+        with CMOR.
+
+        Parameters
+        ----------
+        vars_to_filepaths : dict[str, list[str]]
+            A dictionary mapping E3SM raw variables to a list of filepath(s).
+        index : int
+            The index representing the time range for the file.
+        data_vars : Iterable[str] | None, optional
+            The data variables to read with their coordinates and bounds, by
+            default None to read every variable of the input files.
+
+        Returns
+        -------
+        xr.Dataset
+            The dataset containing all of the raw variables.
+        """
+        all_filepaths = _get_segment_filepaths(vars_to_filepaths, index)
+
+        kwargs: dict[str, Any] = {"add_bounds": ["X", "Y"]}
+        if data_vars is not None:
+            layout = _read_input_layout(all_filepaths, data_vars)
+            kwargs["drop_variables"] = layout.drop_variables
+            kwargs["chunks"] = _get_time_chunks(layout)
 
-        all_filepaths = []
-        for filepaths in sorted_v_to_fp.values():
-            filepath = filepaths[index]
-            all_filepaths.append(filepath)
+            # Only add the latitude and longitude bounds if they are missing.
+            if {"lat_bnds", "lon_bnds"}.issubset(layout.names):
+                kwargs["add_bounds"] = False
 
         ds = xc.open_mfdataset(
             all_filepaths,
-            add_bounds=["X", "Y"],
             decode_times=False,
             combine="nested",
             data_vars="minimal",
             coords="minimal",
+            **kwargs,
             **LEGACY_XARRAY_MERGE_SETTINGS,
         )
 
-        # If the output CMIP variable has an alternative time dimension name (e.g.,
-        # "time2") add that to the xr.Dataset by copying the "time" dimension.
-        if time_dim is not None and time_dim != "time":
-            with xr.set_options(keep_attrs=True):
-                ds = ds.rename({"time": time_dim})
-
         # Convert "lev" and "ilev" units from mb to Pa for downstream operations.
         if "lev" in ds:
             ds["lev"] = ds["lev"] / 1000
         if "ilev" in ds:
             ds["ilev"] = ds["ilev"] / 1000
 
+        return ds
+
+    def _prepare_dataset(self, ds: xr.Dataset, time_dim: str | None) -> xr.Dataset:
+        """Prepare the dataset of raw variables for this handler.
+
+        The dataset is shallow copied, so the same dataset can be prepared for
+        more than one handler without copying the data.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            The dataset containing the raw variables.
+        time_dim : str | None
+            Whether or not the output CMIP variable has a time dimension.
+
+        Returns
+        -------
+        xr.Dataset
+            The dataset prepared for this handler.
+        """
+        ds = ds.copy()
+
+        # If the output CMIP variable has an alternative time dimension name (e.g.,
+        # "time2") add that to the xr.Dataset by copying the "time" dimension.
+        if time_dim is not None and time_dim != "time":
+            with xr.set_options(keep_attrs=True):
+                ds = ds.rename({"time": time_dim})
+
         # If the variable has levels for "sdepth", make sure it has bounds
         # for the "levgrnd" axis using a statically defined list of bound
         # values.
@@ -446,7 +755,10 @@ class VarHandler(BaseVarHandler):
         raise KeyError("No matching time bounds found in the dataset")
 
     def _get_cmor_axis_ids_and_ips_id(
-        self, ds: xr.Dataset, time_dim: str | None
+        self,
+        ds: xr.Dataset,
+        time_dim: str | None,
+        grid_cache: GridCache | None = None,
     ) -> tuple[dict[str, int], int | None]:
         """Create the CMOR axes objects, which are set globally in the CMOR module.
 
@@ -464,6 +776,9 @@ class VarHandler(BaseVarHandler):
             The dataset containing axes information.
         time_dim : str | None
             An optional time dimension for the output CMIP variable (if set).
+        grid_cache : GridCache | None, optional
+            The grid descriptor cache, which stores the values and bounds of
+            the axes and the hybrid sigma coefficients, by default None.
 
         Returns
         -------
@@ -484,36 +799,69 @@ class VarHandler(BaseVarHandler):
             axis_id_map["time"] = cmor.axis(time_dim, units=units)
 
         if self.levels is not None:
-            axis_id_map["lev"] = self._get_cmor_lev_axis_id(ds)
+            axis_id_map["lev"] = self._get_cmor_lev_axis_id(ds, grid_cache)
 
         # Datasets will always have a "lat" and "lon" dimension.
+        grid = self._get_grid_descriptor(ds, grid_cache)
         axis_id_map["lat"] = cmor.axis(
             "latitude",
             units=ds["lat"].units,
-            coord_vals=ds["lat"].values,
-            cell_bounds=ds["lat_bnds"].values,
+            coord_vals=grid["lat"],
+            cell_bounds=grid["lat_bnds"],
         )
         axis_id_map["lon"] = cmor.axis(
             "longitude",
             units=ds["lon"].units,
-            coord_vals=ds["lon"].values,
-            cell_bounds=ds["lon_bnds"].values,
+            coord_vals=grid["lon"],
+            cell_bounds=grid["lon_bnds"],
         )
 
         if self._has_hybrid_sigma_levels(ds):
-            self._set_cmor_zfactor_for_hybrid_levels(ds, axis_id_map)
+            self._set_cmor_zfactor_for_hybrid_levels(ds, axis_id_map, grid_cache)
 
             cmor_ips_id = self._set_and_get_cmor_zfactor_ips_id(axis_id_map)
 
         return axis_id_map, cmor_ips_id
 
-    def _get_cmor_lev_axis_id(self, ds: xr.Dataset) -> cmor.axis:
+    def _get_grid_descriptor(
+        self, ds: xr.Dataset, grid_cache: GridCache | None
+    ) -> Descriptor:
+        """Get the latitude and longitude values and bounds of the dataset.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            The dataset containing the "lat" and "lon" axes and their bounds.
+        grid_cache : GridCache | None
+            The grid descriptor cache, or None to read the bounds from the
+            dataset.
+
+        Returns
+        -------
+        Descriptor
+            The descriptor with the "lat", "lat_bnds", "lon" and "lon_bnds"
+            values, which is keyed by the latitude and longitude values.
+        """
+        return get_descriptor(
+            grid_cache,
+            "grid",
+            [ds["lat"].values, ds["lon"].values],
+            lambda: {
+                name: ds[name].values for name in ["lat", "lat_bnds", "lon", "lon_bnds"]
+            },
+        )
+
+    def _get_cmor_lev_axis_id(
+        self, ds: xr.Dataset, grid_cache: GridCache | None = None
+    ) -> cmor.axis:
         """Get the CMOR lev axis using the xr.Dataset.
 
         Parameters
         ----------
         ds : xr.Dataset
             The xr.Dataset containing the `lev` axis data.
+        grid_cache : GridCache | None, optional
+            The grid descriptor cache, by default None.
 
         Returns
         -------
@@ -523,18 +871,21 @@ class VarHandler(BaseVarHandler):
         axis_name = self.levels["e3sm_axis_name"]  # type: ignore
         axis_bnds = self.levels.get("e3sm_axis_bnds")  # type: ignore
 
-        coord_vals = ds[axis_name].values
-
-        if axis_bnds is not None:
-            cell_bounds = ds[axis_bnds].values
-        else:
-            cell_bounds = None
+        levels = get_descriptor(
+            grid_cache,
+            "-".join([self.levels["name"], axis_name, axis_bnds or ""]),  # type: ignore
+            [ds[axis_name].values],
+            lambda: {
+                "values": ds[axis_name].values,
+                **({"bounds": ds[axis_bnds].values} if axis_bnds is not None else {}),
+            },
+        )
 
         lev_id = cmor.axis(
             table_entry=self.levels["name"],  # type: ignore
             units=self.levels["units"],  # type: ignore
-            coord_vals=coord_vals,
-            cell_bounds=cell_bounds,
+            coord_vals=levels["values"],
+            cell_bounds=levels.get("bounds"),
         )
 
         return lev_id
@@ -545,16 +896,29 @@ class VarHandler(BaseVarHandler):
         return set(hybrid_sigma_levels).issubset(ds.data_vars)
 
     def _set_cmor_zfactor_for_hybrid_levels(
-        self, ds: xr.Dataset, cmor_axis_id_map: dict[str, cmor.axis]
+        self,
+        ds: xr.Dataset,
+        cmor_axis_id_map: dict[str, cmor.axis],
+        grid_cache: GridCache | None = None,
     ):
         lev_id = cmor_axis_id_map["lev"]
         lev_name = self.levels["name"]  # type: ignore
 
+        # The hybrid sigma coefficients are identified by the model levels.
+        coefficients = get_descriptor(
+            grid_cache,
+            "hybrid",
+            [ds[name].values for name in ["lev", "ilev"] if name in ds.coords],
+            lambda: {
+                name: ds[name].values for name in ["hyam", "hybm", "hyai", "hybi"]
+            },
+        )
+
         if lev_name == "standard_hybrid_sigma":
             a_name = "a"
             b_name = "b"
-            a_bounds = ds["hyai"].values
-            b_bounds = ds["hybi"].values
+            a_bounds = coefficients["hyai"]
+            b_bounds = coefficients["hybi"]
         elif lev_name == "standard_hybrid_sigma_half":
             a_name = "a_half"
             b_name = "b_half"
@@ -565,7 +929,7 @@ class VarHandler(BaseVarHandler):
             zaxis_id=lev_id,
             zfactor_name=a_name,
             axis_ids=[lev_id],
-            zfactor_values=ds["hyam"].values,
+            zfactor_values=coefficients["hyam"],
             zfactor_bounds=a_bounds,
         )
 
@@ -573,7 +937,7 @@ class VarHandler(BaseVarHandler):
             zaxis_id=lev_id,
             zfactor_name=b_name,
             axis_ids=[lev_id],
-            zfactor_values=ds["hybm"].values,
+            zfactor_values=coefficients["hybm"],
             zfactor_bounds=b_bounds,
         )
 
@@ -624,6 +988,7 @@ class VarHandler(BaseVarHandler):
         self,
         ds: xr.Dataset,
         cmor_var_id: int,
+        output_dtype: np.dtype | None = None,
     ) -> bool:
         """Writes the output CMIP variable.
 
@@ -632,10 +997,13 @@ class VarHandler(BaseVarHandler):
         bool
             True if write succeeded, False otherwise.
         """
-        output_data = self._get_output_data(ds)
+        output_data = self._get_output_data(ds, output_dtype)
 
         try:
-            cmor.write(var_id=cmor_var_id, data=output_data)
+            with telemetry.span("cmor_write", self.name) as span:
+                span["bytes_out"] = telemetry.get_nbytes(output_data)
+                with get_netcdf_lock():
+                    cmor.write(var_id=cmor_var_id, data=output_data)
         except Exception as e:
             logger.error(f"Error writing variable {self.name} to file: {e}")
 
@@ -649,9 +1017,15 @@ class VarHandler(BaseVarHandler):
         cmor_var_id: int,
         time_dim: str,
         cmor_ips_id: int | None,
+        output_dtype: np.dtype | None = None,
+        field_cache: FieldCache | None = None,
     ) -> bool:
         """Writes the output CMIP variable and IPS variable (if it exists).
 
+        The variables are evaluated and written in slabs of time steps (refer
+        to ``TIME_SLAB_BYTES``), so only one slab of the output data is in
+        memory at a time.
+
         Parameters
         ----------
         ds : xr.Dataset
@@ -662,53 +1036,171 @@ class VarHandler(BaseVarHandler):
             The key of the time dimension.
         cmor_ips_id : int | None
             The optional CMOR zfactor ips ID.
+        output_dtype : np.dtype | None, optional
+            The dtype of the output data (refer to ``_get_output_data()``), by
+            default None.
+        field_cache : FieldCache | None, optional
+            The field cache of the surface pressure and hybrid coefficients of
+            each slab, by default None.
 
         Returns
         -------
         bool
             True if write succeeded, False otherwise.
         """
-        output_data = self._get_output_data(ds)
-
-        time_vals = ds[time_dim].values
         time_bnds_key = self._get_time_bnds_key(ds.data_vars.keys())
         time_bnds = ds[time_bnds_key].values
 
+        num_times = ds.sizes[time_dim]
+        slab_size = self._get_time_slab_size(ds, time_dim)
+
+        # The precision of the raw variables is checked once for the segment.
+        float32_vars = self._get_float32_vars(ds, output_dtype)
+
         logger.info(
             f"{self.name}: time span {time_bnds[0][0]:1.1f} - {time_bnds[-1][-1]:1.1f}"
         )
-        logger.info(f"{self.name}: Writing variable to file...")
+        logger.info(
+            f"{self.name}: Writing variable to file in slabs of {slab_size} of "
+            f"{num_times} time steps..."
+        )
 
-        try:
-            cmor.write(
-                var_id=cmor_var_id,
-                data=output_data,
-                time_vals=time_vals,
-                time_bnds=time_bnds,
-            )
-        except Exception as e:
-            logger.error(e)
+        # Each slab is evaluated and written on its own, and CMOR appends the
+        # time steps of each write to the output file.
+        for start in range(0, num_times, slab_size):
+            ds_slab = ds.isel({time_dim: slice(start, start + slab_size)})
+
+            if not self._cmor_write_time_slab(
+                ds_slab,
+                cmor_var_id,
+                time_dim,
+                time_bnds_key,
+                cmor_ips_id,
+                output_dtype,
+                field_cache,
+                float32_vars,
+            ):
+                return False
 
-            return False
-        else:
-            if cmor_ips_id is not None:
-                logger.info(f"{self.name}: Writing IPS variable to file...")
-                try:
+        return True
+
+    def _cmor_write_time_slab(
+        self,
+        ds: xr.Dataset,
+        cmor_var_id: int,
+        time_dim: str,
+        time_bnds_key: str,
+        cmor_ips_id: int | None,
+        output_dtype: np.dtype | None = None,
+        field_cache: FieldCache | None = None,
+        float32_vars: list[str] | None = None,
+    ) -> bool:
+        """Writes a slab of time steps of the output CMIP and IPS variables.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            The slab of the dataset containing the E3SM raw variable and axes
+            info.
+        cmor_var_id : int
+            The CMOR variable ID.
+        time_dim : str
+            The key of the time dimension.
+        time_bnds_key : str
+            The key of the time bounds.
+        cmor_ips_id : int | None
+            The optional CMOR zfactor ips ID.
+        output_dtype : np.dtype | None, optional
+            The dtype of the output data (refer to ``_get_output_data()``), by
+            default None.
+        field_cache : FieldCache | None, optional
+            The field cache, which replaces the surface pressure and hybrid
+            coefficients of the slab that are not in memory yet, by default
+            None.
+        float32_vars : list[str] | None, optional
+            The raw variables that are cast to float32, which are checked once
+            for the time segment (refer to ``_get_float32_vars()``), by default
+            None to check them on the slab.
+
+        Returns
+        -------
+        bool
+            True if write succeeded, False otherwise.
+        """
+        # The fields are keyed by the time values of the slab, so only the
+        # slab of each field is read (and cached) at a time.
+        ds = get_cached_fields(field_cache, ds, HYBRID_SIGMA_INPUT_VARS)
+
+        # The data is read before the netCDF lock is held around each write,
+        # since xarray holds the same lock while it reads.
+        output_data = self._get_output_data(ds, output_dtype, float32_vars)
+        ps_data = ds["PS"].values if cmor_ips_id is not None else None
+
+        time_vals = ds[time_dim].values
+        time_bnds = ds[time_bnds_key].values
+
+        with telemetry.span("cmor_write", self.name) as span:
+            span["bytes_out"] = telemetry.get_nbytes(output_data)
+
+            try:
+                with get_netcdf_lock():
                     cmor.write(
-                        var_id=cmor_ips_id,
-                        data=ds["PS"].values,
+                        var_id=cmor_var_id,
+                        data=output_data,
                         time_vals=time_vals,
                         time_bnds=time_bnds,
-                        store_with=cmor_var_id,
                     )
-                except Exception as e:
-                    logger.error(e)
+            except Exception as e:
+                logger.error(e)
 
-                    return False
+                return False
+            else:
+                if ps_data is not None:
+                    span["bytes_out"] += telemetry.get_nbytes(ps_data)
+
+                    try:
+                        with get_netcdf_lock():
+                            cmor.write(
+                                var_id=cmor_ips_id,
+                                data=ps_data,
+                                time_vals=time_vals,
+                                time_bnds=time_bnds,
+                                store_with=cmor_var_id,
+                            )
+                    except Exception as e:
+                        logger.error(e)
+
+                        return False
 
         return True
 
-    def _get_output_data(self, ds: xr.Dataset) -> np.ndarray:
+    def _get_time_slab_size(self, ds: xr.Dataset, time_dim: str) -> int:
+        """Get the number of time steps written with CMOR at once.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            The dataset containing the E3SM raw variables.
+        time_dim : str
+            The key of the time dimension.
+
+        Returns
+        -------
+        int
+            The number of time steps of the raw variables that fit in
+            ``TIME_SLAB_BYTES``, which is at least one time step and at most
+            all of the time steps. If the raw variables are chunked along time
+            in smaller chunks, it is a multiple of the chunk size so that each
+            chunk is read once.
+        """
+        return _get_time_slab_size(ds, time_dim, self.raw_variables)
+
+    def _get_output_data(
+        self,
+        ds: xr.Dataset,
+        output_dtype: np.dtype | None = None,
+        float32_vars: list[str] | None = None,
+    ) -> np.ndarray:
         """Get the variable output data.
 
         The variable output data is retrieved by:
@@ -721,28 +1213,186 @@ class VarHandler(BaseVarHandler):
         to an `np.ndarray`. It is important that an `np.ndarray` is returned
         because `cmor.write` does not support Xarray objects.
 
+        Unit conversions and formulas that only involve arithmetic on raw
+        variables are evaluated by their compiled form (refer to
+        ``compiler.py``), which writes into the output array and replaces the
+        missing values in the same pass. Otherwise, the formula method in
+        ``_formulas.py`` is used.
+
+        The raw variables are opened lazily, so the telemetry span of this
+        phase includes reading their data from the input files.
+
         Parameters
         ----------
         ds : xr.Dataset
             The dataset containing the raw variables.
+        output_dtype : np.dtype | None, optional
+            The dtype of the output data, which is the type of the variable in
+            the CMOR table (refer to ``_get_output_dtype()``). If it is
+            float32, the output data is evaluated in float32 where the
+            precision policy allows it (refer to ``precision.py``). By default
+            None to keep the dtype of the evaluated output data.
+        float32_vars : list[str] | None, optional
+            The raw variables that are cast to float32 if ``output_dtype`` is
+            float32, which are checked once for the time segment of a time
+            slab (refer to ``_get_float32_vars()``). By default None to check
+            them on ``ds``.
 
         Returns
         -------
         np.ndarray
             The final variable output data to pass to ``cmor.write``.
         """
+        with telemetry.span("get_output_data", self.name) as span:
+            compiled_formula = self._get_evaluable_formula(ds, output_dtype)
+
+            ds_inputs = ds
+            if output_dtype == np.float32:
+                if float32_vars is None:
+                    float32_vars = self._get_float32_vars(ds, output_dtype)
+
+                ds_inputs = precision.cast_to_float32(ds, float32_vars)
+
+            if compiled_formula is not None:
+                output = compiled_formula.evaluate(ds_inputs, output_dtype)
+            else:
+                da_output = self._evaluate(ds_inputs).fillna(FILL_VALUE)
+                output = da_output.values
+
+                if output_dtype is not None:
+                    output = output.astype(output_dtype, copy=False)
+
+            span["bytes_in"] = sum(
+                telemetry.get_nbytes(ds[name])
+                for name in self.raw_variables
+                if name in ds
+            )
+            span["bytes_out"] = telemetry.get_nbytes(output)
+            span["shapes"] = {self.name: list(output.shape)}
+
+        return output
+
+    def _get_float32_vars(
+        self, ds: xr.Dataset, output_dtype: np.dtype | None = None
+    ) -> list[str]:
+        """Get the raw variables that are cast to float32 for the output data.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            The dataset containing the raw variables, whose first time step is
+            evaluated to check the error of the cast (refer to
+            ``precision.get_float32_vars()``).
+        output_dtype : np.dtype | None, optional
+            The dtype of the output data, by default None.
+
+        Returns
+        -------
+        list[str]
+            The raw variables, which is empty unless ``output_dtype`` is
+            float32.
+        """
+        if output_dtype != np.float32:
+            return []
+
+        # The error budget is checked with the evaluation that is used.
+        compiled_formula = self._get_evaluable_formula(ds, output_dtype)
+        evaluate: Callable[[xr.Dataset], Any] = self._evaluate
+        if compiled_formula is not None:
+            evaluate = partial(compiled_formula.evaluate, fill_value=np.nan)
+
+        return precision.get_float32_vars(ds, self.raw_variables, evaluate)
+
+    def _get_evaluable_formula(
+        self, ds: xr.Dataset, output_dtype: np.dtype | None = None
+    ) -> CompiledFormula | None:
+        """Get the compiled formula of the output data if it can evaluate it.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            The dataset containing the raw variables.
+        output_dtype : np.dtype | None, optional
+            The dtype of the output data, by default None.
+
+        Returns
+        -------
+        CompiledFormula | None
+            The compiled formula (refer to ``_get_compiled_formula()``), or
+            None if it can't evaluate the raw variables of the dataset into the
+            output dtype.
+        """
+        compiled_formula = self._get_compiled_formula()
+        if compiled_formula is not None and not (
+            compiled_formula.can_evaluate(ds)
+            and (output_dtype is None or output_dtype.kind == "f")
+        ):
+            return None
+
+        return compiled_formula
+
+    def _evaluate(self, ds: xr.Dataset) -> xr.DataArray:
+        """Evaluate the output data with xarray, before replacing missing values.
+
+        Parameters
+        ----------
+        ds : xr.Dataset
+            The dataset containing the raw variables.
+
+        Returns
+        -------
+        xr.DataArray
+            The output data.
+        """
         if self.unit_conversion is not None:
             var = ds[self.raw_variables[0]]
-            da_output = _formulas.convert_units(var, self.unit_conversion)
+
+            return _formulas.convert_units(var, self.unit_conversion)
         elif self.formula is not None:
-            da_output = self.formula_method(ds)
+            return self.formula_method(ds)
+
+        return ds[self.raw_variables[0]]
+
+    def _get_compiled_formula(self) -> CompiledFormula | None:
+        """Get the compiled formula of the output data.
+
+        The formula is the handler's formula, the arithmetic of its unit
+        conversion (refer to ``_formulas.UNIT_CONVERSION_FORMULAS``), or its
+        first and only raw variable.
+
+        Returns
+        -------
+        CompiledFormula | None
+            The compiled formula, or None if it can't be compiled.
+        """
+        if self.formula is not None:
+            formula = self.formula
+        elif self.unit_conversion is not None:
+            formula = _formulas.UNIT_CONVERSION_FORMULAS.get(self.unit_conversion, "")
+            formula = formula.format(var=self.raw_variables[0])
         else:
-            da_output = ds[self.raw_variables[0]]
+            formula = self.raw_variables[0]
 
-        da_output = da_output.fillna(FILL_VALUE)
-        output = da_output.values
+        return compile_formula(formula, tuple(self.raw_variables))
 
-        return output
+    def _get_output_dtype(self, table_path: str) -> np.dtype | None:
+        """Get the dtype of the output data from the type in the CMOR table.
+
+        Parameters
+        ----------
+        table_path : str
+            The absolute path to the CMOR table.
+
+        Returns
+        -------
+        np.dtype | None
+            The dtype (e.g., float32 for "real"), or None if the type is not
+            defined in the CMOR table.
+        """
+        tables_path, table = os.path.split(table_path)
+        table_type = get_table_registry(tables_path).get_type(table, self.name)
+
+        return precision.get_output_dtype(table_type)
 
     def _update_table_ref(self, freq: str, realm: str, cmip_tables_path: str):
         """
@@ -764,3 +1414,194 @@ class VarHandler(BaseVarHandler):
         self.table = _get_table_for_non_monthly_freq(
             self.name, self.table, freq, realm, cmip_tables_path
         )
+
+
+def _get_time_slab_size(ds: xr.Dataset, time_dim: str, names: Iterable[str]) -> int:
+    """Get the number of time steps of variables that are written at once.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        The dataset containing the variables.
+    time_dim : str
+        The key of the time dimension.
+    names : Iterable[str]
+        The names of the variables (e.g., the raw variables of a handler, or of
+        a group of handlers that are read together).
+
+    Returns
+    -------
+    int
+        The number of time steps of the variables that fit in
+        ``TIME_SLAB_BYTES``, which is at least one time step and at most all
+        of the time steps. If the variables are chunked along time in smaller
+        chunks, it is a multiple of the chunk size so that each chunk is read
+        once.
+    """
+    num_times = ds.sizes[time_dim]
+    time_vars = [
+        ds[name]
+        for name in dict.fromkeys(names)
+        if name in ds and time_dim in ds[name].dims
+    ]
+    step_bytes = sum(telemetry.get_nbytes(var) // num_times for var in time_vars)
+
+    if step_bytes == 0:
+        return max(num_times, 1)
+
+    slab_size = max(1, min(num_times, TIME_SLAB_BYTES // step_bytes))
+
+    chunk_sizes = [
+        var.chunksizes[time_dim][0] for var in time_vars if var.chunks is not None
+    ]
+    if chunk_sizes and max(chunk_sizes) <= slab_size:
+        slab_size = slab_size // max(chunk_sizes) * max(chunk_sizes)
+
+    return slab_size
+
+
+def _get_segment_filepaths(
+    vars_to_filepaths: dict[str, list[str]], index: int
+) -> list[str]:
+    """Get the filepaths of all raw variables for a time segment.
+
+    Parameters
+    ----------
+    vars_to_filepaths : dict[str, list[str]]
+        A dictionary mapping E3SM raw variables to a list of filepath(s).
+    index : int
+        The index representing the time range for the file.
+
+    Returns
+    -------
+    list[str]
+        The filepath of each raw variable at the index.
+    """
+    # Sort the input filepath names for each variable to ensure time axis data
+    # is aligned and in order across variables.
+    sorted_v_to_fp: dict[str, list[str]] = {
+        var: sorted(vars_to_filepaths[var]) for var in vars_to_filepaths
+    }
+
+    all_filepaths = []
+    for filepaths in sorted_v_to_fp.values():
+        filepath = filepaths[index]
+        all_filepaths.append(filepath)
+
+    return all_filepaths
+
+
+def _read_input_layout(filepaths: list[str], data_vars: Iterable[str]) -> InputLayout:
+    """Read the layout of the input files of a time range from their headers.
+
+    The variables that are read are the data variables, the dimension
+    coordinates, the time bounds, and the coordinates and bounds referenced by
+    the ``coordinates`` and ``bounds`` attributes of these variables.
+
+    Parameters
+    ----------
+    filepaths : list[str]
+        The input files of the time range, which can include the same file
+        more than once (e.g., history files).
+    data_vars : Iterable[str]
+        The data variables to read.
+
+    Returns
+    -------
+    InputLayout
+        The layout of the input files.
+    """
+    import netCDF4
+
+    layout = InputLayout()
+    data_vars = set(data_vars)
+    step_bytes: dict[str, int] = {}
+
+    # The headers are read on the prefetch thread while CMOR writes, so the
+    # netCDF4 calls hold the shared netCDF lock (refer to ``_netcdf_lock.py``).
+    for filepath in dict.fromkeys(filepaths):
+        with get_netcdf_lock(), netCDF4.Dataset(filepath, "r") as ds:
+            names = {
+                name
+                for name, var in ds.variables.items()
+                if name in data_vars
+                or name in TIME_BNDS_VARS
+                or var.dimensions == (name,)
+            }
+            for name in list(names):
+                var = ds.variables[name]
+                names.update(getattr(var, "coordinates", "").split())
+                names.add(getattr(var, "bounds", ""))
+
+            names &= set(ds.variables)
+            layout.names |= names
+            layout.drop_variables += [
+                name for name in ds.variables if name not in names
+            ]
+
+            for name in names & data_vars:
+                var = ds.variables[name]
+                if "time" not in var.dimensions:
+                    continue
+
+                axis = var.dimensions.index("time")
+                step_bytes[name] = var.dtype.itemsize * int(
+                    np.prod([n for i, n in enumerate(var.shape) if i != axis])
+                )
+
+                chunking = var.chunking()
+                if isinstance(chunking, list):
+                    layout.time_chunk = max(layout.time_chunk, chunking[axis])
+
+    # A variable that is read in one file is read in every file.
+    layout.drop_variables = sorted(set(layout.drop_variables) - layout.names)
+    layout.step_bytes = sum(step_bytes.values())
+
+    return layout
+
+
+def _get_time_chunks(layout: InputLayout) -> dict[str, int]:
+    """Get the chunks of the input files along the time dimension.
+
+    Parameters
+    ----------
+    layout : InputLayout
+        The layout of the input files.
+
+    Returns
+    -------
+    dict[str, int]
+        The chunks, with the number of time steps of the variables that fit in
+        ``TIME_SLAB_BYTES`` (at least one on-disk chunk, and a multiple of the
+        on-disk chunk size otherwise). Empty if the variables do not vary in
+        time, so each file is read as one chunk.
+    """
+    if layout.step_bytes == 0:
+        return {}
+
+    num_steps = max(TIME_SLAB_BYTES // layout.step_bytes, 1)
+    num_steps = max(num_steps // layout.time_chunk, 1) * layout.time_chunk
+
+    return {"time": num_steps}
+
+
+def _get_log_name(name: str, segment: int | None) -> str:
+    """Get the name of the CMOR log file for a handler or one of its segments.
+
+    Parameters
+    ----------
+    name : str
+        The name of the handler.
+    segment : int | None
+        The index of the time segment, or None if all segments are CMORized
+        together.
+
+    Returns
+    -------
+    str
+        The name of the log file (without the extension).
+    """
+    if segment is None:
+        return name
+
+    return f"{name}_segment{segment}"
@@ -0,0 +1,258 @@
+"""
+This module provides the precision policy of the output data of handlers.
+
+The CMOR tables define the type of each variable, which is the precision that
+CMOR writes (e.g., "real" for float32, which is the type of most CMIP6
+variables). The output data of a handler is evaluated and passed to
+``cmor.write`` in that precision:
+
+  * The raw variables are cast to float32 if it is lossless, i.e., they are
+    stored as float32 or a smaller type in the input files, but are decoded
+    as float64 (refer to ``is_lossless_float32()``).
+  * The other float64 raw variables (e.g., variables stored as double, or the
+    hybrid sigma coefficients of "pfull") are cast to float32 if the error of
+    evaluating the first time step in float32 instead of float64 is within
+    ``FLOAT32_ERROR_BUDGET``. The error is checked once per time segment, and
+    the same raw variables are cast for each time slab of the segment.
+  * The output data is written into an array of the type of the variable
+    (refer to ``CompiledFormula.evaluate()``), without an intermediate
+    float64 copy.
+
+Variables of the "integer" type are not cast, since the missing values of the
+output data (``FILL_VALUE``) don't fit in an integer type. Their output data
+is passed to CMOR as is.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
+
+from e3sm_to_cmip._lazy_import import lazy_import
+from e3sm_to_cmip._logger import _setup_child_logger
+
+if TYPE_CHECKING:
+    import numpy as np
+    import xarray as xr
+else:
+    np = lazy_import("numpy")
+    xr = lazy_import("xarray")
+
+logger = _setup_child_logger(__name__)
+
+# The dtypes of the types of the variables in the CMOR tables. The "integer"
+# type is not supported (refer to the module docstring).
+TABLE_TYPE_DTYPES = {"real": "float32", "double": "float64"}
+
+# The maximum error of evaluating the output data in float32 instead of
+# float64, in units of the spacing of float32 values (ULPs) at the largest
+# magnitude of the output data. Rounding the float64 output data to float32,
+# as CMOR does, has an error of up to 0.5 ULP.
+FLOAT32_ERROR_BUDGET = 4.0
+
+
+def get_output_dtype(table_type: str | None) -> np.dtype | None:
+    """Gets the dtype of the output data of a variable.
+
+    Parameters
+    ----------
+    table_type : str | None
+        The type of the variable in the CMOR table (e.g., "real").
+
+    Returns
+    -------
+    np.dtype | None
+        The dtype, or None if the type is not defined or not supported (e.g.,
+        "integer").
+    """
+    dtype = TABLE_TYPE_DTYPES.get(table_type)  # type: ignore[arg-type]
+
+    return None if dtype is None else np.dtype(dtype)
+
+
+def is_lossless_float32(var: xr.DataArray) -> bool:
+    """Checks if a variable can be cast to float32 without loss.
+
+    Parameters
+    ----------
+    var : xr.DataArray
+        The variable.
+
+    Returns
+    -------
+    bool
+        True if the variable is float32, or if it is stored in the input files
+        as a type whose values are all exactly representable in float32 (e.g.,
+        float32 or int16) and is not packed with a scale factor or an offset.
+    """
+    if var.dtype == np.float32:
+        return True
+
+    encoding = var.encoding
+    if (
+        "dtype" not in encoding
+        or "scale_factor" in encoding
+        or "add_offset" in encoding
+    ):
+        return False
+
+    return bool(np.can_cast(encoding["dtype"], np.float32, casting="safe"))
+
+
+def get_float32_inputs(
+    ds: xr.Dataset,
+    names: Iterable[str],
+    evaluate: Callable[[xr.Dataset], Any],
+) -> xr.Dataset:
+    """Gets the dataset to evaluate float32 output data of a handler on.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        The dataset containing the raw variables.
+    names : Iterable[str]
+        The raw variables of the handler.
+    evaluate : Callable[[xr.Dataset], Any]
+        The function that evaluates the output data on a dataset, which is
+        used to check the error of evaluating it in float32.
+
+    Returns
+    -------
+    xr.Dataset
+        The dataset, with the float64 raw variables cast to float32 (lazily)
+        if it is lossless or within the error budget.
+    """
+    return cast_to_float32(ds, get_float32_vars(ds, names, evaluate))
+
+
+def get_float32_vars(
+    ds: xr.Dataset,
+    names: Iterable[str],
+    evaluate: Callable[[xr.Dataset], Any],
+) -> list[str]:
+    """Gets the float64 raw variables of a handler that are cast to float32.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        The dataset containing the raw variables (e.g., a time segment, whose
+        first time step is evaluated to check the error).
+    names : Iterable[str]
+        The raw variables of the handler.
+    evaluate : Callable[[xr.Dataset], Any]
+        The function that evaluates the output data on a dataset, which is
+        used to check the error of evaluating it in float32.
+
+    Returns
+    -------
+    list[str]
+        The float64 raw variables whose cast to float32 is lossless, and the
+        other float64 raw variables if the error is within the budget.
+    """
+    names = [name for name in names if name in ds and ds[name].dtype == np.float64]
+    lossless = [name for name in names if is_lossless_float32(ds[name])]
+    lossy = [name for name in names if name not in lossless]
+
+    if not lossy:
+        return lossless
+
+    ds = cast_to_float32(ds, lossless)
+    error = get_float32_error(ds, cast_to_float32(ds, lossy), lossy, evaluate)
+
+    if error > FLOAT32_ERROR_BUDGET:
+        logger.debug(
+            f"Evaluating {lossy} in float64: the float32 error ({error:.1f} ULPs) "
+            f"exceeds the budget ({FLOAT32_ERROR_BUDGET} ULPs)."
+        )
+
+        return lossless
+
+    return lossless + lossy
+
+
+def cast_to_float32(ds: xr.Dataset, names: Iterable[str]) -> xr.Dataset:
+    """Casts variables of a dataset to float32 (lazily).
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        The dataset.
+    names : Iterable[str]
+        The variables to cast (refer to ``get_float32_vars()``). The
+        variables that are not in the dataset are skipped.
+
+    Returns
+    -------
+    xr.Dataset
+        The dataset with the variables cast to float32.
+    """
+    names = [name for name in names if name in ds]
+    if not names:
+        return ds
+
+    return ds.assign({name: ds[name].astype(np.float32) for name in names})
+
+
+def get_float32_error(
+    ds: xr.Dataset,
+    ds_float32: xr.Dataset,
+    names: list[str],
+    evaluate: Callable[[xr.Dataset], Any],
+) -> float:
+    """Gets the error of evaluating the first step of the output data in float32.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        The dataset containing the float64 raw variables.
+    ds_float32 : xr.Dataset
+        The dataset containing the raw variables cast to float32.
+    names : list[str]
+        The raw variables that are cast to float32.
+    evaluate : Callable[[xr.Dataset], Any]
+        The function that evaluates the output data on a dataset.
+
+    Returns
+    -------
+    float
+        The error in ULPs (refer to ``get_ulp_error()``). The first step is
+        the first index of the first dimension (usually time) of the raw
+        variable with the most dimensions.
+    """
+    var = max((ds[name] for name in names), key=lambda var: var.ndim)
+    step = {var.dims[0]: slice(0, 1)} if var.ndim > 0 else {}
+
+    reference = np.asarray(evaluate(ds.isel(step)), dtype=np.float64)
+    result = np.asarray(evaluate(ds_float32.isel(step)), dtype=np.float64)
+
+    return get_ulp_error(result, reference)
+
+
+def get_ulp_error(result: np.ndarray, reference: np.ndarray) -> float:
+    """Gets the maximum error of a result in float32 ULPs of a reference.
+
+    Parameters
+    ----------
+    result : np.ndarray
+        The result.
+    reference : np.ndarray
+        The reference.
+
+    Returns
+    -------
+    float
+        The maximum absolute error, in units of the spacing of float32 values
+        at the largest finite magnitude of the reference. The error is
+        infinite if the result is not finite where the reference is.
+    """
+    finite = np.isfinite(reference)
+    if not finite.any():
+        return 0.0
+
+    error = np.abs(result[finite] - reference[finite])
+    if not np.isfinite(error).all():
+        return float("inf")
+
+    ulp = np.spacing(np.float32(np.abs(reference[finite]).max()))
+
+    return float(error.max() / ulp)
@@ -0,0 +1,556 @@
+"""
+This module provides the handler registry, a compact index of the variable
+handlers defined in ``handlers.yaml`` and in the legacy and MPAS handler
+modules.
+
+The registry maps each CMIP variable to the definitions of its handlers (name,
+units, table, raw variables, etc.) and, for handler modules, to the path of
+the module. The metadata of handler modules is read from their source without
+importing them, and a module is only imported when its ``handle()`` function
+is called. The registry is cached under ``$XDG_CACHE_HOME`` (or
+``~/.cache``) and is rebuilt whenever the modification time of
+``handlers.yaml`` or of a handler module changes.
+"""
+
+import ast
+import copy
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+from collections import defaultdict
+from typing import Any
+
+import yaml
+
+from e3sm_to_cmip import (
+    HANDLER_DEFINITIONS_PATH,
+    LEGACY_HANDLER_DIR_PATH,
+    MPAS_HANDLER_DIR_PATH,
+)
+from e3sm_to_cmip._logger import _setup_child_logger
+from e3sm_to_cmip.cmor_handlers.handler import VarHandler, VarHandlerDict
+
+logger = _setup_child_logger(__name__)
+
+# The path to the cached handler registry.
+REGISTRY_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "e3sm_to_cmip",
+    "handler_registry.json",
+)
+
+# The version of the cached registry format. Bump this when the structure of
+# the registry changes so that stale cached registries are rebuilt.
+REGISTRY_VERSION = 1
+
+# Files in the handler module directories that are not handler modules.
+# FIXME: Checking the file should be done dynamically because static
+# references are fragile. Filename changes won't be picked up here
+# automatically.
+NON_HANDLER_MODULES = ["__init__.py", "_formulas.py", "handler.py", "utils.py"]
+
+# Map the module-level attributes of handler modules to the keys of their
+# handler definitions.
+MODULE_ATTRS = {
+    "VAR_NAME": "name",
+    "VAR_UNITS": "units",
+    "TABLE": "table",
+    "RAW_VARIABLES": "raw_variables",
+    "POSITIVE": "positive",
+    "LEVELS": "levels",
+}
+
+# The module-level attributes that every handler module must define.
+REQUIRED_MODULE_ATTRS = ["VAR_NAME", "VAR_UNITS", "TABLE", "RAW_VARIABLES"]
+
+
+class LazyHandle:
+    """The ``handle()`` function of a handler module, imported on first call.
+
+    Instances are picklable, so they can be submitted to worker processes,
+    which import the module themselves.
+
+    Parameters
+    ----------
+    module_name : str
+        The name of the module, which is the key of the variable (e.g.,
+        "orog").
+    module_path : str
+        The absolute path to the handler module.
+    """
+
+    def __init__(self, module_name: str, module_path: str):
+        self.module_name = module_name
+        self.module_path = module_path
+
+        # Match the name of the function this object stands in for.
+        self.__name__ = "handle"
+
+        self._handle: Any = None
+
+    def __call__(self, *args, **kwargs):
+        if self._handle is None:
+            module = _get_handler_module(self.module_name, self.module_path)
+            self._handle = module.handle
+
+        return self._handle(*args, **kwargs)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {**self.__dict__, "_handle": None}
+
+    def __repr__(self) -> str:
+        return f"<LazyHandle {self.module_name}.handle ({self.module_path})>"
+
+
+class HandlerRegistry:
+    """An index of the variable handler definitions.
+
+    Parameters
+    ----------
+    yaml_handlers : dict[str, list[dict[str, Any]]]
+        A dictionary mapping CMIP variables to their handler definitions in
+        ``handlers.yaml``.
+    legacy_handlers : dict[str, dict[str, Any]]
+        A dictionary mapping CMIP variables to the definition of their legacy
+        handler module, including the "module_path".
+    mpas_handlers : dict[str, dict[str, Any]]
+        A dictionary mapping CMIP variables to the definition of their MPAS
+        handler module, including the "module_path".
+    """
+
+    def __init__(
+        self,
+        yaml_handlers: dict[str, list[dict[str, Any]]],
+        legacy_handlers: dict[str, dict[str, Any]],
+        mpas_handlers: dict[str, dict[str, Any]],
+    ):
+        self.yaml_handlers = yaml_handlers
+        self.legacy_handlers = legacy_handlers
+        self.mpas_handlers = mpas_handlers
+
+    @classmethod
+    def build(cls) -> "HandlerRegistry":
+        """Builds the registry from ``handlers.yaml`` and the handler modules.
+
+        Returns
+        -------
+        HandlerRegistry
+            The registry.
+        """
+        with open(HANDLER_DEFINITIONS_PATH, "r") as infile:
+            handlers_file = yaml.load(infile, yaml.SafeLoader)
+
+        yaml_handlers: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for entry in handlers_file:
+            yaml_handlers[entry["name"]].append(entry)
+
+        return cls(
+            dict(yaml_handlers),
+            _get_module_definitions(LEGACY_HANDLER_DIR_PATH),
+            _get_module_definitions(MPAS_HANDLER_DIR_PATH),
+        )
+
+    @classmethod
+    def load_or_build(cls, cache_path: str | None = None) -> "HandlerRegistry":
+        """Loads the cached registry, or builds it if it is stale.
+
+        Parameters
+        ----------
+        cache_path : str | None, optional
+            The path to the cached registry, by default
+            ``REGISTRY_CACHE_PATH``.
+
+        Returns
+        -------
+        HandlerRegistry
+            The registry.
+        """
+        cache_path = cache_path or REGISTRY_CACHE_PATH
+        fingerprint = _get_fingerprint()
+
+        try:
+            with open(cache_path, "r") as infile:
+                contents = json.load(infile)
+
+            if (
+                contents["version"] == REGISTRY_VERSION
+                and contents["fingerprint"] == fingerprint
+            ):
+                return cls(
+                    contents["yaml_handlers"],
+                    contents["legacy_handlers"],
+                    contents["mpas_handlers"],
+                )
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        registry = cls.build()
+        registry.save(cache_path, fingerprint)
+
+        return registry
+
+    def save(self, cache_path: str, fingerprint: dict[str, int]) -> bool:
+        """Saves the registry atomically.
+
+        Parameters
+        ----------
+        cache_path : str
+            The path to the cached registry.
+        fingerprint : dict[str, int]
+            The modification times of the handler definition files.
+
+        Returns
+        -------
+        bool
+            True if the registry was saved, otherwise False.
+        """
+        contents = {
+            "version": REGISTRY_VERSION,
+            "fingerprint": fingerprint,
+            "yaml_handlers": self.yaml_handlers,
+            "legacy_handlers": self.legacy_handlers,
+            "mpas_handlers": self.mpas_handlers,
+        }
+        dirname = os.path.dirname(cache_path)
+
+        try:
+            os.makedirs(dirname, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+            with os.fdopen(fd, "w") as outfile:
+                json.dump(contents, outfile)
+
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.debug(f"Unable to save the handler registry to '{cache_path}': {e}")
+
+            return False
+
+        return True
+
+    def get_handlers(self, var: str) -> list[VarHandlerDict] | None:
+        """Gets the handlers for a CMIP variable.
+
+        Legacy handler modules take precedence over ``handlers.yaml``. Only
+        the VarHandler objects of the requested variable are created.
+
+        Parameters
+        ----------
+        var : str
+            The CMIP variable.
+
+        Returns
+        -------
+        list[VarHandlerDict] | None
+            The dictionary representations of the handlers, or None if no
+            handlers are defined for the variable.
+        """
+        if var in self.legacy_handlers:
+            return [_to_module_handler(var, self.legacy_handlers[var])]
+
+        entries = self.yaml_handlers.get(var)
+        if entries is None:
+            return None
+
+        # Copy the entries so that changes to the handlers (e.g., their table)
+        # don't change the registry.
+        entries = copy.deepcopy(entries)
+
+        return [
+            VarHandler(
+                name=entry["name"],
+                units=entry["units"],
+                raw_variables=entry["raw_variables"],
+                table=entry["table"],
+                formula=entry.get("formula"),
+                unit_conversion=entry.get("unit_conversion"),
+                positive=entry.get("positive"),
+                levels=entry.get("levels"),
+            ).to_dict()
+            for entry in entries
+        ]
+
+    def get_mpas_handler(self, var: str) -> VarHandlerDict | None:
+        """Gets the MPAS handler for a CMIP variable.
+
+        Parameters
+        ----------
+        var : str
+            The CMIP variable.
+
+        Returns
+        -------
+        VarHandlerDict | None
+            The dictionary representation of the handler, or None if no MPAS
+            handler is defined for the variable.
+        """
+        definition = self.mpas_handlers.get(var)
+        if definition is None:
+            return None
+
+        return _to_module_handler(var, definition)
+
+    def get_raw_variables(self, var: str) -> set[str]:
+        """Gets the raw E3SM variables of every handler for a CMIP variable.
+
+        Parameters
+        ----------
+        var : str
+            The CMIP variable.
+
+        Returns
+        -------
+        set[str]
+            The raw E3SM variables, which is empty if no handlers are defined
+            for the variable.
+        """
+        if var in self.legacy_handlers:
+            return set(self.legacy_handlers[var]["raw_variables"])
+
+        return {
+            raw_var
+            for entry in self.yaml_handlers.get(var, [])
+            for raw_var in entry["raw_variables"]
+        }
+
+
+# The registry of the current process, which is reloaded if it is stale.
+_registry: HandlerRegistry | None = None
+_registry_fingerprint: dict[str, int] | None = None
+
+
+def get_registry() -> HandlerRegistry:
+    """Gets the handler registry, loading it on first use.
+
+    Returns
+    -------
+    HandlerRegistry
+        The registry.
+    """
+    global _registry, _registry_fingerprint
+
+    fingerprint = _get_fingerprint()
+    if _registry is None or fingerprint != _registry_fingerprint:
+        _registry = HandlerRegistry.load_or_build()
+        _registry_fingerprint = fingerprint
+
+    return _registry
+
+
+def _get_fingerprint() -> dict[str, int]:
+    """Gets the modification times of the handler definition files.
+
+    Returns
+    -------
+    dict[str, int]
+        A dictionary mapping the absolute path of ``handlers.yaml`` and of each
+        handler module to its modification time in nanoseconds.
+    """
+    fingerprint = {
+        HANDLER_DEFINITIONS_PATH: os.stat(HANDLER_DEFINITIONS_PATH).st_mtime_ns
+    }
+
+    for path in [LEGACY_HANDLER_DIR_PATH, MPAS_HANDLER_DIR_PATH]:
+        for module_path in _get_module_paths(path):
+            fingerprint[module_path] = os.stat(module_path).st_mtime_ns
+
+    return fingerprint
+
+
+def _get_module_paths(path: str) -> list[str]:
+    """Gets the paths of the handler modules in a directory.
+
+    Parameters
+    ----------
+    path : str
+        Path to the handler modules.
+
+    Returns
+    -------
+    list[str]
+        The sorted absolute paths of the handler modules.
+    """
+    module_paths = []
+
+    for root, _, files in os.walk(path):
+        for file in files:
+            if file.endswith(".py") and file not in NON_HANDLER_MODULES:
+                module_paths.append(os.path.join(root, file))
+
+    return sorted(module_paths)
+
+
+def _get_module_definitions(path: str) -> dict[str, dict[str, Any]]:
+    """Gets the definitions of the handler modules in a directory.
+
+    A handler module defines information about a variable, including
+    `RAW_VARIABLES`, `VAR_NAME`, `VAR_UNITS`, `TABLE`, the `handle()`
+    function, `POSITIVE` (bool, optional), and `LEVELS` (dictionary,
+    optional). These attributes are read from the module's source. A module
+    whose attributes are not literals is imported to read them.
+
+    Parameters
+    ----------
+    path: str
+        Path to the handler modules.
+
+    Returns
+    -------
+    dict[str, dict[str, Any]]
+        A dictionary mapping the key of each variable (the module name) to
+        its definition, including the "module_path".
+    """
+    definitions = {}
+
+    for module_path in _get_module_paths(path):
+        var = os.path.basename(module_path).split(".")[0]
+
+        attrs = _read_module_attrs(module_path)
+        if attrs is None:
+            module = _get_handler_module(var, module_path)
+            attrs = {
+                attr: getattr(module, attr)
+                for attr in MODULE_ATTRS
+                if hasattr(module, attr)
+            }
+
+        definitions[var] = {
+            "name": attrs["VAR_NAME"],
+            "units": attrs["VAR_UNITS"],
+            "table": attrs["TABLE"],
+            "raw_variables": attrs["RAW_VARIABLES"],
+            "positive": attrs.get("POSITIVE"),
+            "levels": attrs.get("LEVELS"),
+            "module_path": module_path,
+        }
+
+    return definitions
+
+
+def _read_module_attrs(module_path: str) -> dict[str, Any] | None:
+    """Reads the handler attributes of a module from its source.
+
+    Parameters
+    ----------
+    module_path : str
+        The absolute path to the handler module.
+
+    Returns
+    -------
+    dict[str, Any] | None
+        A dictionary mapping the module-level attributes (e.g., "VAR_NAME")
+        to their values, or None if a required attribute is missing or an
+        attribute is not a literal.
+    """
+    with open(module_path, "r") as infile:
+        tree = ast.parse(infile.read(), filename=module_path)
+
+    attrs = {}
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and node.targets[0].id in MODULE_ATTRS
+        ):
+            try:
+                attrs[node.targets[0].id] = ast.literal_eval(_unwrap_str(node.value))
+            except ValueError:
+                return None
+
+    if any(attr not in attrs for attr in REQUIRED_MODULE_ATTRS):
+        return None
+
+    return attrs
+
+
+def _unwrap_str(node: ast.expr) -> ast.expr:
+    """Unwraps ``str()`` calls on literals (e.g., ``[str("area")]``).
+
+    Parameters
+    ----------
+    node : ast.expr
+        The expression.
+
+    Returns
+    -------
+    ast.expr
+        The expression with ``str(<literal>)`` calls replaced by the literal.
+    """
+
+    class _StrCallTransformer(ast.NodeTransformer):
+        def visit_Call(self, call: ast.Call) -> ast.AST:
+            if (
+                isinstance(call.func, ast.Name)
+                and call.func.id == "str"
+                and len(call.args) == 1
+                and not call.keywords
+                and isinstance(call.args[0], ast.Constant)
+                and isinstance(call.args[0].value, str)
+            ):
+                return call.args[0]
+
+            return call
+
+    return _StrCallTransformer().visit(node)
+
+
+def _to_module_handler(var: str, definition: dict[str, Any]) -> VarHandlerDict:
+    """Converts the definition of a handler module to a handler.
+
+    Parameters
+    ----------
+    var : str
+        The key of the variable (the module name).
+    definition : dict[str, Any]
+        The definition of the handler module.
+
+    Returns
+    -------
+    VarHandlerDict
+        The dictionary representation of the handler, with a "method" that
+        imports the module when it is called.
+    """
+    definition = copy.deepcopy(definition)
+
+    return {
+        "name": definition["name"],
+        "units": definition["units"],
+        "table": definition["table"],
+        "method": LazyHandle(var, definition["module_path"]),
+        "raw_variables": definition["raw_variables"],
+        "positive": definition["positive"],
+        "levels": definition["levels"],
+    }
+
+
+def _get_handler_module(module_name: str, module_path: str):
+    """Get the variable handler Python module.
+
+    Parameters
+    ----------
+    module_name : str
+        The name of the module, which should be the key of the variable (e.g., "orog").
+    module_path : str
+        The absolute path to the variable handler Python module.
+
+    Returns
+    -------
+    module
+        The module.
+
+    Raises
+    ------
+    ImportError
+        If the module cannot be loaded from the specified path.
+    """
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load module {module_name} from {module_path}")
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+
+    return module
@@ -0,0 +1,76 @@
+"""
+This module splits handlers into time segments that are CMORized in parallel.
+
+``VarHandler.cmorize`` CMORizes the time segments (i.e., the files of each
+raw variable) of a CMIP variable one at a time, and writes an output file for
+each segment. Splitting a handler into one job per segment, each with its own
+CMOR session, allows a single large variable (e.g., "ta" or "cl" over 165
+years of 5-year files) to use all of the worker processes.
+"""
+
+import functools
+
+from e3sm_to_cmip._logger import _setup_child_logger
+from e3sm_to_cmip.cmor_handlers.fused import VarHandlerGroup
+from e3sm_to_cmip.cmor_handlers.handler import VarHandler, VarHandlerDict
+
+logger = _setup_child_logger(__name__)
+
+
+def split_into_segments(
+    handler: VarHandlerDict, vars_to_filepaths: dict[str, list[str]]
+) -> list[tuple[VarHandlerDict, dict[str, list[str]]]]:
+    """Splits a handler into one job per time segment.
+
+    Each segment job has the name "<handler>#<segment>", the "parent" key set
+    to the name of the handler, and only the files of its segment for each
+    raw variable.
+
+    Only VarHandlers (and groups of VarHandlers) whose raw variables all have
+    the same number of files can be split. Other handlers (e.g., MPAS and
+    legacy handlers) are returned as a single job.
+
+    Parameters
+    ----------
+    handler : VarHandlerDict
+        The dictionary representation of the handler.
+    vars_to_filepaths : dict[str, list[str]]
+        A dictionary mapping the handler's raw variables to their file paths.
+
+    Returns
+    -------
+    list[tuple[VarHandlerDict, dict[str, list[str]]]]
+        The jobs for the handler with the file paths of each job.
+    """
+    method = handler["method"]
+    num_files = {len(filepaths) for filepaths in vars_to_filepaths.values()}
+
+    if (
+        not isinstance(getattr(method, "__self__", None), (VarHandler, VarHandlerGroup))
+        or len(num_files) != 1
+        or min(num_files) < 2
+    ):
+        return [(handler, vars_to_filepaths)]
+
+    # Sort the filepaths the same way as `VarHandler._open_mfdataset()` to
+    # align the time segments across raw variables.
+    sorted_v_to_fp = {var: sorted(fps) for var, fps in vars_to_filepaths.items()}
+    num_segments = num_files.pop()
+
+    jobs = []
+    for segment in range(num_segments):
+        job = {
+            **handler,
+            "name": f"{handler['name']}#{segment}",
+            "parent": handler["name"],
+            "segment": segment,
+            "num_segments": num_segments,
+            "method": functools.partial(method, segment=segment),
+        }
+        segment_v_to_fp = {var: [fps[segment]] for var, fps in sorted_v_to_fp.items()}
+
+        jobs.append((job, segment_v_to_fp))
+
+    logger.debug(f"Split '{handler['name']}' handler into {num_segments} segments.")
+
+    return jobs
@@ -1,19 +1,10 @@
 import copy
-import importlib.util
-import os
-import sys
-from collections import defaultdict
 from typing import Literal, get_args
 
-import yaml
-
-from e3sm_to_cmip import (
-    HANDLER_DEFINITIONS_PATH,
-    LEGACY_HANDLER_DIR_PATH,
-    MPAS_HANDLER_DIR_PATH,
-)
+from e3sm_to_cmip import MPAS_HANDLER_DIR_PATH
 from e3sm_to_cmip._logger import _setup_child_logger
-from e3sm_to_cmip.cmor_handlers.handler import VarHandler, VarHandlerDict
+from e3sm_to_cmip.cmor_handlers.handler import VarHandlerDict
+from e3sm_to_cmip.cmor_handlers.registry import get_registry
 from e3sm_to_cmip.util import FREQUENCY_TO_CMIP_TABLES, _get_table_for_non_monthly_freq
 
 logger = _setup_child_logger(__name__)
@@ -52,7 +43,7 @@ def load_all_handlers(
         A list of the dictionary representation of VarHandler objects
         and a list of variable names that are missing handlers if any.
     """
-    handlers_by_var: dict[str, list[VarHandlerDict]] = _get_handlers_by_var()
+    registry = get_registry()
 
     missing_handlers: list[str] = []
 
@@ -60,7 +51,7 @@ def load_all_handlers(
         handlers: list[VarHandlerDict] = []
 
         for var in cmip_vars:
-            var_handler = handlers_by_var.get(var)
+            var_handler = registry.get_handlers(var)
 
             if var_handler is None:
                 missing_handlers.append(var)
@@ -91,19 +82,19 @@ def _get_mpas_handlers(cmip_vars: list[str]) -> tuple[list[VarHandlerDict], list
         A list of the dictionary representation of VarHandler objects and
         a list of variable names that are missing handlers if any.
     """
-    handlers = _get_handlers_from_modules(MPAS_HANDLER_DIR_PATH)
+    registry = get_registry()
 
     derived_handlers: list[VarHandlerDict] = []
     missing_handlers: list[str] = []
 
     for var in cmip_vars:
-        var_handler = handlers.get(var)
+        var_handler = registry.get_mpas_handler(var)
 
         if var_handler is None:
             missing_handlers.append(var)
             continue
 
-        derived_handlers.append(var_handler[0])
+        derived_handlers.append(var_handler)
 
     if len(missing_handlers) > 0:
         logger.warning(
@@ -161,7 +152,7 @@ def derive_handlers(
 
     """
     # TODO: Refactor the function parameters.
-    handlers_by_var: dict[str, list[VarHandlerDict]] = _get_handlers_by_var()
+    registry = get_registry()
     derived_handlers: list[VarHandlerDict] = []
 
     # Stores variable names that are missing handlers or the handler cannot
@@ -170,7 +161,7 @@ def derive_handlers(
     non_derivable_handlers: list[str] = []
 
     for var in cmip_vars:
-        var_handlers = handlers_by_var.get(var)
+        var_handlers = registry.get_handlers(var)
 
         # If no handlers are defined for the variable, add it to the missing
         # handlers list and continue to the next variable.
@@ -197,167 +188,30 @@ def derive_handlers(
     return derived_handlers, missing_handlers, non_derivable_handlers
 
 
-def _get_handlers_by_var() -> dict[str, list[VarHandlerDict]]:
-    """Retrieve all variable handlers from YAML and legacy module sources.
-
-    This function combines handlers loaded from a YAML configuration and from
-    legacy Python modules, merging them into a single dictionary keyed by
-    variable name.
-
-    Returns
-    -------
-    dict[str, list[VarHandlerDict]]
-        A dictionary mapping variable names to a list of handler definitions,
-        where each handler is represented as a dictionary containing handler
-        metadata and logic.
-    """
-    handlers_from_yaml = _get_handlers_from_yaml()
-    handlers_from_modules = _get_handlers_from_modules(LEGACY_HANDLER_DIR_PATH)
-    all_handlers = {**handlers_from_yaml, **handlers_from_modules}
-
-    return all_handlers
+def get_raw_variables(cmip_vars: list[str]) -> set[str]:
+    """Gets the raw E3SM variables named by the handlers of the CMIP variables.
 
-
-def _get_handlers_from_yaml() -> dict[str, list[VarHandlerDict]]:
-    """Get VarHandler objects using the `handlers.yaml` file.
-
-    Returns
-    -------
-    dict[str, list[VarHandlerDict]]
-        A dictionary, with the key being the CMIP6 variable ID and the value
-        being a list of VarHandler objects.
-    """
-    with open(HANDLER_DEFINITIONS_PATH, "r") as infile:
-        handlers_file = yaml.load(infile, yaml.SafeLoader)
-
-    handlers = defaultdict(list)
-    for entry in handlers_file:
-        var_handler = VarHandler(
-            name=entry["name"],
-            units=entry["units"],
-            raw_variables=entry["raw_variables"],
-            table=entry["table"],
-            formula=entry.get("formula"),
-            unit_conversion=entry.get("unit_conversion"),
-            positive=entry.get("positive"),
-            levels=entry.get("levels"),
-        ).to_dict()
-        handlers[entry["name"]].append(var_handler)
-
-    return dict(handlers)
-
-
-def _get_handlers_from_modules(path: str) -> dict[str, list[VarHandlerDict]]:
-    """Gets variable handlers defined in Python modules.
-
-    A Python module variable handler defines information about a variable,
-    including `RAW_VARIABLES`, `VAR_NAME`, `VAR_UNITS`, `TABLE`, the `handler()`
-    function, `positive` (bool, optional), and `levels` (dictionary, optional).
-    It also has a `write_data()` function, where additional processing may or
-    may not be performed.
-
-    The output of this function is a dictionary. The parent key is the CMIP name
-    of the variable, and the value is a nested dictionary storing key/value
-    pairs for "name", "units", "table", "method", "raw_variables", "positive"
-    (optional), and "levels" (optional).
-
-    Example output:
-    ---------------
-    {
-        "cesm_mmrbc": {
-            "name": "mmrbc",
-            "units": "kg kg-1",
-            "table": "CMIP6_AERmon.json",
-            "method": "<function cesm_mmrbc.handle(infiles, tables, user_input_path, **kwargs)>",
-            "raw_variables": ["bc_a1", "bc_a4", "bc_c1", "bc_c4"],
-            "positive": None,
-            "levels": {
-                "name": "standard_hybrid_sigma",
-                "units": "1",
-                "e3sm_axis_name": "lev",
-                "e3sm_axis_bnds": "ilev",
-            },
-        }
-    }
+    This includes the raw variables of every handler defined for each CMIP
+    variable, since the handler that is derived depends on which raw variables
+    exist in the input dataset.
 
     Parameters
     ----------
-    path: str
-        Path to the handler modules.
-
-    Returns
-    -------
-    dict[str, list[VarHandlerDict]]
-        A dictionary of a list of dictionaries, with each dictionary defining a
-        handler.
-    """
-    handlers = {}
-
-    for root, _, files in os.walk(path):
-        for file in files:
-            # FIXME: Checking the file should be done dynamically because static
-            # references are fragile. Filename changes won't be picked up here
-            # automatically.
-            if file.endswith(".py") and file not in [
-                "__init__.py",
-                "_formulas.py",
-                "handler.py",
-                "utils.py",
-            ]:
-                var = file.split(".")[0]
-                filepath = os.path.join(root, file)
-                module = _get_handler_module(var, filepath)
-
-                # NOTE: The value is set to a list with a single dict entry
-                # so that it is compatible with the data structure for storing
-                # all var handlers (which can have multiple handlers per
-                # variable).
-                handlers[var] = [
-                    {
-                        "name": module.VAR_NAME,
-                        "units": module.VAR_UNITS,
-                        "table": module.TABLE,
-                        "method": module.handle,
-                        "raw_variables": module.RAW_VARIABLES,
-                        "positive": module.POSITIVE
-                        if hasattr(module, "POSITIVE")
-                        else None,
-                        "levels": module.LEVELS if hasattr(module, "LEVELS") else None,
-                    }
-                ]
-
-    return handlers
-
-
-def _get_handler_module(module_name: str, module_path: str):
-    """Get the variable handler Python module.
-
-    Parameters
-    ----------
-    module_name : str
-        The name of the module, which should be the key of the variable (e.g., "orog").
-    module_path : str
-        The absolute path to the variable handler Python module.
+    cmip_vars : list[str]
+        The list of CMIP6 variables to CMORize.
 
     Returns
     -------
-    module
-        The module.
-
-    Raises
-    ------
-    ImportError
-        If the module cannot be loaded from the specified path.
+    set[str]
+        The set of raw E3SM variables.
     """
-    spec = importlib.util.spec_from_file_location(module_name, module_path)
-    if spec is None or spec.loader is None:
-        raise ImportError(f"Cannot load module {module_name} from {module_path}")
+    registry = get_registry()
+    raw_variables: set[str] = set()
 
-    module = importlib.util.module_from_spec(spec)
-    sys.modules[module_name] = module
-    spec.loader.exec_module(module)
+    for var in cmip_vars:
+        raw_variables.update(registry.get_raw_variables(var))
 
-    return module
+    return raw_variables
 
 
 def _derive_handler(
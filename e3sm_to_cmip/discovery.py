@@ -0,0 +1,227 @@
+"""
+This module provides header-only discovery of the E3SM variables that exist in
+an input directory.
+
+Only the netCDF headers of the input files are read, the reads are spread
+across a thread pool (with the netCDF library calls serialized), and the scan
+stops as soon as all of the raw E3SM variables required by the requested
+handlers have been found.
+"""
+
+import os
+import re
+import time
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from e3sm_to_cmip._logger import _setup_child_logger
+from e3sm_to_cmip._netcdf_lock import get_netcdf_lock
+
+logger = _setup_child_logger(__name__)
+
+# The E3SM time series filename pattern (e.g., "PS_185001_201412.nc"). Files
+# that share the same variable prefix share the same netCDF header, so only one
+# header needs to be read per prefix.
+TIME_SERIES_FILENAME_PATTERN = re.compile(r"^(?P<var>.+)_\d{6}_\d{6}\.nc$")
+
+# The default number of threads used to read netCDF headers. Header reads are
+# dominated by filesystem latency rather than CPU, so this is intentionally
+# larger than the number of cores.
+DEFAULT_NUM_THREADS = 16
+
+# The number of bytes read from the start of each file, where its netCDF
+# header is stored, before the file is opened with netCDF4. The netCDF4 calls
+# are serialized with the shared netCDF lock (refer to ``_netcdf_lock.py``), so
+# the threads overlap the filesystem latency of the reads by prefetching the
+# start of each file into the page cache before they take the lock.
+HEADER_PREFETCH_BYTES = 64 * 1024
+
+
+@dataclass
+class DiscoveryResult:
+    """The result of discovering the E3SM variables in an input directory."""
+
+    # The unique names of the data variables found in the input files.
+    variables: set[str] = field(default_factory=set)
+    # The number of `.nc` files that had their header read.
+    files_scanned: int = 0
+    # The total number of `.nc` files found in the input directory.
+    files_total: int = 0
+    # The wall-clock time spent discovering variables, in seconds.
+    elapsed: float = 0.0
+    # Whether the scan stopped before reading every candidate header because
+    # all of the required variables were found.
+    stopped_early: bool = False
+
+
+def discover_e3sm_vars(
+    input_path: str,
+    required_vars: Iterable[str] | None = None,
+    num_threads: int = DEFAULT_NUM_THREADS,
+) -> DiscoveryResult:
+    """Discovers the E3SM data variables in the `.nc` files of an input path.
+
+    The input path is walked once to collect the `.nc` files. Only one
+    header is read per time series variable prefix, starting with the
+    prefixes that are required variables. Each file's header is read on a
+    thread pool and the data variables are merged into a set. If
+    ``required_vars`` is set, pending reads are cancelled once every required
+    variable has been found.
+
+    Parameters
+    ----------
+    input_path : str
+        The path to the input `.nc` files.
+    required_vars : Iterable[str] | None, optional
+        The raw E3SM variables needed by the requested handlers, by default
+        None. If None, every file header is read.
+    num_threads : int, optional
+        The number of threads used to read headers, by default
+        ``DEFAULT_NUM_THREADS``.
+
+    Returns
+    -------
+    DiscoveryResult
+        The discovered variables along with scan statistics.
+    """
+    start_time = time.perf_counter()
+
+    required = set(required_vars) if required_vars is not None else None
+    filepaths, num_files = _get_filepaths_to_scan(input_path, required)
+    result = DiscoveryResult(files_total=num_files)
+
+    with ThreadPoolExecutor(max_workers=max(1, num_threads)) as executor:
+        pending: set[Future[set[str]]] = set()
+        paths = iter(filepaths)
+
+        # Keep a bounded window of reads in flight so that an early stop does
+        # not leave tens of thousands of queued futures behind.
+        for path in paths:
+            pending.add(executor.submit(_get_data_vars_from_header, path))
+            if len(pending) >= num_threads * 2:
+                break
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                result.variables.update(future.result())
+                result.files_scanned += 1
+
+            if required is not None and required.issubset(result.variables):
+                result.stopped_early = result.files_scanned < len(filepaths)
+
+                for future in pending:
+                    future.cancel()
+
+                break
+
+            for path in paths:
+                pending.add(executor.submit(_get_data_vars_from_header, path))
+                if len(pending) >= num_threads * 2:
+                    break
+
+    result.elapsed = time.perf_counter() - start_time
+
+    logger.info(
+        f"Discovered {len(result.variables)} E3SM variables by scanning "
+        f"{result.files_scanned} of {result.files_total} file header(s) in "
+        f"{result.elapsed:.2f} seconds (stopped early: {result.stopped_early})."
+    )
+
+    return result
+
+
+def _get_filepaths_to_scan(
+    input_path: str, required: set[str] | None
+) -> tuple[list[str], int]:
+    """Gets the `.nc` filepaths in the input path that need a header read.
+
+    Time series files that share a variable prefix share the same header
+    (e.g., "PS_185001_189912.nc" and "PS_190001_194912.nc"), so only the first
+    file for each prefix is kept. Files with a prefix that is a required
+    variable are placed first so that the scan can stop as early as possible,
+    followed by the remaining files in sorted order.
+
+    Parameters
+    ----------
+    input_path : str
+        The path to the input `.nc` files.
+    required : set[str] | None
+        The required raw E3SM variables, if any.
+
+    Returns
+    -------
+    tuple[list[str], int]
+        The ordered list of absolute filepaths to scan and the total number of
+        `.nc` files found.
+    """
+    filepaths: list[str] = []
+
+    for root, _, files in os.walk(input_path):
+        for filename in files:
+            if ".nc" in filename:
+                filepaths.append(os.path.abspath(os.path.join(root, filename)))
+
+    filepaths.sort()
+
+    prioritized: list[str] = []
+    others: list[str] = []
+    seen_prefixes: set[tuple[str, str]] = set()
+
+    for path in filepaths:
+        dirname, filename = os.path.split(path)
+        match = TIME_SERIES_FILENAME_PATTERN.match(filename)
+
+        if match is None:
+            others.append(path)
+            continue
+
+        prefix = (dirname, match.group("var"))
+        if prefix in seen_prefixes:
+            continue
+
+        seen_prefixes.add(prefix)
+        if required is not None and prefix[1] in required:
+            prioritized.append(path)
+        else:
+            others.append(path)
+
+    return prioritized + others, len(filepaths)
+
+
+def _get_data_vars_from_header(path: str) -> set[str]:
+    """Gets the data variable names from the header of a netCDF file.
+
+    This mirrors how ``xarray`` separates data variables from coordinates:
+    variables that share their name with a dimension, or that are referenced
+    in a ``coordinates`` attribute, are treated as coordinates and excluded.
+
+    Parameters
+    ----------
+    path : str
+        The path to the netCDF file.
+
+    Returns
+    -------
+    set[str]
+        The names of the data variables in the file.
+    """
+    import netCDF4
+
+    with open(path, "rb") as infile:
+        infile.read(HEADER_PREFETCH_BYTES)
+
+    with get_netcdf_lock(), netCDF4.Dataset(path, "r") as ds:
+        coord_names: set[str] = set(getattr(ds, "coordinates", "").split())
+        for var in ds.variables.values():
+            coord_names.update(getattr(var, "coordinates", "").split())
+
+        data_vars = {
+            str(name)
+            for name, var in ds.variables.items()
+            if name not in var.dimensions and name not in coord_names
+        }
+
+    return data_vars
@@ -0,0 +1,277 @@
+"""
+This module provides the field cache of the surface pressure and the hybrid
+sigma coefficients, shared by the handlers of a run on each worker process.
+
+Every handler with hybrid sigma levels (e.g., "cl", "cli" and "mmrso4") reads
+"PS", "hyam", "hybm", "hyai" and "hybi" from its input files, and writes "PS"
+again as the "ps" zfactor of each time slab. The fields of a slab are read
+once per worker process and kept in memory, so the next handlers that write
+the same time slab on the same worker don't read and decode them again.
+
+A field is identified by its name with a hash of the values of its
+coordinates (e.g., the time values of the slab and the latitudes and
+longitudes), as the grid descriptors of ``grid_cache.py`` are. E3SM time
+series files of different variables (e.g., "CLOUD" and "CLDICE") each store a
+copy of the same "PS", so the fields of a run are shared across these files.
+The cache is scoped to a run, which converts the output of one simulation.
+
+The fields are looked up for each time slab that is written (refer to
+``handler.TIME_SLAB_BYTES``), so a field is never read for a whole time
+segment at once. A field larger than the memory budget is left lazy.
+
+The fields are evicted in least recently used order once the cache exceeds its
+memory budget. Only the name of the cache is pickled, and each worker process
+keeps its own fields for the cache's name, so the fields are kept across the
+handlers that run on the same worker process. The fields are read by xarray,
+which holds the shared netCDF lock (refer to ``_netcdf_lock.py``) around each
+read, and the cache's own lock guards its fields.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from e3sm_to_cmip._lazy_import import lazy_import
+from e3sm_to_cmip._logger import _setup_child_logger
+from e3sm_to_cmip.grid_cache import get_key
+
+if TYPE_CHECKING:
+    import numpy as np
+    import xarray as xr
+else:
+    np = lazy_import("numpy")
+    xr = lazy_import("xarray")
+
+logger = _setup_child_logger(__name__)
+
+# The default memory budget of the fields cached by each worker process. The
+# "PS" of 165 years of monthly ne30pg2 output is about 0.5 GB.
+FIELD_CACHE_MAX_BYTES = 1024**3
+
+
+@dataclass
+class FieldCacheStats:
+    """The statistics of a field cache in a worker process."""
+
+    # The number of fields that were found in the cache.
+    hits: int = 0
+    # The number of fields that were read and added to the cache.
+    misses: int = 0
+    # The bytes of the fields that were found in the cache, i.e., not read.
+    bytes_hit: int = 0
+    # The number of fields evicted to stay under the memory budget.
+    evictions: int = 0
+
+
+@dataclass
+class _FieldStore:
+    """The fields of a cache in this process, in least recently used order."""
+
+    fields: OrderedDict[str, np.ndarray] = field(default_factory=OrderedDict)
+    nbytes: int = 0
+    stats: FieldCacheStats = field(default_factory=FieldCacheStats)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+# The fields of the caches in this process, by the name of the cache.
+_stores: dict[str, _FieldStore] = {}
+
+
+class FieldCache:
+    """A per-process LRU cache of fields, under a memory budget.
+
+    Parameters
+    ----------
+    name : str
+        The name of the cache, which is unique to a run so that the fields of
+        different runs (e.g., the cases of a batch) are not shared.
+    max_bytes : int, optional
+        The memory budget of the fields in each process, by default
+        ``FIELD_CACHE_MAX_BYTES``.
+    """
+
+    def __init__(self, name: str, max_bytes: int = FIELD_CACHE_MAX_BYTES):
+        self.name = name
+        self.max_bytes = max_bytes
+
+    @property
+    def stats(self) -> FieldCacheStats:
+        """The statistics of the cache in this process."""
+        return self._store.stats
+
+    @property
+    def nbytes(self) -> int:
+        """The bytes of the fields cached in this process."""
+        return self._store.nbytes
+
+    @property
+    def _store(self) -> _FieldStore:
+        return _stores.setdefault(self.name, _FieldStore())
+
+    def get(self, key: str) -> np.ndarray | None:
+        """Gets a field, marking it as the most recently used.
+
+        Parameters
+        ----------
+        key : str
+            The key of the field (refer to ``get_field_key()``).
+
+        Returns
+        -------
+        np.ndarray | None
+            The read-only values of the field, or None if it is not cached.
+        """
+        store = self._store
+
+        with store.lock:
+            values = store.fields.get(key)
+            if values is not None:
+                store.fields.move_to_end(key)
+                store.stats.hits += 1
+                store.stats.bytes_hit += values.nbytes
+
+        return values
+
+    def put(self, key: str, values: np.ndarray) -> np.ndarray:
+        """Stores a field, evicting the least recently used fields if needed.
+
+        Fields larger than the memory budget are not stored.
+
+        Parameters
+        ----------
+        key : str
+            The key of the field (refer to ``get_field_key()``).
+        values : np.ndarray
+            The values of the field, which are made read-only.
+
+        Returns
+        -------
+        np.ndarray
+            The values.
+        """
+        store = self._store
+        values.flags.writeable = False
+
+        with store.lock:
+            store.stats.misses += 1
+            if values.nbytes > self.max_bytes:
+                return values
+
+            if key in store.fields:
+                store.nbytes -= store.fields.pop(key).nbytes
+
+            while store.fields and store.nbytes + values.nbytes > self.max_bytes:
+                _, evicted = store.fields.popitem(last=False)
+                store.nbytes -= evicted.nbytes
+                store.stats.evictions += 1
+
+            store.fields[key] = values
+            store.nbytes += values.nbytes
+
+        return values
+
+    def get_or_load(self, key: str, load: Callable[[], np.ndarray]) -> np.ndarray:
+        """Gets a field, loading and storing it if it is not cached.
+
+        Parameters
+        ----------
+        key : str
+            The key of the field (refer to ``get_field_key()``).
+        load : Callable[[], np.ndarray]
+            The function that reads the field.
+
+        Returns
+        -------
+        np.ndarray
+            The read-only values of the field.
+        """
+        values = self.get(key)
+        if values is None:
+            values = self.put(key, np.array(load()))
+
+        return values
+
+    def log_stats(self, name: str):
+        """Logs the statistics of the cache in this process.
+
+        Parameters
+        ----------
+        name : str
+            The name of the handler that used the cache.
+        """
+        stats = self.stats
+        logger.info(
+            f"{name}: field cache of this process has {stats.hits} hit(s) "
+            f"({stats.bytes_hit / 1e6:.1f} MB not read again), {stats.misses} "
+            f"miss(es) and {stats.evictions} eviction(s), with "
+            f"{self.nbytes / 1e6:.1f} MB cached."
+        )
+
+
+def get_field_key(ds: xr.Dataset, name: str) -> str:
+    """Gets the key of a field from the values of its coordinates.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        The dataset containing the field.
+    name : str
+        The name of the field.
+
+    Returns
+    -------
+    str
+        The key, which is the name of the field with a hash of its shape and
+        dtype and the values of the coordinates of its dimensions.
+    """
+    var = ds[name]
+    coords = [ds[dim].values for dim in var.dims if dim in ds.coords]
+
+    return get_key(f"{name}-{var.dtype.str}", [np.array(var.shape), *coords])
+
+
+def get_cached_fields(
+    cache: FieldCache | None, ds: xr.Dataset, names: Iterable[str]
+) -> xr.Dataset:
+    """Gets a dataset with fields read from a cache, or once into the cache.
+
+    Parameters
+    ----------
+    cache : FieldCache | None
+        The cache, or None to keep the dataset as is.
+    ds : xr.Dataset
+        The dataset.
+    names : Iterable[str]
+        The names of the fields. The fields that are not in the dataset, that
+        are already in memory, or that are larger than the memory budget of
+        the cache (which are left lazy, so they are read in slabs) are
+        skipped.
+
+    Returns
+    -------
+    xr.Dataset
+        The dataset, with the fields replaced by the read-only cached values.
+    """
+    if cache is None:
+        return ds
+
+    fields = {}
+    for name in names:
+        if name not in ds or ds[name].chunks is None:
+            continue
+
+        var = ds[name]
+        if var.nbytes > cache.max_bytes:
+            continue
+
+        values = cache.get_or_load(get_field_key(ds, name), lambda var=var: var.values)
+        fields[name] = var.copy(data=values)
+
+    if not fields:
+        return ds
+
+    return ds.assign(fields)
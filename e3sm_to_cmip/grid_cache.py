@@ -0,0 +1,220 @@
+"""
+This module provides the grid descriptor cache shared by the handlers of a run.
+
+The CMOR axes of every handler and time segment are created from the same
+latitude and longitude values and bounds, vertical levels and hybrid sigma
+coefficients. A descriptor is a set of these arrays, which is keyed by a hash
+of the coordinate values that identify it (e.g., the latitude and longitude of
+the horizontal grid, or the model levels of the hybrid sigma coefficients).
+
+Descriptors are computed once per run and stored as ``.npy`` files in the
+cache directory, from which the worker processes load them as read-only
+memory-mapped arrays. A descriptor is written to a temporary directory that is
+renamed into place, so concurrent workers computing the same descriptor never
+read a partial one.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING
+
+from e3sm_to_cmip._lazy_import import lazy_import
+from e3sm_to_cmip._logger import _setup_child_logger
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_import("numpy")
+
+logger = _setup_child_logger(__name__)
+
+# The sub-directory of the run's temporary directory that stores the cache.
+GRID_CACHE_DIRNAME = "grid_cache"
+
+# Type alias for a descriptor, which maps the names of its arrays to their values.
+Descriptor = dict[str, "np.ndarray"]
+
+
+class GridCache:
+    """A cache of grid descriptors, shared across processes through a directory.
+
+    Only the path of the cache is pickled, so each worker process loads the
+    descriptors it uses from the cache directory once.
+
+    Parameters
+    ----------
+    path : str
+        The path to the cache directory, which is created if needed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        # The descriptors loaded or computed by this process.
+        self._descriptors: dict[str, Descriptor] = {}
+
+    def __getstate__(self) -> dict[str, str]:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict[str, str]):
+        self.path = state["path"]
+        self._descriptors = {}
+
+    def get(self, key: str) -> Descriptor | None:
+        """Gets a descriptor.
+
+        Parameters
+        ----------
+        key : str
+            The key of the descriptor (refer to ``get_key()``).
+
+        Returns
+        -------
+        Descriptor | None
+            The descriptor with read-only memory-mapped arrays, or None if it
+            is not in the cache.
+        """
+        if key in self._descriptors:
+            return self._descriptors[key]
+
+        descriptor_path = os.path.join(self.path, key)
+        if not os.path.isdir(descriptor_path):
+            return None
+
+        try:
+            descriptor = {
+                os.path.splitext(filename)[0]: np.load(
+                    os.path.join(descriptor_path, filename), mmap_mode="r"
+                )
+                for filename in os.listdir(descriptor_path)
+                if filename.endswith(".npy")
+            }
+        except (OSError, ValueError) as e:
+            logger.debug(f"Unable to load the grid descriptor '{key}': {e}")
+
+            return None
+
+        self._descriptors[key] = descriptor
+
+        return descriptor
+
+    def put(self, key: str, descriptor: Descriptor) -> Descriptor:
+        """Stores a descriptor.
+
+        If the descriptor cannot be written (e.g., the filesystem is full), it
+        is only kept in memory by this process.
+
+        Parameters
+        ----------
+        key : str
+            The key of the descriptor (refer to ``get_key()``).
+        descriptor : Descriptor
+            The descriptor.
+
+        Returns
+        -------
+        Descriptor
+            The stored descriptor.
+        """
+        descriptor_path = os.path.join(self.path, key)
+
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            temp_path = tempfile.mkdtemp(prefix=f".{key}.", dir=self.path)
+
+            for name, values in descriptor.items():
+                np.save(os.path.join(temp_path, f"{name}.npy"), np.asarray(values))
+
+            try:
+                os.rename(temp_path, descriptor_path)
+            except OSError:
+                # Another process stored the same descriptor first.
+                shutil.rmtree(temp_path, ignore_errors=True)
+        except OSError as e:
+            logger.debug(f"Unable to write the grid descriptor '{key}': {e}")
+
+        self._descriptors[key] = descriptor
+
+        return descriptor
+
+    def get_or_compute(self, key: str, compute: Callable[[], Descriptor]) -> Descriptor:
+        """Gets a descriptor, computing and storing it if it is not in the cache.
+
+        Parameters
+        ----------
+        key : str
+            The key of the descriptor (refer to ``get_key()``).
+        compute : Callable[[], Descriptor]
+            The function that computes the descriptor.
+
+        Returns
+        -------
+        Descriptor
+            The descriptor.
+        """
+        descriptor = self.get(key)
+        if descriptor is None:
+            descriptor = self.put(key, compute())
+
+        return descriptor
+
+
+def get_key(kind: str, coords: Iterable[np.ndarray]) -> str:
+    """Gets the key of a descriptor from the coordinate values that identify it.
+
+    Parameters
+    ----------
+    kind : str
+        The kind of descriptor (e.g., "grid" or "standard_hybrid_sigma").
+    coords : Iterable[np.ndarray]
+        The coordinate values.
+
+    Returns
+    -------
+    str
+        The key, which is the kind with a hash of the dtypes, shapes and
+        values of the coordinates.
+    """
+    digest = hashlib.sha1(kind.encode())
+
+    for values in coords:
+        values = np.ascontiguousarray(values)
+        digest.update(f"{values.dtype.str}{values.shape}".encode())
+        digest.update(values.tobytes())
+
+    return f"{kind}-{digest.hexdigest()[:16]}"
+
+
+def get_descriptor(
+    cache: GridCache | None,
+    kind: str,
+    coords: Iterable[np.ndarray],
+    compute: Callable[[], Descriptor],
+) -> Descriptor:
+    """Gets a descriptor from a cache, or computes it without a cache.
+
+    Parameters
+    ----------
+    cache : GridCache | None
+        The cache, or None to compute the descriptor.
+    kind : str
+        The kind of descriptor (e.g., "grid" or "standard_hybrid_sigma").
+    coords : Iterable[np.ndarray]
+        The coordinate values that identify the descriptor.
+    compute : Callable[[], Descriptor]
+        The function that computes the descriptor.
+
+    Returns
+    -------
+    Descriptor
+        The descriptor.
+    """
+    if cache is None:
+        return compute()
+
+    return cache.get_or_compute(get_key(kind, coords), compute)
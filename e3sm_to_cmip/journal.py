@@ -0,0 +1,288 @@
+"""
+This module provides the resume journal, which records the completed units of
+work of a run so that a restarted run (``--resume``) only does the remaining
+work.
+
+A unit of work is a handler and one input segment (the input files of one time
+range of its raw variables). Once the output of a unit is written and closed
+by CMOR, an entry with the output path, its size and its checksum is appended
+to the journal in the output directory. Entries are written with a single
+``write()`` to a file opened in append mode and are flushed to disk, so the
+journal stays valid if the run is killed (e.g., node preemption, walltime or
+``--timeout``). A truncated last line is ignored when the journal is loaded.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any
+
+from e3sm_to_cmip._logger import _setup_child_logger
+
+logger = _setup_child_logger(__name__)
+
+# The filename of the journal stored in the output directory.
+JOURNAL_FILENAME = ".e3sm_to_cmip_journal.jsonl"
+
+# The size of the chunks read when computing the checksum of an output file.
+CHECKSUM_CHUNK_SIZE = 8 * 1024**2
+
+
+class Journal:
+    """An append-only journal of the completed units of work of a run.
+
+    Parameters
+    ----------
+    output_path : str
+        The path to the output directory, which stores the journal.
+    resume : bool, optional
+        Whether to load the existing journal to skip completed units of work,
+        by default False. The journal is always appended to.
+    """
+
+    def __init__(self, output_path: str, resume: bool = False):
+        self.path = os.path.join(output_path, JOURNAL_FILENAME)
+        self.resume = resume
+
+        # Map each unit key to its latest journal entry.
+        self._entries: dict[str, dict[str, Any]] = {}
+
+        self._terminate_truncated_entry()
+
+        # The offset of the journal up to which entries were read by
+        # read_new_entries(), starting with the entries of this run.
+        self._offset = self._get_size()
+
+        if resume:
+            self._entries = self._load()
+            logger.info(
+                f"Loaded {len(self._entries)} completed unit(s) of work from the "
+                f"journal '{self.path}'."
+            )
+
+    @staticmethod
+    def get_unit_key(handler: str, inputs: list[str]) -> str:
+        """Gets the key of a unit of work.
+
+        Parameters
+        ----------
+        handler : str
+            The name of the handler.
+        inputs : list[str]
+            The input filepaths of the unit of work.
+
+        Returns
+        -------
+        str
+            The key, which is the handler name and the sorted input filenames.
+        """
+        filenames = sorted(os.path.basename(filepath) for filepath in inputs)
+
+        return "|".join([handler, *filenames])
+
+    def is_complete(self, handler: str, inputs: list[str]) -> bool:
+        """Checks if a unit of work was completed in a previous run.
+
+        A unit with an output is only complete if the output still exists and
+        its size and checksum match the journal entry. Otherwise (e.g., the
+        output was partially overwritten or deleted), the unit is redone.
+
+        Parameters
+        ----------
+        handler : str
+            The name of the handler.
+        inputs : list[str]
+            The input filepaths of the unit of work.
+
+        Returns
+        -------
+        bool
+            True if resuming and the unit of work is complete, otherwise False.
+        """
+        if not self.resume:
+            return False
+
+        entry = self._entries.get(self.get_unit_key(handler, inputs))
+        if entry is None:
+            return False
+
+        output = entry.get("output")
+        if output is None:
+            return True
+
+        try:
+            is_valid = os.path.getsize(output) == entry["size"] and (
+                compute_checksum(output) == entry["checksum"]
+            )
+        except OSError:
+            is_valid = False
+
+        if not is_valid:
+            logger.warning(
+                f"{handler}: the output '{output}' in the journal is missing or "
+                "does not match its checksum, redoing it."
+            )
+
+        return is_valid
+
+    def record(
+        self, handler: str, inputs: list[str], output: str | None = None
+    ) -> bool:
+        """Appends a completed unit of work to the journal.
+
+        Parameters
+        ----------
+        handler : str
+            The name of the handler.
+        inputs : list[str]
+            The input filepaths of the unit of work.
+        output : str | None, optional
+            The path to the output file of the unit of work, by default None if
+            it is unknown (e.g., MPAS handlers).
+
+        Returns
+        -------
+        bool
+            True if the unit of work was recorded, False if the output or the
+            journal could not be accessed. The unit of work is then redone on
+            resume.
+        """
+        entry: dict[str, Any] = {
+            "key": self.get_unit_key(handler, inputs),
+            "handler": handler,
+            "inputs": sorted(os.path.basename(filepath) for filepath in inputs),
+            "output": None,
+            "size": None,
+            "checksum": None,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+        try:
+            if output is not None:
+                output = os.path.abspath(output)
+                entry.update(
+                    output=output,
+                    size=os.path.getsize(output),
+                    checksum=compute_checksum(output),
+                )
+
+            line = (json.dumps(entry) + "\n").encode()
+
+            # A single write to a file opened with O_APPEND is not interleaved
+            # with the writes of other worker processes.
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.warning(f"{handler}: unable to record the unit in the journal: {e}")
+
+            return False
+
+        self._entries[entry["key"]] = entry
+
+        return True
+
+    def read_new_entries(self) -> list[dict[str, Any]]:
+        """Reads the entries appended to the journal since the last read.
+
+        The first read returns the entries appended since the journal was
+        opened, including the entries of the worker processes of this run.
+
+        Returns
+        -------
+        list[dict[str, Any]]
+            The new entries, in the order they were appended.
+        """
+        entries = []
+
+        try:
+            with open(self.path, "rb") as infile:
+                infile.seek(self._offset)
+                data = infile.read()
+        except OSError:
+            return entries
+
+        # Only read complete lines. A partially written last line is read once
+        # it is complete.
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+
+        for line in data[:end].splitlines():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+
+        return entries
+
+    def _get_size(self) -> int:
+        """Gets the size of the journal in bytes, or 0 if it does not exist."""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def _terminate_truncated_entry(self):
+        """Terminates a truncated last entry so new entries start on a new line."""
+        try:
+            with open(self.path, "rb+") as outfile:
+                outfile.seek(0, os.SEEK_END)
+                if outfile.tell() == 0:
+                    return
+
+                outfile.seek(-1, os.SEEK_END)
+                if outfile.read(1) != b"\n":
+                    outfile.write(b"\n")
+        except OSError:
+            pass
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        """Loads the entries of the journal.
+
+        Returns
+        -------
+        dict[str, dict[str, Any]]
+            A dictionary mapping unit keys to their latest entry.
+        """
+        entries: dict[str, dict[str, Any]] = {}
+
+        try:
+            with open(self.path, "r") as infile:
+                for line in infile:
+                    try:
+                        entry = json.loads(line)
+                        entries[entry["key"]] = entry
+                    except (ValueError, KeyError, TypeError):
+                        # A truncated entry from a run that was killed while
+                        # writing to the journal.
+                        continue
+        except OSError:
+            pass
+
+        return entries
+
+
+def compute_checksum(path: str) -> str:
+    """Computes the SHA-256 checksum of a file.
+
+    Parameters
+    ----------
+    path : str
+        The path to the file.
+
+    Returns
+    -------
+    str
+        The hex digest of the checksum.
+    """
+    checksum = hashlib.sha256()
+
+    with open(path, "rb") as infile:
+        for chunk in iter(lambda: infile.read(CHECKSUM_CHUNK_SIZE), b""):
+            checksum.update(chunk)
+
+    return checksum.hexdigest()
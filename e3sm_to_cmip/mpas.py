@@ -20,7 +20,7 @@ import numpy as np
 import xarray
 from dask.diagnostics import ProgressBar
 
-from e3sm_to_cmip import LEGACY_XARRAY_MERGE_SETTINGS
+from e3sm_to_cmip import LEGACY_XARRAY_MERGE_SETTINGS, telemetry
 from e3sm_to_cmip._logger import _setup_child_logger
 
 logger = _setup_child_logger(__name__)
@@ -117,35 +117,41 @@ def remap_ocean(inFileName, outFileName, mappingFileName, renorm_threshold=0.05)
 def remap(ds, pcode, mappingFileName):
     """Use ncreamp to remap the xarray Dataset to a new target grid"""
 
-    # write the dataset to a temp file
-    inFileName = _get_temp_path()
-    outFileName = _get_temp_path()
+    with telemetry.span("mpas.remap") as span:
+        span["bytes_in"] = telemetry.get_nbytes(ds)
 
-    if "depth" in ds.dims:
-        ds = ds.transpose("time", "depth", "nCells", "nbnd")
+        # write the dataset to a temp file
+        inFileName = _get_temp_path()
+        outFileName = _get_temp_path()
 
-    # missing_value_mask attribute has undesired impacts in ncremap
-    for varName in ds.data_vars:
-        ds[varName].attrs.pop("missing_value_mask", None)
+        if "depth" in ds.dims:
+            ds = ds.transpose("time", "depth", "nCells", "nbnd")
+
+        # missing_value_mask attribute has undesired impacts in ncremap
+        for varName in ds.data_vars:
+            ds[varName].attrs.pop("missing_value_mask", None)
 
-    # Only set time as unlimited if it exists in the dataset dimensions
-    unlimited_dims = "time" if "time" in ds.dims else None
-    write_netcdf(ds, inFileName, unlimited=unlimited_dims)
+        # Only set time as unlimited if it exists in the dataset dimensions
+        unlimited_dims = "time" if "time" in ds.dims else None
+        write_netcdf(ds, inFileName, unlimited=unlimited_dims)
 
-    if pcode == "mpasocean":
-        remap_ocean(inFileName, outFileName, mappingFileName)
-    elif pcode == "mpasseaice":
-        # MPAS-Seaice is a special case because the of the time-varying SGS field
-        remap_seaice_sgs(inFileName, outFileName, mappingFileName)
-    else:
-        raise ValueError(f"pcode: {pcode} is not supported.")
+        if pcode == "mpasocean":
+            remap_ocean(inFileName, outFileName, mappingFileName)
+        elif pcode == "mpasseaice":
+            # MPAS-Seaice is a special case because the of the time-varying SGS field
+            remap_seaice_sgs(inFileName, outFileName, mappingFileName)
+        else:
+            raise ValueError(f"pcode: {pcode} is not supported.")
+
+        ds = xarray.open_dataset(outFileName, decode_times=False)
 
-    ds = xarray.open_dataset(outFileName, decode_times=False)
+        if "depth" in ds.dims:
+            ds = ds.transpose("time", "depth", "lat", "lon", "nbnd")
 
-    if "depth" in ds.dims:
-        ds = ds.transpose("time", "depth", "lat", "lon", "nbnd")
+        ds.load()
 
-    ds.load()
+        span["bytes_out"] = telemetry.get_nbytes(ds)
+        span["shapes"] = telemetry.get_shapes(ds, ds.data_vars)
 
     # remove the temporary files
     keep_temp_files = False
@@ -322,36 +328,40 @@ def open_mfdataset(
         pool=ThreadPool(min(multiprocessing.cpu_count(), daskThreads)),
     )
 
-    ds = xarray.open_mfdataset(
-        fileNames,
-        combine="nested",
-        decode_cf=False,
-        decode_times=False,
-        concat_dim="Time",
-        mask_and_scale=False,
-        chunks=chunks,
-        data_vars="all",
-        **LEGACY_XARRAY_MERGE_SETTINGS,  # type: ignore
-    )
+    with telemetry.span("mpas.open_mfdataset") as span:
+        ds = xarray.open_mfdataset(
+            fileNames,
+            combine="nested",
+            decode_cf=False,
+            decode_times=False,
+            concat_dim="Time",
+            mask_and_scale=False,
+            chunks=chunks,
+            data_vars="all",
+            **LEGACY_XARRAY_MERGE_SETTINGS,  # type: ignore
+        )
 
-    if variableList is not None:
-        allvars = ds.data_vars.keys()
+        if variableList is not None:
+            allvars = ds.data_vars.keys()
 
-        # get set of variables to drop (all ds variables not in vlist)
-        dropvars = set(allvars) - set(variableList)
+            # get set of variables to drop (all ds variables not in vlist)
+            dropvars = set(allvars) - set(variableList)
 
-        # drop spurious variables
-        ds = ds.drop(dropvars)
+            # drop spurious variables
+            ds = ds.drop(dropvars)
 
-        # must also drop all coordinates that are not associated with the
-        # variables
-        coords = set()
-        for avar in ds.data_vars.keys():
-            coords |= set(ds[avar].coords.keys())
-        dropcoords = set(ds.coords.keys()) - coords
+            # must also drop all coordinates that are not associated with the
+            # variables
+            coords = set()
+            for avar in ds.data_vars.keys():
+                coords |= set(ds[avar].coords.keys())
+            dropcoords = set(ds.coords.keys()) - coords
 
-        # drop spurious coordinates
-        ds = ds.drop(dropcoords)
+            # drop spurious coordinates
+            ds = ds.drop(dropcoords)
+
+        span["bytes_in"] = telemetry.get_nbytes(ds)
+        span["shapes"] = telemetry.get_shapes(ds, ds.data_vars)
 
     return ds
 
@@ -409,41 +419,45 @@ def convert_namelist_to_dict(fileName):
 
 def write_cmor(axes, ds, varname, varunits, d2f=True, **kwargs):
     """Write a time series of a variable in the format expected by CMOR"""
-    axis_ids = list()
-    for axis in axes:
-        axis_id = cmor.axis(**axis)
-        axis_ids.append(axis_id)
-
-    if d2f and ds[varname].dtype == np.float64:
-        logger.info("Converting {} to float32".format(varname))
-        ds[varname] = ds[varname].astype(np.float32)
-
-    fillValue = netCDF4.default_fillvals["f4"]
-    if np.any(np.isnan(ds[varname])):
-        mask = np.isfinite(ds[varname])
-        ds[varname] = ds[varname].where(mask, fillValue)
-
-    # create the cmor variable
-    varid = cmor.variable(
-        str(varname), str(varunits), axis_ids, missing_value=fillValue, **kwargs
-    )
+    with telemetry.span("mpas.write_cmor", varname) as span:
+        axis_ids = list()
+        for axis in axes:
+            axis_id = cmor.axis(**axis)
+            axis_ids.append(axis_id)
+
+        if d2f and ds[varname].dtype == np.float64:
+            logger.info("Converting {} to float32".format(varname))
+            ds[varname] = ds[varname].astype(np.float32)
+
+        fillValue = netCDF4.default_fillvals["f4"]
+        if np.any(np.isnan(ds[varname])):
+            mask = np.isfinite(ds[varname])
+            ds[varname] = ds[varname].where(mask, fillValue)
+
+        span["bytes_out"] = telemetry.get_nbytes(ds[varname])
+        span["shapes"] = telemetry.get_shapes(ds, [varname])
+
+        # create the cmor variable
+        varid = cmor.variable(
+            str(varname), str(varunits), axis_ids, missing_value=fillValue, **kwargs
+        )
 
-    # write out the data
-    try:
-        if "time" not in ds.dims:
-            cmor.write(varid, ds[varname].values)
-        else:
-            cmor.write(
-                varid,
-                ds[varname].values,
-                time_vals=ds.time.values,
-                time_bnds=ds.time_bnds.values,
-            )
-    except cmor.CMORError as error:
-        logger.error(f"Error in cmor.write for {varname}: {error}")
-        raise
-    finally:
-        cmor.close(varid)
+        # write out the data
+        try:
+            if "time" not in ds.dims:
+                cmor.write(varid, ds[varname].values)
+            else:
+                cmor.write(
+                    varid,
+                    ds[varname].values,
+                    time_vals=ds.time.values,
+                    time_bnds=ds.time_bnds.values,
+                )
+        except cmor.CMORError as error:
+            logger.error(f"Error in cmor.write for {varname}: {error}")
+            raise
+        finally:
+            cmor.close(varid)
 
 
 def compute_moc_streamfunction(dsIn=None, dsMesh=None, dsMasks=None, showProgress=True):
@@ -0,0 +1,412 @@
+"""
+This module provides the output index, which indexes the CMIP files in an
+output tree (e.g., a published CMIP6 tree) for the precheck (``--precheck``).
+
+The index maps each CMIP variable to its files with their table and year
+range, so checking whether a variable was already CMORized is a dictionary
+lookup instead of a walk of the output tree per variable. The tree is walked
+once, with one thread per top-level directory, and the index is cached under
+``$XDG_CACHE_HOME`` (or ``~/.cache``). On later runs, only the directories
+whose modification time changed (i.e., files or subdirectories were added,
+removed or renamed) are listed again.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from e3sm_to_cmip._logger import _setup_child_logger
+
+logger = _setup_child_logger(__name__)
+
+# The directory of the cached output indexes, with one file per output tree.
+OUTPUT_INDEX_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "e3sm_to_cmip",
+    "output_index",
+)
+
+# The version of the cached index format. Bump this when the structure of the
+# index changes so that stale cached indexes are rebuilt.
+OUTPUT_INDEX_VERSION = 1
+
+# The pattern of CMIP filenames, which start with the variable and table and
+# end with the time range (e.g., "tas_Amon_E3SM-2-0_historical_r1i1p1f1_gr_
+# 185001-189912.nc"). The dates have 4 digit years followed by the month and
+# optionally the day, hour and minute.
+CMIP_FILENAME_PATTERN = re.compile(
+    r"^(?P<var>[^_]+)_(?P<table>[^_]+)_(?:.*_)?"
+    r"(?P<start>\d{4})\d*-(?P<end>\d{4})\d*\.nc$"
+)
+
+# A directory entry of the index, with the modification time of the directory,
+# its CMIP files as [var, table, start, end, filename] and its subdirectories.
+DirEntry = dict[str, Any]
+
+
+class OutputIndex:
+    """An index of the CMIP files in an output tree.
+
+    Parameters
+    ----------
+    path : str
+        The path to the root of the output tree.
+    dirs : dict[str, DirEntry]
+        A dictionary mapping the paths of the directories in the tree,
+        relative to the root, to their entries.
+    """
+
+    def __init__(self, path: str, dirs: dict[str, DirEntry]):
+        self.path = os.path.abspath(path)
+        self._dirs = dirs
+
+        # Map each variable to its files as (table, start, end, path).
+        self._var_files: dict[str, list[tuple[str, int, int, str]]] = defaultdict(list)
+
+        for relpath, entry in sorted(dirs.items()):
+            for var, table, start, end, filename in entry["files"]:
+                filepath = os.path.join(self.path, relpath, filename)
+                self._var_files[var].append((table, start, end, filepath))
+
+    @classmethod
+    def load_or_build(
+        cls,
+        path: str,
+        cache_path: str | None = None,
+        max_workers: int | None = None,
+    ) -> "OutputIndex":
+        """Loads the cached index for the output tree and updates it, or builds it.
+
+        Directories in the cached index whose modification time did not change
+        are not listed again. The updated index is saved to the cache.
+
+        Parameters
+        ----------
+        path : str
+            The path to the root of the output tree.
+        cache_path : str | None, optional
+            The path to the cached index, by default a file named after the
+            hash of the output tree path in ``OUTPUT_INDEX_CACHE_DIR``.
+        max_workers : int | None, optional
+            The maximum number of threads that walk the top-level directories,
+            by default None for the ``ThreadPoolExecutor`` default.
+
+        Returns
+        -------
+        OutputIndex
+            The index.
+        """
+        path = os.path.abspath(path)
+        cache_path = cache_path or _get_cache_path(path)
+
+        cached_dirs = cls._load_cached_dirs(path, cache_path)
+        dirs, num_listed = _walk_tree(path, cached_dirs, max_workers)
+        index = cls(path, dirs)
+
+        logger.info(
+            f"Indexed {sum(len(v) for v in index._var_files.values())} CMIP file(s) "
+            f"in '{path}' ({num_listed} of {len(dirs)} directories listed)."
+        )
+
+        if num_listed > 0 or len(dirs) != len(cached_dirs):
+            index.save(cache_path)
+
+        return index
+
+    @staticmethod
+    def _load_cached_dirs(path: str, cache_path: str) -> dict[str, DirEntry]:
+        """Loads the directory entries of the cached index.
+
+        Parameters
+        ----------
+        path : str
+            The absolute path to the root of the output tree.
+        cache_path : str
+            The path to the cached index.
+
+        Returns
+        -------
+        dict[str, DirEntry]
+            The directory entries, which is empty if the cached index doesn't
+            exist, is for another tree or is invalid.
+        """
+        try:
+            with open(cache_path, "r") as infile:
+                contents = json.load(infile)
+        except (OSError, ValueError):
+            return {}
+
+        if (
+            not isinstance(contents, dict)
+            or contents.get("version") != OUTPUT_INDEX_VERSION
+            or contents.get("path") != path
+        ):
+            return {}
+
+        return contents["dirs"]
+
+    def save(self, cache_path: str) -> bool:
+        """Saves the index atomically.
+
+        Parameters
+        ----------
+        cache_path : str
+            The path to the cached index.
+
+        Returns
+        -------
+        bool
+            True if the index was saved, otherwise False.
+        """
+        contents = {
+            "version": OUTPUT_INDEX_VERSION,
+            "path": self.path,
+            "dirs": self._dirs,
+        }
+        dirname = os.path.dirname(cache_path)
+
+        try:
+            os.makedirs(dirname, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+            with os.fdopen(fd, "w") as outfile:
+                json.dump(contents, outfile)
+
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.debug(f"Unable to save the output index to '{cache_path}': {e}")
+
+            return False
+
+        return True
+
+    def find(
+        self, var: str, start: int, end: int, table: str | None = None
+    ) -> list[str]:
+        """Finds the files of a variable with an exact year range.
+
+        Parameters
+        ----------
+        var : str
+            The CMIP variable.
+        start : int
+            The start year.
+        end : int
+            The end year.
+        table : str | None, optional
+            The CMIP table (e.g., "Amon"), by default None for any table.
+
+        Returns
+        -------
+        list[str]
+            The paths of the files, which is empty if there are none.
+        """
+        return [
+            filepath
+            for f_table, f_start, f_end, filepath in self._var_files.get(var, [])
+            if f_start == start and f_end == end and table in (None, f_table)
+        ]
+
+    def get_coverage(
+        self, var: str, start: int, end: int, table: str | None = None
+    ) -> list[tuple[int, int]]:
+        """Gets the year ranges of a variable that are covered by its files.
+
+        Parameters
+        ----------
+        var : str
+            The CMIP variable.
+        start : int
+            The start year of the range to check.
+        end : int
+            The end year of the range to check.
+        table : str | None, optional
+            The CMIP table (e.g., "Amon"), by default None for any table.
+
+        Returns
+        -------
+        list[tuple[int, int]]
+            The sorted, merged (start, end) year ranges within the range to
+            check that are covered by files. A single range of (start, end)
+            means the range is fully covered, and an empty list means it is
+            not covered at all.
+        """
+        ranges = sorted(
+            (max(f_start, start), min(f_end, end))
+            for f_table, f_start, f_end, _ in self._var_files.get(var, [])
+            if f_start <= end and f_end >= start and table in (None, f_table)
+        )
+
+        merged: list[tuple[int, int]] = []
+        for r_start, r_end in ranges:
+            if merged and r_start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], r_end))
+            else:
+                merged.append((r_start, r_end))
+
+        return merged
+
+
+def _get_cache_path(path: str) -> str:
+    """Gets the path to the cached index of an output tree.
+
+    Parameters
+    ----------
+    path : str
+        The absolute path to the root of the output tree.
+
+    Returns
+    -------
+    str
+        The path to the cached index.
+    """
+    digest = hashlib.sha256(path.encode()).hexdigest()[:16]
+
+    return os.path.join(OUTPUT_INDEX_CACHE_DIR, f"{digest}.json")
+
+
+def _walk_tree(
+    path: str, cached_dirs: dict[str, DirEntry], max_workers: int | None = None
+) -> tuple[dict[str, DirEntry], int]:
+    """Walks an output tree, with one thread per top-level directory.
+
+    Parameters
+    ----------
+    path : str
+        The absolute path to the root of the output tree.
+    cached_dirs : dict[str, DirEntry]
+        The directory entries of the cached index.
+    max_workers : int | None, optional
+        The maximum number of threads, by default None.
+
+    Returns
+    -------
+    tuple[dict[str, DirEntry], int]
+        The directory entries of the tree and the number of directories that
+        were listed (i.e., not up to date in the cached index).
+    """
+    root = _scan_dir(path, "", cached_dirs)
+    if root is None:
+        return {}, 0
+
+    dirs = {"": root[0]}
+    num_listed = int(root[1])
+
+    # Directory listings release the GIL, so threads walk the top-level
+    # directories in parallel.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda subdir: _walk_subtree(path, subdir, cached_dirs),
+            root[0]["subdirs"],
+        )
+
+        for subtree_dirs, subtree_num_listed in results:
+            dirs.update(subtree_dirs)
+            num_listed += subtree_num_listed
+
+    return dirs, num_listed
+
+
+def _walk_subtree(
+    path: str, relpath: str, cached_dirs: dict[str, DirEntry]
+) -> tuple[dict[str, DirEntry], int]:
+    """Walks a subtree of an output tree.
+
+    Parameters
+    ----------
+    path : str
+        The absolute path to the root of the output tree.
+    relpath : str
+        The path to the root of the subtree, relative to the output tree.
+    cached_dirs : dict[str, DirEntry]
+        The directory entries of the cached index.
+
+    Returns
+    -------
+    tuple[dict[str, DirEntry], int]
+        The directory entries of the subtree and the number of directories
+        that were listed.
+    """
+    dirs: dict[str, DirEntry] = {}
+    num_listed = 0
+    stack = [relpath]
+
+    while stack:
+        current = stack.pop()
+        result = _scan_dir(path, current, cached_dirs)
+
+        # Skip directories that were removed or can't be accessed, like
+        # `os.walk()`.
+        if result is None:
+            continue
+
+        entry, is_listed = result
+        dirs[current] = entry
+        num_listed += int(is_listed)
+        stack.extend(os.path.join(current, subdir) for subdir in entry["subdirs"])
+
+    return dirs, num_listed
+
+
+def _scan_dir(
+    path: str, relpath: str, cached_dirs: dict[str, DirEntry]
+) -> tuple[DirEntry, bool] | None:
+    """Scans a directory, reusing its cached entry if it is up to date.
+
+    Parameters
+    ----------
+    path : str
+        The absolute path to the root of the output tree.
+    relpath : str
+        The path to the directory, relative to the output tree.
+    cached_dirs : dict[str, DirEntry]
+        The directory entries of the cached index.
+
+    Returns
+    -------
+    tuple[DirEntry, bool] | None
+        The directory entry and whether the directory was listed, or None if
+        the directory can't be accessed.
+    """
+    dirpath = os.path.join(path, relpath)
+
+    try:
+        mtime_ns = os.stat(dirpath).st_mtime_ns
+    except OSError:
+        return None
+
+    cached_entry = cached_dirs.get(relpath)
+    if cached_entry is not None and cached_entry["mtime_ns"] == mtime_ns:
+        return cached_entry, False
+
+    files = []
+    subdirs = []
+
+    try:
+        with os.scandir(dirpath) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                    continue
+
+                match = CMIP_FILENAME_PATTERN.match(entry.name)
+                if match is not None:
+                    files.append(
+                        [
+                            match.group("var"),
+                            match.group("table"),
+                            int(match.group("start")),
+                            int(match.group("end")),
+                            entry.name,
+                        ]
+                    )
+    except OSError:
+        return None
+
+    files.sort(key=lambda file: file[-1])
+
+    return {"mtime_ns": mtime_ns, "files": files, "subdirs": sorted(subdirs)}, True
@@ -0,0 +1,364 @@
+"""
+This module provides the worker pool that runs handlers in parallel with
+per-handler wall-clock limits.
+
+``concurrent.futures.ProcessPoolExecutor`` can't stop a single task: a worker
+process that hangs (e.g., on a stuck Lustre read) holds its slot until the
+whole run times out, and killing it breaks the entire pool. ``WorkerPool``
+runs each worker process behind its own dispatcher thread, so a task that
+exceeds its timeout has only its worker process killed. The worker is
+replaced on the next task, and the other workers keep running.
+
+The worker processes are started by the dispatcher threads, so they are
+started with the "forkserver" start method where it is available: forking
+the multi-threaded main process could copy a lock held by another thread
+(e.g., of a logging handler) into the worker, which would deadlock on it. The
+worker processes don't inherit the logging configuration of the main process,
+so each worker sets up the root logger and appends to its log files.
+"""
+
+import logging
+import multiprocessing
+import queue
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from multiprocessing.context import BaseContext
+from typing import Any
+
+from e3sm_to_cmip._logger import (
+    _add_filehandler,
+    _setup_child_logger,
+    _setup_root_logger,
+)
+
+logger = _setup_child_logger(__name__)
+
+# The number of seconds to wait for a worker process to exit before killing it
+# when the pool shuts down.
+WORKER_JOIN_TIMEOUT = 5
+
+
+class HandlerTimeoutError(Exception):
+    """Raised when a task exceeds its wall-clock limit and its worker is killed."""
+
+
+class WorkerDiedError(Exception):
+    """Raised when a worker process exits while running a task (e.g., killed
+    by the out-of-memory killer)."""
+
+
+# The errors of a task that may succeed if it is retried: I/O errors (e.g., a
+# flaky parallel filesystem), wall-clock timeouts and dead workers.
+TRANSIENT_ERRORS = (OSError, HandlerTimeoutError, WorkerDiedError)
+
+
+@dataclass
+class _Task:
+    future: Future
+    fn: Callable[..., Any]
+    args: tuple[Any, ...]
+    kwargs: dict[str, Any]
+    timeout: float | None
+
+
+class WorkerPool:
+    """A process pool that kills and replaces workers whose tasks time out.
+
+    The pool has the subset of the ``concurrent.futures.Executor`` interface
+    used by e3sm_to_cmip (``submit()`` and ``shutdown()``), with an optional
+    timeout per task.
+
+    Parameters
+    ----------
+    max_workers : int
+        The number of worker processes.
+    mp_context : BaseContext | None, optional
+        The multiprocessing context used to start the worker processes, by
+        default None for the "forkserver" context where it is available, or
+        the default context otherwise.
+    """
+
+    def __init__(self, max_workers: int, mp_context: BaseContext | None = None):
+        self.max_workers = max_workers
+        self._mp_context = mp_context or _get_default_context()
+
+        # The logging configuration of the main process, which is set up in
+        # each worker process.
+        self._log_config = _get_log_config()
+
+        self._tasks: queue.SimpleQueue[_Task | None] = queue.SimpleQueue()
+        self._shutdown = False
+
+        self._threads = [
+            threading.Thread(target=self._dispatch, daemon=True)
+            for _ in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> Future:
+        """Submits a task to the pool.
+
+        Parameters
+        ----------
+        fn : Callable[..., Any]
+            The picklable function to run in a worker process.
+        *args : Any
+            The arguments for the function.
+        timeout : float | None, optional
+            The wall-clock limit of the task in seconds, by default None for no
+            limit. If the task exceeds it, its worker process is killed and
+            the future raises ``HandlerTimeoutError``.
+        **kwargs : Any
+            The keyword arguments for the function.
+
+        Returns
+        -------
+        Future
+            The future of the task.
+
+        Raises
+        ------
+        RuntimeError
+            If the pool was shut down.
+        """
+        if self._shutdown:
+            raise RuntimeError("cannot submit tasks after the pool is shut down")
+
+        future: Future = Future()
+        self._tasks.put(_Task(future, fn, args, kwargs, timeout))
+
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """Shuts down the pool.
+
+        Parameters
+        ----------
+        wait : bool, optional
+            Whether to wait for the running tasks to complete and the worker
+            processes to exit, by default True.
+        cancel_futures : bool, optional
+            Whether to cancel the tasks that have not started, by default
+            False.
+        """
+        self._shutdown = True
+
+        if cancel_futures:
+            while True:
+                try:
+                    task = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+
+                if task is not None:
+                    task.future.cancel()
+
+        for _ in self._threads:
+            self._tasks.put(None)
+
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _dispatch(self):
+        """Runs the tasks of the queue on one worker process at a time."""
+        worker: _Worker | None = None
+
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+
+            if not task.future.set_running_or_notify_cancel():
+                continue
+
+            if worker is None:
+                worker = _Worker(self._mp_context, self._log_config)
+
+            try:
+                is_successful, value = worker.run(task)
+            except HandlerTimeoutError as e:
+                logger.warning(
+                    f"Killing worker process {worker.process.pid}: {e}. It will be "
+                    "replaced for the next task."
+                )
+                worker.kill()
+                worker = None
+                task.future.set_exception(e)
+
+                continue
+            except (EOFError, ConnectionError) as e:
+                worker.kill()
+                worker = None
+                task.future.set_exception(
+                    WorkerDiedError(f"the worker process exited unexpectedly: {e}")
+                )
+
+                continue
+            except Exception as e:
+                # The task could not be sent (e.g., it is not picklable).
+                task.future.set_exception(e)
+
+                continue
+
+            if is_successful:
+                task.future.set_result(value)
+            else:
+                task.future.set_exception(value)
+
+        if worker is not None:
+            worker.stop()
+
+
+class _Worker:
+    """A worker process that runs the tasks sent through its pipe."""
+
+    def __init__(self, mp_context: BaseContext, log_config: tuple[int, list[str]]):
+        self.conn, child_conn = mp_context.Pipe()
+        self.process = mp_context.Process(  # type: ignore[attr-defined]
+            target=_worker_main, args=(child_conn, log_config), daemon=True
+        )
+        self.process.start()
+
+        child_conn.close()
+
+    def run(self, task: _Task) -> tuple[bool, Any]:
+        """Runs a task in the worker process.
+
+        Parameters
+        ----------
+        task : _Task
+            The task.
+
+        Returns
+        -------
+        tuple[bool, Any]
+            Whether the task was successful, and its result or exception.
+
+        Raises
+        ------
+        HandlerTimeoutError
+            If the task exceeds its timeout.
+        """
+        self.conn.send((task.fn, task.args, task.kwargs))
+
+        if not self.conn.poll(task.timeout):
+            raise HandlerTimeoutError(
+                f"the task exceeded its wall-clock limit of {task.timeout:.0f}s"
+            )
+
+        return self.conn.recv()
+
+    def kill(self):
+        """Kills the worker process."""
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        """Stops the worker process after its current task."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+
+        self.process.join(WORKER_JOIN_TIMEOUT)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+        self.conn.close()
+
+
+def _get_default_context() -> BaseContext:
+    """Gets the multiprocessing context of the worker processes.
+
+    Returns
+    -------
+    BaseContext
+        The "forkserver" context if it is available (e.g., not on Windows),
+        otherwise the default context.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+
+    return multiprocessing.get_context()
+
+
+def _get_log_config() -> tuple[int, list[str]]:
+    """Gets the logging configuration of the root logger of this process.
+
+    Returns
+    -------
+    tuple[int, list[str]]
+        The level of the root logger and the paths to its log files.
+    """
+    log_paths = [
+        handler.baseFilename
+        for handler in logging.root.handlers
+        if isinstance(handler, logging.FileHandler)
+    ]
+
+    return logging.root.level, log_paths
+
+
+def _setup_worker_logging(log_config: tuple[int, list[str]]):
+    """Sets up the root logger of a worker process like the main process.
+
+    Parameters
+    ----------
+    log_config : tuple[int, list[str]]
+        The logging configuration of the main process (refer to
+        ``_get_log_config()``).
+    """
+    level, log_paths = log_config
+
+    _setup_root_logger()
+    logging.root.setLevel(level)
+
+    for log_path in log_paths:
+        _add_filehandler(log_path, truncate=False)
+
+
+def _worker_main(conn: Connection, log_config: tuple[int, list[str]]):
+    """The main loop of a worker process.
+
+    Parameters
+    ----------
+    conn : Connection
+        The worker's end of the pipe to the pool.
+    log_config : tuple[int, list[str]]
+        The logging configuration of the main process.
+    """
+    _setup_worker_logging(log_config)
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+
+        if task is None:
+            break
+
+        fn, args, kwargs = task
+        try:
+            response: tuple[bool, Any] = (True, fn(*args, **kwargs))
+        except BaseException as e:
+            response = (False, e)
+
+        try:
+            conn.send(response)
+        except Exception as e:
+            # The result or exception is not picklable.
+            conn.send((False, RuntimeError(f"unable to return the task result: {e}")))
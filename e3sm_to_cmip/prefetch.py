@@ -0,0 +1,354 @@
+"""
+This module provides the prefetch of the time segments of a handler's inputs.
+
+A handler CMORizes its time segments one after another: it opens the input
+files of a segment, evaluates its output data and writes it with CMOR. The
+reads of the next segment can overlap with the CMOR write of the current one,
+so a ``SegmentPrefetcher`` reads up to ``depth`` segments ahead on a
+background thread while the current segment is written.
+
+The segments are opened lazily, so the background thread also loads the input
+variables of each segment (refer to ``load_segment()``) if they fit in
+``PREFETCH_LOAD_MAX_BYTES``. Larger segments are read in time slabs while they
+are written, so only their open overlaps with the writes.
+
+The background thread opens the segments with xarray, which holds the shared
+netCDF lock (refer to ``_netcdf_lock.py``) around each netCDF call, and the
+handlers hold the same lock around each CMOR call, so the reads and the writes
+interleave between these calls. With ``readahead``, the background thread also
+reads the input files of each segment into the page cache before it opens the
+segment, which overlaps the filesystem latency of the reads (e.g., on a shared
+filesystem) with the writes. It is opt-in, since it reads whole files (up to
+``READAHEAD_MAX_BYTES`` per segment) even if the handler only reads some of
+their variables (e.g., history files).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from e3sm_to_cmip import telemetry
+from e3sm_to_cmip._logger import _setup_child_logger
+
+if TYPE_CHECKING:
+    import xarray as xr
+
+logger = _setup_child_logger(__name__)
+
+# The default number of segments read ahead of the segment being written. Each
+# prefetched segment holds its open input files (and its data, if the segment
+# is loaded in memory), so the depth bounds the memory of the prefetch.
+DEFAULT_PREFETCH_DEPTH = 1
+
+# The maximum number of bytes of the input variables of a segment that are
+# loaded when it is opened, which is the size of the time slabs written by the
+# handlers (``handler.TIME_SLAB_BYTES``), so a prefetched segment holds at most
+# one slab of data.
+PREFETCH_LOAD_MAX_BYTES = 256 * 1024**2
+
+# The size of the reads of the input files into the page cache.
+READAHEAD_BLOCK_BYTES = 8 * 1024**2
+
+# The maximum number of bytes read into the page cache per segment, which
+# bounds the readahead of large multi-variable input files (e.g., history
+# files) that the handler only reads some variables of.
+READAHEAD_MAX_BYTES = 2 * 1024**3
+
+
+@dataclass
+class PrefetchStats:
+    """The statistics of the prefetch of a handler's time segments."""
+
+    # The number of segments that were opened.
+    segments: int = 0
+    # The time spent reading and opening the segments, in seconds.
+    read_elapsed: float = 0.0
+    # The time spent waiting for a segment to be read and opened, in seconds.
+    stalled: float = 0.0
+    # The number of bytes of the input files read into the page cache.
+    readahead_bytes: int = 0
+
+    @property
+    def overlap(self) -> float:
+        """The time spent reading segments while writing others, in seconds."""
+        return max(0.0, self.read_elapsed - self.stalled)
+
+
+class SegmentPrefetcher:
+    """Iterates over the time segments of a handler, reading them ahead.
+
+    The segments are opened in order on a single background thread, at most
+    ``depth`` segments ahead of the segment that is being written. With a
+    depth of 0, each segment is opened when it is needed, without a thread.
+
+    The prefetcher must be closed (e.g., with a ``with`` statement) to stop
+    the background thread and close the segments that were not iterated over
+    (e.g., if writing a segment raised an exception).
+
+    Parameters
+    ----------
+    name : str
+        The name of the handler, which is used for logging and telemetry.
+    open_segment : Callable[[int], Any]
+        The function that opens a segment by its index (e.g., an
+        ``xr.Dataset`` of the input files of the segment).
+    get_filepaths : Callable[[int], Iterable[str]]
+        The function that gets the input files of a segment by its index.
+    indices : Iterable[int]
+        The indices of the segments, in order.
+    depth : int, optional
+        The number of segments read ahead, by default
+        ``DEFAULT_PREFETCH_DEPTH``.
+    readahead : bool, optional
+        Whether to read the input files of the segments read ahead into the
+        page cache before opening them, by default False.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        open_segment: Callable[[int], Any],
+        get_filepaths: Callable[[int], Iterable[str]],
+        indices: Iterable[int],
+        depth: int = DEFAULT_PREFETCH_DEPTH,
+        readahead: bool = False,
+    ):
+        self.name = name
+        self.open_segment = open_segment
+        self.get_filepaths = get_filepaths
+        self.depth = max(0, depth)
+        self.readahead = readahead
+        self.stats = PrefetchStats()
+
+        self._indices = iter(indices)
+        self._pending: deque[tuple[int, Future]] = deque()
+        self._stop = threading.Event()
+        self._executor: ThreadPoolExecutor | None = None
+        if self.depth > 0:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="prefetch"
+            )
+
+    def __enter__(self) -> SegmentPrefetcher:
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
+
+    def __iter__(self) -> Iterator[tuple[int, Any]]:
+        """Iterates over the segments.
+
+        Yields
+        ------
+        Iterator[tuple[int, Any]]
+            The index of each segment and the opened segment. The time spent
+            waiting for each segment is recorded as a "prefetch_wait" span,
+            with the time spent reading and opening it ("read_elapsed").
+        """
+        while True:
+            item = self._next_segment()
+            if item is None:
+                return
+
+            index, get_segment = item
+            with telemetry.span("prefetch_wait", self.name) as span:
+                segment, nbytes, elapsed = get_segment()
+                span["bytes_in"] = nbytes
+                span["read_elapsed"] = elapsed
+
+            self.stats.segments += 1
+            self.stats.read_elapsed += elapsed
+            self.stats.readahead_bytes += nbytes
+            self.stats.stalled += span["elapsed"]
+
+            yield index, segment
+
+    def log_stats(self):
+        """Logs the overlap of the reads with the writes and the stalled time."""
+        stats = self.stats
+        logger.info(
+            f"{self.name}: read {stats.segments} segment(s) in "
+            f"{stats.read_elapsed:.2f}s (prefetch depth {self.depth}), "
+            f"{stats.overlap:.2f}s overlapped with CMOR writes, "
+            f"{stats.stalled:.2f}s stalled waiting for input."
+        )
+
+    def close(self):
+        """Stops the background thread and closes the unused segments."""
+        self._stop.set()
+
+        while self._pending:
+            _, future = self._pending.popleft()
+
+            if not future.cancel():
+                try:
+                    segment, _, _ = future.result()
+                except Exception:
+                    continue
+
+                if hasattr(segment, "close"):
+                    segment.close()
+
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def _next_segment(
+        self,
+    ) -> tuple[int, Callable[[], tuple[Any, int, float]]] | None:
+        """Gets the next segment.
+
+        Returns
+        -------
+        tuple[int, Callable[[], tuple[Any, int, float]]] | None
+            The index of the segment and the function that waits for the
+            segment to be read (refer to ``_read_segment()``), or None if
+            there are no more segments.
+        """
+        if self._executor is None:
+            index = next(self._indices, None)
+            if index is None:
+                return None
+
+            return index, partial(self._read_segment, index)
+
+        # The segments after this one are read while it is written.
+        self._submit(self.depth + 1)
+        if not self._pending:
+            return None
+
+        index, future = self._pending.popleft()
+
+        return index, future.result
+
+    def _submit(self, num_pending: int):
+        """Submits the next segments until ``num_pending`` are pending.
+
+        Parameters
+        ----------
+        num_pending : int
+            The number of pending segments.
+        """
+        while len(self._pending) < num_pending:
+            index = next(self._indices, None)
+            if index is None:
+                return
+
+            future = self._executor.submit(  # type: ignore[union-attr]
+                self._read_segment, index, readahead=self.readahead
+            )
+            self._pending.append((index, future))
+
+    def _read_segment(
+        self, index: int, readahead: bool = False
+    ) -> tuple[Any, int, float]:
+        """Opens a segment, reading it into the page cache first if enabled.
+
+        Parameters
+        ----------
+        index : int
+            The index of the segment.
+        readahead : bool, optional
+            Whether to read the input files into the page cache before opening
+            the segment, by default False. The readahead only speeds up the
+            open if it overlaps with the write of another segment.
+
+        Returns
+        -------
+        tuple[Any, int, float]
+            The opened segment, the number of bytes read into the page cache
+            and the time spent reading and opening the segment.
+        """
+        start_time = time.perf_counter()
+
+        nbytes = 0
+        if readahead:
+            nbytes = readahead_files(self.get_filepaths(index), self._stop)
+
+        segment = self.open_segment(index)
+
+        return segment, nbytes, time.perf_counter() - start_time
+
+
+def load_segment(
+    ds: xr.Dataset,
+    names: Iterable[str],
+    max_bytes: int = PREFETCH_LOAD_MAX_BYTES,
+) -> xr.Dataset:
+    """Loads the lazy variables of a segment if they fit in memory.
+
+    The variables are read by xarray, which holds the shared netCDF lock
+    (refer to ``_netcdf_lock.py``) around each read.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        The lazily opened dataset of the segment.
+    names : Iterable[str]
+        The names of the variables to load. The variables that are not in the
+        dataset or that are already in memory are skipped.
+    max_bytes : int, optional
+        The maximum number of bytes of the variables, by default
+        ``PREFETCH_LOAD_MAX_BYTES``.
+
+    Returns
+    -------
+    xr.Dataset
+        The dataset with the variables in memory, or the dataset as is if the
+        variables are larger than ``max_bytes``.
+    """
+    names = [name for name in names if name in ds and ds[name].chunks is not None]
+
+    if not names or sum(ds[name].nbytes for name in names) > max_bytes:
+        return ds
+
+    return ds.assign(ds[names].compute().data_vars)
+
+
+def readahead_files(
+    filepaths: Iterable[str],
+    stop: threading.Event | None = None,
+    max_bytes: int = READAHEAD_MAX_BYTES,
+) -> int:
+    """Reads files into the page cache.
+
+    Parameters
+    ----------
+    filepaths : Iterable[str]
+        The filepaths. Duplicates (e.g., a history file with more than one raw
+        variable) are read once.
+    stop : threading.Event | None, optional
+        The event that stops the readahead once it is set, by default None.
+    max_bytes : int, optional
+        The maximum number of bytes to read, by default
+        ``READAHEAD_MAX_BYTES``.
+
+    Returns
+    -------
+    int
+        The number of bytes read.
+    """
+    buffer = bytearray(READAHEAD_BLOCK_BYTES)
+    nbytes = 0
+
+    for filepath in dict.fromkeys(filepaths):
+        try:
+            with open(filepath, "rb", buffering=0) as infile:
+                while nbytes < max_bytes and not (stop is not None and stop.is_set()):
+                    size = infile.readinto(buffer)
+                    if not size:
+                        break
+
+                    nbytes += size
+        except OSError as e:
+            # The readahead is only an optimization, so the error is raised
+            # when the file is opened by the handler.
+            logger.debug(f"Unable to read ahead {filepath}: {e}")
+
+    return nbytes
@@ -0,0 +1,175 @@
+"""
+This module provides per-handler profiling of handler runs (``--profile``).
+
+Each job is run under the deterministic profiler of the standard library
+(``cProfile``) inside the worker process that runs it, so that the profile
+reflects production conditions (e.g., the process pool, the input files and
+the CMOR tables of the run). The profile of each job is written to the
+``profiles`` sub-directory of the CMOR log directory, and the profiles of the
+run are merged into a hot-function summary once the handlers have run.
+
+``cProfile`` only profiles the thread that enables it, so the dask
+computations of a profiled job are run on that thread with the synchronous
+scheduler. Otherwise, the time spent in the dask worker threads (e.g., reading
+and reducing the input variables) would only appear as time spent waiting for
+a lock.
+"""
+
+import cProfile
+import os
+import pstats
+import re
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from e3sm_to_cmip._lazy_import import lazy_import
+from e3sm_to_cmip.scheduler import HandlerRun, run_measured
+
+if TYPE_CHECKING:
+    import dask
+else:
+    dask = lazy_import("dask")
+
+# The sub-directory of the CMOR log directory that stores the profiles.
+PROFILES_DIRNAME = "profiles"
+
+# The number of functions listed in the hot-function summary.
+NUM_HOT_FUNCTIONS = 15
+
+
+@dataclass
+class HotFunction:
+    """The profile of a function, merged across the profiled jobs."""
+
+    # The function, formatted as "filename:lineno(name)".
+    name: str
+    # The number of calls of the function.
+    ncalls: int
+    # The time spent in the function itself, excluding its callees, and
+    # including its callees, in seconds.
+    tottime: float
+    cumtime: float
+
+
+def run_profiled(
+    profile_path: str, func: Callable[..., Any], *args: Any, **kwargs: Any
+) -> HandlerRun:
+    """Runs a handler method with ``run_measured()`` under ``cProfile``.
+
+    This function is submitted to the process pool in place of
+    ``run_measured()`` with ``--profile``. The profile is written even if the
+    handler method raises an exception, but not if the worker process is
+    terminated (e.g., by ``--handler-timeout``).
+
+    Parameters
+    ----------
+    profile_path : str
+        The path to write the profile to.
+    func : Callable[..., Any]
+        The handler method.
+    *args : Any
+        The arguments for the handler method.
+    **kwargs : Any
+        The keyword arguments for the handler method.
+
+    Returns
+    -------
+    HandlerRun
+        The result of the handler method and its resource usage.
+    """
+    profiler = cProfile.Profile()
+
+    with dask.config.set(scheduler="synchronous"):
+        profiler.enable()
+        try:
+            return run_measured(func, *args, **kwargs)
+        finally:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+
+
+def get_profile_path(profiles_dir: str, job_name: str) -> str:
+    """Gets the path to the profile of a job.
+
+    Parameters
+    ----------
+    profiles_dir : str
+        The profiles directory.
+    job_name : str
+        The name of the job (e.g., "cl", "tas#0" or "pr+prc").
+
+    Returns
+    -------
+    str
+        The path to the profile, with the characters of the job name that are
+        not safe in filenames replaced with underscores.
+    """
+    filename = re.sub(r"[^\w.+#-]", "_", job_name)
+
+    return os.path.join(profiles_dir, f"{filename}.prof")
+
+
+def merge_profiles(paths: Iterable[str], output_path: str) -> pstats.Stats | None:
+    """Merges profiles and writes the merged profile with its text report.
+
+    Parameters
+    ----------
+    paths : Iterable[str]
+        The paths to the profiles, which are skipped if they do not exist
+        (e.g., the job's worker process was terminated).
+    output_path : str
+        The path to write the merged profile to. The text report of the
+        functions sorted by time is written next to it with a ``.txt``
+        extension.
+
+    Returns
+    -------
+    pstats.Stats | None
+        The merged profile, or None if there are no profiles.
+    """
+    paths = [path for path in paths if os.path.isfile(path)]
+    if not paths:
+        return None
+
+    stats = pstats.Stats(*paths)
+    stats.dump_stats(output_path)
+
+    report_path = f"{os.path.splitext(output_path)[0]}.txt"
+    with open(report_path, "w") as outfile:
+        report = pstats.Stats(output_path, stream=outfile)
+        report.strip_dirs().sort_stats("tottime").print_stats()
+
+    return stats
+
+
+def get_hot_functions(
+    stats: pstats.Stats, num: int = NUM_HOT_FUNCTIONS
+) -> list[HotFunction]:
+    """Gets the functions that spent the most time in a profile.
+
+    Parameters
+    ----------
+    stats : pstats.Stats
+        The profile.
+    num : int, optional
+        The number of functions, by default ``NUM_HOT_FUNCTIONS``.
+
+    Returns
+    -------
+    list[HotFunction]
+        The functions sorted by the time spent in the function itself, most
+        expensive first.
+    """
+    functions = [
+        HotFunction(
+            name=pstats.func_std_string(pstats.func_strip_path(func)),
+            ncalls=ncalls,
+            tottime=tottime,
+            cumtime=cumtime,
+        )
+        for func, (_, ncalls, tottime, cumtime, _) in stats.stats.items()  # type: ignore[attr-defined]
+    ]
+    functions.sort(key=lambda function: function.tottime, reverse=True)
+
+    return functions[:num]
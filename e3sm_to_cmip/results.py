@@ -0,0 +1,79 @@
+"""
+This module provides the results of a run returned by ``E3SMtoCMIP.execute()``,
+for workflow tools that run e3sm_to_cmip in-process instead of parsing its logs.
+"""
+
+from dataclasses import dataclass, field
+from typing import Literal
+
+# The status of a handler: "success" or "failed" if it was run, or "resumed"
+# if it was completed by a previous run (--resume).
+HandlerStatus = Literal["success", "failed", "resumed"]
+
+
+@dataclass
+class HandlerResult:
+    """The result of a handler (a CMIP variable)."""
+
+    # The name of the handler.
+    name: str
+    # The status of the handler, which is None until all of its jobs complete.
+    status: HandlerStatus | None = None
+    # The absolute paths of the output files written by the handler.
+    output_paths: list[str] = field(default_factory=list)
+    # The size of the input files read by the handler in bytes. Handlers that
+    # are fused (--fuse-handlers) share the input bytes of their group.
+    input_bytes: int = 0
+    # The size of the output files written by the handler in bytes.
+    output_bytes: int = 0
+    # The wall-clock time of each phase of the handler in seconds, summed over
+    # its time segments (e.g., {"run": 12.5, "cmor_write": 3.1}). The phases are
+    # recorded by the telemetry spans of the handler (refer to telemetry.py).
+    timings: dict[str, float] = field(default_factory=dict)
+    # The peak resident set size of the worker process in bytes, if known.
+    peak_memory: int | None = None
+
+    @property
+    def is_successful(self) -> bool:
+        """Whether the handler was successful or completed by a previous run."""
+        return self.status in ("success", "resumed")
+
+
+@dataclass
+class RunResult:
+    """The result of a run of e3sm_to_cmip."""
+
+    # The result of each handler that was run or resumed, by handler name.
+    handlers: dict[str, HandlerResult] = field(default_factory=dict)
+    # The CMIP variables without a handler definition.
+    missing_handlers: list[str] = field(default_factory=list)
+    # The CMIP variables whose handlers are not derivable from the input.
+    non_derivable_handlers: list[str] = field(default_factory=list)
+    # The jobs that were claimed by other processes (--distributed).
+    distributed_jobs: list[str] = field(default_factory=list)
+    # Whether the run was stopped early by a failed handler
+    # (--on-var-failure=stop), or before CMORizing by missing or non-derivable
+    # handlers (--on-var-failure=stop or fail, or no handlers at all).
+    is_stopped: bool = False
+    # The reason the run was stopped, if it was.
+    stop_reason: str | None = None
+    # Whether the run completed, False if it was interrupted (e.g., by an
+    # unexpected error or a keyboard interrupt).
+    is_completed: bool = True
+    # The wall-clock time of the CMORizing process in seconds.
+    elapsed: float | None = None
+
+    @property
+    def successful_handlers(self) -> list[str]:
+        """The names of the handlers that were successful or resumed."""
+        return [name for name, r in self.handlers.items() if r.is_successful]
+
+    @property
+    def failed_handlers(self) -> list[str]:
+        """The names of the handlers that failed."""
+        return [name for name, r in self.handlers.items() if r.status == "failed"]
+
+    @property
+    def is_successful(self) -> bool:
+        """Whether the run completed without failed handlers."""
+        return self.is_completed and not self.is_stopped and not self.failed_handlers
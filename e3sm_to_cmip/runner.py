@@ -8,27 +8,30 @@ frequencies.
 """
 
 import argparse
+import functools
 import os
 import signal
-import subprocess
 import tempfile
 import threading
-from concurrent.futures import Future, as_completed
-from concurrent.futures import ProcessPoolExecutor as Pool
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from pprint import pprint
-from typing import Literal
+from typing import Any, Callable, Literal
 
-import xarray as xr
 import yaml
 from tqdm import tqdm
 
-from e3sm_to_cmip import ROOT_HANDLERS_DIR, __version__, resources
+from e3sm_to_cmip import ROOT_HANDLERS_DIR, __version__, resources, telemetry
 from e3sm_to_cmip._logger import _add_filehandler, _setup_child_logger
 from e3sm_to_cmip.argparser import parse_args
-from e3sm_to_cmip.cmor_handlers.handler import VarHandlerDict
+from e3sm_to_cmip.catalog import InputCatalog
+from e3sm_to_cmip.cmor_handlers import HYBRID_SIGMA_INPUT_VARS
+from e3sm_to_cmip.cmor_handlers.fused import VarHandlerGroup, group_handlers
+from e3sm_to_cmip.cmor_handlers.handler import VarHandler, VarHandlerDict
+from e3sm_to_cmip.cmor_handlers.segments import split_into_segments
 from e3sm_to_cmip.cmor_handlers.utils import (
     MPAS_REALMS,
     REALMS,
@@ -37,18 +40,44 @@ from e3sm_to_cmip.cmor_handlers.utils import (
     Realm,
     _get_mpas_handlers,
     derive_handlers,
+    get_raw_variables,
     load_all_handlers,
 )
+from e3sm_to_cmip.discovery import discover_e3sm_vars
+from e3sm_to_cmip.field_cache import FieldCache
+from e3sm_to_cmip.grid_cache import GRID_CACHE_DIRNAME, GridCache
+from e3sm_to_cmip.journal import Journal
+from e3sm_to_cmip.pool import TRANSIENT_ERRORS, HandlerTimeoutError, WorkerPool
+from e3sm_to_cmip.profiling import (
+    PROFILES_DIRNAME,
+    get_hot_functions,
+    get_profile_path,
+    merge_profiles,
+    run_profiled,
+)
+from e3sm_to_cmip.results import HandlerResult, RunResult
+from e3sm_to_cmip.scheduler import (
+    AdmissionController,
+    HandlerCost,
+    HandlerRun,
+    MemoryProfile,
+    SegmentTracker,
+    estimate_handler_cost,
+    get_handler_timeout,
+    get_job_handler_names,
+    get_retry_delay,
+    run_measured,
+    sort_by_cost,
+)
+from e3sm_to_cmip.table_registry import get_table_registry
 from e3sm_to_cmip.util import (
-    _get_table_info,
     add_metadata,
     exit_failure,
     exit_success,
-    find_atm_files,
-    find_mpas_files,
     get_handler_info_msg,
     precheck,
 )
+from e3sm_to_cmip.work_queue import WorkQueue
 
 logger = _setup_child_logger(__name__)
 
@@ -69,11 +98,22 @@ class CLIArguments:
     serial: bool
     info: bool
     on_var_failure: Literal["ignore", "fail", "stop"]
+    fuse_handlers: bool
+    segment_parallel: bool
 
     # Run settings.
     num_proc: int
+    max_memory: int | None
     debug: bool
     timeout: int
+    handler_timeout: float | None
+    handler_retries: int
+    prefetch_depth: int
+    prefetch_readahead: bool
+    resume: bool
+    distributed: str | None
+    telemetry: bool
+    profile: bool
 
     # CMOR settings
     var_list: list[str]
@@ -115,13 +155,24 @@ class E3SMtoCMIP:
         self.on_var_failure: Literal["ignore", "fail", "stop"] = (
             parsed_args.on_var_failure
         )
+        self.fuse_handlers: bool = parsed_args.fuse_handlers
+        self.segment_parallel: bool = parsed_args.segment_parallel
 
         # ======================================================================
         # Run settings.
         # ======================================================================
         self.num_proc: int = parsed_args.num_proc
+        self.max_memory: int | None = parsed_args.max_memory
         self.debug: bool = parsed_args.debug
         self.timeout: int = parsed_args.timeout
+        self.handler_timeout: float | None = parsed_args.handler_timeout
+        self.handler_retries: int = parsed_args.handler_retries
+        self.prefetch_depth: int = parsed_args.prefetch_depth
+        self.prefetch_readahead: bool = parsed_args.prefetch_readahead
+        self.resume: bool = parsed_args.resume
+        self.distributed: str | None = parsed_args.distributed
+        self.telemetry: bool = parsed_args.telemetry
+        self.profile: bool = parsed_args.profile
 
         # ======================================================================
         # CMOR settings.
@@ -144,6 +195,61 @@ class E3SMtoCMIP:
         self.user_metadata: str | None = parsed_args.user_metadata
         self.custom_metadata: str | None = parsed_args.custom_metadata
 
+        # The catalog of input files, which is built on first use.
+        self._input_catalog: InputCatalog | None = None
+
+        # The resume journal in the output directory, loaded on first use, and
+        # the handlers that were completed by a previous run (--resume).
+        self._journal: Journal | None = None
+        self._resumed_handlers: list[str] = []
+
+        # The work queue shared with the other processes of the run, and the
+        # jobs that were claimed by the other processes (--distributed).
+        self._work_queue: WorkQueue | None = None
+        self.distributed_jobs: list[str] = []
+
+        # The completion of the time segments of handlers with
+        # --segment-parallel.
+        self._segment_tracker = SegmentTracker()
+
+        # The calibrated memory factors of handlers, loaded on first use.
+        self._memory_profile: MemoryProfile | None = None
+
+        # The estimated and actual cost of each handler, and the wall-clock
+        # time of the CMORizing process (set once handlers are run).
+        self.handler_costs: dict[str, HandlerCost] = {}
+        self.run_elapsed: float | None = None
+
+        # The handlers that exceeded their wall-clock limit (--handler-timeout)
+        # and the number of retries of each retried handler
+        # (--handler-retries).
+        self.timed_out_handlers: list[str] = []
+        self.retried_handlers: dict[str, int] = {}
+
+        # The telemetry spans of the phases of the handler runs, which are
+        # written to the telemetry file in the output directory (--telemetry).
+        self.telemetry_spans: list[dict[str, Any]] = []
+        self.telemetry_path: str | None = (
+            os.path.join(
+                self.output_path, f"e3sm_to_cmip_telemetry_{self.timestamp}.jsonl"
+            )
+            if self.telemetry and self.output_path is not None
+            else None
+        )
+
+        # The paths to the profiles of the submitted jobs, which are merged
+        # into a hot-function summary at the end of the run (--profile).
+        self.profile_paths: list[str] = []
+
+        # The result of each handler, whether the run was stopped (by a failed
+        # handler with --on-var-failure=stop, or by missing or non-derivable
+        # handlers) and why, and the function called with the result of each
+        # handler once it completes (refer to execute()).
+        self.handler_results: dict[str, HandlerResult] = {}
+        self._is_stopped = False
+        self._stop_reason: str | None = None
+        self._on_handler_done: Callable[[HandlerResult], None] | None = None
+
         # Setup directories using the CLI argument paths (e.g., output dir).
         # ======================================================================
         self._setup_dirs_with_paths()
@@ -179,6 +285,8 @@ class E3SMtoCMIP:
             "CMOR Log Path (--logdir)": self.cmor_log_dir,
             "CMIP Metadata Path (--user-metadata)": self.new_metadata_path,
             "Temp Path for Processing MPAS Files": self.temp_path,
+            "Telemetry Path (--telemetry)": self.telemetry_path,
+            "Profiles Path (--profile)": self.profiles_path,
             "Frequency (--freq)": self.freq,
             "Realm (--realm)": self.realm,
         }
@@ -196,8 +304,11 @@ class E3SMtoCMIP:
         """Retrieve version information for the current codebase.
 
         This method attempts to determine the current Git branch name and commit
-        hash of the repository containing this file. If the Git information
-        cannot be retrieved, it falls back to using the `__version__` variable.
+        hash of the repository containing this file by reading the repository's
+        ``HEAD`` and refs directly, rather than running ``git`` in a
+        subprocess. If the Git information cannot be retrieved (e.g., in an
+        installed environment), it falls back to using the `__version__`
+        variable.
 
         Returns
         -------
@@ -207,36 +318,30 @@ class E3SMtoCMIP:
             fallback version string in the format "version <__version__>" if Git
             information is unavailable.
         """
-        try:
-            branch_name = (
-                subprocess.check_output(
-                    ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                    cwd=os.path.dirname(__file__),
-                    stderr=subprocess.DEVNULL,
-                )
-                .strip()
-                .decode("utf-8")
-            )
-            commit_hash = (
-                subprocess.check_output(
-                    ["git", "rev-parse", "HEAD"],
-                    cwd=os.path.dirname(__file__),
-                    stderr=subprocess.DEVNULL,
-                )
-                .strip()
-                .decode("utf-8")
-            )
-            version_info = f"branch {branch_name} with commit {commit_hash}"
-        except subprocess.CalledProcessError:
-            version_info = f"version {__version__}"
+        git_info = _read_git_head(os.path.dirname(__file__))
 
-        return version_info
+        if git_info is None:
+            return f"version {__version__}"
+
+        branch_name, commit_hash = git_info
+
+        return f"branch {branch_name} with commit {commit_hash}"
 
     def run(self):
+        # Exit if the handlers are missing or non-derivable.
+        # ======================================================================
+        if self._is_stopped:
+            exit_failure()
+
         # Run e3sm_to_cmip with info mode.
         # ======================================================================
         if self.info_mode:
-            self._run_info_mode()
+            failed_handlers = self._run_info_mode()
+
+            if self._is_stopped:
+                exit_failure()
+
+            self._finalize_on_failure(failed_handlers)
             exit_success()
 
         # Run e3sm_to_cmip to CMORize serially or in parallel.
@@ -246,24 +351,85 @@ class E3SMtoCMIP:
             timer = threading.Timer(self.timeout, self._timeout_exit)
             timer.start()
 
-        is_run_successful = self._run_by_mode()
-
-        if is_run_successful:
-            if self.custom_metadata:
-                add_metadata(
-                    file_path=self.output_path,
-                    var_list=self.var_list,
-                    metadata_path=self.custom_metadata,
-                )
+        result = self.execute()
 
+        if result.is_completed:
             if timer is not None:
                 timer.cancel()
 
-            # NOTE: If the run was not successful with --on-var-failure=stop,
-            # or --on-var-failure=fail, the process would have already
-            # exited with sys.exit(1) in _finalize_failure_exit().
+            if result.is_stopped:
+                exit_failure()
+
+            self._finalize_on_failure(result.failed_handlers)
             exit_success()
 
+    def execute(
+        self, on_handler_done: Callable[[HandlerResult], None] | None = None
+    ) -> RunResult:
+        """CMORize the variables and return the result without exiting.
+
+        Unlike ``run()``, which exits with a return code, this method returns
+        the result of each handler, so that workflow tools can run many
+        conversions in one Python process. It never exits: a run with missing
+        or non-derivable handlers (depending on ``--on-var-failure``) is not
+        CMORized and is returned as stopped, with its stop reason.
+
+        Parameters
+        ----------
+        on_handler_done : Callable[[HandlerResult], None] | None, optional
+            A function called with the result of each handler as soon as it
+            completes (e.g., to schedule follow-up work), by default None.
+
+        Returns
+        -------
+        RunResult
+            The result of the run, with the status, output files, input and
+            output bytes and timings of each handler.
+
+        Raises
+        ------
+        ValueError
+            If the run is in info mode (``--info``), which does not CMORize.
+        """
+        if self.info_mode:
+            raise ValueError("execute() does not support --info, use run() instead.")
+
+        self._on_handler_done = on_handler_done
+
+        if self._is_stopped:
+            return RunResult(
+                missing_handlers=list(self.missing_handlers),
+                non_derivable_handlers=list(self.non_derivable_handlers),
+                is_stopped=True,
+                stop_reason=self._stop_reason,
+            )
+
+        is_completed = self._run_by_mode()
+        self._read_handler_outputs()
+
+        result = RunResult(
+            handlers=dict(self.handler_results),
+            missing_handlers=list(self.missing_handlers),
+            non_derivable_handlers=list(self.non_derivable_handlers),
+            distributed_jobs=list(self.distributed_jobs),
+            is_stopped=self._is_stopped,
+            stop_reason=self._stop_reason,
+            is_completed=is_completed,
+            elapsed=self.run_elapsed,
+        )
+
+        is_failed = result.is_stopped or (
+            result.failed_handlers and self.on_var_failure == "fail"
+        )
+        if is_completed and not is_failed and self.custom_metadata:
+            add_metadata(
+                file_path=self.output_path,
+                var_list=self.var_list,
+                metadata_path=self.custom_metadata,
+            )
+
+        return result
+
     def _get_var_list(self, input_var_list: list[str]) -> list[str]:
         if len(input_var_list) == 1 and " " in input_var_list[0]:
             var_list = input_var_list[0].split()
@@ -354,6 +520,13 @@ class E3SMtoCMIP:
         self.cmor_log_dir = os.path.join(self.output_path, self.cmor_log_dir)  # type: ignore
         os.makedirs(self.cmor_log_dir, exist_ok=True)
 
+        # The profiles of the jobs are stored next to the CMOR logs.
+        self.profiles_path = None
+        if self.profile:
+            self.profiles_path = os.path.join(self.cmor_log_dir, PROFILES_DIRNAME)
+
+            os.makedirs(self.profiles_path, exist_ok=True)
+
         # NOTE: Any warnings that appear before the log filehandler is
         # instantiated will not be captured (e.g,. esmpy VersionWarning).
         # However, they will still be captured by the console via a
@@ -362,11 +535,12 @@ class E3SMtoCMIP:
         _add_filehandler(self.log_path)
 
         # Make the metadata filename unique by appending the process ID (PID)
-        # to prevent resource conflicts when invoking multiple instances of
-        # e3sm_to_cmip simultaneously.
+        # and the timestamp to prevent resource conflicts when invoking
+        # multiple instances of e3sm_to_cmip simultaneously or in the same
+        # process (e.g., the cases of a batch manifest).
         self.new_metadata_path = os.path.join(
             self.output_path,  # type: ignore
-            f"user_metadata_{os.getpid()}.json",
+            f"user_metadata_{os.getpid()}_{self.timestamp}.json",
         )
         # Copy the user's metadata json file with the updated output directory.
         if not self.simple_mode and not self.info_mode:
@@ -382,6 +556,18 @@ class E3SMtoCMIP:
 
             tempfile.tempdir = self.temp_path
 
+        # The grid descriptor cache shared by the handlers of the run, which
+        # is stored in the temporary directory.
+        self.grid_cache = None
+        if self.temp_path is not None:
+            self.grid_cache = GridCache(
+                os.path.join(self.temp_path, GRID_CACHE_DIRNAME)
+            )
+
+        # The surface pressure and hybrid coefficients cached by each worker
+        # process for the handlers of the run.
+        self.field_cache = FieldCache(self.timestamp)
+
     def _copy_user_metadata(self):
         """
         Copies user metadata from an input file to an output file, updating the
@@ -435,10 +621,14 @@ class E3SMtoCMIP:
         if self.info_mode:
             handlers, missing_handlers = load_all_handlers(self.realm, self.var_list)
         elif not self.info_mode and self.input_path is not None:
-            e3sm_vars = self._get_e3sm_vars(self.input_path)
-            logger.debug(f"Input dataset variables: {e3sm_vars}")
-
             if self.realm in REALMS:
+                e3sm_vars = self._get_e3sm_vars(self.input_path)
+                logger.debug(f"Input dataset variables: {e3sm_vars}")
+
+                # Load the table registry before deriving the handlers, which
+                # also refreshes its cached copy for the worker processes.
+                get_table_registry(self.tables_path)
+
                 handlers, missing_handlers, non_derivable_handlers = derive_handlers(
                     cmip_tables_path=self.tables_path,
                     cmip_vars=self.var_list,
@@ -455,9 +645,10 @@ class E3SMtoCMIP:
     def _get_e3sm_vars(self, input_path: str) -> list[str]:
         """Gets all E3SM variables from the input files to derive CMIP variables.
 
-        This method walks through the input file path and reads each `.nc` file
-        into a xr.Dataset to retrieve the `data_vars` keys. These `data_vars` keys
-        are appended to a list, which is returned.
+        This method reads only the netCDF headers of the input `.nc` files
+        across a thread pool (refer to ``discover_e3sm_vars()``). The scan
+        stops early once all of the raw E3SM variables named by the handlers
+        of the requested CMIP variables have been found.
 
         NOTE: This method is not used to derive CMIP variables from MPAS input
         files.
@@ -477,19 +668,10 @@ class E3SMtoCMIP:
         IndexError
             If no data variables were found in the input files.
         """
-        paths: list[str] = []
-        e3sm_vars: list[str] = []
-
-        for root, _, files in os.walk(input_path):
-            for filename in files:
-                if ".nc" in filename:
-                    paths.append(str(Path(root, filename).absolute()))
-
-        for path in paths:
-            ds = xr.open_dataset(path, decode_timedelta=True)
-            data_vars = [str(var) for var in ds.data_vars.keys()]
-
-            e3sm_vars = e3sm_vars + data_vars
+        result = discover_e3sm_vars(
+            input_path, required_vars=get_raw_variables(self.var_list)
+        )
+        e3sm_vars = sorted(result.variables)
 
         if len(e3sm_vars) == 0:
             raise IndexError(
@@ -502,13 +684,16 @@ class E3SMtoCMIP:
         """Validates the derived CMOR handlers and logs a summary.
 
         If there are any missing or non-derivable handlers, they are logged
-        as errors. Depending on the `on_var_failure` setting, the program may
-        exit with a failure code ``sys.exit(1)`` if such issues are detected.
+        as errors. Depending on the `on_var_failure` setting, the run is
+        stopped if such issues are detected, so ``run()`` exits with a failure
+        code and ``execute()`` returns a stopped result.
         """
         self._log_handler_summary()
 
-        if self._exit_due_to_handler_issues():
-            exit_failure()
+        stop_reason = self._get_handler_issues()
+        if stop_reason is not None:
+            self._is_stopped = True
+            self._stop_reason = stop_reason
 
     def _log_handler_summary(self):
         """
@@ -555,35 +740,38 @@ class E3SMtoCMIP:
             logger.error(f"  * Count: {len(self.non_derivable_handlers)}")
             logger.error(f"  * Variables: {self.non_derivable_handlers}")
 
-    def _exit_due_to_handler_issues(self) -> bool:
+    def _get_handler_issues(self) -> str | None:
         """
-        Determines if the program should exit due to missing or non-derivable
+        Determines if the run should stop due to missing or non-derivable
         handlers based on the ``on_var_failure`` setting.
 
         Returns
         -------
-        bool
-            True if the program should exit, False otherwise.
+        str | None
+            The reason to stop the run, or None if the run should continue.
         """
         if not self.handlers:
-            logger.error(
+            reason = (
                 "No variable handlers are defined or derivable from the raw "
                 "variables found in the E3SM input datasets."
             )
-            return True
+            logger.error(reason)
+
+            return reason
 
         if self.missing_handlers or self.non_derivable_handlers:
             if self.on_var_failure in ["stop", "fail"]:
-                logger.error(
-                    "Exiting due to missing or non-derivable handlers with "
+                reason = (
+                    "Stopping due to missing or non-derivable handlers with "
                     f"--on-var-failure={self.on_var_failure}."
                 )
+                logger.error(reason)
 
-                return True
+                return reason
 
-        return False
+        return None
 
-    def _run_info_mode(self):  # noqa: C901
+    def _run_info_mode(self) -> list[str]:  # noqa: C901
         """
         Executes the "info mode" logic for the runner, providing information
         about variable handlers, their inclusion in CMIP tables, and dataset
@@ -602,6 +790,13 @@ class E3SMtoCMIP:
         frequency-table combinations. Outputs results to a YAML file or prints
         them to the console.
 
+        Returns
+        -------
+        list[str]
+            The names of the handlers that failed the checks. With
+            ``--on-var-failure=stop``, the run is stopped at the first failed
+            handler and no output is written.
+
         Raises
         ------
         Exception
@@ -612,7 +807,8 @@ class E3SMtoCMIP:
         - Uses `self.handlers` to iterate over variable handlers.
         - Outputs are written to `self.info_out_path` or `self.output_path` if
           specified.
-        - Finalizes failure behavior using `_finalize_failure_exit`.
+        - ``run()`` finalizes the failure behavior with the failed handlers
+          (refer to ``_finalize_on_failure()``).
         """
         messages = []
         failed_handlers: list[str] = []
@@ -632,16 +828,19 @@ class E3SMtoCMIP:
                 for handler in self.handlers:
                     # FIXME: This check is duplicated in mode 3 below. Refactor.
                     # --- DUPLICATE CODE ---
-                    table_info = _get_table_info(self.tables_path, handler["table"])
+                    table_vars = get_table_registry(self.tables_path).get_variables(
+                        handler["table"]
+                    )
 
-                    if handler["name"] not in table_info["variable_entry"]:
+                    if handler["name"] not in table_vars:
                         logger.error(
                             f"Variable {handler['name']} is not included in the table "
                             f"{handler['table']}"
                         )
 
                         failed_handlers.append(handler["name"])
-                        self._stop_with_failed_handler(handler["name"])
+                        if self._stop_with_failed_handler(handler["name"]):
+                            break
 
                         continue
                     # --- DUPLICATE CODE ---
@@ -662,24 +861,29 @@ class E3SMtoCMIP:
 
             # Info mode 3: check table + dataset consistency
             elif self.freq and self.tables_path and self.input_path:
+                import xarray as xr
+
                 filepath = next(Path(self.input_path).glob("*.nc"))
 
                 with xr.open_dataset(filepath) as ds:
                     for handler in self.handlers:
                         # FIXME: This check is duplicated in mode 2 above. Refactor.
                         # --- DUPLICATE CODE ---
-                        table_info = _get_table_info(self.tables_path, handler["table"])
+                        table_vars = get_table_registry(self.tables_path).get_variables(
+                            handler["table"]
+                        )
 
                         # If the variable is not in the table, it is not supported
                         # and therefore logged as a failure.
-                        if handler["name"] not in table_info["variable_entry"]:
+                        if handler["name"] not in table_vars:
                             logger.error(
                                 f"Variable {handler['name']} is not included in the table "
                                 f"{handler['table']}"
                             )
 
                             failed_handlers.append(handler["name"])
-                            self._stop_with_failed_handler(handler["name"])
+                            if self._stop_with_failed_handler(handler["name"]):
+                                break
 
                             continue
                         # --- DUPLICATE CODE ---
@@ -708,7 +912,8 @@ class E3SMtoCMIP:
                                 f"{missing_vars} in the input dataset"
                             )
                             failed_handlers.append(handler["name"])
-                            self._stop_with_failed_handler(handler["name"])
+                            if self._stop_with_failed_handler(handler["name"]):
+                                break
 
                             continue
 
@@ -723,6 +928,9 @@ class E3SMtoCMIP:
 
                         logger.info(stat_msg)
 
+            if self._is_stopped:
+                return failed_handlers
+
             # Output log messages.
             if self.info_out_path is not None:
                 with open(self.info_out_path, "w") as outstream:
@@ -737,7 +945,7 @@ class E3SMtoCMIP:
         except Exception as e:
             logger.error(f"Unexpected error in info mode: {e}")
 
-        self._finalize_on_failure(failed_handlers)
+        return failed_handlers
 
     def _run_by_mode(self) -> bool:
         """
@@ -774,67 +982,67 @@ class E3SMtoCMIP:
 
            - "ignore": Continues processing even if some handlers fail.
              Always returns True.
-           - "fail": Exits with a status code of 1 if any handler fails.
-           - "stop": Terminates immediately upon the first failure and exits with a
-              status code of 1.
+           - "fail": ``run()`` exits with a status code of 1 if any handler
+             fails.
+           - "stop": Stops upon the first failure, and ``run()`` exits with a
+             status code of 1.
 
         Returns
         -------
         Literal[True]
-            Always True, even if some handlers fail, unless `self.on_var_failure`
-            is set to "fail" or "stop", in which case the process may terminate early.
+            Always True, even if some handlers fail.
         """
         num_handlers = len(self.handlers)
         num_success = 0
         failed_handlers: list[str] = []
+        start_time = time.perf_counter()
 
         try:
+            jobs, handlers_to_filepaths = self._get_jobs()
+            num_jobs = len(jobs)
+            num_success = len(self._resumed_handlers)
+
             if self.realm != "atm":
-                pbar = tqdm(total=num_handlers)
+                pbar = tqdm(total=num_jobs)
+
+            self.handler_costs = self._estimate_handler_costs(
+                jobs, handlers_to_filepaths
+            )
 
             logger.info("========== STARTING CMORIZING PROCESS ==========")
-            for index, handler in enumerate(self.handlers):
-                is_cmor_successful = False
+            for index, handler in enumerate(jobs):
+                is_cmor_successful: bool | dict[str, bool] = False
                 handler_method = handler["method"]
-                handler_variables = handler["raw_variables"]
-                handler_table = handler["table"]
-                vars_to_filepaths = self._get_handler_input_files(handler_variables)
+                vars_to_filepaths = handlers_to_filepaths[handler["name"]]
 
                 logger.info(
-                    f"CMOR attempt {index + 1}/{num_handlers} -- '{handler['name']}' handler: {handler}"
+                    f"CMOR attempt {index + 1}/{num_jobs} -- '{handler['name']}' handler: {handler}"
                 )
                 try:
-                    # MPAS handlers require a different set of arguments than other
-                    # handlers.
-                    if self.realm in MPAS_REALMS:
-                        is_cmor_successful = handler_method(
-                            vars_to_filepaths,
-                            self.tables_path,
-                            self.new_metadata_path,
-                            self.cmor_log_dir,
-                        )
-                    else:
-                        is_cmor_successful = handler_method(
-                            vars_to_filepaths,
-                            self.tables_path,
-                            self.new_metadata_path,
-                            self.cmor_log_dir,
-                            handler_table,
-                        )
+                    is_cmor_successful = self._record_handler_run(
+                        handler,
+                        self._get_run_function(handler)(
+                            handler_method,
+                            *self._get_handler_args(handler, vars_to_filepaths),
+                            **self._get_handler_kwargs(handler),
+                        ),
+                        vars_to_filepaths,
+                    )
                 except Exception as e:
                     logger.error(f"Exception in handler '{handler['name']}': {e}")
                     is_cmor_successful = False
 
-                num_success, failed_handlers = self._log_handler_status(
+                num_success, failed_handlers, is_cmor_successful = self._log_job_status(
                     is_cmor_successful,
-                    handler["name"],
+                    handler,
                     num_handlers,
                     num_success,
                     failed_handlers,
                 )
 
-                if not is_cmor_successful:
-                    self._stop_with_failed_handler(handler["name"])
+                if not is_cmor_successful and self.on_var_failure == "stop":
+                    self._stop_run(handler["name"])
+                    break
 
                 if self.realm != "atm":
                     pbar.update(1)
@@ -845,23 +1053,26 @@ class E3SMtoCMIP:
         except Exception as error:
             logger.error(error)
 
+        self.run_elapsed = time.perf_counter() - start_time
+        self._get_memory_profile().save()
         self._log_final_result(num_handlers, num_success, failed_handlers)
-        self._finalize_on_failure(failed_handlers)
 
         return True
 
     def _run_parallel(self) -> Literal[True]:  # noqa: C901
-        """Run all handlers in parallel using ProcessPoolExecutor.
+        """Run all handlers in parallel using a WorkerPool.
 
         This method processes handlers concurrently, tracks their success or failure,
-        and logs the results.
+        and logs the results. Handlers that fail with a transient error are
+        retried with exponential backoff, up to ``self.handler_retries`` times.
 
         The behavior depends on the `self.on_var_failure` setting:
 
         - "ignore": Continues processing even if some handlers fail.
             Always returns True.
-        - "fail": Exits with a status code of 1 if any handler fails.
-        - "stop": Terminates immediately upon the first failure and exits with a
+        - "fail": ``run()`` exits with a status code of 1 if any handler
+            fails.
+        - "stop": Stops upon the first failure, and ``run()`` exits with a
             status code of 1.
 
         TODO: Refactor this method to reduce its complexity (C901).
@@ -869,280 +1080,1234 @@ class E3SMtoCMIP:
         Returns
         -------
         Literal[True]
-            True if the process completes, unless terminated early due to "fail" or "stop".
+            True once the process completes, including when it is stopped
+            early ("stop").
         """
-        pool = Pool(max_workers=self.num_proc)
-        futures: list[Future[bool]] = []
-        # Map each future to its handler name
-        future_to_name = {}
-        pbar = tqdm(total=len(self.handlers))
+        pool = WorkerPool(max_workers=self.num_proc)
+        futures: list[Future[HandlerRun]] = []
+        # Map each future to its handler
+        future_to_handler: dict[Future[HandlerRun], VarHandlerDict] = {}
+        jobs, handlers_to_filepaths = self._get_jobs()
+        pbar = tqdm(total=len(jobs))
 
         num_handlers = len(self.handlers)
-        num_success = 0
+        num_success = len(self._resumed_handlers)
         failed_handlers: list[str] = []
 
+        self.handler_costs = self._estimate_handler_costs(jobs, handlers_to_filepaths)
+        admission = AdmissionController(
+            self.max_memory, self.num_proc, self._get_memory_profile().base_memory
+        )
+
         logger.info("========== STARTING CMORIZING PROCESS ==========")
-        for handler in self.handlers:
-            handler_method = handler["method"]
-            handler_variables = handler["raw_variables"]
-            handler_table = handler["table"]
-            vars_to_filepaths = self._get_handler_input_files(handler_variables)
+        start_time = time.perf_counter()
 
-            try:
-                if self.realm in MPAS_REALMS:
-                    future: Future[bool] = pool.submit(
-                        handler_method,
-                        vars_to_filepaths,
-                        self.tables_path,
-                        self.new_metadata_path,
-                        self.cmor_log_dir,
-                    )
-                else:
-                    future = pool.submit(
-                        handler_method,
-                        vars_to_filepaths,
-                        self.tables_path,
-                        self.new_metadata_path,
-                        self.cmor_log_dir,
-                        handler_table,
-                    )
-            except Exception as exc:
-                logger.error(
-                    f"Failed to submit handler '{handler.get('name', 'unknown')}' to pool: {exc}"
-                )
-                continue
+        # Submit the most expensive handlers first so that they do not become
+        # a long tail after the other workers have gone idle. With a memory
+        # budget, handlers are only submitted once they fit in the budget.
+        pending = sort_by_cost(jobs, self.handler_costs)
+        running: set[Future[HandlerRun]] = set()
+        # The handlers waiting to be retried, with the time they are ready.
+        retries: list[tuple[float, VarHandlerDict]] = []
 
-            futures.append(future)
-            # Map future job to handler name for progress tracking as they complete
-            future_to_name[future] = handler.get("name", "unknown")
+        while pending or running or retries:
+            pending = _get_ready_retries(retries) + pending
 
-        # Execute the jobs in the pool and log their status as they complete.
-        for future in as_completed(futures):
-            handler_name = future_to_name[future]
-            future_result = None
+            for handler in admission.admit_ready(pending, self.handler_costs):
+                vars_to_filepaths = handlers_to_filepaths[handler["name"]]
 
-            try:
-                future_result = future.result()
-            except Exception as e:
-                logger.error(f"Handler '{handler_name}' raised an exception: {e}")
-                future_result = False
+                if not self._claim_job(handler, vars_to_filepaths):
+                    admission.release(handler["name"])
+                    pbar.update(1)
+                    continue
 
-            num_success, failed_handlers = self._log_handler_status(
-                future_result, handler_name, num_handlers, num_success, failed_handlers
+                future = self._submit_handler(pool, handler, vars_to_filepaths)
+
+                if future is None:
+                    admission.release(handler["name"])
+                    self._complete_job(handler, vars_to_filepaths, None)
+                    continue
+
+                futures.append(future)
+                running.add(future)
+                # Map future job to handler for progress tracking as they
+                # complete
+                future_to_handler[future] = handler
+
+            # Wake up for the next retry if no handler completes before it.
+            wait_timeout = _get_retry_wait(retries)
+
+            if not running:
+                time.sleep(wait_timeout or 0)
+                continue
+
+            # Log the status of the jobs as they complete.
+            done, running = wait(
+                running, timeout=wait_timeout, return_when=FIRST_COMPLETED
             )
 
-            if not future_result and self.on_var_failure == "stop":
-                self._stop_with_failed_handler_parallel(
-                    handler_name, pool, pbar, futures
+            for future in done:
+                handler = future_to_handler[future]
+                handler_name = handler["name"]
+                admission.release(handler_name)
+
+                future_result = self._get_run_result(
+                    handler, future, handlers_to_filepaths[handler_name], retries
+                )
+                if future_result is None:
+                    continue
+
+                self._complete_job(
+                    handler, handlers_to_filepaths[handler_name], future_result
+                )
+
+                num_success, failed_handlers, future_result = self._log_job_status(
+                    future_result,
+                    handler,
+                    num_handlers,
+                    num_success,
+                    failed_handlers,
                 )
 
-            pbar.update(1)
+                if not future_result and self.on_var_failure == "stop":
+                    self._stop_with_failed_handler_parallel(
+                        handler_name, pool, pbar, futures
+                    )
+                    break
+
+                pbar.update(1)
+
+            if self._is_stopped:
+                break
 
         pbar.close()
         pool.shutdown()
+        self.run_elapsed = time.perf_counter() - start_time
+        self._get_memory_profile().save()
         self._log_final_result(num_handlers, num_success, failed_handlers)
-        self._finalize_on_failure(failed_handlers)
 
         return True
 
-    def _get_handler_input_files(
-        self, handler_variables: dict[str, str]
-    ) -> dict[str, list[str]]:
-        """Get the input files for a given handler.
+    def _submit_handler(
+        self,
+        pool: WorkerPool,
+        handler: VarHandlerDict,
+        vars_to_filepaths: dict[str, list[str]],
+    ) -> Future[HandlerRun] | None:
+        """Submit a handler to the process pool.
 
         Parameters
         ----------
-        handler_variables : dict[str, str]
-            The handler dictionary containing the variable names and their
-            corresponding file paths.
+        pool : WorkerPool
+            The process pool.
+        handler : VarHandlerDict
+            The handler.
+        vars_to_filepaths : dict[str, list[str]]
+            A dictionary mapping the handler's raw variables to their file paths.
 
         Returns
         -------
-        dict[str, list[str]]
-            A dictionary mapping variable names to their corresponding file paths.
+        Future[HandlerRun] | None
+            The future of the handler's job, or None if it could not be
+            submitted.
         """
-        if self.realm in ["atm", "lnd"]:
-            vars_to_filepaths = {
-                var: [
-                    os.path.join(self.input_path, x)  # type: ignore
-                    for x in find_atm_files(var, self.input_path)
-                ]
-                for var in handler_variables
-            }
-        elif self.realm == "fx":
-            vars_to_filepaths = {
-                var: [
-                    os.path.join(self.input_path, x)  # type: ignore
-                    for x in os.listdir(self.input_path)
-                    if x[-3:] == ".nc"
-                ]
-                for var in handler_variables
-            }
-        else:
-            vars_to_filepaths = {
-                var: find_mpas_files(var, self.input_path, self.map_path)
-                for var in handler_variables
-            }
+        try:
+            return pool.submit(
+                self._get_run_function(handler),
+                handler["method"],
+                *self._get_handler_args(handler, vars_to_filepaths),
+                timeout=self._get_handler_timeout(handler),
+                **self._get_handler_kwargs(handler),
+            )
+        except Exception as exc:
+            logger.error(
+                f"Failed to submit handler '{handler.get('name', 'unknown')}' to pool: {exc}"
+            )
 
-        return vars_to_filepaths
+        return None
 
-    def _log_handler_status(
-        self,
-        is_cmor_successful: bool | str | None,
-        name: str,
-        num_handlers: int,
-        num_success: int,
-        failed_handlers: list[str],
-    ) -> tuple[int, list[str]]:
+    def _get_run_function(self, handler: VarHandlerDict) -> Callable[..., HandlerRun]:
+        """Get the function that runs a job in the worker process.
+
+        With --profile, the job is run under the profiler and its profile is
+        written to the profiles directory.
+
+        Parameters
+        ----------
+        handler : VarHandlerDict
+            The handler of the job.
+
+        Returns
+        -------
+        Callable[..., HandlerRun]
+            The function, which is called with the handler method and its
+            arguments.
         """
-        Logs the status of a handler after attempting to CMORize a variable.
+        if self.profiles_path is None:
+            return run_measured
+
+        profile_path = get_profile_path(self.profiles_path, handler["name"])
+        if profile_path not in self.profile_paths:
+            self.profile_paths.append(profile_path)
+
+        return functools.partial(run_profiled, profile_path)
+
+    def _claim_job(
+        self, handler: VarHandlerDict, vars_to_filepaths: dict[str, list[str]]
+    ) -> bool:
+        """Claim a job in the work queue shared with other processes.
 
         Parameters
         ----------
-        is_cmor_successful : bool | str | None
-            Indicates if the handler was successful. False, None, or "" means
-            failure. VarHandler objects (`handlers/*.py`) return False for
-            failures. MPAS handlers (`mpas_vars/*.py`) return "" for failures.
-        name : str
-            The name of the handler (variable) being processed.
-        num_handlers : int
-            The total number of handlers.
-        num_success : int
-            The current count of successful handlers.
-        failed_handlers : list[str]
-            A list to append failed handler names to.
+        handler : VarHandlerDict
+            The job.
+        vars_to_filepaths : dict[str, list[str]]
+            A dictionary mapping the job's raw variables to their file paths.
 
         Returns
         -------
-        tuple[int, list[str]]
-            The updated number of successful handlers and the list of failed
-            handlers.
+        bool
+            True if the job should be run by this process, False if it was
+            completed or is claimed by another process (--distributed).
         """
-        if is_cmor_successful:
-            num_success += 1
-            logger.info(f"Successfully processed '{name}' handler.")
-        else:
-            failed_handlers.append(name)
-            logger.error(f"Error processing '{name}' handler.")
+        if self.distributed is None:
+            return True
 
-        logger.info("=" * 60)
-        logger.info("STATUS UPDATE:")
-        logger.info(f"  * Successful handlers: {num_success} of {num_handlers}")
-        logger.info(f"  * Failed handlers: {len(failed_handlers)}")
+        if self._work_queue is None:
+            self._work_queue = WorkQueue(str(self.output_path), self.distributed)
 
-        if failed_handlers:
-            logger.info(f"  - Failed handler names: {', '.join(failed_handlers)}")
-        else:
-            logger.info("  - No failed handlers so far.")
+        key = _get_unit_key(handler, vars_to_filepaths)
+        if self._work_queue.claim(key):
+            return True
 
-        logger.info("=" * 60)
+        logger.info(
+            f"Skipping '{handler['name']}' handler, claimed by another process "
+            "(--distributed)."
+        )
+        self.distributed_jobs.append(handler["name"])
 
-        return num_success, failed_handlers
+        return False
 
-    def _log_final_result(
-        self, num_handlers: int, num_successes: int, failed_handlers: list[str]
+    def _complete_job(
+        self,
+        handler: VarHandlerDict,
+        vars_to_filepaths: dict[str, list[str]],
+        result: bool | dict[str, bool] | None,
     ):
-        """
-        Logs the final result of the CMORization process.
+        """Mark a job claimed by this process as completed (--distributed).
 
         Parameters
         ----------
-        num_handlers : int
-            The total number of handlers that were processed.
-        num_successes : int
-            The number of handlers that completed successfully.
-        failed_handlers : list[str]
-            A list of handler names that failed during processing.
+        handler : VarHandlerDict
+            The job.
+        vars_to_filepaths : dict[str, list[str]]
+            A dictionary mapping the job's raw variables to their file paths.
+        result : bool | dict[str, bool] | None
+            The result of the job, or None if it could not be run, in which
+            case it is released for another process instead.
         """
-        logger.info("")
-        logger.info("=======================================")
-        logger.info("| FINAL RUN SUMMARY")
-        logger.info("---------------------------------------")
-        logger.info(f"  * Total variables (--var-list): {len(self.var_list)}")
-        logger.info(f"  * Total handlers successfully derived: {num_handlers}")
-        logger.info(
-            f"  * Total handlers successfully cmorized: {num_successes} / {num_handlers}"
-        )
+        if self._work_queue is None:
+            return
 
-        if failed_handlers:
-            logger.error(
-                f"  * Total handlers failed to cmorize: {len(failed_handlers)}"
-            )
-            logger.error(f"    - Failed variables: {failed_handlers}")
+        key = _get_unit_key(handler, vars_to_filepaths)
+        if result is None:
+            self._work_queue.release(key)
+        else:
+            self._work_queue.complete(key, result)
 
-        if self.missing_handlers:
-            logger.error(
-                f"  * Total handlers missing (not defined in handlers.yaml): "
-                f"{len(self.missing_handlers)}"
-            )
-            logger.error(f"    - Includes: {self.missing_handlers}")
+    def _get_handler_timeout(self, handler: VarHandlerDict) -> float | None:
+        """Get the wall-clock limit of a handler (--handler-timeout).
 
-        if self.non_derivable_handlers:
-            logger.error(
-                f"  * Total handlers non-derivable (defined but not derivable): "
-                f"{len(self.non_derivable_handlers)}"
-            )
-            logger.error(f"    - Includes: {self.non_derivable_handlers}")
+        Parameters
+        ----------
+        handler : VarHandlerDict
+            The handler.
 
-        logger.info("=======================================")
+        Returns
+        -------
+        float | None
+            The wall-clock limit in seconds, scaled by the handler's estimated
+            cost, or None if there is no limit.
+        """
+        if self.handler_timeout is None:
+            return None
 
-    def _timeout_exit(self):
-        logger.info("Hit timeout limit, exiting")
-        os.kill(os.getpid(), signal.SIGINT)
+        return get_handler_timeout(
+            self.handler_costs[handler["name"]], self.handler_timeout
+        )
 
-    def _stop_with_failed_handler(self, handler_name: str) -> None:
-        """Gracefully stop with a failed handler in serial or info mode.
+    def _get_run_result(
+        self,
+        handler: VarHandlerDict,
+        future: Future[HandlerRun],
+        vars_to_filepaths: dict[str, list[str]],
+        retries: list[tuple[float, VarHandlerDict]],
+    ) -> bool | dict[str, bool] | None:
+        """Get the result of a handler run and record it.
 
-        If ``self.on_var_failure`` is set to "stop", the program will log an
-        error message and terminate execution immediately (exit code 1).
+        Only the exceptions raised by the handler in its worker are retried.
+        An error recording the run (e.g., writing the resume journal) is
+        logged, since the handler's output is already written.
 
         Parameters
         ----------
-        handler_name : str
-            The name of the handler that failed.
+        handler : VarHandlerDict
+            The handler.
+        future : Future[HandlerRun]
+            The future of the handler run.
+        vars_to_filepaths : dict[str, list[str]]
+            A dictionary mapping the handler's raw variables to their file paths.
+        retries : list[tuple[float, VarHandlerDict]]
+            The handlers waiting to be retried, with the time they are ready.
 
         Returns
         -------
-        None
+        bool | dict[str, bool] | None
+            The result of the handler, False if it raised an exception, or
+            None if it is retried.
         """
-        if self.on_var_failure == "stop":
-            logger.error(
-                f"Stopping immediately due to --on-var-failure=stop "
-                f"(failed at handler: '{handler_name}')"
-            )
+        name = handler["name"]
 
-            exit_failure()
+        try:
+            run = future.result()
+        except Exception as e:
+            if self._schedule_retry(handler, e, retries):
+                return None
 
-    def _stop_with_failed_handler_parallel(
-        self, handler_name: str, pool: Pool, pbar: tqdm, futures: list[Future[bool]]
-    ) -> None:
-        """Gracefully stop parallel processing when a handler fails.
+            logger.error(f"Handler '{name}' raised an exception: {e}")
 
-        This method is triggered when a handler fails during parallel processing.
-        It logs the failure, shuts down the processing pool, closes the progress
-        bar, and waits for active futures to settle before exiting with a
-        failure code.
+            return False
 
-        The function ensures that pending jobs are canceled gracefully while
+        try:
+            return self._record_handler_run(handler, run, vars_to_filepaths)
+        except Exception as e:
+            logger.error(f"Unable to record the run of handler '{name}': {e}")
+
+            return run.result
+
+    def _schedule_retry(
+        self,
+        handler: VarHandlerDict,
+        exc: Exception,
+        retries: list[tuple[float, VarHandlerDict]],
+    ) -> bool:
+        """Schedule a handler that failed with an exception to be retried.
+
+        Only transient errors are retried: I/O errors (e.g., a flaky parallel
+        filesystem), wall-clock timeouts and workers that died (e.g., killed by
+        the out-of-memory killer). Each handler is retried up to
+        ``self.handler_retries`` times, with exponential backoff.
+
+        Parameters
+        ----------
+        handler : VarHandlerDict
+            The handler.
+        exc : Exception
+            The exception raised by the handler.
+        retries : list[tuple[float, VarHandlerDict]]
+            The handlers waiting to be retried, with the time they are ready.
+            The handler is appended if it is retried.
+
+        Returns
+        -------
+        bool
+            True if the handler is retried, otherwise False.
+        """
+        name = handler["name"]
+
+        if isinstance(exc, HandlerTimeoutError) and name not in self.timed_out_handlers:
+            self.timed_out_handlers.append(name)
+
+        attempt = self.retried_handlers.get(name, 0) + 1
+        if not isinstance(exc, TRANSIENT_ERRORS) or attempt > self.handler_retries:
+            return False
+
+        delay = get_retry_delay(attempt)
+        logger.warning(
+            f"Handler '{name}' failed with a transient error: {exc}. Retrying in "
+            f"{delay:.0f}s (retry {attempt} of {self.handler_retries})."
+        )
+
+        self.retried_handlers[name] = attempt
+        retries.append((time.monotonic() + delay, handler))
+
+        return True
+
+    def _record_handler_run(
+        self,
+        handler: VarHandlerDict,
+        run: HandlerRun,
+        vars_to_filepaths: dict[str, list[str]],
+    ) -> bool | dict[str, bool]:
+        """Record the time and peak memory of a handler run.
+
+        The peak memory calibrates the handler's memory factor in the memory
+        profile for future runs. Handlers that do not record their own time
+        segments in the resume journal (e.g., MPAS handlers) are recorded in
+        the journal as a whole once they succeed.
+
+        Parameters
+        ----------
+        handler : VarHandlerDict
+            The handler.
+        run : HandlerRun
+            The run of the handler.
+        vars_to_filepaths : dict[str, list[str]]
+            A dictionary mapping the handler's raw variables to their file paths.
+
+        Returns
+        -------
+        bool | dict[str, bool]
+            The result of the handler, or the result of each handler for a
+            group of handlers.
+        """
+        cost = self.handler_costs[handler["name"]]
+        cost.actual = run.elapsed
+        self._get_memory_profile().update(cost, run)
+
+        for name in get_job_handler_names(handler):
+            handler_result = self._get_handler_result(name)
+            handler_result.input_bytes += cost.input_bytes
+            handler_result.timings["run"] = (
+                handler_result.timings.get("run", 0.0) + run.elapsed
+            )
+
+            if run.peak_memory is not None:
+                handler_result.peak_memory = max(
+                    handler_result.peak_memory or 0, run.peak_memory
+                )
+
+        self._record_telemetry(handler, run.spans)
+
+        if run.result and not _supports_journal(handler):
+            self._get_journal().record(
+                handler["name"], _get_input_filepaths(vars_to_filepaths)
+            )
+
+        return run.result
+
+    def _record_telemetry(self, job: VarHandlerDict, spans: list[dict[str, Any]]):
+        """Record the telemetry spans of the phases of a job run.
+
+        The time of each phase is added to the timings of the job's handlers.
+        A span of one handler of a group (--fuse-handlers) is only added to
+        that handler, while a span shared by the group (e.g., reading the
+        group's input files) is added to each handler of the group. With
+        ``--telemetry``, the spans are also written to the telemetry file.
+
+        Parameters
+        ----------
+        job : VarHandlerDict
+            The job.
+        spans : list[dict[str, Any]]
+            The telemetry spans of the job run.
+        """
+        names = get_job_handler_names(job)
+
+        for span in spans:
+            span_names = [span["handler"]] if span.get("handler") in names else names
+
+            for name in span_names:
+                timings = self._get_handler_result(name).timings
+                timings[span["phase"]] = (
+                    timings.get(span["phase"], 0.0) + span["elapsed"]
+                )
+
+        if self.telemetry_path is not None and spans:
+            job_spans = [{"job": job["name"], **span} for span in spans]
+            self.telemetry_spans.extend(job_spans)
+
+            try:
+                telemetry.write_spans(self.telemetry_path, job_spans)
+            except OSError as e:
+                logger.warning(f"Unable to write the telemetry file: {e}")
+
+    def _get_handler_kwargs(
+        self, handler: VarHandlerDict
+    ) -> dict[str, Journal | GridCache | FieldCache | int | bool | None]:
+        """Get the keyword arguments to pass to a handler's method.
+
+        Parameters
+        ----------
+        handler : VarHandlerDict
+            The handler.
+
+        Returns
+        -------
+        dict[str, Journal | GridCache | FieldCache | int | bool | None]
+            The resume journal, the grid descriptor cache, the prefetch depth
+            and readahead and the field cache for handlers that record their
+            own time segments in the journal, otherwise an empty dictionary.
+        """
+        if _supports_journal(handler):
+            return {
+                "journal": self._get_journal(),
+                "grid_cache": self.grid_cache,
+                "prefetch_depth": self.prefetch_depth,
+                "prefetch_readahead": self.prefetch_readahead,
+                "field_cache": self.field_cache,
+            }
+
+        return {}
+
+    def _get_journal(self) -> Journal:
+        """Get the resume journal in the output directory, loading it on first use.
+
+        Returns
+        -------
+        Journal
+            The resume journal.
+        """
+        if self._journal is None:
+            self._journal = Journal(str(self.output_path), resume=self.resume)
+
+        return self._journal
+
+    def _skip_completed_jobs(
+        self,
+        jobs: list[VarHandlerDict],
+        jobs_to_filepaths: dict[str, dict[str, list[str]]],
+    ) -> list[VarHandlerDict]:
+        """Skip the jobs that were completed by a previous run (``--resume``).
+
+        Only handlers that do not record their own time segments in the
+        resume journal (e.g., MPAS handlers) are skipped here. Other handlers
+        skip their completed time segments when they run.
+
+        Parameters
+        ----------
+        jobs : list[VarHandlerDict]
+            The jobs.
+        jobs_to_filepaths : dict[str, dict[str, list[str]]]
+            A dictionary mapping job names to a dictionary of their raw
+            variables and corresponding file paths.
+
+        Returns
+        -------
+        list[VarHandlerDict]
+            The jobs that have not been completed.
+        """
+        journal = self._get_journal()
+        remaining = []
+
+        for job in jobs:
+            inputs = _get_input_filepaths(jobs_to_filepaths[job["name"]])
+
+            if not _supports_journal(job) and journal.is_complete(job["name"], inputs):
+                logger.info(f"Skipping '{job['name']}' handler, completed (--resume).")
+                self._resumed_handlers.append(job["name"])
+
+                for name in get_job_handler_names(job):
+                    self._get_handler_result(name).status = "resumed"
+            else:
+                remaining.append(job)
+
+        return remaining
+
+    def _get_jobs(
+        self,
+    ) -> tuple[list[VarHandlerDict], dict[str, dict[str, list[str]]]]:
+        """Get the jobs to run and their input files.
+
+        The jobs are the handlers, groups of handlers or time segments of
+        handlers:
+
+          - With ``--fuse-handlers``, handlers that share inputs are grouped so
+            that their input files are read once for the group. The groups
+            are capped by the size of their input files.
+          - With ``--segment-parallel``, handlers are split into one job per
+            time segment (input file) so that the segments of a handler run in
+            parallel. Not used in serial mode.
+
+        Returns
+        -------
+        tuple[list[VarHandlerDict], dict[str, dict[str, list[str]]]]
+            The jobs, and a dictionary mapping job names to a dictionary of
+            their raw variables and corresponding file paths.
+        """
+        jobs = self.handlers
+        if self.fuse_handlers and self.realm not in MPAS_REALMS:
+            jobs = group_handlers(jobs, var_bytes=self._get_input_var_bytes(jobs))
+
+        jobs_to_filepaths = self._get_handlers_input_files(jobs)
+
+        if (
+            self.segment_parallel
+            and not self.serial_mode
+            and self.realm not in MPAS_REALMS
+        ):
+            segment_jobs = []
+            for job in jobs:
+                for segment_job, filepaths in split_into_segments(
+                    job, jobs_to_filepaths.pop(job["name"])
+                ):
+                    if segment_job.get("segment") == 0:
+                        self._segment_tracker.add(
+                            job["name"], segment_job["num_segments"]
+                        )
+
+                    segment_jobs.append(segment_job)
+                    jobs_to_filepaths[segment_job["name"]] = filepaths
+
+            logger.info(
+                f"Split {len(jobs)} handler job(s) into {len(segment_jobs)} "
+                "time segment job(s)."
+            )
+            jobs = segment_jobs
+
+        if self.resume:
+            jobs = self._skip_completed_jobs(jobs, jobs_to_filepaths)
+
+        return jobs, jobs_to_filepaths
+
+    def _get_handlers_input_files(
+        self, handlers: list[VarHandlerDict]
+    ) -> dict[str, dict[str, list[str]]]:
+        """Get the input files for every handler.
+
+        Parameters
+        ----------
+        handlers : list[VarHandlerDict]
+            The handlers.
+
+        Returns
+        -------
+        dict[str, dict[str, list[str]]]
+            A dictionary mapping handler names to a dictionary of their raw
+            variables and corresponding file paths.
+        """
+        return {
+            handler["name"]: self._get_handler_input_files(handler["raw_variables"])
+            for handler in handlers
+        }
+
+    def _estimate_handler_costs(
+        self,
+        handlers: list[VarHandlerDict],
+        handlers_to_filepaths: dict[str, dict[str, list[str]]],
+    ) -> dict[str, HandlerCost]:
+        """Estimate the cost of every handler from its input files.
+
+        Parameters
+        ----------
+        handlers : list[VarHandlerDict]
+            The handlers.
+        handlers_to_filepaths : dict[str, dict[str, list[str]]]
+            A dictionary mapping handler names to a dictionary of their raw
+            variables and corresponding file paths.
+
+        Returns
+        -------
+        dict[str, HandlerCost]
+            A dictionary mapping handler names to their estimated costs.
+        """
+        catalog = self._get_input_catalog()
+        profile = self._get_memory_profile()
+
+        return {
+            handler["name"]: estimate_handler_cost(
+                handler,
+                handlers_to_filepaths[handler["name"]],
+                catalog,
+                profile,
+                self.prefetch_depth,
+            )
+            for handler in handlers
+        }
+
+    def _get_handler_args(
+        self, handler: VarHandlerDict, vars_to_filepaths: dict[str, list[str]]
+    ) -> tuple:
+        """Get the arguments to pass to a handler's method.
+
+        MPAS handlers require a different set of arguments than other handlers.
+
+        Parameters
+        ----------
+        handler : VarHandlerDict
+            The handler.
+        vars_to_filepaths : dict[str, list[str]]
+            A dictionary mapping the handler's raw variables to their file paths.
+
+        Returns
+        -------
+        tuple
+            The arguments for the handler's method.
+        """
+        if self.realm in MPAS_REALMS:
+            return (
+                vars_to_filepaths,
+                self.tables_path,
+                self.new_metadata_path,
+                self.cmor_log_dir,
+            )
+
+        return (
+            vars_to_filepaths,
+            self.tables_path,
+            self.new_metadata_path,
+            self.cmor_log_dir,
+            handler["table"],
+        )
+
+    def _get_memory_profile(self) -> MemoryProfile:
+        """Get the memory profile, loading it on first use.
+
+        Returns
+        -------
+        MemoryProfile
+            The memory profile with the calibrated memory factors of handlers.
+        """
+        if self._memory_profile is None:
+            self._memory_profile = MemoryProfile()
+
+        return self._memory_profile
+
+    def _get_input_catalog(self) -> InputCatalog:
+        """Get the catalog of the input files, building it on first use.
+
+        The catalog is built with a single listing of the input directory (or
+        loaded from the user cache directory if the input files are
+        unchanged), so that the input files for every handler are dictionary
+        lookups.
+
+        Returns
+        -------
+        InputCatalog
+            The input file catalog.
+        """
+        if self._input_catalog is None:
+            self._input_catalog = InputCatalog.load_or_build(self.input_path)  # type: ignore
+
+        return self._input_catalog
+
+    def _get_input_var_bytes(self, handlers: list[VarHandlerDict]) -> dict[str, int]:
+        """Get the size of the input files of the handlers' inputs.
+
+        Parameters
+        ----------
+        handlers : list[VarHandlerDict]
+            The handlers.
+
+        Returns
+        -------
+        dict[str, int]
+            A dictionary mapping the raw variables (and the surface pressure
+            and hybrid coefficients) to the total size of their input files in
+            bytes. Empty if the inputs are not time series files (e.g., the
+            "fx" realm), which are not sized per variable.
+        """
+        if self.realm not in ["atm", "lnd"]:
+            return {}
+
+        catalog = self._get_input_catalog()
+        inputs = dict.fromkeys(
+            var
+            for handler in handlers
+            for var in [*handler["raw_variables"], *HYBRID_SIGMA_INPUT_VARS]
+        )
+
+        return {
+            var: catalog.get_total_bytes(catalog.get_var_files(var)) for var in inputs
+        }
+
+    def _get_handler_input_files(
+        self, handler_variables: dict[str, str]
+    ) -> dict[str, list[str]]:
+        """Get the input files for a given handler.
+
+        Parameters
+        ----------
+        handler_variables : dict[str, str]
+            The handler dictionary containing the variable names and their
+            corresponding file paths.
+
+        Returns
+        -------
+        dict[str, list[str]]
+            A dictionary mapping variable names to their corresponding file paths.
+        """
+        catalog = self._get_input_catalog()
+
+        if self.realm in ["atm", "lnd"]:
+            vars_to_filepaths = {
+                var: catalog.get_var_files(var) for var in handler_variables
+            }
+        elif self.realm == "fx":
+            vars_to_filepaths = {
+                var: catalog.get_nc_files() for var in handler_variables
+            }
+        else:
+            vars_to_filepaths = {
+                var: catalog.get_mpas_files(var, self.map_path)
+                for var in handler_variables
+            }
+
+        return vars_to_filepaths
+
+    def _log_job_status(
+        self,
+        result: bool | dict[str, bool],
+        job: VarHandlerDict,
+        num_handlers: int,
+        num_success: int,
+        failed_handlers: list[str],
+    ) -> tuple[int, list[str], bool]:
+        """
+        Logs the status of a job, which is a handler, a group of handlers or a
+        time segment of either.
+
+        The status of a handler split into time segments is only logged once
+        all of its segments have completed.
+
+        Parameters
+        ----------
+        result : bool | dict[str, bool]
+            The result of the handler, or the result of each handler for a
+            group of handlers.
+        job : VarHandlerDict
+            The job.
+        num_handlers : int
+            The total number of handlers.
+        num_success : int
+            The current count of successful handlers.
+        failed_handlers : list[str]
+            A list to append failed handler names to.
+
+        Returns
+        -------
+        tuple[int, list[str], bool]
+            The updated number of successful handlers, the list of failed
+            handlers, and whether every handler in the job was successful.
+        """
+        name = job["name"]
+
+        if "parent" in job:
+            is_successful = (
+                all(result.values()) if isinstance(result, dict) else bool(result)
+            )
+            combined = self._segment_tracker.record(
+                job["parent"], job["segment"], result
+            )
+
+            if combined is None:
+                return num_success, failed_handlers, is_successful
+
+            name = job["parent"]
+            result = combined
+
+        if not isinstance(result, dict):
+            result = {handler: result for handler in job.get("handlers", [name])}
+
+        for handler_name, is_cmor_successful in result.items():
+            num_success, failed_handlers = self._log_handler_status(
+                is_cmor_successful,
+                handler_name,
+                num_handlers,
+                num_success,
+                failed_handlers,
+            )
+
+        return num_success, failed_handlers, all(result.values())
+
+    def _log_handler_status(
+        self,
+        is_cmor_successful: bool | str | None,
+        name: str,
+        num_handlers: int,
+        num_success: int,
+        failed_handlers: list[str],
+    ) -> tuple[int, list[str]]:
+        """
+        Logs the status of a handler after attempting to CMORize a variable.
+
+        Parameters
+        ----------
+        is_cmor_successful : bool | str | None
+            Indicates if the handler was successful. False, None, or "" means
+            failure. VarHandler objects (`handlers/*.py`) return False for
+            failures. MPAS handlers (`mpas_vars/*.py`) return "" for failures.
+        name : str
+            The name of the handler (variable) being processed.
+        num_handlers : int
+            The total number of handlers.
+        num_success : int
+            The current count of successful handlers.
+        failed_handlers : list[str]
+            A list to append failed handler names to.
+
+        Returns
+        -------
+        tuple[int, list[str]]
+            The updated number of successful handlers and the list of failed
+            handlers.
+        """
+        if is_cmor_successful:
+            num_success += 1
+            logger.info(f"Successfully processed '{name}' handler.")
+        else:
+            failed_handlers.append(name)
+            logger.error(f"Error processing '{name}' handler.")
+
+        self._set_handler_status(name, bool(is_cmor_successful))
+
+        logger.info("=" * 60)
+        logger.info("STATUS UPDATE:")
+        logger.info(f"  * Successful handlers: {num_success} of {num_handlers}")
+        logger.info(f"  * Failed handlers: {len(failed_handlers)}")
+
+        if failed_handlers:
+            logger.info(f"  - Failed handler names: {', '.join(failed_handlers)}")
+        else:
+            logger.info("  - No failed handlers so far.")
+
+        logger.info("=" * 60)
+
+        return num_success, failed_handlers
+
+    def _get_handler_result(self, name: str) -> HandlerResult:
+        """Get the result of a handler, adding it on first use.
+
+        Parameters
+        ----------
+        name : str
+            The name of the handler.
+
+        Returns
+        -------
+        HandlerResult
+            The result of the handler.
+        """
+        if name not in self.handler_results:
+            self.handler_results[name] = HandlerResult(name)
+
+        return self.handler_results[name]
+
+    def _set_handler_status(self, name: str, is_successful: bool):
+        """Set the status of a handler once all of its jobs have completed.
+
+        The output files of the handler are read from the resume journal,
+        and the result is passed to the ``on_handler_done`` function of
+        ``execute()``.
+
+        Parameters
+        ----------
+        name : str
+            The name of the handler.
+        is_successful : bool
+            Whether the handler was successful.
+        """
+        self._read_handler_outputs()
+
+        handler_result = self._get_handler_result(name)
+        handler_result.status = "success" if is_successful else "failed"
+
+        if self._on_handler_done is not None:
+            try:
+                self._on_handler_done(handler_result)
+            except Exception as e:
+                logger.error(f"The on_handler_done function of '{name}' failed: {e}")
+
+    def _read_handler_outputs(self):
+        """Add the output files recorded in the resume journal to the results."""
+        if self._journal is None:
+            return
+
+        names = {handler["name"] for handler in self.handlers}
+
+        for entry in self._journal.read_new_entries():
+            if entry.get("output") is None or entry.get("handler") not in names:
+                continue
+
+            handler_result = self._get_handler_result(entry["handler"])
+            handler_result.output_paths.append(entry["output"])
+            handler_result.output_bytes += entry.get("size") or 0
+
+    def _log_final_result(
+        self, num_handlers: int, num_successes: int, failed_handlers: list[str]
+    ):
+        """
+        Logs the final result of the CMORization process.
+
+        Parameters
+        ----------
+        num_handlers : int
+            The total number of handlers that were processed.
+        num_successes : int
+            The number of handlers that completed successfully.
+        failed_handlers : list[str]
+            A list of handler names that failed during processing.
+        """
+        logger.info("")
+        logger.info("=======================================")
+        logger.info("| FINAL RUN SUMMARY")
+        logger.info("---------------------------------------")
+        logger.info(f"  * Total variables (--var-list): {len(self.var_list)}")
+        logger.info(f"  * Total handlers successfully derived: {num_handlers}")
+        logger.info(
+            f"  * Total handlers successfully cmorized: {num_successes} / {num_handlers}"
+        )
+
+        if failed_handlers:
+            logger.error(
+                f"  * Total handlers failed to cmorize: {len(failed_handlers)}"
+            )
+            logger.error(f"    - Failed variables: {failed_handlers}")
+
+        if self.distributed_jobs:
+            logger.info(
+                f"  * Total jobs claimed by other processes (--distributed): "
+                f"{len(self.distributed_jobs)}"
+            )
+
+        if self.timed_out_handlers:
+            logger.error(
+                f"  * Total handlers timed out (--handler-timeout): "
+                f"{len(self.timed_out_handlers)}"
+            )
+            logger.error(f"    - Includes: {self.timed_out_handlers}")
+
+        if self.retried_handlers:
+            retried = [
+                f"{name} ({retries} {'retry' if retries == 1 else 'retries'})"
+                for name, retries in self.retried_handlers.items()
+            ]
+            logger.warning(
+                f"  * Total handlers retried (--handler-retries): {len(retried)}"
+            )
+            logger.warning(f"    - Includes: {retried}")
+
+        if self.missing_handlers:
+            logger.error(
+                f"  * Total handlers missing (not defined in handlers.yaml): "
+                f"{len(self.missing_handlers)}"
+            )
+            logger.error(f"    - Includes: {self.missing_handlers}")
+
+        if self.non_derivable_handlers:
+            logger.error(
+                f"  * Total handlers non-derivable (defined but not derivable): "
+                f"{len(self.non_derivable_handlers)}"
+            )
+            logger.error(f"    - Includes: {self.non_derivable_handlers}")
+
+        if self.handler_costs:
+            self._log_handler_costs()
+
+        if self.telemetry_spans:
+            self._log_telemetry()
+
+        if self.profile_paths:
+            self._log_hot_functions()
+
+        logger.info("=======================================")
+
+    def _log_handler_costs(self):
+        """Logs the estimated and actual cost of each handler.
+
+        The ideal makespan is the total handler time divided by the number of
+        processes, which the wall-clock time approaches when the handlers are
+        well balanced across the workers.
+        """
+        logger.info("---------------------------------------")
+        logger.info("| HANDLER COSTS (most expensive first)")
+        logger.info("---------------------------------------")
+
+        costs = sorted(
+            self.handler_costs.values(), key=lambda c: c.estimated, reverse=True
+        )
+        for cost in costs:
+            actual = f"{cost.actual:.2f}s" if cost.actual is not None else "n/a"
+            peak = (
+                f"{cost.peak_memory / 1024**3:.2f} GiB"
+                if cost.peak_memory is not None
+                else "n/a"
+            )
+            logger.info(
+                f"  * {cost.name}: estimated={cost.estimated / 1e9:.3f} GB-eq "
+                f"(input={cost.input_bytes / 1e9:.3f} GB, levels={cost.num_levels}, "
+                f"vertical={cost.is_vertical}, hybrid={cost.is_hybrid}), "
+                f"actual={actual}, "
+                f"predicted memory={cost.predicted_memory / 1024**3:.2f} GiB, "
+                f"peak memory={peak}"
+            )
+
+        total_work = sum(c.actual for c in costs if c.actual is not None)
+        logger.info(f"  * Total handler time: {total_work:.2f}s")
+
+        if self.run_elapsed is not None:
+            num_proc = 1 if self.serial_mode else self.num_proc
+            logger.info(f"  * Wall-clock time: {self.run_elapsed:.2f}s")
+            logger.info(f"  * Ideal makespan: {total_work / num_proc:.2f}s")
+
+    def _log_telemetry(self):
+        """Logs the time, bytes and throughput of each phase of the handlers.
+
+        The share of each phase in the total time of the phases shows which
+        phase to optimize. The input throughput of the run compared to the
+        throughput per process shows whether adding processes (--num-proc)
+        still increases the throughput, or whether the filesystem is saturated.
+        """
+        logger.info("---------------------------------------")
+        logger.info("| TELEMETRY (--telemetry)")
+        logger.info("---------------------------------------")
+
+        summaries = telemetry.summarize_spans(self.telemetry_spans)
+        total_elapsed = sum(summary.elapsed for summary in summaries.values())
+
+        for summary in summaries.values():
+            share = summary.elapsed / total_elapsed * 100 if total_elapsed else 0.0
+            throughput = (
+                f"{summary.throughput:.1f} MB/s"
+                if summary.throughput is not None
+                else "n/a"
+            )
+            logger.info(
+                f"  * {summary.phase}: count={summary.count}, "
+                f"time={summary.elapsed:.2f}s ({share:.1f}%), "
+                f"in={summary.bytes_in / 1e9:.3f} GB, "
+                f"out={summary.bytes_out / 1e9:.3f} GB, "
+                f"throughput={throughput}"
+            )
+
+        # The reads of the time segments that overlapped with CMOR writes, and
+        # the time the handlers stalled waiting for their input (refer to
+        # ``prefetch.py``).
+        waits = [s for s in self.telemetry_spans if s["phase"] == "prefetch_wait"]
+        if waits:
+            read_elapsed = sum(s.get("read_elapsed", 0.0) for s in waits)
+            stalled = sum(s.get("elapsed", 0.0) for s in waits)
+            logger.info(
+                f"  * Input prefetch: {max(0.0, read_elapsed - stalled):.2f}s of "
+                f"{read_elapsed:.2f}s of reads overlapped with CMOR writes, "
+                f"{stalled:.2f}s stalled waiting for input"
+            )
+
+        input_bytes = sum(
+            cost.input_bytes
+            for cost in self.handler_costs.values()
+            if cost.actual is not None
+        )
+        if self.run_elapsed:
+            num_proc = 1 if self.serial_mode else self.num_proc
+            run_throughput = input_bytes / telemetry.BYTES_PER_MB / self.run_elapsed
+            logger.info(
+                f"  * Input throughput: {run_throughput:.1f} MB/s "
+                f"({run_throughput / num_proc:.1f} MB/s per process)"
+            )
+
+        logger.info(f"  * Telemetry file: {self.telemetry_path}")
+
+    def _log_hot_functions(self):
+        """Logs the functions that spent the most time across the profiled jobs.
+
+        The profiles of the jobs are merged into a summary profile in the
+        profiles directory, with a text report of all of the functions.
+        """
+        logger.info("---------------------------------------")
+        logger.info("| HOT FUNCTIONS (--profile)")
+        logger.info("---------------------------------------")
+
+        summary_path = os.path.join(
+            self.profiles_path,  # type: ignore
+            f"summary_{self.timestamp}.prof",
+        )
+        try:
+            stats = merge_profiles(self.profile_paths, summary_path)
+        except Exception as e:
+            logger.warning(f"Unable to merge the profiles: {e}")
+            return
+
+        if stats is None:
+            logger.warning("  * No profiles were written by the jobs.")
+            return
+
+        for function in get_hot_functions(stats):
+            logger.info(
+                f"  * {function.name}: tottime={function.tottime:.2f}s, "
+                f"cumtime={function.cumtime:.2f}s, calls={function.ncalls}"
+            )
+
+        logger.info(f"  * Profiles: {self.profiles_path}")
+        logger.info(f"  * Summary profile: {summary_path}")
+
+    def _timeout_exit(self):
+        logger.info("Hit timeout limit, exiting")
+        os.kill(os.getpid(), signal.SIGINT)
+
+    def _stop_with_failed_handler(self, handler_name: str) -> bool:
+        """Gracefully stop with a failed handler in info mode.
+
+        If ``self.on_var_failure`` is set to "stop", the run is stopped (refer
+        to ``_stop_run()``), and ``run()`` exits with a failure code (exit code
+        1).
+
+        Parameters
+        ----------
+        handler_name : str
+            The name of the handler that failed.
+
+        Returns
+        -------
+        bool
+            True if the run is stopped, False otherwise.
+        """
+        if self.on_var_failure == "stop":
+            self._stop_run(handler_name)
+
+            return True
+
+        return False
+
+    def _stop_run(self, handler_name: str):
+        """Stop the run with a failed handler in serial or parallel mode.
+
+        The run is marked as stopped, and ``run()`` exits with a failure code
+        (exit code 1) once the final result is logged.
+
+        Parameters
+        ----------
+        handler_name : str
+            The name of the handler that failed.
+        """
+        self._stop_reason = (
+            f"Stopping immediately due to --on-var-failure=stop "
+            f"(failed handler: '{handler_name}')"
+        )
+        logger.error(self._stop_reason)
+
+        self._is_stopped = True
+
+    def _stop_with_failed_handler_parallel(
+        self,
+        handler_name: str,
+        pool: WorkerPool,
+        pbar: tqdm,
+        futures: list[Future[HandlerRun]],
+    ) -> None:
+        """Gracefully stop parallel processing when a handler fails.
+
+        This method is triggered when a handler fails during parallel processing.
+        It stops the run, shuts down the processing pool, closes the progress
+        bar, and waits for active futures to settle.
+
+        The function ensures that pending jobs are canceled gracefully while
         allowing running jobs to complete. Active futures are given a brief
-        timeout to settle before the process exits. The process exits with a
-        failure code after handling the failure.
+        timeout to settle before the run stops.
 
         Parameters
         ----------
         handler_name : str
             The name of the handler that failed.
-        pool : Pool
+        pool : WorkerPool
             The multiprocessing pool managing parallel tasks.
         pbar : tqdm
             The progress bar instance to be closed.
-        futures : list[Future[bool]]
+        futures : list[Future[HandlerRun]]
             A collection of futures representing the parallel tasks.
         """
-        logger.error(
-            f"Stopping immediately due to --on-var-failure=stop "
-            f"(failed handler: '{handler_name}')"
-        )
+        self._stop_run(handler_name)
+
         # Gracefully cancel pending jobs, allow running ones to complete
         pool.shutdown(cancel_futures=False)
         pbar.close()
@@ -1155,8 +2320,6 @@ class E3SMtoCMIP:
                 except Exception:
                     pass
 
-        exit_failure()
-
     def _finalize_on_failure(self, failed_handlers: list[str]) -> None:
         """Finalize exit behavior based on --on-var-failure mode "fail".
 
@@ -1193,3 +2356,214 @@ class E3SMtoCMIP:
             A data class of parsed arguments.
         """
         return CLIArguments(**vars(parsed_args))
+
+
+def _supports_journal(handler: VarHandlerDict) -> bool:
+    """Checks if a handler records its own time segments in the resume journal.
+
+    Parameters
+    ----------
+    handler : VarHandlerDict
+        The handler.
+
+    Returns
+    -------
+    bool
+        True for VarHandlers and groups of VarHandlers (including their time
+        segments), False for MPAS and legacy handlers.
+    """
+    method = handler["method"]
+    if isinstance(method, functools.partial):
+        method = method.func
+
+    return isinstance(getattr(method, "__self__", None), (VarHandler, VarHandlerGroup))
+
+
+def _get_unit_key(
+    handler: VarHandlerDict, vars_to_filepaths: dict[str, list[str]]
+) -> str:
+    """Get the key of a job in the work queue shared with other processes.
+
+    Parameters
+    ----------
+    handler : VarHandlerDict
+        The job.
+    vars_to_filepaths : dict[str, list[str]]
+        A dictionary mapping the job's raw variables to their file paths.
+
+    Returns
+    -------
+    str
+        The key of the job.
+    """
+    return WorkQueue.get_unit_key(
+        handler["name"],
+        handler.get("table"),
+        _get_input_filepaths(vars_to_filepaths),  # type: ignore
+    )
+
+
+def _get_ready_retries(
+    retries: list[tuple[float, VarHandlerDict]],
+) -> list[VarHandlerDict]:
+    """Remove and return the handlers that are ready to be retried.
+
+    Parameters
+    ----------
+    retries : list[tuple[float, VarHandlerDict]]
+        The handlers waiting to be retried, with the time they are ready.
+
+    Returns
+    -------
+    list[VarHandlerDict]
+        The handlers that are ready to be retried.
+    """
+    now = time.monotonic()
+    ready = [handler for ready_at, handler in retries if ready_at <= now]
+    retries[:] = [(ready_at, h) for ready_at, h in retries if ready_at > now]
+
+    return ready
+
+
+def _get_retry_wait(retries: list[tuple[float, VarHandlerDict]]) -> float | None:
+    """Get the number of seconds until the next handler is ready to be retried.
+
+    Parameters
+    ----------
+    retries : list[tuple[float, VarHandlerDict]]
+        The handlers waiting to be retried, with the time they are ready.
+
+    Returns
+    -------
+    float | None
+        The number of seconds, or None if there are no handlers to retry.
+    """
+    if not retries:
+        return None
+
+    return max(0.0, min(ready_at for ready_at, _ in retries) - time.monotonic())
+
+
+def _get_input_filepaths(vars_to_filepaths: dict[str, list[str] | str]) -> list[str]:
+    """Get the flat list of a handler's input filepaths.
+
+    Parameters
+    ----------
+    vars_to_filepaths : dict[str, list[str] | str]
+        A dictionary mapping the handler's raw variables to their file path(s).
+
+    Returns
+    -------
+    list[str]
+        The filepaths.
+    """
+    filepaths: list[str] = []
+
+    for value in vars_to_filepaths.values():
+        if isinstance(value, str):
+            filepaths.append(value)
+        else:
+            filepaths.extend(value)
+
+    return filepaths
+
+
+def _read_git_head(path: str) -> tuple[str, str] | None:
+    """Reads the branch name and commit hash of the Git repository of a path.
+
+    Parameters
+    ----------
+    path : str
+        A path inside the Git repository.
+
+    Returns
+    -------
+    tuple[str, str] | None
+        The branch name ("HEAD" if the HEAD is detached, like
+        ``git rev-parse --abbrev-ref HEAD``) and the commit hash, or None if
+        the path is not in a Git repository or the HEAD can't be resolved.
+    """
+    git_dir = _find_git_dir(path)
+    if git_dir is None:
+        return None
+
+    try:
+        with open(os.path.join(git_dir, "HEAD"), "r") as infile:
+            head = infile.read().strip()
+    except OSError:
+        return None
+
+    if not head.startswith("ref: "):
+        return "HEAD", head
+
+    ref = head[len("ref: ") :]
+    branch_name = ref.removeprefix("refs/heads/")
+
+    # Refs of worktrees are stored in the common Git directory.
+    common_dir = git_dir
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r") as infile:
+            common_dir = os.path.join(git_dir, infile.read().strip())
+    except OSError:
+        pass
+
+    for ref_dir in dict.fromkeys([git_dir, common_dir]):
+        try:
+            with open(os.path.join(ref_dir, ref), "r") as infile:
+                return branch_name, infile.read().strip()
+        except OSError:
+            pass
+
+    try:
+        with open(os.path.join(common_dir, "packed-refs"), "r") as infile:
+            for line in infile:
+                parts = line.split()
+                if len(parts) == 2 and parts[1] == ref:
+                    return branch_name, parts[0]
+    except OSError:
+        pass
+
+    return None
+
+
+def _find_git_dir(path: str) -> str | None:
+    """Finds the Git directory of the repository containing a path.
+
+    Parameters
+    ----------
+    path : str
+        A path inside the Git repository.
+
+    Returns
+    -------
+    str | None
+        The path to the Git directory, or None if the path is not in a Git
+        repository.
+    """
+    path = os.path.abspath(path)
+
+    while True:
+        dot_git = os.path.join(path, ".git")
+
+        if os.path.isdir(dot_git):
+            return dot_git
+
+        # Worktrees and submodules have a ".git" file pointing to the Git
+        # directory.
+        if os.path.isfile(dot_git):
+            try:
+                with open(dot_git, "r") as infile:
+                    contents = infile.read().strip()
+            except OSError:
+                return None
+
+            if contents.startswith("gitdir: "):
+                return os.path.join(path, contents[len("gitdir: ") :])
+
+            return None
+
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+
+        path = parent
@@ -0,0 +1,787 @@
+"""
+This module provides cost-aware scheduling of variable handlers.
+
+The cost of each handler is estimated from its input files in the input
+catalog (total bytes), the number of vertical levels, and whether it needs
+vertical or hybrid sigma level handling. Handlers are submitted to the process
+pool in descending order of estimated cost (longest processing time first), so
+that large 3D variables do not become a long tail after the other workers have
+gone idle.
+
+It also provides memory-aware admission control. The peak memory of each
+handler is predicted from the shapes and dtypes of its variables in the input
+headers, scaled by a per-handler factor that is calibrated from the peak
+resident set size (RSS) observed in previous runs. The factors are kept per
+handler and horizontal grid size, so that runs at different resolutions don't
+overwrite each other, and the factors of time segment jobs and groups of
+handlers are kept under the names of their handlers. With a ``--max-memory``
+budget, handlers are only admitted to the process pool while their combined
+predicted memory fits in the budget.
+"""
+
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from e3sm_to_cmip import telemetry
+from e3sm_to_cmip._logger import _setup_child_logger
+from e3sm_to_cmip.catalog import InputCatalog
+from e3sm_to_cmip.cmor_handlers import HYBRID_SIGMA_LEVEL_NAMES
+from e3sm_to_cmip.prefetch import PREFETCH_LOAD_MAX_BYTES
+
+logger = _setup_child_logger(__name__)
+
+# The relative cost added per vertical level, which accounts for the per-level
+# overhead of building and writing the vertical axis with CMOR.
+LEVEL_COST_WEIGHT = 0.01
+
+# The cost multiplier for handlers with vertical levels (e.g., "plev19").
+VERTICAL_COST_FACTOR = 1.5
+
+# The cost multiplier for handlers with hybrid sigma levels, which also read
+# the surface pressure and hybrid coefficients and write the "ps" zfactor.
+HYBRID_COST_FACTOR = 2.0
+
+# The default ratio of a handler's peak memory to the in-memory size of its
+# input variables, used until the handler has been calibrated. It accounts for
+# the intermediate arrays created by formulas and by CMOR.
+DEFAULT_MEMORY_FACTOR = 3.0
+
+# The default resident set size of a worker process before it runs a handler
+# (i.e., the Python interpreter and imported libraries), used until it has
+# been observed.
+DEFAULT_BASE_MEMORY = 512 * 1024**2
+
+# The weight given to the latest observation when calibrating the memory
+# factor of a handler (exponential moving average).
+MEMORY_CALIBRATION_WEIGHT = 0.5
+
+# The base delay in seconds before retrying a handler that failed with a
+# transient error, which doubles with each retry up to the maximum delay.
+RETRY_BASE_DELAY = 10.0
+RETRY_MAX_DELAY = 300.0
+
+# The path to the memory profile, which stores the calibrated memory factors
+# across runs, by handler name and horizontal grid size (refer to
+# ``get_profile_keys()``).
+MEMORY_PROFILE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "e3sm_to_cmip",
+    "memory_profile.json",
+)
+
+
+@dataclass
+class HandlerCost:
+    """The estimated and actual cost of running a handler."""
+
+    # The name of the job, which is a handler, a group of handlers or a time
+    # segment of either.
+    name: str
+    # The CMIP variable names of the handlers of the job, by default the name.
+    handlers: list[str] = field(default_factory=list)
+    # The horizontal grid size of the input variables (i.e., the number of
+    # elements per time step and level), or 0 if it is unknown.
+    grid_size: int = 0
+    # The total size of the handler's input files.
+    input_bytes: int = 0
+    # The number of vertical levels, or 0 if the handler has no levels.
+    num_levels: int = 0
+    # Whether the handler has vertical levels.
+    is_vertical: bool = False
+    # Whether the handler has hybrid sigma levels.
+    is_hybrid: bool = False
+    # The estimated cost, in weighted bytes.
+    estimated: float = 0.0
+    # The actual wall-clock time of the handler in seconds, once it has run.
+    actual: float | None = None
+    # The in-memory size of the handler's input variables in bytes.
+    data_bytes: int = 0
+    # The memory of the time segments that the handler loads ahead of the
+    # segment being written in bytes (refer to ``prefetch.py``).
+    prefetch_memory: int = 0
+    # The predicted peak memory of the handler in bytes, excluding the base
+    # memory of the worker process, including its prefetch memory.
+    predicted_memory: int = 0
+    # The observed peak memory of the handler in bytes, excluding the base
+    # memory of the worker process, once it has run.
+    peak_memory: int | None = None
+
+
+@dataclass
+class HandlerRun:
+    """The result and resource usage of running a handler."""
+
+    # The result of the handler method.
+    result: Any
+    # The wall-clock time in seconds.
+    elapsed: float
+    # The resident set size of the process before running the handler in bytes.
+    base_memory: int | None = None
+    # The peak resident set size of the process while running the handler in
+    # bytes.
+    peak_memory: int | None = None
+    # The telemetry spans of the phases of the handler (e.g., "cmor_write").
+    spans: list[dict[str, Any]] = field(default_factory=list)
+
+
+class MemoryProfile:
+    """The calibrated memory factors of handlers, persisted across runs.
+
+    Parameters
+    ----------
+    path : str | None, optional
+        The path to the memory profile, by default None to use
+        ``MEMORY_PROFILE_PATH``.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or MEMORY_PROFILE_PATH
+        self.factors: dict[str, float] = {}
+        self.base_memory: int = DEFAULT_BASE_MEMORY
+
+        try:
+            with open(self.path, "r") as infile:
+                contents = json.load(infile)
+
+            self.factors = {k: float(v) for k, v in contents["factors"].items()}
+            self.base_memory = int(contents["base_memory"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+
+    def get_factor(self, cost: HandlerCost) -> float:
+        """Gets the memory factor of a job.
+
+        Parameters
+        ----------
+        cost : HandlerCost
+            The cost of the job, with its handlers and grid size.
+
+        Returns
+        -------
+        float
+            The largest factor of the job's handlers at its grid size, with
+            ``DEFAULT_MEMORY_FACTOR`` for the handlers that have not been
+            calibrated.
+        """
+        return max(
+            self.factors.get(key, DEFAULT_MEMORY_FACTOR)
+            for key in get_profile_keys(cost)
+        )
+
+    def update(self, cost: HandlerCost, run: HandlerRun):
+        """Calibrates the memory factors of a job's handlers from a run.
+
+        Parameters
+        ----------
+        cost : HandlerCost
+            The cost of the job, with its data bytes.
+        run : HandlerRun
+            The observed run of the job.
+        """
+        if run.base_memory is None or run.peak_memory is None:
+            return
+
+        self.base_memory = run.base_memory
+        cost.peak_memory = max(run.peak_memory - run.base_memory, 0)
+
+        if cost.data_bytes == 0:
+            return
+
+        # The factor excludes the memory of the prefetched segments, which
+        # depends on the prefetch depth of the run.
+        observed = max(cost.peak_memory - cost.prefetch_memory, 0) / cost.data_bytes
+        for key in get_profile_keys(cost):
+            factor = observed
+            if key in self.factors:
+                factor = (
+                    MEMORY_CALIBRATION_WEIGHT * observed
+                    + (1 - MEMORY_CALIBRATION_WEIGHT) * self.factors[key]
+                )
+
+            self.factors[key] = factor
+
+    def save(self) -> bool:
+        """Saves the memory profile atomically.
+
+        Returns
+        -------
+        bool
+            True if the memory profile was saved, otherwise False.
+        """
+        contents = {"factors": self.factors, "base_memory": self.base_memory}
+        dirname = os.path.dirname(self.path)
+
+        try:
+            os.makedirs(dirname, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+            with os.fdopen(fd, "w") as outfile:
+                json.dump(contents, outfile, indent=2, sort_keys=True)
+
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.debug(f"Unable to save the memory profile to '{self.path}': {e}")
+
+            return False
+
+        return True
+
+
+class AdmissionController:
+    """Admits handlers to the process pool within a memory budget.
+
+    Parameters
+    ----------
+    max_memory : int | None
+        The memory budget in bytes, or None for no budget (i.e., every
+        handler is admitted immediately and the pool queues them).
+    max_jobs : int
+        The maximum number of handlers running at once with a budget, which
+        is the number of worker processes.
+    base_memory : int, optional
+        The base memory of each worker process in bytes, by default
+        ``DEFAULT_BASE_MEMORY``.
+    """
+
+    def __init__(
+        self,
+        max_memory: int | None,
+        max_jobs: int,
+        base_memory: int = DEFAULT_BASE_MEMORY,
+    ):
+        self.max_memory = max_memory
+        self.max_jobs = max_jobs
+        self.base_memory = base_memory
+
+        self._admitted: dict[str, int] = {}
+
+    @property
+    def in_use(self) -> int:
+        """The combined predicted memory of the admitted handlers in bytes."""
+        return sum(self._admitted.values())
+
+    def admit_ready(
+        self, pending: list[dict[str, Any]], costs: dict[str, HandlerCost]
+    ) -> list[dict[str, Any]]:
+        """Admits the pending handlers that fit in the memory budget.
+
+        Handlers are admitted in the order of ``pending``. A handler that does
+        not fit is skipped in favor of later (smaller) handlers that do. A
+        handler that exceeds the budget on its own is admitted once no other
+        handler is running.
+
+        Parameters
+        ----------
+        pending : list[dict[str, Any]]
+            The pending handlers, which admitted handlers are removed from.
+        costs : dict[str, HandlerCost]
+            A dictionary mapping handler names to their costs.
+
+        Returns
+        -------
+        list[dict[str, Any]]
+            The admitted handlers.
+        """
+        if self.max_memory is None:
+            admitted = list(pending)
+            pending.clear()
+
+            return admitted
+
+        admitted = []
+        for handler in list(pending):
+            if len(self._admitted) >= self.max_jobs:
+                break
+
+            name = handler["name"]
+            footprint = self.base_memory + costs[name].predicted_memory
+
+            if self._admitted and self.in_use + footprint > self.max_memory:
+                continue
+
+            if footprint > self.max_memory:
+                logger.warning(
+                    f"Handler '{name}' is predicted to use {footprint / 1024**3:.2f} "
+                    "GiB, which exceeds --max-memory. Running it on its own."
+                )
+
+            self._admitted[name] = footprint
+            pending.remove(handler)
+            admitted.append(handler)
+
+        return admitted
+
+    def release(self, name: str):
+        """Releases the memory of a handler that has finished.
+
+        Parameters
+        ----------
+        name : str
+            The name of the handler.
+        """
+        self._admitted.pop(name, None)
+
+
+class SegmentTracker:
+    """Tracks the completion of the time segments of handlers.
+
+    Handlers that are split into time segments (``--segment-parallel``) are
+    complete once all of their segments are complete, and are successful only
+    if all of their segments are successful.
+    """
+
+    def __init__(self):
+        # Map each handler to the results of its completed segments.
+        self._results: dict[str, dict[int, Any]] = {}
+        # Map each handler to its number of segments.
+        self._num_segments: dict[str, int] = {}
+
+    def add(self, name: str, num_segments: int):
+        """Adds a handler that is split into segments.
+
+        Parameters
+        ----------
+        name : str
+            The name of the handler.
+        num_segments : int
+            The number of segments.
+        """
+        self._results[name] = {}
+        self._num_segments[name] = num_segments
+
+    def record(self, name: str, segment: int, result: Any) -> Any | None:
+        """Records the result of a segment.
+
+        Parameters
+        ----------
+        name : str
+            The name of the handler.
+        segment : int
+            The index of the segment.
+        result : Any
+            The result of the segment, which is either a boolean or a
+            dictionary mapping handler names to booleans for a group of
+            handlers.
+
+        Returns
+        -------
+        Any | None
+            The combined result of all segments if the handler is complete,
+            otherwise None.
+        """
+        results = self._results[name]
+        results[segment] = result
+
+        logger.info(
+            f"Completed segment {len(results)}/{self._num_segments[name]} of "
+            f"'{name}' handler (segment {segment})."
+        )
+
+        if len(results) < self._num_segments[name]:
+            return None
+
+        return _combine_segment_results(list(results.values()))
+
+    def get_incomplete(self) -> list[str]:
+        """Gets the handlers with segments that have not completed.
+
+        Returns
+        -------
+        list[str]
+            The names of the handlers.
+        """
+        return [
+            name
+            for name, results in self._results.items()
+            if len(results) < self._num_segments[name]
+        ]
+
+
+def estimate_handler_cost(
+    handler: dict[str, Any],
+    vars_to_filepaths: dict[str, Any],
+    catalog: InputCatalog,
+    profile: MemoryProfile | None = None,
+    prefetch_depth: int = 0,
+) -> HandlerCost:
+    """Estimates the cost and peak memory of a handler from its input files.
+
+    Parameters
+    ----------
+    handler : dict[str, Any]
+        The dictionary representation of the handler.
+    vars_to_filepaths : dict[str, Any]
+        A dictionary mapping the handler's raw variables to their filepath(s).
+    catalog : InputCatalog
+        The input file catalog.
+    profile : MemoryProfile | None, optional
+        The memory profile with the calibrated memory factors, by default None
+        to use ``DEFAULT_MEMORY_FACTOR``.
+    prefetch_depth : int, optional
+        The number of time segments read ahead (``--prefetch-depth``), by
+        default 0. The handlers and groups of handlers load the segments they
+        read ahead if they fit in ``PREFETCH_LOAD_MAX_BYTES``, so up to this
+        many segments are in memory with the one being written.
+
+    Returns
+    -------
+    HandlerCost
+        The estimated cost of the handler.
+    """
+    levels = handler.get("levels")
+
+    cost = HandlerCost(name=handler["name"], handlers=get_job_handler_names(handler))
+    cost.input_bytes = sum(
+        catalog.get_total_bytes(filepaths) for filepaths in vars_to_filepaths.values()
+    )
+    cost.is_vertical = levels is not None
+    cost.is_hybrid = levels is not None and levels["name"] in HYBRID_SIGMA_LEVEL_NAMES
+
+    axis_name = levels["e3sm_axis_name"] if levels is not None else None
+    num_files = 1
+    for var, filepaths in vars_to_filepaths.items():
+        if isinstance(filepaths, str):
+            filepaths = [filepaths]
+
+        num_files = max(num_files, len(filepaths))
+
+        var_bytes, num_levels, grid_size = _read_header_info(filepaths, var, axis_name)
+        if var_bytes is None:
+            # Not a variable in the input files (e.g., the MPAS mesh or
+            # namelist), so the whole file is assumed to be loaded.
+            var_bytes = catalog.get_total_bytes(filepaths)
+
+        cost.data_bytes += var_bytes
+        cost.num_levels = max(cost.num_levels, num_levels)
+        cost.grid_size = max(cost.grid_size, grid_size)
+
+    segment_bytes = cost.data_bytes // num_files
+    if segment_bytes <= PREFETCH_LOAD_MAX_BYTES:
+        num_prefetched = min(max(prefetch_depth, 0), num_files - 1)
+        cost.prefetch_memory = num_prefetched * segment_bytes
+
+    factor = profile.get_factor(cost) if profile else DEFAULT_MEMORY_FACTOR
+    cost.predicted_memory = int(cost.data_bytes * factor) + cost.prefetch_memory
+
+    factor = 1.0 + LEVEL_COST_WEIGHT * cost.num_levels
+    if cost.is_hybrid:
+        factor *= HYBRID_COST_FACTOR
+    elif cost.is_vertical:
+        factor *= VERTICAL_COST_FACTOR
+
+    cost.estimated = cost.input_bytes * factor
+
+    return cost
+
+
+def sort_by_cost(
+    handlers: list[dict[str, Any]], costs: dict[str, HandlerCost]
+) -> list[dict[str, Any]]:
+    """Sorts handlers by descending estimated cost.
+
+    The sort is stable, so handlers with the same cost keep their
+    ``--var-list`` order.
+
+    Parameters
+    ----------
+    handlers : list[dict[str, Any]]
+        The handlers.
+    costs : dict[str, HandlerCost]
+        A dictionary mapping handler names to their costs.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The sorted handlers.
+    """
+    return sorted(handlers, key=lambda h: costs[h["name"]].estimated, reverse=True)
+
+
+def get_handler_timeout(cost: HandlerCost, seconds_per_gib: float) -> float:
+    """Gets the wall-clock limit of a handler, scaled by its estimated cost.
+
+    Parameters
+    ----------
+    cost : HandlerCost
+        The cost of the handler.
+    seconds_per_gib : float
+        The wall-clock limit in seconds per GiB of estimated cost
+        (``--handler-timeout``).
+
+    Returns
+    -------
+    float
+        The wall-clock limit in seconds, which is at least ``seconds_per_gib``
+        for handlers with less than one GiB of estimated cost.
+    """
+    return seconds_per_gib * max(1.0, cost.estimated / 1024**3)
+
+
+def get_retry_delay(attempt: int) -> float:
+    """Gets the delay before retrying a handler (exponential backoff).
+
+    Parameters
+    ----------
+    attempt : int
+        The number of the retry, starting at 1.
+
+    Returns
+    -------
+    float
+        The delay in seconds.
+    """
+    return min(RETRY_BASE_DELAY * 2 ** (attempt - 1), RETRY_MAX_DELAY)
+
+
+def run_measured(func: Callable[..., Any], *args: Any, **kwargs: Any) -> HandlerRun:
+    """Runs a handler method and measures its wall-clock time and peak memory.
+
+    This function is submitted to the process pool in place of the handler
+    method, so that the time is measured inside the worker process rather than
+    including the time the job spent queued.
+
+    The telemetry spans of the handler's phases are collected while it runs
+    and returned with its result.
+
+    Worker processes are reused across handlers, so the peak RSS of the
+    process is reset before the handler runs where the platform supports it
+    (Linux). Otherwise, the peak memory is only recorded if the handler raised
+    the high-water mark of the process.
+
+    Parameters
+    ----------
+    func : Callable[..., Any]
+        The handler method.
+    *args : Any
+        The arguments for the handler method.
+    **kwargs : Any
+        The keyword arguments for the handler method.
+
+    Returns
+    -------
+    HandlerRun
+        The result of the handler method and its resource usage.
+    """
+    is_reset = _reset_peak_rss()
+    base_memory = _get_rss()
+    peak_before = _get_peak_rss()
+
+    telemetry.start_collecting()
+    start_time = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start_time
+        spans = telemetry.stop_collecting()
+
+    peak_memory = _get_peak_rss()
+    if not is_reset and peak_memory is not None and peak_memory == peak_before:
+        peak_memory = None
+
+    return HandlerRun(result, elapsed, base_memory, peak_memory, spans)
+
+
+def _combine_segment_results(results: list[Any]) -> Any:
+    """Combines the results of the segments of a handler.
+
+    Parameters
+    ----------
+    results : list[Any]
+        The results of the segments, which are either booleans or dictionaries
+        mapping handler names to booleans for a group of handlers.
+
+    Returns
+    -------
+    Any
+        True if all segments were successful, or a dictionary mapping handler
+        names to whether all of their segments were successful.
+    """
+    dict_results = [result for result in results if isinstance(result, dict)]
+
+    if not dict_results:
+        return all(results)
+
+    names = dict.fromkeys(name for result in dict_results for name in result)
+
+    # A segment that failed without a per-handler result (e.g., it raised an
+    # exception) fails every handler in the group.
+    is_any_failed = any(not r for r in results if not isinstance(r, dict))
+
+    return {
+        name: not is_any_failed and all(r.get(name, False) for r in dict_results)
+        for name in names
+    }
+
+
+def get_job_handler_names(job: dict[str, Any]) -> list[str]:
+    """Gets the names of the handlers of a job.
+
+    Parameters
+    ----------
+    job : dict[str, Any]
+        The job, which is a handler, a group of handlers or a time segment of
+        either.
+
+    Returns
+    -------
+    list[str]
+        The names of the handlers.
+    """
+    return job.get("handlers") or [job.get("parent", job["name"])]
+
+
+def get_profile_keys(cost: HandlerCost) -> list[str]:
+    """Gets the keys of the memory factors of a job in the memory profile.
+
+    Parameters
+    ----------
+    cost : HandlerCost
+        The cost of the job.
+
+    Returns
+    -------
+    list[str]
+        The key of each handler of the job, which is the handler name with
+        the horizontal grid size of the job's input variables (e.g.,
+        "ta@21600"), so that jobs of the same handler (e.g., its time segments)
+        share a factor while other resolutions have their own.
+    """
+    return [f"{name}@{cost.grid_size}" for name in cost.handlers or [cost.name]]
+
+
+def _read_header_info(
+    filepaths: list[str], var: str, axis_name: str | None
+) -> tuple[int | None, int, int]:
+    """Reads the in-memory size of a variable and its number of levels.
+
+    Only the header of the first file is read. The size of the variable is
+    extrapolated to all of the files, which have the same shape in a time
+    series.
+
+    Parameters
+    ----------
+    filepaths : list[str]
+        The filepaths of the variable.
+    var : str
+        The name of the variable.
+    axis_name : str | None
+        The name of the E3SM level axis (e.g., "lev", "plev"), or None if the
+        handler has no levels.
+
+    Returns
+    -------
+    tuple[int | None, int, int]
+        The in-memory size of the variable across all files in bytes (None if
+        the variable is not in the header), the number of levels (0 if the
+        axis could not be found) and the horizontal grid size of the variable
+        (0 if it is not in the header).
+    """
+    if len(filepaths) == 0:
+        return 0, 0, 0
+
+    import netCDF4
+
+    try:
+        with netCDF4.Dataset(filepaths[0], "r") as ds:
+            num_levels = 0
+            if axis_name is not None and axis_name in ds.dimensions:
+                num_levels = len(ds.dimensions[axis_name])
+
+            if var not in ds.variables:
+                return None, num_levels, 0
+
+            ncvar = ds.variables[var]
+            num_elements = 1
+            grid_size = 1
+            for dim, size in zip(ncvar.dimensions, ncvar.shape, strict=True):
+                num_elements *= size
+
+                if (
+                    dim not in ("time", axis_name)
+                    and not ds.dimensions[dim].isunlimited()
+                ):
+                    grid_size *= size
+
+            var_bytes = num_elements * ncvar.dtype.itemsize * len(filepaths)
+
+            return var_bytes, num_levels, grid_size
+    except (OSError, AttributeError) as e:
+        logger.debug(f"Unable to read the header of '{filepaths[0]}': {e}")
+
+    return None, 0, 0
+
+
+def _reset_peak_rss() -> bool:
+    """Resets the peak RSS of the current process (Linux only).
+
+    Returns
+    -------
+    bool
+        True if the peak RSS was reset, otherwise False.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as outfile:
+            outfile.write("5")
+    except OSError:
+        return False
+
+    return True
+
+
+def _get_rss() -> int | None:
+    """Gets the current RSS of the current process in bytes (Linux only).
+
+    Returns
+    -------
+    int | None
+        The current RSS, or None if it is not available.
+    """
+    return _read_proc_status("VmRSS")
+
+
+def _get_peak_rss() -> int | None:
+    """Gets the peak RSS of the current process in bytes.
+
+    Returns
+    -------
+    int | None
+        The peak RSS, or None if it is not available.
+    """
+    peak = _read_proc_status("VmHWM")
+    if peak is not None:
+        return peak
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ``ru_maxrss`` is in bytes on macOS and in kilobytes elsewhere.
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _read_proc_status(field: str) -> int | None:
+    """Reads a memory field (in kB) from ``/proc/self/status`` in bytes.
+
+    Parameters
+    ----------
+    field : str
+        The name of the field (e.g., "VmRSS").
+
+    Returns
+    -------
+    int | None
+        The value in bytes, or None if it is not available.
+    """
+    try:
+        with open("/proc/self/status", "r") as infile:
+            for line in infile:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    return None
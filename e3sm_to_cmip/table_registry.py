@@ -0,0 +1,339 @@
+"""
+This module provides the CMOR table registry, a compact index of the variables
+of the CMOR tables in a tables directory.
+
+The registry maps each table to its variables, with the dimensions, frequency,
+time dimension and type of each variable, so that deriving handlers, the info mode
+and CMORizing don't parse the large table JSON files (e.g., "CMIP6_Amon.json")
+for every handler. The registry of a tables directory is cached under
+``$XDG_CACHE_HOME`` (or ``~/.cache``) and is rebuilt whenever a table in the
+directory is added, removed or modified. The worker processes load the cached
+registry built by the main process instead of parsing the tables again.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any
+
+from e3sm_to_cmip._logger import _setup_child_logger
+
+logger = _setup_child_logger(__name__)
+
+# The directory of the cached table registries, which stores one registry per
+# tables directory.
+TABLE_REGISTRY_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "e3sm_to_cmip",
+    "table_registry",
+)
+
+# The version of the cached registry format. Bump this when the structure of
+# the registry changes so that stale cached registries are rebuilt.
+TABLE_REGISTRY_VERSION = 2
+
+# A list of valid time dimension names, which is used to check if
+# a output CMIP variable has a time dimension based on the CMOR table. If the
+# CMIP variable does have a time dimension, subsequent CMOR operations are
+# handled appropriately.
+TIME_DIMS = ["time", "time1", "time2"]
+
+
+class TableRegistry:
+    """An index of the variables of the CMOR tables in a tables directory.
+
+    Parameters
+    ----------
+    tables_path : str
+        The path to the tables directory.
+    tables : dict[str, dict[str, dict[str, Any]]]
+        A dictionary mapping the filename of each table (e.g.,
+        "CMIP6_Amon.json") to its variables, which map to their
+        "dimensions", "frequency", "time_dim" and "type".
+    """
+
+    def __init__(self, tables_path: str, tables: dict[str, dict[str, dict[str, Any]]]):
+        self.tables_path = tables_path
+        self.tables = tables
+
+    @classmethod
+    def build(cls, tables_path: str) -> "TableRegistry":
+        """Builds the registry by parsing each table in the tables directory.
+
+        Files that are not valid JSON or have no "variable_entry" (e.g.,
+        "CMIP6_CV.json") are not indexed.
+
+        Parameters
+        ----------
+        tables_path : str
+            The path to the tables directory.
+
+        Returns
+        -------
+        TableRegistry
+            The registry.
+        """
+        tables: dict[str, dict[str, dict[str, Any]]] = {}
+
+        for table_path in sorted(glob.glob(os.path.join(tables_path, "*.json"))):
+            try:
+                with open(table_path, "r") as infile:
+                    variable_entry = json.load(infile)["variable_entry"]
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+
+            tables[os.path.basename(table_path)] = {
+                var: _get_variable_index(entry) for var, entry in variable_entry.items()
+            }
+
+        return cls(tables_path, tables)
+
+    @classmethod
+    def load_or_build(
+        cls, tables_path: str, cache_dir: str | None = None
+    ) -> "TableRegistry":
+        """Loads the cached registry, or builds it if it is stale.
+
+        Parameters
+        ----------
+        tables_path : str
+            The path to the tables directory.
+        cache_dir : str | None, optional
+            The directory of the cached registries, by default
+            ``TABLE_REGISTRY_CACHE_DIR``.
+
+        Returns
+        -------
+        TableRegistry
+            The registry.
+        """
+        cache_path = _get_cache_path(tables_path, cache_dir)
+        fingerprint = _get_fingerprint(tables_path)
+
+        try:
+            with open(cache_path, "r") as infile:
+                contents = json.load(infile)
+
+            if (
+                contents["version"] == TABLE_REGISTRY_VERSION
+                and contents["fingerprint"] == fingerprint
+            ):
+                return cls(tables_path, contents["tables"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        registry = cls.build(tables_path)
+        registry.save(cache_path, fingerprint)
+
+        return registry
+
+    def save(self, cache_path: str, fingerprint: dict[str, list[int]]) -> bool:
+        """Saves the registry atomically.
+
+        Parameters
+        ----------
+        cache_path : str
+            The path to the cached registry.
+        fingerprint : dict[str, list[int]]
+            The modification times and sizes of the tables.
+
+        Returns
+        -------
+        bool
+            True if the registry was saved, otherwise False.
+        """
+        contents = {
+            "version": TABLE_REGISTRY_VERSION,
+            "tables_path": os.path.abspath(self.tables_path),
+            "fingerprint": fingerprint,
+            "tables": self.tables,
+        }
+        dirname = os.path.dirname(cache_path)
+
+        try:
+            os.makedirs(dirname, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+            with os.fdopen(fd, "w") as outfile:
+                json.dump(contents, outfile)
+
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.debug(f"Unable to save the table registry to '{cache_path}': {e}")
+
+            return False
+
+        return True
+
+    def get_variables(self, table: str) -> dict[str, dict[str, Any]]:
+        """Gets the variables of a table.
+
+        Parameters
+        ----------
+        table : str
+            The filename of the table (e.g., "CMIP6_Amon.json").
+
+        Returns
+        -------
+        dict[str, dict[str, Any]]
+            A dictionary mapping the variables of the table to their
+            "dimensions", "frequency", "time_dim" and "type".
+
+        Raises
+        ------
+        ValueError
+            If the table does not exist in the tables directory.
+        """
+        if table not in self.tables:
+            raise ValueError(
+                f"CMIP6 table doesnt exist: {os.path.join(self.tables_path, table)}"
+            )
+
+        return self.tables[table]
+
+    def get_time_dim(self, table: str, var: str) -> str | None:
+        """Gets the time dimension of a variable in a table.
+
+        Parameters
+        ----------
+        table : str
+            The filename of the table (e.g., "CMIP6_Amon.json").
+        var : str
+            The CMIP variable.
+
+        Returns
+        -------
+        str | None
+            The name of the time dimension (e.g., "time1"), or None if the
+            variable has no time dimension.
+
+        Raises
+        ------
+        ValueError
+            If the table does not exist in the tables directory.
+        KeyError
+            If the variable is not included in the table.
+        """
+        return self.get_variables(table)[var]["time_dim"]
+
+    def get_type(self, table: str, var: str) -> str | None:
+        """Gets the type of a variable in a table.
+
+        Parameters
+        ----------
+        table : str
+            The filename of the table (e.g., "CMIP6_Amon.json").
+        var : str
+            The CMIP variable.
+
+        Returns
+        -------
+        str | None
+            The type of the variable (e.g., "real"), or None if the table does
+            not define it.
+
+        Raises
+        ------
+        ValueError
+            If the table does not exist in the tables directory.
+        KeyError
+            If the variable is not included in the table.
+        """
+        return self.get_variables(table)[var]["type"]
+
+
+# The registries loaded by this process, keyed by the path to their tables
+# directory. The tables are not expected to change during a run, so they are
+# only checked for changes when a registry is first loaded.
+_registries: dict[str, TableRegistry] = {}
+
+
+def get_table_registry(tables_path: str) -> TableRegistry:
+    """Gets the table registry of a tables directory, loading it on first use.
+
+    Parameters
+    ----------
+    tables_path : str
+        The path to the tables directory.
+
+    Returns
+    -------
+    TableRegistry
+        The registry.
+    """
+    key = os.path.abspath(tables_path)
+
+    if key not in _registries:
+        _registries[key] = TableRegistry.load_or_build(tables_path)
+
+    return _registries[key]
+
+
+def _get_variable_index(entry: dict[str, Any]) -> dict[str, Any]:
+    """Gets the index of a variable from its entry in a table.
+
+    Parameters
+    ----------
+    entry : dict[str, Any]
+        The entry of the variable in the "variable_entry" of the table.
+
+    Returns
+    -------
+    dict[str, Any]
+        The "dimensions", "frequency", "time_dim" and "type" of the variable.
+    """
+    dimensions = entry.get("dimensions", "").split()
+    time_dim = next((dim for dim in TIME_DIMS if dim in dimensions), None)
+
+    return {
+        "dimensions": dimensions,
+        "frequency": entry.get("frequency"),
+        "time_dim": time_dim,
+        "type": entry.get("type"),
+    }
+
+
+def _get_cache_path(tables_path: str, cache_dir: str | None = None) -> str:
+    """Gets the path to the cached registry of a tables directory.
+
+    Parameters
+    ----------
+    tables_path : str
+        The path to the tables directory.
+    cache_dir : str | None, optional
+        The directory of the cached registries, by default
+        ``TABLE_REGISTRY_CACHE_DIR``.
+
+    Returns
+    -------
+    str
+        The path, which is named after a hash of the absolute path to the
+        tables directory.
+    """
+    digest = hashlib.sha1(os.path.abspath(tables_path).encode()).hexdigest()[:16]
+
+    return os.path.join(cache_dir or TABLE_REGISTRY_CACHE_DIR, f"{digest}.json")
+
+
+def _get_fingerprint(tables_path: str) -> dict[str, list[int]]:
+    """Gets the modification times and sizes of the tables in a directory.
+
+    Parameters
+    ----------
+    tables_path : str
+        The path to the tables directory.
+
+    Returns
+    -------
+    dict[str, list[int]]
+        A dictionary mapping the filename of each table to its modification
+        time in nanoseconds and its size in bytes.
+    """
+    fingerprint = {}
+
+    for table_path in sorted(glob.glob(os.path.join(tables_path, "*.json"))):
+        stat = os.stat(table_path)
+        fingerprint[os.path.basename(table_path)] = [stat.st_mtime_ns, stat.st_size]
+
+    return fingerprint
@@ -0,0 +1,241 @@
+"""
+This module provides phase-level telemetry of handler runs (``--telemetry``).
+
+The phases of a handler (e.g., opening the input files, evaluating the formula
+and writing with CMOR) are measured with ``span()``, which records the
+wall-clock time of the phase with the bytes it read and wrote and the shapes
+of its arrays. The spans of a handler are collected in the worker process by
+``scheduler.run_measured()`` and returned to the parent process with the
+handler's result, which writes them as JSON lines to the telemetry file in the
+output directory and aggregates them into a run-level report.
+
+Spans are only recorded while a handler run is collecting them, so the
+handlers can be called outside of e3sm_to_cmip (e.g., in tests) without
+accumulating spans.
+"""
+
+import json
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+# The number of bytes per megabyte, for throughputs in MB/s.
+BYTES_PER_MB = 1e6
+
+# The spans recorded in this process since ``start_collecting()``, or None if
+# spans are not being collected.
+_spans: list[dict[str, Any]] | None = None
+
+
+@dataclass
+class PhaseSummary:
+    """The aggregated spans of a phase across handler runs."""
+
+    # The name of the phase (e.g., "cmor_write").
+    phase: str
+    # The number of spans of the phase.
+    count: int = 0
+    # The total wall-clock time of the spans in seconds.
+    elapsed: float = 0.0
+    # The total bytes read and written by the spans.
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    @property
+    def throughput(self) -> float | None:
+        """The throughput of the phase in MB/s, or None if it has no bytes."""
+        return get_throughput(max(self.bytes_in, self.bytes_out), self.elapsed)
+
+
+def start_collecting():
+    """Starts collecting the spans recorded in this process."""
+    global _spans
+
+    _spans = []
+
+
+def stop_collecting() -> list[dict[str, Any]]:
+    """Stops collecting spans and returns the spans that were recorded.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The spans recorded since ``start_collecting()``.
+    """
+    global _spans
+
+    spans, _spans = _spans or [], None
+
+    return spans
+
+
+@contextmanager
+def span(phase: str, handler: str | None = None) -> Iterator[dict[str, Any]]:
+    """Measures a phase of a handler.
+
+    The span is a dictionary that the caller can update with the bytes read
+    (``"bytes_in"``) and written (``"bytes_out"``) by the phase and the shapes
+    of its arrays (``"shapes"``). Its wall-clock time and throughput are set
+    when the phase exits, including if it raises an exception.
+
+    Parameters
+    ----------
+    phase : str
+        The name of the phase (e.g., "get_mfdataset").
+    handler : str | None, optional
+        The name of the handler, by default None if the phase is not specific
+        to one handler (e.g., the MPAS utilities).
+
+    Yields
+    ------
+    Iterator[dict[str, Any]]
+        The span.
+    """
+    record: dict[str, Any] = {
+        "phase": phase,
+        "handler": handler,
+        "bytes_in": 0,
+        "bytes_out": 0,
+        "shapes": {},
+    }
+
+    start_time = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["elapsed"] = time.perf_counter() - start_time
+        record["mb_per_s"] = get_throughput(
+            max(record["bytes_in"], record["bytes_out"]), record["elapsed"]
+        )
+
+        if _spans is not None:
+            _spans.append(record)
+
+
+def get_nbytes(obj: Any) -> int:
+    """Gets the size of an array or dataset in bytes.
+
+    Parameters
+    ----------
+    obj : Any
+        The ``np.ndarray``, ``xr.DataArray`` or ``xr.Dataset``.
+
+    Returns
+    -------
+    int
+        The size of the object's data in memory (uncompressed), or 0 if it has
+        no size.
+    """
+    return int(getattr(obj, "nbytes", 0))
+
+
+def get_shapes(ds: Any, names: Iterable[str]) -> dict[str, list[int]]:
+    """Gets the shapes of the variables of a dataset.
+
+    Parameters
+    ----------
+    ds : Any
+        The ``xr.Dataset``.
+    names : Iterable[str]
+        The names of the variables, which are skipped if not in the dataset.
+
+    Returns
+    -------
+    dict[str, list[int]]
+        A dictionary mapping the variable names to their shapes.
+    """
+    return {name: list(ds[name].shape) for name in names if name in ds}
+
+
+def get_throughput(nbytes: int, elapsed: float) -> float | None:
+    """Gets the throughput of a phase in MB/s.
+
+    Parameters
+    ----------
+    nbytes : int
+        The bytes processed by the phase.
+    elapsed : float
+        The wall-clock time of the phase in seconds.
+
+    Returns
+    -------
+    float | None
+        The throughput in MB/s, or None if no bytes were processed or no time
+        was measured.
+    """
+    if nbytes <= 0 or elapsed <= 0:
+        return None
+
+    return nbytes / BYTES_PER_MB / elapsed
+
+
+def summarize_spans(spans: Iterable[dict[str, Any]]) -> dict[str, PhaseSummary]:
+    """Aggregates spans by phase.
+
+    Parameters
+    ----------
+    spans : Iterable[dict[str, Any]]
+        The spans.
+
+    Returns
+    -------
+    dict[str, PhaseSummary]
+        A dictionary mapping the phases to their summaries, in the order the
+        phases were first recorded.
+    """
+    summaries: dict[str, PhaseSummary] = {}
+
+    for record in spans:
+        summary = summaries.setdefault(record["phase"], PhaseSummary(record["phase"]))
+        summary.count += 1
+        summary.elapsed += record.get("elapsed", 0.0)
+        summary.bytes_in += record.get("bytes_in", 0)
+        summary.bytes_out += record.get("bytes_out", 0)
+
+    return summaries
+
+
+def write_spans(path: str, spans: Iterable[dict[str, Any]]):
+    """Appends spans to a telemetry file as JSON lines.
+
+    Parameters
+    ----------
+    path : str
+        The path to the telemetry file.
+    spans : Iterable[dict[str, Any]]
+        The spans.
+    """
+    lines = "".join(f"{json.dumps(record)}\n" for record in spans)
+    if not lines:
+        return
+
+    with open(path, "a") as outfile:
+        outfile.write(lines)
+
+
+def read_spans(path: str) -> list[dict[str, Any]]:
+    """Reads the spans of a telemetry file.
+
+    Parameters
+    ----------
+    path : str
+        The path to the telemetry file.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        The spans, skipping lines that are not valid JSON (e.g., a line
+        truncated by a crash).
+    """
+    spans = []
+
+    with open(path, "r") as infile:
+        for line in infile:
+            try:
+                spans.append(json.loads(line))
+            except ValueError:
+                continue
+
+    return spans
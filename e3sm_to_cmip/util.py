@@ -5,12 +5,12 @@ import sys
 from pathlib import Path
 from pprint import pprint
 
-import cmor
-import xarray as xr
 import yaml
-from tqdm import tqdm
 
 from e3sm_to_cmip._logger import _setup_child_logger
+from e3sm_to_cmip.catalog import InputCatalog
+from e3sm_to_cmip.output_index import OutputIndex
+from e3sm_to_cmip.table_registry import get_table_registry
 
 logger = _setup_child_logger(__name__)
 
@@ -148,6 +148,8 @@ def setup_cmor(var_name, table_path, table_name, user_input_path, cmor_log_dir):
     under ``e3sm_to_cmip/cmor_handlers/mpas_vars`` and legacy handlers
     defined under ``e3sm_to_cmip/cmor_handlers/vars``.
     """
+    import cmor
+
     logfile = os.path.join(cmor_log_dir, var_name + ".log")
     cmor.setup(inpath=table_path, netcdf_file_action=cmor.CMOR_REPLACE, logfile=logfile)
 
@@ -182,8 +184,8 @@ def print_var_info(  # noqa: C901
     # but didnt ask about the files in the inpath
     elif freq and tables and not inpath:
         for handler in handlers:
-            table_info = _get_table_info(tables, handler["table"])
-            if handler["name"] not in table_info["variable_entry"]:
+            table_vars = get_table_registry(tables).get_variables(handler["table"])
+            if handler["name"] not in table_vars:
                 msg = f"Variable {handler['name']} is not included in the table {handler['table']}"  # type: ignore
                 print_message(msg, status="error")
                 continue
@@ -201,12 +203,14 @@ def print_var_info(  # noqa: C901
                 messages.append(msg)
 
     elif freq and tables and inpath:
+        import xarray as xr
+
         file_path = next(Path(inpath).glob("*.nc"))
 
         with xr.open_dataset(file_path) as ds:
             for handler in handlers:
-                table_info = _get_table_info(tables, handler["table"])
-                if handler["name"] not in table_info["variable_entry"]:
+                table_vars = get_table_registry(tables).get_variables(handler["table"])
+                if handler["name"] not in table_vars:
                     continue
 
                 msg = None
@@ -301,8 +305,8 @@ def _get_table_for_non_monthly_freq(
     table = table_path.name
 
     # Check that the variable is included in the table.
-    table_data = _get_table_info(tables_path, table_for_freq)
-    if var not in table_data["variable_entry"].keys():
+    table_vars = get_table_registry(tables_path).get_variables(table_for_freq)
+    if var not in table_vars:
         raise KeyError(f"Variable '{var}' is not included in table `{table}`.")
 
     # Check if the table is supported by the realm.
@@ -416,6 +420,9 @@ def add_metadata(file_path, var_list, metadata_path):
                 f"custom metadata file {metadata_path} is not a json or yaml document"
             )
 
+    import xarray as xr
+    from tqdm import tqdm
+
     for filepath in tqdm(
         filter_variables(file_path, var_list),
         desc="Adding additional metadata to output files",
@@ -450,102 +457,20 @@ def find_atm_files(var, path):
 # ------------------------------------------------------------------
 
 
-def find_mpas_files(component, path, map_path=None):  # noqa: C901
+def find_mpas_files(component, path, map_path=None):
     """
     Looks in the path given for MPAS monthly-averaged files
 
+    NOTE: This function lists the directory on every call. Use
+    ``InputCatalog.load_or_build()`` to look up the files for many components
+    in the same directory.
+
     Params:
     -------
         component (str): Either the mpaso or mpassi component name or variable name
         path (str): The path of the directory to search for files in
     """
-    # save original in case it's an atm var
-    var = str(component)
-    component = component.lower()
-    contents = os.listdir(path)
-
-    logger.info(f"find_mpas_files: component = {component}, path = {path}")
-
-    if component == "mpaso":
-        pattern = r".*mpaso.hist.am.timeSeriesStatsMonthly.\d{4}-\d{2}-\d{2}.nc"
-        results = [
-            os.path.join(path, x)
-            for x in contents
-            if re.match(pattern=pattern, string=x)
-        ]
-        if results:
-            logger.info(f"results found: {len(results)} items")
-            return sorted(results)
-        raise IOError("Unable to find mpaso in the input directory")
-
-    if component == "mpassi":
-        patterns = [
-            r".*mpassi.hist.am.timeSeriesStatsMonthly.\d{4}-\d{2}-\d{2}.nc",
-            r".*mpascice.hist.am.timeSeriesStatsMonthly.\d{4}-\d{2}-\d{2}.nc",
-        ]
-        for pattern in patterns:
-            results = [
-                os.path.join(path, x)
-                for x in contents
-                if re.match(pattern=pattern, string=x)
-            ]
-            if results:
-                logger.info(f"results found: {len(results)} items")
-                return sorted(results)
-        raise IOError("Unable to find mpassi in the input directory")
-
-    elif component == "mpaso_namelist":
-        patterns = ["mpaso_in", "mpas-o_in"]
-        for pattern in patterns:
-            for infile in contents:
-                if re.match(pattern, infile):
-                    return os.path.abspath(os.path.join(path, infile))
-        raise IOError("Unable to find MPASO_namelist in the input directory")
-
-    elif component == "mpassi_namelist":
-        patterns = ["mpassi_in", "mpas-cice_in"]
-        for pattern in patterns:
-            for infile in contents:
-                if re.match(pattern, infile):
-                    return os.path.abspath(os.path.join(path, infile))
-        raise IOError("Unable to find MPASSI_namelist in the input directory")
-
-    elif component == "mpas_mesh":
-        pattern = r".*mpaso.rst.\d{4}-\d{2}-\d{2}_\d{5}.nc"
-        for infile in contents:
-            if re.match(pattern, infile):
-                logger.info(f"component mpas_mesh found: {infile}")
-                return os.path.abspath(os.path.join(path, infile))
-        raise IOError("Unable to find mpas_mesh in the input directory")
-
-    elif component == "mpas_map":
-        if not map_path:
-            raise ValueError("No map path given")
-        map_path = os.path.abspath(map_path)
-        if os.path.exists(map_path):
-            logger.info(f"component mpas_map found: {map_path}")
-            return map_path
-        else:
-            raise IOError("Unable to find mpas_map in the input directory")
-
-    elif component == "mpaso_moc_regions":
-        pattern_v1 = "_region_"
-        pattern_v2 = "mocBasinsAndTransects"
-        for infile in contents:
-            if pattern_v1 in infile or pattern_v2 in infile:
-                logger.info(f"component mpas0_moc_regions found: {infile}")
-                return os.path.abspath(os.path.join(path, infile))
-        raise IOError("Unable to find mpaso_moc_regions in the input directory")
-
-    else:
-        files = [x for x in find_atm_files(var, path)]
-        if len(files) > 0:
-            files = [os.path.join(path, name) for name in files]
-            return files
-        else:
-            raise ValueError(
-                f"Unrecognized component {component}, unable to find input files"
-            )
+    return InputCatalog.build(path).get_mpas_files(component, map_path)
 
 
 def get_years_from_raw(path, realm, var):
@@ -600,34 +525,36 @@ def precheck(inpath, precheck_path, variables, realm):
     """
     Check if the data has already been produced and skip
 
+    The output tree is indexed once (see ``OutputIndex``), so each variable
+    is checked with a lookup. Variables whose year range is only partially
+    covered by existing files are logged and are not skipped.
+
     returns a list of variable names that were not found in the output directory with matching years
     """
 
     # First check the inpath for the start and end years
     start, end = get_years_from_raw(inpath, realm, variables[0])
-    var_map = [{"found": False, "name": var} for var in variables]
 
     logger.info(f"precheck: working on year-range {start} to {end}")
 
     # then check the output tree for files with the correct variables for those years
-    for val in var_map:
-        logger.info(f"precheck: testing for var {val} in path {precheck_path}")
-        for _, _, files in os.walk(precheck_path, topdown=False):
-            if files:
-                # Seek files named <var>_<anything>
-                prefix = val["name"] + "_"
-                if files[0][: len(prefix)] != prefix:
-                    # this directory doesnt have the variable we're looking for
-                    continue
+    index = OutputIndex.load_or_build(precheck_path)
+    missing = []
+
+    for var in variables:
+        files = index.find(var, start, end)
+        if files:
+            logger.info(f"found file: {files[0]}")
+            continue
+
+        coverage = index.get_coverage(var, start, end)
+        if coverage:
+            ranges = ", ".join(f"{r_start}-{r_end}" for r_start, r_end in coverage)
+            logger.info(
+                f"precheck: {var} is partially covered for years {ranges} of "
+                f"{start}-{end}"
+            )
 
-                files = [x for x in sorted(files) if x.endswith(".nc")]
-                for f in files:
-                    cmip_start, cmip_end = get_year_from_cmip(f)
-                    if cmip_start == start and cmip_end == end:
-                        logger.info(f"found file: {f}")
-                        val["found"] = True
-                        break
-                if val["found"] is True:
-                    break
+        missing.append(var)
 
-    return [x["name"] for x in var_map if not x["found"]]
+    return missing
@@ -0,0 +1,366 @@
+"""
+This module provides the work queue shared by the e3sm_to_cmip processes that
+cooperate on one run (``--distributed``), e.g., one process per node of a
+batch job.
+
+The queue has no central service. Every process builds the same list of units
+of work (a handler or a time segment of a handler) and claims a unit before it
+runs it by exclusively creating a claim file in the output directory. Once the
+unit is run, the claim is replaced by a completion marker with its result, so
+a unit is run by only one process.
+
+A process renews its claims while their units run. A claim that was not
+renewed within the lease (e.g., its node crashed) is stale and can be taken
+over by another process, including a later rerun of the same command.
+"""
+
+import hashlib
+import json
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from e3sm_to_cmip._logger import _setup_child_logger
+
+logger = _setup_child_logger(__name__)
+
+# The directory in the output directory that stores the claims and completion
+# markers of each distributed run.
+CLAIMS_DIRNAME = ".e3sm_to_cmip_claims"
+
+# The number of seconds after which a claim that was not renewed is stale, and
+# the number of seconds between renewals of the claims held by a process.
+CLAIM_LEASE = 600
+CLAIM_RENEW_INTERVAL = 60
+
+
+class WorkQueue:
+    """A queue of units of work shared by processes through the filesystem.
+
+    Parameters
+    ----------
+    output_path : str
+        The path to the output directory, which must be on a filesystem shared
+        by the processes.
+    run_id : str
+        The ID of the distributed run. Processes with the same run ID and
+        output directory cooperate on the same units of work.
+    lease : float, optional
+        The number of seconds after which a claim that was not renewed is
+        stale, by default ``CLAIM_LEASE``.
+    """
+
+    def __init__(self, output_path: str, run_id: str, lease: float = CLAIM_LEASE):
+        self.path = os.path.join(output_path, CLAIMS_DIRNAME, _sanitize(run_id))
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        os.makedirs(self.path, exist_ok=True)
+
+        # The claim paths of the units of work held by this process.
+        self._claims: set[str] = set()
+        self._lock = threading.Lock()
+        self._renewer: threading.Thread | None = None
+
+    @staticmethod
+    def get_unit_key(name: str, table: str | None, inputs: list[str]) -> str:
+        """Gets the key of a unit of work.
+
+        Parameters
+        ----------
+        name : str
+            The name of the job.
+        table : str | None
+            The CMIP table of the job.
+        inputs : list[str]
+            The input filepaths of the job.
+
+        Returns
+        -------
+        str
+            The key, which is the sanitized job name followed by a digest of
+            the job name, table and input filenames.
+        """
+        filenames = sorted(os.path.basename(filepath) for filepath in inputs)
+        digest = hashlib.sha256(
+            "|".join([name, table or "", *filenames]).encode()
+        ).hexdigest()
+
+        return f"{_sanitize(name)}-{digest[:16]}"
+
+    def claim(self, key: str) -> bool:
+        """Claims a unit of work.
+
+        Parameters
+        ----------
+        key : str
+            The key of the unit of work.
+
+        Returns
+        -------
+        bool
+            True if the unit was claimed by this process, False if it was
+            completed or is claimed by another process.
+        """
+        if os.path.exists(self._get_done_path(key)):
+            return False
+
+        claim_path = self._get_claim_path(key)
+
+        # The unit is already claimed by this process (e.g., it is retried).
+        if claim_path in self._claims:
+            return True
+
+        if not self._create_claim(claim_path):
+            if not self._take_over_stale_claim(key, claim_path):
+                return False
+
+        # The unit may have been completed by another process between the
+        # check and the claim.
+        if os.path.exists(self._get_done_path(key)):
+            self.release(key)
+
+            return False
+
+        return True
+
+    def complete(self, key: str, result: Any):
+        """Marks a unit of work claimed by this process as completed.
+
+        Parameters
+        ----------
+        key : str
+            The key of the unit of work.
+        result : Any
+            The JSON-serializable result of the unit.
+        """
+        marker = {
+            "owner": self.owner,
+            "result": result,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w") as outfile:
+            json.dump(marker, outfile)
+
+        os.replace(tmp_path, self._get_done_path(key))
+
+        self.release(key)
+
+    def release(self, key: str):
+        """Releases the claim of a unit of work held by this process.
+
+        Parameters
+        ----------
+        key : str
+            The key of the unit of work.
+        """
+        claim_path = self._get_claim_path(key)
+
+        with self._lock:
+            self._claims.discard(claim_path)
+
+        try:
+            os.remove(claim_path)
+        except FileNotFoundError:
+            pass
+
+    def get_completed(self) -> dict[str, dict[str, Any]]:
+        """Gets the completion markers of the units of work of the run.
+
+        Returns
+        -------
+        dict[str, dict[str, Any]]
+            A dictionary mapping the keys of the completed units to their
+            markers, which include the owner and result.
+        """
+        completed = {}
+
+        for filename in os.listdir(self.path):
+            if not filename.endswith(".done"):
+                continue
+
+            try:
+                with open(os.path.join(self.path, filename), "r") as infile:
+                    completed[filename.removesuffix(".done")] = json.load(infile)
+            except (OSError, ValueError):
+                continue
+
+        return completed
+
+    def _create_claim(self, claim_path: str) -> bool:
+        """Exclusively creates a claim file.
+
+        Parameters
+        ----------
+        claim_path : str
+            The path to the claim file.
+
+        Returns
+        -------
+        bool
+            True if the claim file was created, False if it already exists.
+        """
+        try:
+            fd = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+
+        with os.fdopen(fd, "w") as outfile:
+            json.dump({"owner": self.owner, "timestamp": time.time()}, outfile)
+
+        with self._lock:
+            self._claims.add(claim_path)
+
+        self._start_renewer()
+
+        return True
+
+    def _take_over_stale_claim(self, key: str, claim_path: str) -> bool:
+        """Takes over the claim of a unit of work if it is stale.
+
+        Parameters
+        ----------
+        key : str
+            The key of the unit of work.
+        claim_path : str
+            The path to the claim file.
+
+        Returns
+        -------
+        bool
+            True if the stale claim was taken over by this process.
+        """
+        stale_claim = self._read_stale_claim(claim_path)
+        if stale_claim is None:
+            return False
+
+        # Take over the stale claim. Renaming it is atomic, so only one of the
+        # processes that found it stale takes it over.
+        stale_path = f"{claim_path}.{_sanitize(self.owner)}.stale"
+        try:
+            os.rename(claim_path, stale_path)
+        except FileNotFoundError:
+            return False
+
+        # Another process may have taken over the stale claim and created its
+        # own claim between the check and the rename, in which case the claim
+        # that was renamed is current and is put back.
+        if self._read_stale_claim(stale_path) != stale_claim:
+            self._restore_claim(stale_path, claim_path)
+
+            return False
+
+        os.remove(stale_path)
+        logger.warning(f"Taking over the stale claim of '{key}'.")
+
+        return self._create_claim(claim_path)
+
+    def _read_stale_claim(self, claim_path: str) -> dict[str, Any] | None:
+        """Reads a claim file if it was not renewed within the lease.
+
+        Parameters
+        ----------
+        claim_path : str
+            The path to the claim file.
+
+        Returns
+        -------
+        dict[str, Any] | None
+            The owner and timestamp of the claim with the mtime of the claim
+            file, or None if the claim is current or was removed.
+        """
+        try:
+            mtime = os.path.getmtime(claim_path)
+        except FileNotFoundError:
+            return None
+
+        if time.time() - mtime <= self.lease:
+            return None
+
+        try:
+            with open(claim_path, "r") as infile:
+                contents = json.load(infile)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            contents = {}
+
+        return {**contents, "mtime": mtime}
+
+    def _restore_claim(self, stale_path: str, claim_path: str):
+        """Puts back a claim that was renamed while it was current.
+
+        Parameters
+        ----------
+        stale_path : str
+            The path the claim file was renamed to.
+        claim_path : str
+            The path to the claim file.
+        """
+        try:
+            # Linking fails if the claim was created again in the meantime,
+            # unlike a rename, which would replace it.
+            os.link(stale_path, claim_path)
+        except FileExistsError:
+            pass
+        except OSError:
+            # The filesystem does not support hard links.
+            os.rename(stale_path, claim_path)
+
+            return
+
+        os.remove(stale_path)
+
+    def _start_renewer(self):
+        """Starts the thread that renews the claims held by this process."""
+        if self._renewer is not None:
+            return
+
+        self._renewer = threading.Thread(target=self._renew_claims, daemon=True)
+        self._renewer.start()
+
+    def _renew_claims(self):
+        """Renews the claims held by this process by updating their mtimes."""
+        interval = min(CLAIM_RENEW_INTERVAL, self.lease / 4)
+
+        while True:
+            time.sleep(interval)
+
+            with self._lock:
+                claims = list(self._claims)
+
+            for claim_path in claims:
+                try:
+                    os.utime(claim_path)
+                except FileNotFoundError:
+                    pass
+
+    def _get_claim_path(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.claim")
+
+    def _get_done_path(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.done")
+
+
+def _sanitize(name: str) -> str:
+    """Replaces the characters of a name that are not safe in filenames.
+
+    Parameters
+    ----------
+    name : str
+        The name.
+
+    Returns
+    -------
+    str
+        The name with the characters other than letters, digits, "-", "_" and
+        "." replaced with "_".
+    """
+    return re.sub(r"[^\w.-]", "_", name)
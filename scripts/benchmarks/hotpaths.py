@@ -0,0 +1,642 @@
+"""
+Benchmark the CMORization hot paths on synthetic E3SM-shaped inputs.
+
+The inputs are generated at each requested resolution (refer to
+``synthetic.py``) and each hot path is timed several times:
+
+  * ``formulas/<name>``: each formula in ``_formulas.py`` and each unit
+    conversion, on the raw variables of its handler in ``handlers.yaml``.
+  * ``formulas/<name>[fallback]`` and ``formulas/<name>[compiled]``: the
+    output data of each formula that can be compiled (refer to
+    ``compiler.py``), evaluated with the formula function and ``fillna()``
+    and with the compiled formula. The time and peak memory saved by the
+    compiled formulas are reported once the benchmarks have run.
+  * ``cmorize/<name>``: ``VarHandler.cmorize()`` of a 2D variable ("tas"), a
+    variable on 72 hybrid sigma levels ("cl") and a variable on plev19
+    ("ta"), including reading the input files and writing with CMOR. Requires
+    CMOR and the CMIP6 tables (``--tables-path``).
+  * ``mpas/<name>``: ``interp_vertex_to_cell()``, ``_compute_moc_time_series()``
+    and ``remap()`` on a synthetic MPAS mesh, with a mapping file built
+    locally. ``remap()`` requires ``ncremap`` (NCO).
+
+The median time of each benchmark is reported with its throughput, and the
+results are saved to ``<results-dir>/<label>.json`` (by default the label is
+the current Git commit), so they can be compared between commits with
+``--compare <label>``. The script exits with a non-zero code if a benchmark is
+slower than the baseline by more than the threshold.
+
+Example:
+
+    python scripts/benchmarks/hotpaths.py --sizes tiny low --repeat 3
+    python scripts/benchmarks/hotpaths.py --sizes ne30pg2 \\
+        --tables-path cmip6-cmor-tables/Tables --compare 1a2b3c4d5e6f
+"""
+
+import argparse
+import fnmatch
+import inspect
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+import xarray as xr
+
+import synthetic
+from e3sm_to_cmip import resources
+from e3sm_to_cmip.cmor_handlers import FILL_VALUE, _formulas
+from e3sm_to_cmip.cmor_handlers.compiler import compile_formula
+from e3sm_to_cmip.cmor_handlers.registry import get_registry
+from e3sm_to_cmip.runner import _read_git_head
+
+# The unit conversions of the handlers, which are benchmarked on a 2D field.
+UNIT_CONVERSIONS = ["g-to-kg", "1-to-%", "m/s-to-kg/ms", "-1"]
+
+# The handlers benchmarked with ``VarHandler.cmorize()``: a 2D variable, a
+# variable on hybrid sigma levels and a variable on plev19.
+CMORIZE_HANDLERS = ["tas", "cl", "ta"]
+
+# The table of the handlers benchmarked with ``VarHandler.cmorize()``.
+CMORIZE_TABLE = "CMIP6_Amon.json"
+
+# The default directory of the saved results.
+RESULTS_DIR = ".benchmarks"
+
+
+@dataclass
+class Case:
+    """A benchmark case, whose function is timed after its inputs are set up."""
+
+    # The name of the benchmark (e.g., "formulas/pr").
+    name: str
+    # The function to time.
+    func: Callable[[], Any]
+    # The bytes of the inputs of the function, for the throughput.
+    nbytes: int
+    # Whether to trace the peak memory allocated by the function.
+    trace_memory: bool = False
+
+
+@dataclass
+class Result:
+    """The timings of a benchmark case at a resolution."""
+
+    name: str
+    resolution: str
+    repeat: int
+    median: float
+    min: float
+    nbytes: int
+    # The peak memory allocated by a run in bytes, if it is traced.
+    peak: int = 0
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.resolution}"
+
+    @property
+    def throughput(self) -> float:
+        """The throughput of the median run in MB/s."""
+        return self.nbytes / 1e6 / self.median if self.median > 0 else 0.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[1],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        default=["tiny"],
+        help=(
+            f"Resolutions of the synthetic inputs: {list(synthetic.RESOLUTIONS)} "
+            "or '<nlat>x<nlon>'. Default is tiny."
+        ),
+    )
+    parser.add_argument(
+        "--ntime", type=int, default=12, help="Number of months of the inputs."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Number of runs per benchmark."
+    )
+    parser.add_argument(
+        "-k",
+        "--select",
+        nargs="+",
+        default=["*"],
+        help="Glob patterns of the benchmarks to run (e.g., 'formulas/*').",
+    )
+    parser.add_argument(
+        "--tables-path",
+        default=None,
+        help="Path to the CMIP6 tables, required for the cmorize benchmarks.",
+    )
+    parser.add_argument(
+        "--results-dir",
+        default=RESULTS_DIR,
+        help=f"Directory of the saved results. Default is {RESULTS_DIR}.",
+    )
+    parser.add_argument(
+        "--label",
+        default=None,
+        help="Label of the saved results. Default is the current Git commit.",
+    )
+    parser.add_argument(
+        "--compare",
+        default=None,
+        metavar="<label>",
+        help="Compare with the saved results of a label (or a results file).",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help=(
+            "Exit with code 1 if a benchmark is slower than the baseline by more "
+            "than this ratio. Default is 1.25."
+        ),
+    )
+
+    return parser.parse_args()
+
+
+# ==============================================================================
+# Benchmark cases
+# ==============================================================================
+def get_formula_cases(
+    res: synthetic.Resolution, ntime: int, tmpdir: str, args: argparse.Namespace
+) -> Iterator[Case]:
+    """Gets the cases of the formulas and unit conversions."""
+    registry = get_registry()
+
+    for name, formula in inspect.getmembers(_formulas, inspect.isfunction):
+        if formula.__module__ != _formulas.__name__ or name == "convert_units":
+            continue
+
+        handlers = [h for h in registry.get_handlers(name) or [] if h.get("formula")]
+        if not handlers:
+            continue
+
+        handler = handlers[0]
+        var_handler = handler["method"].__self__
+        time_dim = (handler.get("levels") or {}).get("time_name") or "time"
+        ds = var_handler._prepare_dataset(
+            synthetic.make_handler_dataset(handler, res, ntime), time_dim
+        )
+
+        yield Case(
+            f"formulas/{name}",
+            lambda formula=formula, ds=ds: np.asarray(formula(ds)),
+            _get_nbytes(ds, handler["raw_variables"]),
+        )
+
+        for handler in handlers:
+            compiled = compile_formula(
+                handler["formula"], tuple(handler["raw_variables"])
+            )
+            if compiled is not None:
+                break
+        else:
+            continue
+
+        ds = handler["method"].__self__._prepare_dataset(
+            synthetic.make_handler_dataset(handler, res, ntime), time_dim
+        )
+        nbytes = _get_nbytes(ds, handler["raw_variables"])
+
+        yield Case(
+            f"formulas/{name}[fallback]",
+            lambda formula=formula, ds=ds: formula(ds).fillna(FILL_VALUE).values,
+            nbytes,
+            trace_memory=True,
+        )
+        yield Case(
+            f"formulas/{name}[compiled]",
+            lambda compiled=compiled, ds=ds: compiled.evaluate(ds),
+            nbytes,
+            trace_memory=True,
+        )
+
+    ds = synthetic.make_atm_dataset(["Q"], res, ntime)
+    for unit_conversion in UNIT_CONVERSIONS:
+        yield Case(
+            f"formulas/convert_units[{unit_conversion}]",
+            lambda unit_conversion=unit_conversion: np.asarray(
+                _formulas.convert_units(ds["Q"], unit_conversion)
+            ),
+            ds["Q"].nbytes,
+        )
+
+
+def get_cmorize_cases(
+    res: synthetic.Resolution, ntime: int, tmpdir: str, args: argparse.Namespace
+) -> Iterator[Case]:
+    """Gets the cases of ``VarHandler.cmorize()``."""
+    if args.tables_path is None:
+        print("Skipping cmorize/*: --tables-path is not set.")
+        return
+
+    try:
+        import cmor  # noqa: F401
+    except ImportError:
+        print("Skipping cmorize/*: CMOR is not installed.")
+        return
+
+    output_path = os.path.join(tmpdir, "cmorized")
+    metadata_path = _write_metadata(tmpdir, output_path)
+    registry = get_registry()
+
+    for name in CMORIZE_HANDLERS:
+        handler = next(
+            h for h in registry.get_handlers(name) or [] if h["table"] == CMORIZE_TABLE
+        )
+        var_handler = handler["method"].__self__
+
+        input_path = os.path.join(tmpdir, "input", name)
+        os.makedirs(input_path, exist_ok=True)
+        ds = synthetic.make_handler_dataset(handler, res, ntime)
+        vars_to_filepaths = synthetic.write_time_series(
+            ds, handler["raw_variables"], input_path
+        )
+
+        yield Case(
+            f"cmorize/{name}",
+            lambda var_handler=var_handler, v2f=vars_to_filepaths: _check(
+                var_handler.cmorize(v2f, args.tables_path, metadata_path, tmpdir),
+                f"cmorize/{var_handler.name}",
+            ),
+            sum(
+                os.path.getsize(fp) for fps in vars_to_filepaths.values() for fp in fps
+            ),
+        )
+
+
+def get_mpas_cases(
+    res: synthetic.Resolution, ntime: int, tmpdir: str, args: argparse.Namespace
+) -> Iterator[Case]:
+    """Gets the cases of the MPAS utilities."""
+    from e3sm_to_cmip import mpas
+
+    mesh = synthetic.make_mpas_mesh(res)
+
+    ds_seaice = synthetic.make_mpas_seaice_dataset(mesh, ntime)
+    velocity = ds_seaice.timeMonthly_avg_uVelocityGeo
+    yield Case(
+        "mpas/interp_vertex_to_cell",
+        lambda: mpas.interp_vertex_to_cell(velocity, mesh),
+        velocity.nbytes,
+    )
+
+    # The inputs of the MOC, as computed by compute_moc_streamfunction().
+    ds_ocean = synthetic.make_mpas_ocean_dataset(mesh, ntime).chunk(
+        {"nCells": None, "nVertLevels": None, "Time": 6}
+    )
+    masks = synthetic.make_mpas_masks(mesh)
+    cells_on_edge = mesh.cellsOnEdge - 1
+    normal_velocity = (
+        ds_ocean.timeMonthly_avg_normalVelocity
+        + ds_ocean.timeMonthly_avg_normalGMBolusVelocity
+    )
+    layer_thickness = ds_ocean.timeMonthly_avg_layerThickness
+    layer_thickness_edge = 0.5 * (
+        layer_thickness[:, cells_on_edge[:, 0], :]
+        + layer_thickness[:, cells_on_edge[:, 1], :]
+    )
+    vert_velocity_top = (
+        ds_ocean.timeMonthly_avg_vertVelocityTop
+        + ds_ocean.timeMonthly_avg_vertGMBolusVelocityTop
+    )
+    yield Case(
+        "mpas/compute_moc_time_series",
+        lambda: mpas._compute_moc_time_series(
+            normal_velocity,
+            vert_velocity_top,
+            layer_thickness_edge,
+            mesh,
+            masks,
+            False,
+        ),
+        _get_nbytes(ds_ocean, list(ds_ocean.data_vars)),
+    )
+
+    if shutil.which("ncremap") is None:
+        print("Skipping mpas/remap: ncremap is not installed.")
+        return
+
+    map_path = os.path.join(tmpdir, f"map_mpas_to_{res.nlat}x{res.nlon}.nc")
+    synthetic.write_mpas_map(mesh, res, map_path)
+
+    time_coords = synthetic.make_time(ntime)
+    ds_remap = xr.Dataset(
+        {
+            "tos": (
+                ("time", "nCells"),
+                ds_ocean.timeMonthly_avg_activeTracers_temperature.values,
+            ),
+            **time_coords,
+        }
+    )
+    yield Case(
+        "mpas/remap",
+        lambda: mpas.remap(ds_remap.copy(), "mpasocean", map_path),
+        ds_remap["tos"].nbytes,
+    )
+
+
+# The groups of benchmarks, by the prefix of their names.
+CASE_GROUPS = {
+    "formulas": get_formula_cases,
+    "cmorize": get_cmorize_cases,
+    "mpas": get_mpas_cases,
+}
+
+
+# ==============================================================================
+# Running and comparing
+# ==============================================================================
+def run_benchmarks(args: argparse.Namespace) -> list[Result]:
+    """Runs the selected benchmarks at each resolution.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The command line arguments.
+
+    Returns
+    -------
+    list[Result]
+        The results.
+    """
+    results = []
+
+    for size in args.sizes:
+        res = synthetic.get_resolution(size)
+        print(f"Resolution {res}")
+
+        for group, get_cases in CASE_GROUPS.items():
+            if not _is_group_selected(group, args.select):
+                continue
+
+            with tempfile.TemporaryDirectory() as tmpdir:
+                for case in get_cases(res, args.ntime, tmpdir, args):
+                    if not _is_selected(case.name, args.select):
+                        continue
+
+                    result = time_case(case, res, args.repeat)
+                    results.append(result)
+
+                    print(
+                        f"  {case.name:<45} median {result.median:8.4f}s, "
+                        f"min {result.min:8.4f}s, "
+                        f"{result.throughput:9.1f} MB/s"
+                    )
+
+    return results
+
+
+def time_case(case: Case, res: synthetic.Resolution, repeat: int) -> Result:
+    """Times a benchmark case.
+
+    Parameters
+    ----------
+    case : Case
+        The case.
+    res : synthetic.Resolution
+        The resolution of its inputs.
+    repeat : int
+        The number of runs.
+
+    Returns
+    -------
+    Result
+        The median and minimum wall time of the runs, and the peak memory of
+        an additional run if it is traced.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.func()
+        times.append(time.perf_counter() - start)
+
+    peak = 0
+    if case.trace_memory:
+        # The memory is traced in a separate run, since tracing slows it down.
+        tracemalloc.start()
+        try:
+            case.func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return Result(
+        case.name,
+        res.name,
+        repeat,
+        statistics.median(times),
+        min(times),
+        case.nbytes,
+        peak,
+    )
+
+
+def report_compiled_formulas(results: list[Result]):
+    """Reports the time and peak memory saved by the compiled formulas.
+
+    Parameters
+    ----------
+    results : list[Result]
+        The results, which include the ``formulas/<name>[fallback]`` and
+        ``formulas/<name>[compiled]`` benchmarks.
+    """
+    by_key = {result.key: result for result in results}
+    rows = []
+
+    for result in results:
+        if not result.name.endswith("[compiled]"):
+            continue
+
+        name = result.name.removesuffix("[compiled]")
+        fallback = by_key.get(f"{name}[fallback]@{result.resolution}")
+        if fallback is None or result.median <= 0 or result.peak <= 0:
+            continue
+
+        rows.append(
+            f"  {name + '@' + result.resolution:<45} "
+            f"time {fallback.median:8.4f}s -> {result.median:8.4f}s "
+            f"({fallback.median / result.median:5.2f}x), "
+            f"peak {fallback.peak / 1e6:9.1f} MB -> {result.peak / 1e6:9.1f} MB "
+            f"({fallback.peak / result.peak:5.2f}x)"
+        )
+
+    if rows:
+        print("Compiled formulas (fallback -> compiled):")
+        print("\n".join(rows))
+
+
+def save_results(results: list[Result], args: argparse.Namespace) -> str:
+    """Saves the results to ``<results-dir>/<label>.json``.
+
+    Parameters
+    ----------
+    results : list[Result]
+        The results.
+    args : argparse.Namespace
+        The command line arguments.
+
+    Returns
+    -------
+    str
+        The path to the results file.
+    """
+    git_head = _read_git_head(os.path.dirname(os.path.abspath(__file__)))
+    label = args.label or (git_head[1][:12] if git_head else "unknown")
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(args.results_dir, f"{label}.json")
+
+    with open(path, "w") as outfile:
+        json.dump(
+            {
+                "label": label,
+                "git": {"branch": git_head[0], "commit": git_head[1]}
+                if git_head
+                else None,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "machine": {
+                    "platform": platform.platform(),
+                    "python": platform.python_version(),
+                    "cpu_count": os.cpu_count(),
+                },
+                "settings": {"ntime": args.ntime, "repeat": args.repeat},
+                "results": [asdict(result) for result in results],
+            },
+            outfile,
+            indent=2,
+        )
+
+    return path
+
+
+def compare_results(
+    results: list[Result], baseline_path: str, threshold: float
+) -> list[str]:
+    """Compares the results with a baseline.
+
+    Parameters
+    ----------
+    results : list[Result]
+        The results.
+    baseline_path : str
+        The path to the results file of the baseline.
+    threshold : float
+        The ratio of the median times above which a benchmark is slower.
+
+    Returns
+    -------
+    list[str]
+        The keys of the benchmarks that are slower than the baseline.
+    """
+    with open(baseline_path) as infile:
+        baseline = {
+            f"{r['name']}@{r['resolution']}": Result(**r)
+            for r in json.load(infile)["results"]
+        }
+
+    print(f"Comparison with {baseline_path} (ratio = current / baseline):")
+
+    slower = []
+    for result in results:
+        base = baseline.get(result.key)
+        if base is None or base.median <= 0:
+            continue
+
+        ratio = result.median / base.median
+        flag = ""
+        if ratio > threshold:
+            flag = "  SLOWER"
+            slower.append(result.key)
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+
+        print(
+            f"  {result.key:<55} {base.median:8.4f}s -> {result.median:8.4f}s "
+            f"({ratio:5.2f}x){flag}"
+        )
+
+    return slower
+
+
+def main():
+    args = parse_args()
+
+    baseline_path = None
+    if args.compare is not None:
+        baseline_path = (
+            args.compare
+            if os.path.isfile(args.compare)
+            else os.path.join(args.results_dir, f"{args.compare}.json")
+        )
+        if not os.path.isfile(baseline_path):
+            sys.exit(f"No saved results for '{args.compare}' ({baseline_path}).")
+
+    results = run_benchmarks(args)
+    report_compiled_formulas(results)
+    print(f"Saved the results to {save_results(results, args)}")
+
+    if baseline_path is not None:
+        slower = compare_results(results, baseline_path, args.threshold)
+
+        if slower:
+            print(
+                f"Slower than the baseline by more than {args.threshold:.2f}x: {slower}"
+            )
+            sys.exit(1)
+
+
+def _is_selected(name: str, patterns: list[str]) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def _is_group_selected(group: str, patterns: list[str]) -> bool:
+    # Only set up the inputs of a group if one of its benchmarks may be run.
+    return any(fnmatch.fnmatch(group, pattern.split("/")[0]) for pattern in patterns)
+
+
+def _get_nbytes(ds: xr.Dataset, names: list[str]) -> int:
+    return sum(ds[name].nbytes for name in names if name in ds)
+
+
+def _check(is_successful: bool, name: str):
+    if not is_successful:
+        raise RuntimeError(f"{name} failed, refer to the CMOR logs.")
+
+
+def _write_metadata(tmpdir: str, output_path: str) -> str:
+    """Writes the default CMIP6 metadata with the output path."""
+    with open(
+        os.path.join(os.path.dirname(resources.__file__), "default_metadata.json")
+    ) as infile:
+        metadata = json.load(infile)
+
+    metadata["outpath"] = output_path
+
+    path = os.path.join(tmpdir, "metadata.json")
+    with open(path, "w") as outfile:
+        json.dump(metadata, outfile)
+
+    return path
+
+
+if __name__ == "__main__":
+    main()
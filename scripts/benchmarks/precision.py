@@ -0,0 +1,200 @@
+"""
+Report the accuracy of the float32 output data of the handlers.
+
+The output data of each handler in ``handlers.yaml`` with a formula or a unit
+conversion is evaluated on synthetic E3SM-shaped inputs (refer to
+``synthetic.py``) with the precision policy of "real" variables (refer to
+``precision.py``), and compared with the float64 reference: the raw variables
+cast to float64, the formula or unit conversion, and ``fillna()``.
+
+Each handler is evaluated on inputs stored as float32 (as E3SM writes most
+variables) and on inputs stored as double. The report includes the maximum
+absolute error, the error in float32 ULPs at the largest magnitude of the
+reference (rounding the reference to float32 has an error of up to 0.5 ULP),
+and the bytes of the output data compared with the float64 reference. The
+script exits with a non-zero code if an error exceeds the error budget of the
+precision policy, or if the missing values differ.
+
+Example:
+
+    python scripts/benchmarks/precision.py --size low --ntime 2
+"""
+
+import argparse
+import sys
+from collections.abc import Iterator
+
+import numpy as np
+import xarray as xr
+
+import synthetic
+from e3sm_to_cmip.cmor_handlers import FILL_VALUE, precision
+from e3sm_to_cmip.cmor_handlers.handler import VarHandler
+from e3sm_to_cmip.cmor_handlers.registry import get_registry
+
+# The dtypes the raw variables are stored as in the input files.
+INPUT_DTYPES = ["float32", "float64"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--size",
+        default="tiny",
+        help="The resolution of the inputs (refer to synthetic.RESOLUTIONS).",
+    )
+    parser.add_argument(
+        "--ntime", type=int, default=2, help="The number of months of the inputs."
+    )
+    parser.add_argument(
+        "--handlers",
+        nargs="+",
+        default=None,
+        help="The names of the handlers to report, by default all of them.",
+    )
+
+    return parser.parse_args()
+
+
+def get_handlers(names: list[str] | None) -> Iterator[tuple[dict, VarHandler]]:
+    """Gets the handlers with a formula or a unit conversion.
+
+    Parameters
+    ----------
+    names : list[str] | None
+        The names of the handlers, or None for all of them.
+
+    Yields
+    ------
+    Iterator[tuple[dict, VarHandler]]
+        The handler definitions and their ``VarHandler`` objects.
+    """
+    registry = get_registry()
+
+    for name in names or list(registry.yaml_handlers):
+        for handler in registry.get_handlers(name) or []:
+            var_handler = getattr(handler["method"], "__self__", None)
+
+            if isinstance(var_handler, VarHandler) and (
+                var_handler.formula is not None
+                or var_handler.unit_conversion is not None
+            ):
+                yield handler, var_handler
+
+
+def get_inputs(ds: xr.Dataset, raw_variables: list[str], dtype: str) -> xr.Dataset:
+    """Gets the inputs as if the raw variables were stored as a dtype.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        The dataset with float32 raw variables.
+    raw_variables : list[str]
+        The raw variables.
+    dtype : str
+        The dtype the raw variables are stored as. The variables are decoded
+        as float64, as xarray does for variables with a fill value. The
+        float64 variables are perturbed below the precision of float32, so
+        casting them to float32 is not lossless.
+
+    Returns
+    -------
+    xr.Dataset
+        The dataset.
+    """
+    rng = np.random.default_rng(0)
+    ds = ds.copy()
+
+    for name in raw_variables:
+        if name in ds and ds[name].dtype == np.float32:
+            var = ds[name].astype(np.float64)
+            if dtype == "float64":
+                var = var * (1.0 + rng.uniform(-(2.0**-25), 2.0**-25, var.shape))
+
+            ds[name] = var
+            ds[name].encoding["dtype"] = np.dtype(dtype)
+
+    return ds
+
+
+def compare(
+    var_handler: VarHandler, ds: xr.Dataset
+) -> tuple[float, float, bool, int, int]:
+    """Compares the float32 output data of a handler with the float64 reference.
+
+    Parameters
+    ----------
+    var_handler : VarHandler
+        The handler.
+    ds : xr.Dataset
+        The dataset with the raw variables.
+
+    Returns
+    -------
+    tuple[float, float, bool, int, int]
+        The maximum absolute error, the error in ULPs, whether the missing
+        values are the same, and the bytes of the output data and of the
+        reference.
+    """
+    ds_float64 = ds.copy()
+    for name in var_handler.raw_variables:
+        if name in ds and ds[name].dtype.kind == "f":
+            ds_float64[name] = ds[name].astype(np.float64)
+
+    reference = var_handler._evaluate(ds_float64).fillna(FILL_VALUE).values
+    output = var_handler._get_output_data(ds, np.dtype("float32"))
+
+    missing = reference == FILL_VALUE
+    same_missing = bool(np.array_equal(missing, output == np.float32(FILL_VALUE)))
+
+    result = np.where(missing, np.nan, output.astype(np.float64))
+    reference = np.where(missing, np.nan, reference)
+    finite = np.isfinite(reference)
+    abs_error = float(np.abs(result - reference)[finite].max(initial=0.0))
+
+    return (
+        abs_error,
+        precision.get_ulp_error(result, reference),
+        same_missing,
+        output.nbytes,
+        reference.nbytes,
+    )
+
+
+def main():
+    args = parse_args()
+    res = synthetic.get_resolution(args.size)
+
+    print(
+        f"{'handler':<28} {'inputs':<8} {'max abs error':>14} {'ULPs':>7} "
+        f"{'output bytes':>22}"
+    )
+
+    failures = []
+    for handler, var_handler in get_handlers(args.handlers):
+        time_dim = (handler.get("levels") or {}).get("time_name") or "time"
+        ds = var_handler._prepare_dataset(
+            synthetic.make_handler_dataset(handler, res, args.ntime), time_dim
+        )
+        label = f"{handler['name']}[{handler['table'].removesuffix('.json')}]"
+
+        for dtype in INPUT_DTYPES:
+            abs_error, ulps, same_missing, nbytes, ref_nbytes = compare(
+                var_handler, get_inputs(ds, handler["raw_variables"], dtype)
+            )
+            print(
+                f"{label:<28} {dtype:<8} {abs_error:>14.3e} {ulps:>7.2f} "
+                f"{nbytes:>10,} / {ref_nbytes:>10,}"
+                + ("" if same_missing else "  missing values differ")
+            )
+
+            if ulps > precision.FLOAT32_ERROR_BUDGET or not same_missing:
+                failures.append(f"{label} ({dtype} inputs)")
+
+    if failures:
+        print(f"Over the {precision.FLOAT32_ERROR_BUDGET} ULP budget: {failures}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark the startup time of the e3sm_to_cmip command line.
+
+Each command is run in a fresh Python process several times, and the median
+wall time is reported along with the heavy modules (e.g., cmor, xarray) that
+were imported. The script exits with a non-zero code if a command exceeds the
+time budget.
+
+Example:
+
+    python scripts/benchmarks/startup.py --repeat 10 --budget 1.0
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# The heavy dependencies that should not be imported by the startup path.
+HEAVY_MODULES = ["cmor", "xarray", "xcdat", "dask", "pandas", "netCDF4"]
+
+# The code run in a fresh Python process for each command. It runs the command
+# line with the given arguments, then prints the heavy modules that were
+# actually loaded (lazy modules that were never accessed are not counted).
+RUNNER = """
+import json, sys
+from e3sm_to_cmip.main import main
+
+try:
+    main(json.loads(sys.argv[1]))
+except SystemExit:
+    pass
+
+loaded = [
+    name for name in json.loads(sys.argv[2])
+    if name in sys.modules
+    and type(sys.modules[name]).__name__ != "_LazyModule"
+]
+print(json.dumps(loaded), file=sys.stderr)
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Number of runs per command."
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=1.0,
+        help="Time budget in seconds for the median run of each command.",
+    )
+    parser.add_argument(
+        "--var-list",
+        nargs="+",
+        default=["tas", "pr", "orog", "ta"],
+        help="Variables for the --info command.",
+    )
+
+    return parser.parse_args()
+
+
+def time_command(args: list[str], repeat: int) -> tuple[float, list[str]]:
+    """Times a command line in fresh Python processes.
+
+    Parameters
+    ----------
+    args : list[str]
+        The command line arguments.
+    repeat : int
+        The number of runs.
+
+    Returns
+    -------
+    tuple[float, list[str]]
+        The median wall time in seconds and the heavy modules that were
+        imported.
+    """
+    times = []
+    loaded: list[str] = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", RUNNER, json.dumps(args), json.dumps(HEAVY_MODULES)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        times.append(time.perf_counter() - start)
+
+        loaded = json.loads(result.stderr.strip().splitlines()[-1])
+
+    return statistics.median(times), loaded
+
+
+def main():
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        commands = {
+            "--help": ["--help"],
+            "--version": ["--version"],
+            "--info": [
+                "--info",
+                "-v",
+                *args.var_list,
+                "--realm",
+                "atm",
+                "--output-path",
+                tmpdir,
+                "--info-out",
+                f"{tmpdir}/info.yaml",
+            ],
+        }
+
+        over_budget = []
+        for name, command in commands.items():
+            median, loaded = time_command(command, args.repeat)
+            print(
+                f"{name:<10} median {median:.3f}s over {args.repeat} runs, "
+                f"heavy modules imported: {loaded or 'none'}"
+            )
+
+            if median > args.budget:
+                over_budget.append(name)
+
+    if over_budget:
+        print(f"Over the {args.budget:.2f}s budget: {over_budget}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,698 @@
+"""
+Synthetic E3SM-shaped inputs for the CMORization benchmarks.
+
+The atmosphere and land inputs are time series on a regular lat-lon grid
+(e.g., ne30pg2 output remapped to 180x360) with hybrid sigma levels (72) or
+pressure levels (plev19). The MPAS inputs are a doubly periodic hexagonal mesh
+with its vertices, edges and MOC region masks, and a mapping file from the
+mesh to a lat-lon grid that is built locally, so no input data needs to be
+downloaded.
+
+The values are random, so the inputs are only suitable for measuring
+performance, not for checking the correctness of the output.
+"""
+
+import math
+import os
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import xarray as xr
+
+from e3sm_to_cmip.cmor_handlers import HYBRID_SIGMA_LEVEL_NAMES, _formulas
+
+# The number of days in each month of the "noleap" calendar used by E3SM.
+DAYS_PER_MONTH = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+# The time units of E3SM time series.
+TIME_UNITS = "days since 0001-01-01 00:00:00"
+
+# The first year of the synthetic time series.
+START_YEAR = 1850
+
+# The number of hybrid sigma levels of E3SM v2 and v3 (L72).
+NUM_HYBRID_LEVELS = 72
+
+# The CMIP6 "plev19" pressure levels in Pa.
+PLEV19 = [
+    100000.0,
+    92500.0,
+    85000.0,
+    70000.0,
+    60000.0,
+    50000.0,
+    40000.0,
+    30000.0,
+    25000.0,
+    20000.0,
+    15000.0,
+    10000.0,
+    7000.0,
+    5000.0,
+    3000.0,
+    2000.0,
+    1000.0,
+    500.0,
+    100.0,
+]
+
+# The hybrid sigma coefficients read by the handlers with hybrid sigma levels.
+HYBRID_COEFFICIENTS = {"hyam": "lev", "hybm": "lev", "hyai": "ilev", "hybi": "ilev"}
+
+# The E3SM land variables with soil levels ("levgrnd").
+LEVGRND_VARS = ["SOILICE", "SOILLIQ"]
+
+# The fraction of missing values (NaN) in the synthetic variables, which are
+# replaced with the fill value when CMORizing.
+NAN_FRACTION = 0.01
+
+# The number of edges of the cells and the number of cells of the vertices of
+# the hexagonal MPAS mesh.
+MAX_EDGES = 6
+VERTEX_DEGREE = 3
+
+# The mean radius of the Earth in meters.
+EARTH_RADIUS = 6.37122e6
+
+
+@dataclass(frozen=True)
+class Resolution:
+    """The size of the synthetic inputs."""
+
+    # The name of the resolution (e.g., "ne30pg2").
+    name: str
+    # The number of latitudes and longitudes of the lat-lon grid.
+    nlat: int
+    nlon: int
+    # The number of cells and vertical levels of the MPAS mesh.
+    ncells: int
+    nvertlevels: int
+
+
+# The predefined resolutions. "ne30pg2" is the E3SM standard resolution, with
+# the atmosphere remapped to 180x360 and an ocean mesh the size of EC30to60E2r2.
+RESOLUTIONS = {
+    "tiny": Resolution("tiny", 18, 36, 1_000, 10),
+    "low": Resolution("low", 90, 180, 30_000, 30),
+    "ne30pg2": Resolution("ne30pg2", 180, 360, 236_853, 60),
+}
+
+
+def get_resolution(name: str) -> Resolution:
+    """Gets a predefined resolution or a custom "<nlat>x<nlon>" resolution.
+
+    The MPAS mesh of a custom resolution has one cell per lat-lon grid cell
+    and 60 vertical levels.
+
+    Parameters
+    ----------
+    name : str
+        The name of a predefined resolution (e.g., "ne30pg2") or a custom
+        resolution (e.g., "360x720").
+
+    Returns
+    -------
+    Resolution
+        The resolution.
+
+    Raises
+    ------
+    ValueError
+        If the name is not a predefined or custom resolution.
+    """
+    if name in RESOLUTIONS:
+        return RESOLUTIONS[name]
+
+    match = re.fullmatch(r"(\d+)x(\d+)", name)
+    if match is None:
+        raise ValueError(
+            f"'{name}' is not one of {list(RESOLUTIONS)} or '<nlat>x<nlon>'."
+        )
+
+    nlat, nlon = int(match[1]), int(match[2])
+
+    return Resolution(name, nlat, nlon, nlat * nlon, 60)
+
+
+# ==============================================================================
+# Atmosphere and land
+# ==============================================================================
+def make_time(ntime: int) -> dict[str, xr.DataArray]:
+    """Makes a monthly time axis with bounds in the "noleap" calendar.
+
+    Parameters
+    ----------
+    ntime : int
+        The number of months.
+
+    Returns
+    -------
+    dict[str, xr.DataArray]
+        The "time" coordinate (the end of each month, as in E3SM output) and
+        "time_bnds" variable.
+    """
+    month_days = [DAYS_PER_MONTH[month % 12] for month in range(ntime)]
+    ends = START_YEAR * 365.0 + np.cumsum(month_days)
+    bounds = np.stack([ends - month_days, ends], axis=1)
+
+    time = xr.DataArray(
+        ends,
+        dims="time",
+        attrs={"units": TIME_UNITS, "calendar": "noleap", "bounds": "time_bnds"},
+    )
+    time_bnds = xr.DataArray(bounds, dims=("time", "nbnd"))
+
+    return {"time": time, "time_bnds": time_bnds}
+
+
+def make_latlon(nlat: int, nlon: int) -> dict[str, xr.DataArray]:
+    """Makes a regular lat-lon grid with bounds.
+
+    Parameters
+    ----------
+    nlat : int
+        The number of latitudes.
+    nlon : int
+        The number of longitudes.
+
+    Returns
+    -------
+    dict[str, xr.DataArray]
+        The "lat" and "lon" coordinates and "lat_bnds" and "lon_bnds"
+        variables.
+    """
+    lat_edges = np.linspace(-90.0, 90.0, nlat + 1)
+    lon_edges = np.linspace(0.0, 360.0, nlon + 1)
+
+    lat = xr.DataArray(
+        (lat_edges[:-1] + lat_edges[1:]) / 2,
+        dims="lat",
+        attrs={"units": "degrees_north", "axis": "Y", "bounds": "lat_bnds"},
+    )
+    lon = xr.DataArray(
+        (lon_edges[:-1] + lon_edges[1:]) / 2,
+        dims="lon",
+        attrs={"units": "degrees_east", "axis": "X", "bounds": "lon_bnds"},
+    )
+
+    return {
+        "lat": lat,
+        "lon": lon,
+        "lat_bnds": xr.DataArray(
+            np.stack([lat_edges[:-1], lat_edges[1:]], axis=1), dims=("lat", "nbnd")
+        ),
+        "lon_bnds": xr.DataArray(
+            np.stack([lon_edges[:-1], lon_edges[1:]], axis=1), dims=("lon", "nbnd")
+        ),
+    }
+
+
+def make_hybrid_levels(nlev: int = NUM_HYBRID_LEVELS) -> dict[str, xr.DataArray]:
+    """Makes hybrid sigma levels with their coefficients.
+
+    Parameters
+    ----------
+    nlev : int, optional
+        The number of levels, by default ``NUM_HYBRID_LEVELS``.
+
+    Returns
+    -------
+    dict[str, xr.DataArray]
+        The "lev" and "ilev" coordinates (in hPa, as in E3SM output) and the
+        "hyam", "hybm", "hyai" and "hybi" coefficients.
+    """
+    # The interfaces go from the model top (pure pressure) to the surface
+    # (pure sigma).
+    eta = np.linspace(0.001, 1.0, nlev + 1)
+    hybi = np.clip((eta - 0.2) / 0.8, 0.0, 1.0)
+    hyai = eta - hybi
+    hyam = (hyai[:-1] + hyai[1:]) / 2
+    hybm = (hybi[:-1] + hybi[1:]) / 2
+
+    return {
+        "lev": xr.DataArray((hyam + hybm) * 1000.0, dims="lev", attrs={"units": "hPa"}),
+        "ilev": xr.DataArray(
+            (hyai + hybi) * 1000.0, dims="ilev", attrs={"units": "hPa"}
+        ),
+        "hyam": xr.DataArray(hyam, dims="lev"),
+        "hybm": xr.DataArray(hybm, dims="lev"),
+        "hyai": xr.DataArray(hyai, dims="ilev"),
+        "hybi": xr.DataArray(hybi, dims="ilev"),
+    }
+
+
+def make_atm_dataset(
+    variables: list[str],
+    res: Resolution,
+    ntime: int,
+    levels: str | None = None,
+    seed: int = 0,
+) -> xr.Dataset:
+    """Makes an E3SM-shaped dataset of atmosphere or land variables.
+
+    Parameters
+    ----------
+    variables : list[str]
+        The names of the variables.
+    res : Resolution
+        The resolution of the lat-lon grid.
+    ntime : int
+        The number of months.
+    levels : str | None, optional
+        The vertical levels of the variables: "hybrid" for hybrid sigma levels
+        (with "PS" and the hybrid coefficients), "plev19" for pressure levels,
+        "levgrnd" for soil levels, or None for 2D variables, by default None.
+    seed : int, optional
+        The seed of the random values, by default 0.
+
+    Returns
+    -------
+    xr.Dataset
+        The dataset, with float32 variables with missing values.
+    """
+    rng = np.random.default_rng(seed)
+    ds = xr.Dataset({**make_time(ntime), **make_latlon(res.nlat, res.nlon)})
+
+    dims: tuple[str, ...] = ("time", "lat", "lon")
+    if levels == "hybrid":
+        ds = ds.assign(make_hybrid_levels())
+        ds["PS"] = _make_variable(rng, dims, ds, scale=1.0e5, nan_fraction=0.0)
+        dims = ("time", "lev", "lat", "lon")
+    elif levels == "plev19":
+        ds["plev"] = xr.DataArray(PLEV19, dims="plev", attrs={"units": "Pa"})
+        dims = ("time", "plev", "lat", "lon")
+    elif levels == "levgrnd":
+        ds["levgrnd"] = xr.DataArray(
+            _formulas.LEVGRND_BNDS[1:], dims="levgrnd", attrs={"units": "m"}
+        )
+        dims = ("time", "levgrnd", "lat", "lon")
+
+    for name in variables:
+        if name not in ds:
+            ds[name] = _make_variable(rng, dims, ds)
+
+    return ds
+
+
+def make_handler_dataset(
+    handler: dict, res: Resolution, ntime: int, seed: int = 0
+) -> xr.Dataset:
+    """Makes a dataset with the raw variables of a handler.
+
+    The hybrid sigma coefficients and "PS" are 1D and 2D, the soil variables
+    have soil levels, and the other raw variables have the levels of the
+    handler.
+
+    Parameters
+    ----------
+    handler : dict
+        The handler definition from ``handlers.yaml``.
+    res : Resolution
+        The resolution of the lat-lon grid.
+    ntime : int
+        The number of months.
+    seed : int, optional
+        The seed of the random values, by default 0.
+
+    Returns
+    -------
+    xr.Dataset
+        The dataset.
+    """
+    levels = handler.get("levels") or {}
+    raw_variables = handler["raw_variables"]
+
+    if levels.get("name") in HYBRID_SIGMA_LEVEL_NAMES:
+        ds = make_atm_dataset(raw_variables, res, ntime, "hybrid", seed)
+    elif levels.get("name") == "plev19":
+        ds = make_atm_dataset(raw_variables, res, ntime, "plev19", seed)
+    else:
+        soil_vars = [name for name in raw_variables if name in LEVGRND_VARS]
+        other_vars = [name for name in raw_variables if name not in LEVGRND_VARS]
+
+        ds = make_atm_dataset(other_vars, res, ntime, None, seed)
+        if soil_vars:
+            ds = ds.merge(
+                make_atm_dataset(soil_vars, res, ntime, "levgrnd", seed),
+                compat="override",
+            )
+
+    return ds
+
+
+def write_time_series(
+    ds: xr.Dataset, variables: list[str], output_path: str
+) -> dict[str, list[str]]:
+    """Writes one time series file per variable, as in E3SM time series.
+
+    Each file contains its variable with the coordinates and bounds, and the
+    hybrid sigma coefficients and "PS" for variables on hybrid sigma levels.
+
+    Parameters
+    ----------
+    ds : xr.Dataset
+        The dataset.
+    variables : list[str]
+        The names of the variables to write.
+    output_path : str
+        The directory of the files.
+
+    Returns
+    -------
+    dict[str, list[str]]
+        A dictionary mapping the variables to their filepaths, as passed to
+        ``VarHandler.cmorize()``.
+    """
+    ntime = ds.sizes["time"]
+    start, end = f"{START_YEAR:04d}01", f"{START_YEAR + (ntime - 1) // 12:04d}12"
+    shared = [
+        name
+        for name in ["time_bnds", "lat_bnds", "lon_bnds", "PS", *HYBRID_COEFFICIENTS]
+        if name in ds
+    ]
+
+    vars_to_filepaths = {}
+    for name in variables:
+        filepath = os.path.join(output_path, f"{name}_{start}_{end}.nc")
+        ds[list(dict.fromkeys([name, *shared]))].to_netcdf(filepath)
+
+        vars_to_filepaths[name] = [filepath]
+
+    return vars_to_filepaths
+
+
+def _make_variable(
+    rng: np.random.Generator,
+    dims: tuple[str, ...],
+    ds: xr.Dataset,
+    scale: float = 1.0,
+    nan_fraction: float = NAN_FRACTION,
+) -> xr.DataArray:
+    shape = tuple(ds.sizes[dim] for dim in dims)
+    data = rng.random(shape, dtype=np.float32) * np.float32(scale)
+
+    if nan_fraction > 0:
+        data[rng.random(shape) < nan_fraction] = np.nan
+
+    return xr.DataArray(data, dims=dims, attrs={"units": "1"})
+
+
+# ==============================================================================
+# MPAS
+# ==============================================================================
+def make_mpas_mesh(res: Resolution) -> xr.Dataset:
+    """Makes a doubly periodic hexagonal MPAS mesh.
+
+    The cells are on a triangular lattice of ``nx`` by ``ny`` cells with
+    axial coordinates ``(q, r)``. The vertices are the triangles of the
+    lattice: the "up" triangle of a cell has the cells ``(q, r)``,
+    ``(q + 1, r)`` and ``(q, r + 1)``, and its "down" triangle has the cells
+    ``(q + 1, r)``, ``(q, r + 1)`` and ``(q + 1, r + 1)``. Each cell owns the
+    three edges to its neighbors ``(q + 1, r)``, ``(q, r + 1)`` and
+    ``(q - 1, r + 1)``. The cells are spread over the sphere, with the rows
+    ``r`` from south to north.
+
+    Parameters
+    ----------
+    res : Resolution
+        The resolution of the mesh.
+
+    Returns
+    -------
+    xr.Dataset
+        The mesh, with the indices of its connectivity variables starting at 1
+        as in MPAS.
+    """
+    nx = max(int(round(math.sqrt(res.ncells))), 2)
+    ny = max(int(math.ceil(res.ncells / nx)), 2)
+    ncells = nx * ny
+
+    q, r = np.meshgrid(np.arange(nx), np.arange(ny))
+    q, r = q.ravel(), r.ravel()
+
+    def cell(dq: int, dr: int) -> np.ndarray:
+        return ((r + dr) % ny) * nx + (q + dq) % nx
+
+    def up(dq: int, dr: int) -> np.ndarray:
+        return 2 * cell(dq, dr)
+
+    def down(dq: int, dr: int) -> np.ndarray:
+        return 2 * cell(dq, dr) + 1
+
+    # The vertices of each cell, counterclockwise.
+    vertices_on_cell = np.stack(
+        [up(0, 0), down(-1, 0), up(-1, 0), down(-1, -1), up(0, -1), down(0, -1)],
+        axis=1,
+    )
+    cells_on_vertex = np.empty((2 * ncells, VERTEX_DEGREE), dtype=np.int64)
+    cells_on_vertex[0::2] = np.stack([cell(0, 0), cell(1, 0), cell(0, 1)], axis=1)
+    cells_on_vertex[1::2] = np.stack([cell(1, 0), cell(0, 1), cell(1, 1)], axis=1)
+    cells_on_edge = np.stack(
+        [
+            np.repeat(cell(0, 0), 3),
+            np.stack([cell(1, 0), cell(0, 1), cell(-1, 1)], axis=1).ravel(),
+        ],
+        axis=1,
+    )
+
+    area_cell = 4 * math.pi * EARTH_RADIUS**2 / ncells
+    dv_edge = math.sqrt(area_cell / (1.5 * math.sqrt(3)))
+
+    ref_bottom_depth = np.cumsum(np.linspace(10.0, 200.0, res.nvertlevels))
+
+    return xr.Dataset(
+        {
+            "latCell": ("nCells", np.deg2rad(-90.0 + 180.0 * (r + 0.5) / ny)),
+            "lonCell": ("nCells", np.deg2rad(360.0 * (q + 0.5 * (r % 2)) / nx)),
+            "areaCell": ("nCells", np.full(ncells, area_cell)),
+            "verticesOnCell": (("nCells", "maxEdges"), vertices_on_cell + 1),
+            "cellsOnVertex": (("nVertices", "vertexDegree"), cells_on_vertex + 1),
+            "kiteAreasOnVertex": (
+                ("nVertices", "vertexDegree"),
+                np.full((2 * ncells, VERTEX_DEGREE), area_cell / MAX_EDGES),
+            ),
+            "cellsOnEdge": (("nEdges", "TWO"), cells_on_edge + 1),
+            "dvEdge": ("nEdges", np.full(3 * ncells, dv_edge)),
+            "refBottomDepth": ("nVertLevels", ref_bottom_depth),
+        }
+    )
+
+
+def make_mpas_masks(mesh: xr.Dataset) -> xr.Dataset:
+    """Makes the MOC region masks of an MPAS mesh.
+
+    The mesh has one region ("Atlantic"), which is the western half of the
+    cells north of 30S, and its transect is the edges along its southern
+    boundary.
+
+    Parameters
+    ----------
+    mesh : xr.Dataset
+        The mesh from ``make_mpas_mesh()``.
+
+    Returns
+    -------
+    xr.Dataset
+        The region masks, as read by ``mpas.compute_moc_streamfunction()``.
+    """
+    lat = np.rad2deg(mesh.latCell.values)
+    lon = np.rad2deg(mesh.lonCell.values)
+    in_region = (lat >= -30.0) & (lon < 180.0)
+
+    # The edges from the cells just south of the region to their northern
+    # neighbors (the second edge of each cell goes to (q, r + 1)).
+    south_lat = lat[in_region].min()
+    row_below = np.unique(lat[lat < south_lat]).max()
+    boundary_cells = np.nonzero((lat == row_below) & (lon < 180.0))[0]
+    edges = 3 * boundary_cells + 1
+
+    nedges = mesh.sizes["nEdges"]
+    edge_signs = np.zeros((nedges, 1), dtype=np.int32)
+    edge_signs[edges, 0] = 1
+
+    return xr.Dataset(
+        {
+            "regionNames": ("nRegions", ["Atlantic"]),
+            "regionCellMasks": (
+                ("nCells", "nRegions"),
+                in_region[:, np.newaxis].astype(np.int32),
+            ),
+            "transectEdgeGlobalIDs": (
+                ("nTransects", "maxEdgesInTransect"),
+                (edges + 1)[np.newaxis, :],
+            ),
+            "transectEdgeMaskSigns": (("nEdges", "nTransects"), edge_signs),
+        }
+    )
+
+
+def make_mpas_ocean_dataset(mesh: xr.Dataset, ntime: int, seed: int = 0) -> xr.Dataset:
+    """Makes MPAS-Ocean monthly means with the variables of the MOC.
+
+    Parameters
+    ----------
+    mesh : xr.Dataset
+        The mesh from ``make_mpas_mesh()``.
+    ntime : int
+        The number of months.
+    seed : int, optional
+        The seed of the random values, by default 0.
+
+    Returns
+    -------
+    xr.Dataset
+        The dataset, with the variables and dimensions of MPAS-Ocean output.
+    """
+    rng = np.random.default_rng(seed)
+    ncells, nedges = mesh.sizes["nCells"], mesh.sizes["nEdges"]
+    nlev = mesh.sizes["nVertLevels"]
+
+    def values(*shape: int, scale: float = 1.0) -> np.ndarray:
+        return (rng.random((ntime, *shape), dtype=np.float32) - 0.5) * scale
+
+    edge_dims = ("Time", "nEdges", "nVertLevels")
+    top_dims = ("Time", "nCells", "nVertLevelsP1")
+
+    return xr.Dataset(
+        {
+            "timeMonthly_avg_normalVelocity": (edge_dims, values(nedges, nlev)),
+            "timeMonthly_avg_normalGMBolusVelocity": (
+                edge_dims,
+                values(nedges, nlev, scale=0.01),
+            ),
+            "timeMonthly_avg_vertVelocityTop": (
+                top_dims,
+                values(ncells, nlev + 1, scale=1e-5),
+            ),
+            "timeMonthly_avg_vertGMBolusVelocityTop": (
+                top_dims,
+                values(ncells, nlev + 1, scale=1e-7),
+            ),
+            "timeMonthly_avg_layerThickness": (
+                ("Time", "nCells", "nVertLevels"),
+                np.abs(values(ncells, nlev, scale=50.0)) + 1.0,
+            ),
+            "timeMonthly_avg_activeTracers_temperature": (
+                ("Time", "nCells"),
+                values(ncells, scale=30.0),
+            ),
+            "xtime_startMonthly": ("Time", _get_xtimes(ntime, start=True)),
+            "xtime_endMonthly": ("Time", _get_xtimes(ntime, start=False)),
+        }
+    )
+
+
+def make_mpas_seaice_dataset(mesh: xr.Dataset, ntime: int, seed: int = 0) -> xr.Dataset:
+    """Makes MPAS-Seaice monthly means with velocities on the vertices.
+
+    Parameters
+    ----------
+    mesh : xr.Dataset
+        The mesh from ``make_mpas_mesh()``.
+    ntime : int
+        The number of months.
+    seed : int, optional
+        The seed of the random values, by default 0.
+
+    Returns
+    -------
+    xr.Dataset
+        The dataset, with the variables and dimensions of MPAS-Seaice output.
+    """
+    rng = np.random.default_rng(seed)
+    shape = (ntime, mesh.sizes["nVertices"])
+
+    return xr.Dataset(
+        {
+            "timeMonthly_avg_uVelocityGeo": (
+                ("Time", "nVertices"),
+                rng.random(shape, dtype=np.float32) - 0.5,
+            ),
+            "timeMonthly_avg_iceAreaCell": (
+                ("Time", "nCells"),
+                rng.random((ntime, mesh.sizes["nCells"]), dtype=np.float32),
+            ),
+            "xtime_startMonthly": ("Time", _get_xtimes(ntime, start=True)),
+            "xtime_endMonthly": ("Time", _get_xtimes(ntime, start=False)),
+        }
+    )
+
+
+def write_mpas_map(mesh: xr.Dataset, res: Resolution, filepath: str):
+    """Writes a mapping file from an MPAS mesh to a lat-lon grid.
+
+    Each cell of the lat-lon grid is the average of the MPAS cells whose
+    centers it contains, which is stored in the sparse matrix format of
+    ESMF and TempestRemap mapping files read by ``ncremap``.
+
+    Parameters
+    ----------
+    mesh : xr.Dataset
+        The mesh from ``make_mpas_mesh()``.
+    res : Resolution
+        The resolution of the lat-lon grid.
+    filepath : str
+        The path to the mapping file.
+    """
+    latlon = make_latlon(res.nlat, res.nlon)
+    lat_bnds, lon_bnds = latlon["lat_bnds"].values, latlon["lon_bnds"].values
+
+    lat_cell = np.rad2deg(mesh.latCell.values)
+    lon_cell = np.rad2deg(mesh.lonCell.values) % 360.0
+    ilat = np.clip(np.searchsorted(lat_bnds[:, 1], lat_cell), 0, res.nlat - 1)
+    ilon = np.clip(np.searchsorted(lon_bnds[:, 1], lon_cell), 0, res.nlon - 1)
+
+    n_a, n_b = mesh.sizes["nCells"], res.nlat * res.nlon
+    row = ilat * res.nlon + ilon
+    counts = np.bincount(row, minlength=n_b)
+
+    # The corners of the lat-lon cells, counterclockwise from the south west.
+    lat_2d, lon_2d = np.meshgrid(
+        np.arange(res.nlat), np.arange(res.nlon), indexing="ij"
+    )
+    yv_b = lat_bnds[lat_2d.ravel()][:, [0, 0, 1, 1]]
+    xv_b = lon_bnds[lon_2d.ravel()][:, [0, 1, 1, 0]]
+    area_b = np.deg2rad(xv_b[:, 1] - xv_b[:, 0]) * np.abs(
+        np.sin(np.deg2rad(yv_b[:, 2])) - np.sin(np.deg2rad(yv_b[:, 0]))
+    )
+
+    ds = xr.Dataset(
+        {
+            "S": ("n_s", 1.0 / counts[row]),
+            "row": ("n_s", (row + 1).astype(np.int32)),
+            "col": ("n_s", np.arange(1, n_a + 1, dtype=np.int32)),
+            "area_a": ("n_a", mesh.areaCell.values / EARTH_RADIUS**2),
+            "frac_a": ("n_a", np.ones(n_a)),
+            "mask_a": ("n_a", np.ones(n_a, dtype=np.int32)),
+            "xc_a": ("n_a", lon_cell),
+            "yc_a": ("n_a", lat_cell),
+            "area_b": ("n_b", area_b),
+            "frac_b": ("n_b", (counts > 0).astype(np.float64)),
+            "mask_b": ("n_b", np.ones(n_b, dtype=np.int32)),
+            "xc_b": ("n_b", (xv_b[:, 0] + xv_b[:, 1]) / 2),
+            "yc_b": ("n_b", (yv_b[:, 0] + yv_b[:, 2]) / 2),
+            "xv_b": (("n_b", "nv_b"), xv_b),
+            "yv_b": (("n_b", "nv_b"), yv_b),
+            "src_grid_dims": ("src_grid_rank", np.array([n_a], dtype=np.int32)),
+            "dst_grid_dims": (
+                "dst_grid_rank",
+                np.array([res.nlon, res.nlat], dtype=np.int32),
+            ),
+        },
+        attrs={"map_method": "Nearest neighbor average (synthetic)"},
+    )
+    ds.to_netcdf(filepath)
+
+
+def _get_xtimes(ntime: int, start: bool) -> np.ndarray:
+    xtimes = []
+    for month in range(ntime):
+        year = START_YEAR + month // 12
+        if start:
+            xtimes.append(f"{year:04d}-{month % 12 + 1:02d}-01_00:00:00")
+        else:
+            day = DAYS_PER_MONTH[month % 12]
+            xtimes.append(f"{year:04d}-{month % 12 + 1:02d}-{day:02d}_23:59:59")
+
+    return np.array(xtimes, dtype="S64")
@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+import xarray as xr
+import yaml
+
+from e3sm_to_cmip import HANDLER_DEFINITIONS_PATH
+from e3sm_to_cmip.cmor_handlers import FILL_VALUE, _formulas
+from e3sm_to_cmip.cmor_handlers.compiler import compile_formula
+
+
+def _get_dataset(names: list[str], seed: int = 0) -> xr.Dataset:
+    rng = np.random.default_rng(seed)
+    ds = xr.Dataset(
+        {
+            name: (("time", "lat", "lon"), rng.random((5, 4, 3), dtype=np.float32))
+            for name in names
+        }
+    )
+    ds[names[0]][0, 0, 0] = np.nan
+
+    return ds
+
+
+def _get_formula_handlers() -> list[dict]:
+    with open(HANDLER_DEFINITIONS_PATH) as infile:
+        handlers = yaml.safe_load(infile)
+
+    return [
+        handler
+        for handler in handlers
+        if handler.get("formula")
+        and compile_formula(handler["formula"], tuple(handler["raw_variables"]))
+    ]
+
+
+class TestCompileFormula:
+    def test_compiles_arithmetic_on_raw_variables(self):
+        result = compile_formula("(PRECC + PRECL) * 1000.0", ("PRECC", "PRECL"))
+
+        assert result is not None
+        assert result.variables == ["PRECC", "PRECL"]
+        assert result.tree == (
+            "multiply",
+            ("add", ("var", "PRECC"), ("var", "PRECL")),
+            ("const", 1000.0),
+        )
+
+    def test_folds_constant_operands(self):
+        result = compile_formula("-FAREA_BURNED * (3600 * 24)", ("FAREA_BURNED",))
+
+        assert result is not None
+        assert result.tree == (
+            "multiply",
+            ("neg", ("var", "FAREA_BURNED")),
+            ("const", 86400),
+        )
+
+    @pytest.mark.parametrize(
+        "formula",
+        [
+            "verticalSum(SOILICE, capped_at=5000)",
+            "hyam * p0 + hybm * PS",
+            "SOILICE ** 2",
+            "SOILICE + 'a'",
+            "1000.0 * 2",
+            "SOILICE +",
+        ],
+    )
+    def test_returns_none_if_formula_is_not_supported(self, formula):
+        assert compile_formula(formula, ("SOILICE", "hyam", "hybm", "PS")) is None
+
+
+class TestCompiledFormula:
+    def test_evaluates_formula_in_blocks_and_replaces_missing_values(self):
+        ds = _get_dataset(["SFso4_a1", "SFso4_a2", "so4_a1_CLXF", "so4_a2_CLXF"])
+        compiled = compile_formula(
+            "SFso4_a1 + SFso4_a2 + (so4_a1_CLXF + so4_a2_CLXF) * 115.107340 "
+            "/ 6.02214e+22",
+            tuple(ds.data_vars),
+        )
+        assert compiled is not None
+
+        # One time step per block.
+        result = compiled.evaluate(ds, block_bytes=1)
+
+        expected = _formulas.emiso4(ds).fillna(FILL_VALUE).values
+        assert result.dtype == np.float32
+        assert result[0, 0, 0] == np.float32(FILL_VALUE)
+        np.testing.assert_array_equal(result, expected)
+
+    def test_writes_output_array_of_dtype(self):
+        ds = _get_dataset(["LAISHA", "LAISUN"]).astype(np.float64)
+        compiled = compile_formula("LAISHA + LAISUN", tuple(ds.data_vars))
+        assert compiled is not None
+
+        result = compiled.evaluate(ds, np.dtype("float32"))
+
+        expected = (ds["LAISHA"] + ds["LAISUN"]).fillna(FILL_VALUE).values
+        assert result.dtype == np.float32
+        np.testing.assert_array_equal(result, expected.astype(np.float32))
+
+    def test_evaluates_lazy_raw_variables(self):
+        ds = _get_dataset(["FSNTOA", "FSNT", "FLNT"]).chunk({"time": 2})
+        compiled = compile_formula("FSNTOA - FSNT + FLNT", tuple(ds.data_vars))
+        assert compiled is not None
+
+        result = compiled.evaluate(ds, block_bytes=3 * 4 * 3 * 4 * 4)
+
+        expected = _formulas.rlut(ds).fillna(FILL_VALUE).values
+        np.testing.assert_array_equal(result, expected)
+
+    def test_can_evaluate_only_raw_variables_with_the_same_dimensions(self):
+        compiled = compile_formula("LAISHA + LAISUN", ("LAISHA", "LAISUN"))
+        assert compiled is not None
+
+        ds = _get_dataset(["LAISHA", "LAISUN"])
+        assert compiled.can_evaluate(ds)
+        assert not compiled.can_evaluate(ds.drop_vars("LAISUN"))
+
+        ds["LAISUN"] = ds["LAISUN"].transpose("time", "lon", "lat")
+        assert not compiled.can_evaluate(ds)
+
+
+@pytest.mark.parametrize("unit_conversion", _formulas.UNIT_CONVERSION_FORMULAS)
+def test_compiled_unit_conversions_match_convert_units(unit_conversion):
+    ds = _get_dataset(["Q"])
+    formula = _formulas.UNIT_CONVERSION_FORMULAS[unit_conversion]
+    compiled = compile_formula(formula.format(var="Q"), ("Q",))
+
+    result = compiled.evaluate(ds)  # type: ignore[union-attr]
+
+    expected = _formulas.convert_units(ds["Q"], unit_conversion).fillna(FILL_VALUE)
+    np.testing.assert_array_equal(result, expected.values)
+
+
+@pytest.mark.parametrize(
+    "handler", _get_formula_handlers(), ids=lambda handler: handler["name"]
+)
+def test_compiled_formulas_match_formula_functions(handler):
+    ds = _get_dataset(handler["raw_variables"])
+    compiled = compile_formula(handler["formula"], tuple(handler["raw_variables"]))
+
+    result = compiled.evaluate(ds, block_bytes=1)  # type: ignore[union-attr]
+
+    formula = getattr(_formulas, handler["name"])
+    expected = formula(ds).fillna(FILL_VALUE).values.astype(np.float32)
+    np.testing.assert_array_equal(result, expected)
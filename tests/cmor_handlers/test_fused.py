@@ -0,0 +1,248 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+from e3sm_to_cmip.cmor_handlers.fused import VarHandlerGroup, group_handlers
+from e3sm_to_cmip.cmor_handlers.handler import VarHandler
+
+HANDLER_MODULE = "e3sm_to_cmip.cmor_handlers.handler"
+
+HYBRID_LEVELS: VarHandler.Levels = {
+    "name": "standard_hybrid_sigma",
+    "units": "1",
+    "e3sm_axis_name": "lev",
+    "e3sm_axis_bnds": "ilev",
+    "time_name": None,
+}
+
+
+def _get_handler(
+    name: str,
+    raw_variables: list[str],
+    table: str = "CMIP6_Amon.json",
+    levels: VarHandler.Levels | None = None,
+) -> dict:
+    return VarHandler(
+        name=name,
+        units="1",
+        table=table,
+        raw_variables=raw_variables,
+        levels=levels,
+    ).to_dict()
+
+
+class TestGroupHandlers:
+    def test_groups_handlers_that_share_raw_variables(self):
+        handlers = [
+            _get_handler("rlut", ["FSNTOA", "FSNT", "FLNT"]),
+            _get_handler("pr", ["PRECC", "PRECL"]),
+            _get_handler("rsut", ["SOLIN", "FSNTOA"]),
+            _get_handler("rtmt", ["FLNT", "FSNT"]),
+        ]
+
+        result = group_handlers(handlers)
+
+        assert [h["name"] for h in result] == ["rlut+rsut+rtmt", "pr"]
+        assert result[0]["handlers"] == ["rlut", "rsut", "rtmt"]
+        assert result[0]["raw_variables"] == ["FSNTOA", "FSNT", "FLNT", "SOLIN"]
+        assert result[1] is handlers[1]
+
+    def test_groups_handlers_with_hybrid_sigma_levels(self):
+        handlers = [
+            _get_handler("cl", ["CLOUD"], levels=HYBRID_LEVELS),
+            _get_handler("cli", ["CLDICE"], levels=HYBRID_LEVELS),
+            _get_handler("ps", ["PS"]),
+        ]
+
+        result = group_handlers(handlers)
+
+        assert [h["name"] for h in result] == ["cl+cli", "ps"]
+
+    def test_does_not_group_handlers_with_different_tables(self):
+        handlers = [
+            _get_handler("rlut", ["FSNTOA", "FSNT", "FLNT"]),
+            _get_handler("rlut", ["FSNTOA", "FSNT", "FLNT"], table="CMIP6_day.json"),
+        ]
+
+        result = group_handlers(handlers)
+
+        assert result == handlers
+
+    def test_splits_groups_larger_than_max_group_size(self):
+        handlers = [_get_handler(f"var{i}", ["FSNT"]) for i in range(5)]
+
+        result = group_handlers(handlers, max_group_size=2)
+
+        assert [h["name"] for h in result] == ["var0+var1", "var2+var3", "var4"]
+        assert result[2] is handlers[4]
+
+    def test_splits_groups_larger_than_max_group_bytes(self):
+        handlers = [_get_handler(f"var{i}", ["FSNT", f"VAR{i}"]) for i in range(3)]
+        var_bytes = {"FSNT": 4, "VAR0": 4, "VAR1": 4, "VAR2": 4}
+
+        result = group_handlers(handlers, var_bytes=var_bytes, max_group_bytes=12)
+
+        # The shared input is counted once per group.
+        assert [h["name"] for h in result] == ["var0+var1", "var2"]
+        assert result[1] is handlers[2]
+
+    def test_does_not_group_handlers_larger_than_max_group_bytes(self):
+        handlers = [_get_handler(f"var{i}", ["FSNT"]) for i in range(2)]
+
+        result = group_handlers(handlers, var_bytes={"FSNT": 8}, max_group_bytes=4)
+
+        assert result == handlers
+
+    def test_does_not_group_legacy_handlers(self):
+        def handle(*args):
+            return True
+
+        handlers = [
+            {"name": "a", "table": "CMIP6_Amon.json", "raw_variables": ["FSNT"]},
+            {"name": "b", "table": "CMIP6_Amon.json", "raw_variables": ["FSNT"]},
+        ]
+        for handler in handlers:
+            handler["method"] = handle
+
+        result = group_handlers(handlers)
+
+        assert result == handlers
+
+
+class TestVarHandlerGroup:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.group = VarHandlerGroup(
+            [
+                VarHandler("rlut", "W m-2", "CMIP6_Amon.json", ["FSNTOA", "FLNT"]),
+                VarHandler("rsut", "W m-2", "CMIP6_Amon.json", ["SOLIN", "FSNTOA"]),
+            ]
+        )
+
+    def test_returns_failure_for_handlers_without_input_files(self):
+        result = self.group.cmorize(
+            {"FSNTOA": [], "FLNT": ["FLNT_185001_185012.nc"], "SOLIN": []},
+            "tables",
+            "metadata.json",
+            "logs",
+        )
+
+        assert result == {"rlut": False, "rsut": False}
+
+    def test_updates_table_of_handlers(self):
+        self.group.cmorize(
+            {"FSNTOA": [], "FLNT": [], "SOLIN": []},
+            "tables",
+            "metadata.json",
+            "logs",
+            table="CMIP6_day.json",
+        )
+
+        assert self.group.table == "CMIP6_day.json"
+        assert [h.table for h in self.group.handlers] == ["CMIP6_day.json"] * 2
+
+
+class _FakeCmor:
+    def __init__(self):
+        self.variables: list[str] = []
+        self.writes: list[dict] = []
+
+    def variable(self, name, **kwargs):
+        self.variables.append(name)
+
+        return len(self.variables)
+
+    def write(self, **kwargs):
+        self.writes.append(kwargs)
+
+    def close(self, var_id, file_name=False):
+        return f"{self.variables[var_id - 1]}.nc"
+
+
+def _get_group_dataset(num_times: int) -> xr.Dataset:
+    time = np.arange(num_times, dtype="float64") + 0.5
+    shape = (num_times, 2, 3)
+
+    return xr.Dataset(
+        {
+            "CLOUD": (("time", "lat", "lon"), np.ones(shape)),
+            "CLDICE": (("time", "lat", "lon"), np.full(shape, 2.0)),
+            "time_bnds": (("time", "nbnd"), np.stack([time - 0.5, time + 0.5], 1)),
+        },
+        coords={"time": time},
+    ).chunk({"time": 1})
+
+
+class TestCmorWriteSegment:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.cmor = _FakeCmor()
+        monkeypatch.setattr(HANDLER_MODULE + ".cmor", self.cmor)
+
+        handlers = [
+            VarHandler("cl", "%", "CMIP6_Amon.json", ["CLOUD"]),
+            VarHandler("cli", "%", "CMIP6_Amon.json", ["CLDICE"]),
+        ]
+        for var_handler in handlers:
+            monkeypatch.setattr(
+                var_handler,
+                "_get_cmor_axis_ids_and_ips_id",
+                lambda **kwargs: ({"time": 0}, None),
+            )
+
+        self.group = VarHandlerGroup(handlers)
+        self.time_dims = {"cl": "time", "cli": "time"}
+        self.output_dtypes = {"cl": None, "cli": None}
+
+    def test_reads_each_time_slab_once_for_the_group(self, monkeypatch):
+        ds = _get_group_dataset(5)
+        # Two time steps of CLOUD and CLDICE (2 x 2 x 3 float64 values each) fit
+        # in a slab.
+        monkeypatch.setattr(HANDLER_MODULE + ".TIME_SLAB_BYTES", 2 * 2 * 2 * 3 * 8)
+
+        # Record each read of a chunk (one time step) of the raw variables.
+        reads = []
+        for name in ["CLOUD", "CLDICE"]:
+            ds[name] = ds[name].copy(
+                data=ds[name].data.map_blocks(
+                    lambda block, name=name: reads.append(name) or block,
+                    meta=np.array((), dtype="float64"),
+                )
+            )
+
+        result = self.group._cmor_write_segment(
+            ds, self.group.handlers, self.time_dims, self.output_dtypes
+        )
+
+        assert result == {"cl": "cl.nc", "cli": "cli.nc"}
+        assert sorted(reads) == ["CLDICE"] * 5 + ["CLOUD"] * 5
+
+        # Each slab is written by every handler before the next one is read.
+        assert [w["var_id"] for w in self.cmor.writes] == [1, 2, 1, 2, 1, 2]
+        assert [len(w["time_vals"]) for w in self.cmor.writes] == [2, 2, 2, 2, 1, 1]
+        np.testing.assert_array_equal(
+            np.concatenate([w["data"] for w in self.cmor.writes if w["var_id"] == 2]),
+            ds["CLDICE"].values,
+        )
+
+    def test_stops_writing_handler_whose_slab_fails(self, monkeypatch):
+        monkeypatch.setattr(HANDLER_MODULE + ".TIME_SLAB_BYTES", 2 * 2 * 2 * 3 * 8)
+        write = self.cmor.write
+
+        def fail_cl(**kwargs):
+            if kwargs["var_id"] == 1:
+                raise RuntimeError("CMOR error")
+
+            write(**kwargs)
+
+        monkeypatch.setattr(self.cmor, "write", fail_cl)
+
+        result = self.group._cmor_write_segment(
+            _get_group_dataset(5),
+            self.group.handlers,
+            self.time_dims,
+            self.output_dtypes,
+        )
+
+        assert result == {"cl": None, "cli": "cli.nc"}
+        assert [w["var_id"] for w in self.cmor.writes] == [2, 2, 2]
@@ -1,11 +1,21 @@
 import json
 import os
+import uuid
 
+import numpy as np
 import pytest
+import xarray as xr
 
-from e3sm_to_cmip import cmor_handlers
-from e3sm_to_cmip.cmor_handlers import _formulas
-from e3sm_to_cmip.cmor_handlers.handler import VarHandler
+from e3sm_to_cmip import cmor_handlers, prefetch
+from e3sm_to_cmip.cmor_handlers import FILL_VALUE, _formulas, handler, precision
+from e3sm_to_cmip.cmor_handlers.handler import (
+    InputLayout,
+    VarHandler,
+    _get_time_chunks,
+    _read_input_layout,
+)
+from e3sm_to_cmip.field_cache import FieldCache
+from e3sm_to_cmip.grid_cache import GridCache
 
 
 class TestVarHandler:
@@ -179,6 +189,19 @@ class TestVarHandler:
             "time_name: time2\noutput_data: null\n"
         )
 
+    def test__get_output_dtype_returns_dtype_of_type_in_table(self):
+        var_handler = VarHandler(
+            name="pr",
+            units="kg m-2 s-1",
+            raw_variables=["PRECT"],
+            table="CMIP6_3hr.json",
+            unit_conversion="m/s-to-kg/ms",
+        )
+
+        result = var_handler._get_output_dtype(f"{self.tables_path}/CMIP6_3hr.json")
+
+        assert result == np.float32
+
     @pytest.mark.xfail
     def test__update_table_ref_updates_table_attr(self):
         assert 0
@@ -208,3 +231,373 @@ class TestCmorizeMethod:
     @pytest.mark.xfail
     def test_updates_table_reference_based_on_input_freq_and_realm(self):
         assert 0
+
+
+class _FakeCmor:
+    def __init__(self):
+        self.writes: list[dict] = []
+
+    def write(self, **kwargs):
+        self.writes.append(kwargs)
+
+
+def _get_time_dataset(num_times: int) -> xr.Dataset:
+    time = np.arange(num_times, dtype="float64") + 0.5
+    cloud = np.arange(num_times * 2 * 3, dtype="float64").reshape(num_times, 2, 3)
+    cloud[0, 0, 0] = np.nan
+
+    return xr.Dataset(
+        {
+            "CLOUD": (("time", "lat", "lon"), cloud),
+            "PS": (("time", "lat", "lon"), np.full((num_times, 2, 3), 1e5)),
+            "time_bnds": (
+                ("time", "nbnd"),
+                np.stack([time - 0.5, time + 0.5], axis=1),
+            ),
+        },
+        coords={"time": time},
+    )
+
+
+class TestCmorWriteWithTime:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.cmor = _FakeCmor()
+        monkeypatch.setattr(handler, "cmor", self.cmor)
+
+        self.handler = VarHandler(
+            name="cl", units="%", raw_variables=["CLOUD"], table="CMIP6_Amon.json"
+        )
+
+    def test_writes_variable_and_ips_in_time_slabs(self, monkeypatch):
+        ds = _get_time_dataset(5)
+        # Two time steps of CLOUD (2 x 2 x 3 float64 values) fit in a slab.
+        monkeypatch.setattr(handler, "TIME_SLAB_BYTES", 2 * 2 * 3 * 8)
+
+        result = self.handler._cmor_write_with_time(ds, 1, "time", 2)
+
+        assert result
+        var_writes = [w for w in self.cmor.writes if w["var_id"] == 1]
+        ips_writes = [w for w in self.cmor.writes if w["var_id"] == 2]
+        assert [len(w["time_vals"]) for w in var_writes] == [2, 2, 1]
+        assert [w["store_with"] for w in ips_writes] == [1, 1, 1]
+
+        np.testing.assert_array_equal(
+            np.concatenate([w["data"] for w in var_writes]),
+            ds["CLOUD"].fillna(FILL_VALUE).values,
+        )
+        np.testing.assert_array_equal(
+            np.concatenate([w["time_bnds"] for w in var_writes]),
+            ds["time_bnds"].values,
+        )
+        np.testing.assert_array_equal(
+            np.concatenate([w["time_vals"] for w in ips_writes]), ds["time"].values
+        )
+
+    def test_writes_all_time_steps_at_once_if_they_fit_in_a_slab(self):
+        ds = _get_time_dataset(5)
+
+        assert self.handler._cmor_write_with_time(ds, 1, "time", None)
+        assert len(self.cmor.writes) == 1
+        assert self.cmor.writes[0]["data"].shape == (5, 2, 3)
+
+    def test_writes_one_time_step_per_slab_if_a_time_step_exceeds_a_slab(
+        self, monkeypatch
+    ):
+        monkeypatch.setattr(handler, "TIME_SLAB_BYTES", 1)
+
+        assert self.handler._get_time_slab_size(_get_time_dataset(3), "time") == 1
+
+    def test_aligns_time_slabs_with_time_chunks(self, monkeypatch):
+        ds = _get_time_dataset(6).chunk({"time": 2})
+        # Three time steps fit in a slab, which is rounded down to a chunk.
+        monkeypatch.setattr(handler, "TIME_SLAB_BYTES", 3 * 2 * 3 * 8)
+
+        assert self.handler._get_time_slab_size(ds, "time") == 2
+
+    def test_checks_float32_error_once_per_segment(self, monkeypatch):
+        ds = _get_time_dataset(5)
+        monkeypatch.setattr(handler, "TIME_SLAB_BYTES", 2 * 2 * 3 * 8)
+
+        num_checks = 0
+        get_float32_error = precision.get_float32_error
+
+        def count_checks(*args):
+            nonlocal num_checks
+            num_checks += 1
+
+            return get_float32_error(*args)
+
+        monkeypatch.setattr(precision, "get_float32_error", count_checks)
+
+        assert self.handler._cmor_write_with_time(
+            ds, 1, "time", None, np.dtype("float32")
+        )
+        assert len(self.cmor.writes) == 3
+        assert all(w["data"].dtype == np.float32 for w in self.cmor.writes)
+        assert num_checks == 1
+
+    def test_returns_false_if_a_slab_fails_to_write(self, monkeypatch):
+        def write(**kwargs):
+            raise RuntimeError("CMOR error")
+
+        monkeypatch.setattr(self.cmor, "write", write)
+
+        assert not self.handler._cmor_write_with_time(
+            _get_time_dataset(2), 1, "time", None
+        )
+
+    def test_writes_ips_from_field_cache_across_handlers(self, monkeypatch):
+        cache = FieldCache(uuid.uuid4().hex)
+        monkeypatch.setattr(self.cmor, "variable", lambda *args, **kwargs: 1, False)
+        monkeypatch.setattr(self.cmor, "close", lambda *args, **kwargs: "out.nc", False)
+
+        for name in ["cl", "cli"]:
+            var_handler = VarHandler(
+                name=name, units="%", raw_variables=["CLOUD"], table="CMIP6_Amon.json"
+            )
+            monkeypatch.setattr(
+                var_handler,
+                "_get_cmor_axis_ids_and_ips_id",
+                lambda **kwargs: ({"time": 0}, 2),
+            )
+
+            # Each handler opens its own input files, with the same "PS".
+            ds = _get_time_dataset(3).chunk()
+            assert var_handler._cmor_write_dataset(ds, "time", field_cache=cache)
+
+        ips_writes = [w for w in self.cmor.writes if w["var_id"] == 2]
+        assert np.shares_memory(ips_writes[0]["data"], ips_writes[1]["data"])
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    def test_reads_ps_from_field_cache_in_time_slabs(self, monkeypatch):
+        cache = FieldCache(uuid.uuid4().hex)
+        ds = _get_time_dataset(5).chunk({"time": 1})
+        # Two time steps of CLOUD (2 x 2 x 3 float64 values) fit in a slab.
+        monkeypatch.setattr(handler, "TIME_SLAB_BYTES", 2 * 2 * 3 * 8)
+
+        assert self.handler._cmor_write_with_time(ds, 1, "time", 2, field_cache=cache)
+
+        # Each slab of "PS" is read and cached on its own, never the whole
+        # time segment.
+        ips_writes = [w for w in self.cmor.writes if w["var_id"] == 2]
+        assert [w["data"].shape[0] for w in ips_writes] == [2, 2, 1]
+        assert not any(w["data"].flags.writeable for w in ips_writes)
+        assert cache.stats.misses == 3
+        assert cache.nbytes == ds["PS"].nbytes
+
+
+class TestOpenSegment:
+    def test_loads_raw_variables_that_fit_in_a_time_slab(self, monkeypatch):
+        var_handler = VarHandler(
+            name="cl", units="%", raw_variables=["CLOUD"], table="CMIP6_Amon.json"
+        )
+        monkeypatch.setattr(
+            var_handler,
+            "_get_mfdataset",
+            lambda *args: _get_time_dataset(3).chunk({"time": 1}),
+        )
+
+        ds = var_handler._open_segment({"CLOUD": ["CLOUD_185001_185912.nc"]}, 0, "time")
+
+        # "PS" is read in time slabs with the field cache.
+        assert ds["CLOUD"].chunks is None
+        assert ds["PS"].chunks is not None
+
+    def test_keeps_raw_variables_lazy_if_they_exceed_a_time_slab(self, monkeypatch):
+        var_handler = VarHandler(
+            name="cl", units="%", raw_variables=["CLOUD"], table="CMIP6_Amon.json"
+        )
+        monkeypatch.setattr(
+            var_handler,
+            "_get_mfdataset",
+            lambda *args: _get_time_dataset(3).chunk({"time": 1}),
+        )
+        monkeypatch.setattr(
+            handler,
+            "load_segment",
+            lambda ds, names: prefetch.load_segment(ds, names, max_bytes=8),
+        )
+
+        ds = var_handler._open_segment({"CLOUD": ["CLOUD_185001_185912.nc"]}, 0, "time")
+
+        assert ds["CLOUD"].chunks is not None
+
+
+HYBRID_LEVELS: VarHandler.Levels = {
+    "name": "standard_hybrid_sigma",
+    "units": "1",
+    "e3sm_axis_name": "lev",
+    "e3sm_axis_bnds": "ilev",
+    "time_name": None,
+}
+
+
+class TestGetOutputData:
+    def test_evaluates_compiled_formula(self, monkeypatch):
+        ds = _get_time_dataset(3)
+        ds["PRECC"] = ds["CLOUD"] * 2.0
+        ds["PRECL"] = ds["CLOUD"] * 3.0
+        var_handler = VarHandler(
+            name="pr",
+            units="kg m-2 s-1",
+            raw_variables=["PRECC", "PRECL"],
+            table="CMIP6_Amon.json",
+            formula="(PRECC + PRECL) * 1000.0",
+        )
+        # The formula method is only used if the formula can't be compiled.
+        monkeypatch.setattr(var_handler, "formula_method", None)
+
+        result = var_handler._get_output_data(ds, np.dtype("float32"))
+
+        expected = ((ds["PRECC"] + ds["PRECL"]) * 1000.0).fillna(FILL_VALUE)
+        assert result.dtype == np.float32
+        np.testing.assert_array_equal(result, expected.values.astype(np.float32))
+
+    def test_evaluates_unit_conversion_in_float32_if_input_is_stored_as_float32(
+        self, monkeypatch
+    ):
+        ds = _get_time_dataset(3)
+        ds["CLOUD"].encoding["dtype"] = np.dtype("float32")
+        var_handler = VarHandler(
+            name="clt",
+            units="%",
+            raw_variables=["CLOUD"],
+            table="CMIP6_Amon.json",
+            unit_conversion="1-to-%",
+        )
+        monkeypatch.setattr(handler._formulas, "convert_units", None)
+
+        result = var_handler._get_output_data(ds, np.dtype("float32"))
+
+        expected = (ds["CLOUD"].astype(np.float32) * 100.0).fillna(FILL_VALUE)
+        assert result.dtype == np.float32
+        np.testing.assert_array_equal(result, expected.values)
+
+    def test_keeps_dtype_of_output_data_without_output_dtype(self):
+        ds = _get_time_dataset(3)
+        var_handler = VarHandler(
+            name="cl", units="%", raw_variables=["CLOUD"], table="CMIP6_Amon.json"
+        )
+
+        result = var_handler._get_output_data(ds)
+
+        assert result.dtype == np.float64
+        np.testing.assert_array_equal(result, ds["CLOUD"].fillna(FILL_VALUE).values)
+
+    def test_uses_formula_method_if_formula_is_not_compiled(self):
+        ds = _get_time_dataset(3).rename({"CLOUD": "FLUT"})
+        var_handler = VarHandler(
+            name="rlut",
+            units="W m-2",
+            raw_variables=["FLUT"],
+            table="CMIP6_Amon.json",
+            formula="FSNTOA - FSNT + FLNT",
+        )
+
+        result = var_handler._get_output_data(ds, np.dtype("float32"))
+
+        expected = ds["FLUT"].fillna(FILL_VALUE).values.astype(np.float32)
+        assert result.dtype == np.float32
+        np.testing.assert_array_equal(result, expected)
+
+
+def _write_history_file(path: str, num_times: int = 4):
+    """Writes a multi-variable E3SM history file with hybrid sigma levels."""
+    ds = _get_time_dataset(num_times)
+    ds["lev"] = ("lev", [100.0, 500.0])
+    ds["CLOUD"] = ds["CLOUD"].expand_dims(lev=ds["lev"], axis=1).astype("float32")
+    ds["T"] = ds["CLOUD"] + 200
+    ds["hyam"] = ("lev", [0.1, 0.2])
+    ds["gw"] = ("lat", [0.5, 0.5])
+    ds["lat"] = ("lat", [-45.0, 45.0], {"bounds": "lat_bnds"})
+    ds["lat_bnds"] = (("lat", "nbnd"), [[-90.0, 0.0], [0.0, 90.0]])
+    ds["lon"] = ("lon", [0.0, 120.0, 240.0])
+    ds["time"].attrs["bounds"] = "time_bnds"
+
+    ds.to_netcdf(path, encoding={"CLOUD": {"chunksizes": (2, 2, 2, 3)}})
+
+
+class TestOpenMfdataset:
+    def test_get_input_vars_includes_hybrid_sigma_inputs(self):
+        cl = VarHandler(
+            name="cl",
+            units="%",
+            raw_variables=["CLOUD", "PS"],
+            table="CMIP6_Amon.json",
+            levels=HYBRID_LEVELS,
+        )
+        tas = VarHandler(
+            name="tas", units="K", raw_variables=["TREFHT"], table="CMIP6_Amon.json"
+        )
+
+        assert cl._get_input_vars() == ["CLOUD", "PS", "hyam", "hybm", "hyai", "hybi"]
+        assert tas._get_input_vars() == ["TREFHT"]
+
+    def test_reads_layout_of_input_files(self, tmp_path):
+        path = str(tmp_path / "history.nc")
+        _write_history_file(path)
+
+        layout = _read_input_layout([path, path], ["CLOUD", "PS", "hyam", "hyai"])
+
+        assert layout.names == {
+            "CLOUD",
+            "PS",
+            "hyam",
+            "time",
+            "time_bnds",
+            "lat",
+            "lat_bnds",
+            "lon",
+            "lev",
+        }
+        assert layout.drop_variables == ["T", "gw"]
+        # One time step of CLOUD (2 x 2 x 3 float32) and PS (2 x 3 float64).
+        assert layout.step_bytes == 2 * 2 * 3 * 4 + 2 * 3 * 8
+        assert layout.time_chunk == 2
+
+    def test_get_time_chunks_fits_time_slab_in_multiple_of_disk_chunks(
+        self, monkeypatch
+    ):
+        monkeypatch.setattr(handler, "TIME_SLAB_BYTES", 1000)
+
+        assert _get_time_chunks(InputLayout(step_bytes=100, time_chunk=4)) == {
+            "time": 8
+        }
+        assert _get_time_chunks(InputLayout(step_bytes=600, time_chunk=4)) == {
+            "time": 4
+        }
+        assert _get_time_chunks(InputLayout(step_bytes=0)) == {}
+
+    def test_opens_only_data_variables_chunked_along_time(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "history.nc")
+        _write_history_file(path)
+        monkeypatch.setattr(handler, "TIME_SLAB_BYTES", 1)
+
+        ds = VarHandler._open_mfdataset({"CLOUD": [path]}, 0, ["CLOUD"])
+
+        assert "T" not in ds
+        assert "gw" not in ds
+        assert "time_bnds" in ds
+        assert ds["CLOUD"].chunksizes["time"] == (2, 2)
+
+
+class TestGetGridDescriptor:
+    def test_reuses_bounds_of_the_same_grid_across_time_segments(self, tmp_path):
+        cache = GridCache(str(tmp_path))
+        handler = VarHandler(
+            name="tas", units="K", raw_variables=["TREFHT"], table="CMIP6_Amon.json"
+        )
+        lat = [-45.0, 45.0]
+        ds = xr.Dataset(
+            {"lat_bnds": (("lat", "nbnd"), [[-90.0, 0.0], [0.0, 90.0]])},
+            coords={"lat": lat, "lon": [0.0, 180.0]},
+        )
+        ds["lon_bnds"] = (("lon", "nbnd"), [[-90.0, 90.0], [90.0, 270.0]])
+
+        first = handler._get_grid_descriptor(ds, cache)
+        # The bounds of the next time segment are not read again.
+        second = handler._get_grid_descriptor(ds.drop_vars("lat_bnds"), cache)
+
+        assert second is first
+        np.testing.assert_array_equal(second["lat_bnds"], ds["lat_bnds"].values)
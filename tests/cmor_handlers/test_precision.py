@@ -0,0 +1,120 @@
+import numpy as np
+import xarray as xr
+
+from e3sm_to_cmip.cmor_handlers import precision
+
+
+def _get_dataset(values: dict[str, np.ndarray]) -> xr.Dataset:
+    return xr.Dataset(
+        {name: (("time", "lat"), data) for name, data in values.items()},
+    )
+
+
+def test_get_output_dtype_returns_dtype_of_table_type():
+    assert precision.get_output_dtype("real") == np.float32
+    assert precision.get_output_dtype("double") == np.float64
+    assert precision.get_output_dtype(None) is None
+    assert precision.get_output_dtype("character") is None
+
+
+def test_get_output_dtype_does_not_support_integer_type():
+    # The missing values of the output data don't fit in an integer type.
+    assert precision.get_output_dtype("integer") is None
+
+
+class TestIsLosslessFloat32:
+    def test_returns_true_if_variable_is_stored_as_float32_or_smaller(self):
+        var = xr.DataArray(np.ones(3))
+
+        var.encoding = {"dtype": np.dtype("float32")}
+        assert precision.is_lossless_float32(var)
+
+        var.encoding = {"dtype": np.dtype("int16"), "_FillValue": -999}
+        assert precision.is_lossless_float32(var)
+
+    def test_returns_false_if_variable_is_stored_as_double_or_packed(self):
+        var = xr.DataArray(np.ones(3))
+        assert not precision.is_lossless_float32(var)
+
+        var.encoding = {"dtype": np.dtype("float64")}
+        assert not precision.is_lossless_float32(var)
+
+        var.encoding = {"dtype": np.dtype("int32")}
+        assert not precision.is_lossless_float32(var)
+
+        var.encoding = {"dtype": np.dtype("int16"), "scale_factor": 0.1}
+        assert not precision.is_lossless_float32(var)
+
+
+class TestGetFloat32Inputs:
+    def test_casts_variables_stored_as_float32(self):
+        ds = _get_dataset({"A": np.ones((2, 3)), "B": np.ones((2, 3))})
+        ds["A"].encoding["dtype"] = np.dtype("float32")
+        ds["B"].encoding["dtype"] = np.dtype("float32")
+
+        def evaluate(ds):
+            raise AssertionError("The error is only checked for lossy casts.")
+
+        result = precision.get_float32_inputs(ds, ["A", "B"], evaluate)
+
+        assert result["A"].dtype == np.float32
+        assert result["B"].dtype == np.float32
+
+    def test_casts_double_variables_if_error_is_within_budget(self):
+        rng = np.random.default_rng(0)
+        ds = _get_dataset({"A": rng.random((2, 3)), "B": rng.random((2, 3))})
+
+        result = precision.get_float32_inputs(
+            ds, ["A", "B"], lambda ds: ds["A"] + ds["B"]
+        )
+
+        assert result["A"].dtype == np.float32
+        assert result["B"].dtype == np.float32
+
+    def test_keeps_double_variables_if_error_exceeds_budget(self):
+        rng = np.random.default_rng(0)
+        b = rng.random((2, 3)) + 1.0
+        ds = _get_dataset({"A": b + rng.random((2, 3)) * 1e-9, "B": b})
+
+        # The difference cancels all the float32 digits of the raw variables.
+        result = precision.get_float32_inputs(
+            ds, ["A", "B"], lambda ds: ds["A"] - ds["B"]
+        )
+
+        assert result["A"].dtype == np.float64
+        assert result["B"].dtype == np.float64
+
+
+class TestGetFloat32Vars:
+    def test_returns_lossless_and_lossy_variables_within_budget(self):
+        rng = np.random.default_rng(0)
+        ds = _get_dataset({"A": rng.random((2, 3)), "B": rng.random((2, 3))})
+        ds["A"].encoding["dtype"] = np.dtype("float32")
+
+        result = precision.get_float32_vars(
+            ds, ["A", "B", "C"], lambda ds: ds["A"] + ds["B"]
+        )
+
+        assert result == ["A", "B"]
+
+    def test_returns_lossless_variables_if_error_exceeds_budget(self):
+        rng = np.random.default_rng(0)
+        b = rng.random((2, 3)) + 1.0
+        ds = _get_dataset({"A": b + rng.random((2, 3)) * 1e-9, "B": b})
+        ds["C"] = ds["B"].copy()
+        ds["C"].encoding["dtype"] = np.dtype("float32")
+
+        result = precision.get_float32_vars(
+            ds, ["A", "B", "C"], lambda ds: ds["A"] - ds["B"]
+        )
+
+        assert result == ["C"]
+
+
+def test_get_ulp_error_is_relative_to_largest_magnitude_of_reference():
+    reference = np.array([1.0, 2.0, np.nan])
+    ulp = float(np.spacing(np.float32(2.0)))
+
+    assert precision.get_ulp_error(reference, reference) == 0.0
+    assert precision.get_ulp_error(reference + [3 * ulp, 0, 0], reference) == 3.0
+    assert precision.get_ulp_error(np.array([np.nan, 2.0, 0]), reference) == np.inf
@@ -0,0 +1,108 @@
+import json
+import pickle
+import sys
+
+from e3sm_to_cmip.cmor_handlers.registry import (
+    HandlerRegistry,
+    LazyHandle,
+    _read_module_attrs,
+)
+
+
+class TestReadModuleAttrs:
+    def test_reads_literal_attrs_without_importing_module(self, tmp_path):
+        module_path = tmp_path / "fake_var.py"
+        module_path.write_text(
+            "import not_an_installed_package\n"
+            'RAW_VARIABLES = [str("area")]\n'
+            'VAR_NAME = str("fake")\n'
+            'VAR_UNITS = "m2"\n'
+            'TABLE = "CMIP6_fx.json"\n'
+            'LEVELS = {"name": "sdepth", "units": "m"}\n'
+        )
+
+        result = _read_module_attrs(str(module_path))
+
+        assert result == {
+            "RAW_VARIABLES": ["area"],
+            "VAR_NAME": "fake",
+            "VAR_UNITS": "m2",
+            "TABLE": "CMIP6_fx.json",
+            "LEVELS": {"name": "sdepth", "units": "m"},
+        }
+        assert "fake_var" not in sys.modules
+
+    def test_returns_none_if_attrs_are_not_literals(self, tmp_path):
+        module_path = tmp_path / "fake_var.py"
+        module_path.write_text(
+            'RAW_VARIABLES = ["area"]\n'
+            'VAR_NAME = "fake"\n'
+            "VAR_UNITS = get_units()\n"
+            'TABLE = "CMIP6_fx.json"\n'
+        )
+
+        assert _read_module_attrs(str(module_path)) is None
+
+
+class TestLazyHandle:
+    def test_imports_module_on_first_call_and_is_picklable(self, tmp_path):
+        module_path = tmp_path / "lazy_var.py"
+        module_path.write_text("def handle(value):\n    return value * 2\n")
+
+        handle = LazyHandle("lazy_var", str(module_path))
+        assert "lazy_var" not in sys.modules
+
+        handle = pickle.loads(pickle.dumps(handle))
+
+        assert handle.__name__ == "handle"
+        assert handle(2) == 4
+        assert "lazy_var" in sys.modules
+
+        del sys.modules["lazy_var"]
+
+
+class TestHandlerRegistry:
+    def test_get_handlers_does_not_import_handler_modules(self):
+        registry = HandlerRegistry.build()
+
+        orog = registry.get_handlers("orog")
+        so = registry.get_mpas_handler("so")
+
+        assert orog is not None and so is not None
+        assert orog[0]["raw_variables"] == ["PHIS"]
+        assert so["raw_variables"] == ["MPASO", "MPAS_mesh", "MPAS_map"]
+        assert isinstance(orog[0]["method"], LazyHandle)
+        assert registry.get_handlers("not_a_var") is None
+        assert registry.get_raw_variables("pr") >= {"PRECT"}
+
+    def test_loads_cached_registry_until_handler_files_change(self, tmp_path):
+        cache_path = str(tmp_path / "handler_registry.json")
+        HandlerRegistry.load_or_build(cache_path)
+
+        with open(cache_path, "r") as infile:
+            contents = json.load(infile)
+
+        contents["mpas_handlers"] = {}
+        with open(cache_path, "w") as outfile:
+            json.dump(contents, outfile)
+
+        registry = HandlerRegistry.load_or_build(cache_path)
+        assert registry.get_mpas_handler("so") is None
+
+        # A handler file with a different modification time invalidates the
+        # cached registry.
+        contents["fingerprint"] = {
+            path: mtime + 1 for path, mtime in contents["fingerprint"].items()
+        }
+        with open(cache_path, "w") as outfile:
+            json.dump(contents, outfile)
+
+        registry = HandlerRegistry.load_or_build(cache_path)
+        assert registry.get_mpas_handler("so") is not None
+
+    def test_returned_handlers_do_not_share_state_with_registry(self):
+        registry = HandlerRegistry.build()
+
+        registry.get_handlers("tas")[0]["raw_variables"].append("PS")  # type: ignore
+
+        assert registry.get_handlers("tas")[0]["raw_variables"] == ["TREFHT"]  # type: ignore
@@ -0,0 +1,74 @@
+from e3sm_to_cmip.cmor_handlers.handler import VarHandler
+from e3sm_to_cmip.cmor_handlers.segments import split_into_segments
+
+
+class TestSplitIntoSegments:
+    def setup_method(self):
+        self.handler = VarHandler(
+            name="rlut",
+            units="W m-2",
+            table="CMIP6_Amon.json",
+            raw_variables=["FSNTOA", "FLNT"],
+            formula="FSNTOA - FSNT + FLNT",
+        ).to_dict()
+
+    def test_splits_handler_into_one_job_per_segment(self):
+        vars_to_filepaths = {
+            "FSNTOA": ["FSNTOA_186001_186912.nc", "FSNTOA_185001_185912.nc"],
+            "FLNT": ["FLNT_185001_185912.nc", "FLNT_186001_186912.nc"],
+        }
+
+        result = split_into_segments(self.handler, vars_to_filepaths)
+
+        assert len(result) == 2
+
+        job, filepaths = result[0]
+        assert job["name"] == "rlut#0"
+        assert job["parent"] == "rlut"
+        assert job["segment"] == 0
+        assert job["num_segments"] == 2
+        assert job["method"].keywords == {"segment": 0}
+        assert filepaths == {
+            "FSNTOA": ["FSNTOA_185001_185912.nc"],
+            "FLNT": ["FLNT_185001_185912.nc"],
+        }
+
+        job, filepaths = result[1]
+        assert job["name"] == "rlut#1"
+        assert filepaths == {
+            "FSNTOA": ["FSNTOA_186001_186912.nc"],
+            "FLNT": ["FLNT_186001_186912.nc"],
+        }
+
+    def test_does_not_split_handler_with_a_single_segment(self):
+        vars_to_filepaths = {
+            "FSNTOA": ["FSNTOA_185001_185912.nc"],
+            "FLNT": ["FLNT_185001_185912.nc"],
+        }
+
+        result = split_into_segments(self.handler, vars_to_filepaths)
+
+        assert result == [(self.handler, vars_to_filepaths)]
+
+    def test_does_not_split_handler_with_different_number_of_files(self):
+        vars_to_filepaths = {
+            "FSNTOA": ["FSNTOA_185001_185912.nc", "FSNTOA_186001_186912.nc"],
+            "FLNT": ["FLNT_185001_185912.nc"],
+        }
+
+        result = split_into_segments(self.handler, vars_to_filepaths)
+
+        assert result == [(self.handler, vars_to_filepaths)]
+
+    def test_does_not_split_legacy_handler(self):
+        def handle(*args):
+            return True
+
+        handler = {"name": "pr", "raw_variables": ["PRECC"], "method": handle}
+        vars_to_filepaths = {
+            "PRECC": ["PRECC_185001_185912.nc", "PRECC_186001_186912.nc"]
+        }
+
+        result = split_into_segments(handler, vars_to_filepaths)
+
+        assert result == [(handler, vars_to_filepaths)]
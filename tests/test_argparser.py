@@ -0,0 +1,38 @@
+import argparse
+
+import pytest
+
+from e3sm_to_cmip.argparser import _parse_memory_size
+
+
+class TestParseMemorySize:
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("64G", 64 * 1024**3),
+            ("64g", 64 * 1024**3),
+            ("512M", 512 * 1024**2),
+            ("512MB", 512 * 1024**2),
+            ("512MiB", 512 * 1024**2),
+            ("1.5T", int(1.5 * 1024**4)),
+            ("2K", 2048),
+            ("100B", 100),
+            (" 8G ", 8 * 1024**3),
+        ],
+    )
+    def test_parses_sizes_with_units(self, value, expected):
+        assert _parse_memory_size(value) == expected
+
+    def test_parses_bare_numbers_as_bytes(self):
+        assert _parse_memory_size("1024") == 1024
+        assert _parse_memory_size("1e6") == 1000000
+
+    @pytest.mark.parametrize("value", ["", "G", "64X", "64 GB GB", "sixty", "B"])
+    def test_raises_error_for_invalid_sizes(self, value):
+        with pytest.raises(argparse.ArgumentTypeError, match="invalid memory size"):
+            _parse_memory_size(value)
+
+    @pytest.mark.parametrize("value", ["0", "0G", "-1G"])
+    def test_raises_error_for_sizes_that_are_not_positive(self, value):
+        with pytest.raises(argparse.ArgumentTypeError, match="must be positive"):
+            _parse_memory_size(value)
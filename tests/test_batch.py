@@ -0,0 +1,98 @@
+import pytest
+
+from e3sm_to_cmip.argparser import parse_args
+from e3sm_to_cmip.batch import get_case_args, load_manifest
+
+
+class TestLoadManifest:
+    def test_merges_defaults_into_each_case(self, tmp_path):
+        manifest = tmp_path / "manifest.yaml"
+        manifest.write_text(
+            "defaults:\n"
+            "  tables_path: /tables\n"
+            "  user_metadata: /metadata.json\n"
+            "  output_path: /output\n"
+            "cases:\n"
+            "  - case: hist atm\n"
+            "    input_path: /rgr\n"
+            "    var_list: [tas, pr]\n"
+            "  - realm: fx\n"
+            "    input_path: /fixed\n"
+            "    var_list: [orog]\n"
+            "    output_path: /output_fx\n"
+        )
+
+        cases = load_manifest(str(manifest))
+
+        assert [label for label, _ in cases] == ["hist atm", "case 2"]
+        assert cases[0][1] == {
+            "tables_path": "/tables",
+            "user_metadata": "/metadata.json",
+            "output_path": "/output",
+            "input_path": "/rgr",
+            "var_list": ["tas", "pr"],
+        }
+        assert cases[1][1]["output_path"] == "/output_fx"
+        assert cases[1][1]["realm"] == "fx"
+
+    def test_accepts_list_of_cases(self, tmp_path):
+        manifest = tmp_path / "manifest.yaml"
+        manifest.write_text("- input_path: /rgr\n  var_list: [tas]\n")
+
+        assert load_manifest(str(manifest)) == [
+            ("case 1", {"input_path": "/rgr", "var_list": ["tas"]})
+        ]
+
+    @pytest.mark.parametrize(
+        "setting", ["num_proc: 4", "max_memory: 64G", "serial: true", "info: true"]
+    )
+    def test_raises_error_for_pool_or_unsupported_settings(self, tmp_path, setting):
+        manifest = tmp_path / "manifest.yaml"
+        manifest.write_text(f"cases:\n  - var_list: [tas]\n    {setting}\n")
+
+        with pytest.raises(ValueError):
+            load_manifest(str(manifest))
+
+    def test_raises_error_without_cases(self, tmp_path):
+        manifest = tmp_path / "manifest.yaml"
+        manifest.write_text("defaults:\n  realm: atm\n")
+
+        with pytest.raises(ValueError):
+            load_manifest(str(manifest))
+
+
+def test_get_case_args_converts_settings_to_cli_arguments():
+    args = get_case_args(
+        {
+            "input_path": "/rgr",
+            "output_path": "/output",
+            "tables_path": "/tables",
+            "user_metadata": "/metadata.json",
+            "var_list": ["tas", "pr"],
+            "freq": "day",
+            "fuse_handlers": True,
+            "resume": False,
+        }
+    )
+
+    assert args == [
+        "--input-path",
+        "/rgr",
+        "--output-path",
+        "/output",
+        "--tables-path",
+        "/tables",
+        "--user-metadata",
+        "/metadata.json",
+        "--var-list",
+        "tas",
+        "pr",
+        "--freq",
+        "day",
+        "--fuse-handlers",
+    ]
+
+    parsed_args = parse_args(args)
+    assert parsed_args.var_list == ["tas", "pr"]
+    assert parsed_args.fuse_handlers
+    assert not parsed_args.resume
@@ -0,0 +1,148 @@
+import os
+
+import pytest
+
+from e3sm_to_cmip.catalog import InputCatalog, _scan_files, get_catalog_path
+
+
+class TestInputCatalog:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.input_path = tmp_path / "input"
+        self.input_path.mkdir()
+
+        filenames = [
+            "PS_186001_186912.nc",
+            "PS_185001_185912.nc",
+            "PSL_185001_185912.nc",
+            "so4_a1_CLXF_185001_185912.nc",
+            "v2.LR.mpaso.hist.am.timeSeriesStatsMonthly.1850-02-01.nc",
+            "v2.LR.mpaso.hist.am.timeSeriesStatsMonthly.1850-01-01.nc",
+            "v2.LR.mpaso.rst.1851-01-01_00000.nc",
+            "mpaso_in",
+            "EC30to60E2r2_mocBasinsAndTransects20210623.nc",
+            "README.txt",
+        ]
+        for filename in filenames:
+            (self.input_path / filename).touch()
+
+    def test_maps_time_series_vars_to_sorted_files(self):
+        catalog = InputCatalog.build(str(self.input_path))
+
+        assert catalog.get_var_files("PS") == [
+            str(self.input_path / "PS_185001_185912.nc"),
+            str(self.input_path / "PS_186001_186912.nc"),
+        ]
+        assert catalog.get_var_files("PSL") == [
+            str(self.input_path / "PSL_185001_185912.nc")
+        ]
+        assert catalog.get_var_files("so4_a1_CLXF") == [
+            str(self.input_path / "so4_a1_CLXF_185001_185912.nc")
+        ]
+        assert catalog.get_var_files("TS") == []
+
+    def test_returns_all_nc_files(self):
+        catalog = InputCatalog.build(str(self.input_path))
+
+        assert len(catalog.get_nc_files()) == 8
+        assert str(self.input_path / "README.txt") not in catalog.get_nc_files()
+
+    def test_maps_mpas_components_to_files(self):
+        catalog = InputCatalog.build(str(self.input_path))
+
+        assert catalog.get_mpas_files("MPASO") == [
+            str(
+                self.input_path
+                / "v2.LR.mpaso.hist.am.timeSeriesStatsMonthly.1850-01-01.nc"
+            ),
+            str(
+                self.input_path
+                / "v2.LR.mpaso.hist.am.timeSeriesStatsMonthly.1850-02-01.nc"
+            ),
+        ]
+        assert catalog.get_mpas_files("MPAS_mesh") == str(
+            self.input_path / "v2.LR.mpaso.rst.1851-01-01_00000.nc"
+        )
+        assert catalog.get_mpas_files("MPASO_namelist") == str(
+            self.input_path / "mpaso_in"
+        )
+        assert catalog.get_mpas_files("MPASO_MOC_regions") == str(
+            self.input_path / "EC30to60E2r2_mocBasinsAndTransects20210623.nc"
+        )
+        assert catalog.get_mpas_files("PS") == catalog.get_var_files("PS")
+
+    def test_raises_error_if_mpas_component_is_not_found(self):
+        catalog = InputCatalog.build(str(self.input_path))
+
+        with pytest.raises(IOError):
+            catalog.get_mpas_files("MPASSI")
+
+        with pytest.raises(ValueError):
+            catalog.get_mpas_files("MPAS_map")
+
+        with pytest.raises(ValueError):
+            catalog.get_mpas_files("invalid_var")
+
+    def test_saves_and_loads_catalog_in_cache_directory(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        catalog = InputCatalog.load_or_build(str(self.input_path), cache_dir=cache_dir)
+
+        # The catalog is not written to the input directory (e.g., a read-only
+        # archive).
+        assert os.path.exists(get_catalog_path(str(self.input_path), cache_dir))
+        assert len(os.listdir(self.input_path)) == 10
+
+        loaded = InputCatalog._load(
+            str(self.input_path), _scan_files(str(self.input_path)), cache_dir
+        )
+
+        assert loaded is not None
+        assert loaded.get_var_files("PS") == catalog.get_var_files("PS")
+        assert loaded.get_nc_files() == catalog.get_nc_files()
+
+    def test_catalog_is_invalidated_when_files_are_added(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        InputCatalog.load_or_build(str(self.input_path), cache_dir=cache_dir)
+
+        (self.input_path / "TS_185001_185912.nc").touch()
+
+        assert (
+            InputCatalog._load(
+                str(self.input_path), _scan_files(str(self.input_path)), cache_dir
+            )
+            is None
+        )
+
+        catalog = InputCatalog.load_or_build(str(self.input_path), cache_dir=cache_dir)
+
+        assert catalog.get_var_files("TS") == [
+            str(self.input_path / "TS_185001_185912.nc")
+        ]
+
+    def test_catalog_is_invalidated_when_a_file_is_rewritten_in_place(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        InputCatalog.load_or_build(str(self.input_path), cache_dir=cache_dir)
+        dir_stat = os.stat(self.input_path)
+
+        # Rewriting a file doesn't change the modification time of the
+        # directory.
+        (self.input_path / "PS_185001_185912.nc").write_bytes(b"0" * 100)
+        os.utime(self.input_path, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+
+        catalog = InputCatalog.load_or_build(str(self.input_path), cache_dir=cache_dir)
+
+        assert catalog.get_total_bytes(catalog.get_var_files("PS")[:1]) == 100
+
+    def test_catalogs_of_input_directories_are_stored_separately(self, tmp_path):
+        assert get_catalog_path(str(self.input_path)) != get_catalog_path(str(tmp_path))
+
+    def test_gets_total_bytes_of_files(self, tmp_path):
+        (self.input_path / "TS_185001_185912.nc").write_bytes(b"0" * 100)
+        other_file = tmp_path / "map.nc"
+        other_file.write_bytes(b"0" * 10)
+
+        catalog = InputCatalog.build(str(self.input_path))
+
+        assert catalog.get_total_bytes(catalog.get_var_files("TS")) == 100
+        assert catalog.get_total_bytes(str(other_file)) == 10
+        assert catalog.get_total_bytes(str(tmp_path / "missing.nc")) == 0
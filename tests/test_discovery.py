@@ -0,0 +1,79 @@
+import netCDF4
+import numpy as np
+import pytest
+
+from e3sm_to_cmip.discovery import discover_e3sm_vars
+
+
+def _write_time_series_file(path, var: str, extra_vars: list[str] | None = None):
+    with netCDF4.Dataset(path, "w") as ds:
+        ds.createDimension("time", None)
+        ds.createDimension("lat", 2)
+        ds.createDimension("nbnd", 2)
+
+        ds.createVariable("time", "f8", ("time",))
+        lat = ds.createVariable("lat", "f8", ("lat",))
+        lat[:] = np.array([-45.0, 45.0])
+        ds.createVariable("time_bnds", "f8", ("time", "nbnd"))
+
+        area = ds.createVariable("area", "f8", ("lat",))
+        area[:] = np.array([1.0, 1.0])
+
+        data = ds.createVariable(var, "f4", ("time", "lat"))
+        data.coordinates = "area"
+
+        for extra_var in extra_vars or []:
+            ds.createVariable(extra_var, "f4", ("time", "lat"))
+
+
+class TestDiscoverE3SMVars:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.input_path = tmp_path / "input"
+        self.input_path.mkdir()
+
+        for var in ["PRECC", "PRECL", "TS"]:
+            for years in ["185001_185912", "186001_186912"]:
+                _write_time_series_file(self.input_path / f"{var}_{years}.nc", var)
+
+    def test_returns_data_vars_excluding_coordinates(self):
+        result = discover_e3sm_vars(str(self.input_path))
+
+        assert result.variables == {"PRECC", "PRECL", "TS", "time_bnds"}
+        assert result.files_total == 6
+        assert not result.stopped_early
+
+    def test_reads_one_header_per_time_series_prefix(self):
+        result = discover_e3sm_vars(str(self.input_path))
+
+        assert result.files_scanned == 3
+
+    def test_reads_every_file_that_is_not_a_time_series(self):
+        _write_time_series_file(self.input_path / "eam.h0.0001-01.nc", "T", ["Q"])
+        _write_time_series_file(self.input_path / "eam.h0.0001-02.nc", "T", ["U"])
+
+        result = discover_e3sm_vars(str(self.input_path))
+
+        assert {"T", "Q", "U"}.issubset(result.variables)
+        assert result.files_scanned == 5
+
+    def test_stops_early_once_required_vars_are_found(self):
+        result = discover_e3sm_vars(
+            str(self.input_path), required_vars=["PRECC"], num_threads=1
+        )
+
+        assert "PRECC" in result.variables
+        assert "TS" not in result.variables
+        # A second read may already be in flight when the required variable is
+        # found.
+        assert result.files_scanned < 3
+        assert result.stopped_early
+
+    def test_scans_all_headers_if_required_vars_are_missing(self):
+        result = discover_e3sm_vars(
+            str(self.input_path), required_vars=["PRECC", "PRECT"], num_threads=1
+        )
+
+        assert result.variables == {"PRECC", "PRECL", "TS", "time_bnds"}
+        assert result.files_scanned == 3
+        assert not result.stopped_early
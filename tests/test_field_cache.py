@@ -0,0 +1,144 @@
+import pickle
+import uuid
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from e3sm_to_cmip.field_cache import FieldCache, get_cached_fields, get_field_key
+
+
+@pytest.fixture
+def cache():
+    return FieldCache(uuid.uuid4().hex, max_bytes=200)
+
+
+def _get_dataset(time: list[float], ps: float = 1e5) -> xr.Dataset:
+    return xr.Dataset(
+        {
+            "PS": (("time", "lat"), np.full((len(time), 3), ps)),
+            "hyam": (("lev",), np.array([0.1, 0.2])),
+            "T": (("time", "lev", "lat"), np.ones((len(time), 2, 3))),
+        },
+        coords={"time": time, "lat": [-45.0, 0.0, 45.0], "lev": [500.0, 900.0]},
+    )
+
+
+class TestFieldCache:
+    def test_gets_stored_field(self, cache):
+        values = cache.put("PS-a", np.ones(4))
+
+        assert cache.get("PS-a") is values
+        assert cache.get("PS-b") is None
+        assert cache.stats.hits == 1
+        assert cache.stats.bytes_hit == 32
+
+        with pytest.raises(ValueError):
+            values[0] = 0.0
+
+    def test_evicts_least_recently_used_fields_under_max_bytes(self, cache):
+        cache.put("PS-a", np.ones(10))
+        cache.put("PS-b", np.ones(10))
+        cache.get("PS-a")
+        cache.put("PS-c", np.ones(10))
+
+        assert cache.get("PS-b") is None
+        assert cache.get("PS-a") is not None
+        assert cache.get("PS-c") is not None
+        assert cache.nbytes == 160
+        assert cache.stats.evictions == 1
+
+    def test_does_not_store_fields_larger_than_max_bytes(self, cache):
+        cache.put("PS-a", np.ones(10))
+        cache.put("PS-b", np.ones(100))
+
+        assert cache.get("PS-a") is not None
+        assert cache.get("PS-b") is None
+
+    def test_loads_field_once(self, cache):
+        calls = []
+
+        def load():
+            calls.append(1)
+            return np.ones(4)
+
+        first = cache.get_or_load("PS-a", load)
+        second = cache.get_or_load("PS-a", load)
+
+        assert first is second
+        assert len(calls) == 1
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    def test_keeps_fields_in_each_process(self, cache):
+        cache.put("PS-a", np.ones(4))
+
+        # Only the name and max bytes are pickled to the worker processes,
+        # which share the fields of the cache's name in each process.
+        worker_cache = pickle.loads(pickle.dumps(cache))
+
+        assert worker_cache.__dict__ == cache.__dict__
+        assert worker_cache.get("PS-a") is cache.get("PS-a")
+        assert FieldCache(uuid.uuid4().hex).get("PS-a") is None
+
+
+class TestGetFieldKey:
+    def test_returns_same_key_for_same_coordinates(self):
+        ds = _get_dataset([0.5, 1.5])
+
+        assert get_field_key(ds, "PS") == get_field_key(_get_dataset([0.5, 1.5]), "PS")
+        assert get_field_key(ds, "hyam") == get_field_key(_get_dataset([2.5]), "hyam")
+
+    def test_returns_different_keys_for_different_time_ranges_or_fields(self):
+        ds = _get_dataset([0.5, 1.5])
+        key = get_field_key(ds, "PS")
+
+        assert get_field_key(_get_dataset([2.5, 3.5]), "PS") != key
+        assert get_field_key(ds.isel(time=slice(0, 1)), "PS") != key
+        assert get_field_key(ds.astype("float32"), "PS") != key
+        assert get_field_key(ds, "hyam") != key
+
+
+class TestGetCachedFields:
+    def test_reads_lazy_fields_once_per_time_range(self, cache):
+        cache.max_bytes = 1024
+
+        # The same fields are stored in the input files of other variables.
+        first = get_cached_fields(cache, _get_dataset([0.5, 1.5]).chunk(), ["PS"])
+        second = get_cached_fields(
+            cache, _get_dataset([0.5, 1.5], ps=0.0).chunk(), ["PS", "hyai"]
+        )
+
+        assert first["PS"].chunks is None
+        assert second["PS"].values is first["PS"].values
+        assert second["T"].chunks is not None
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+        other = get_cached_fields(cache, _get_dataset([2.5, 3.5]).chunk(), ["PS"])
+        assert other["PS"].values is not first["PS"].values
+
+    def test_keeps_attributes_and_encoding(self, cache):
+        ds = _get_dataset([0.5]).chunk()
+        ds["PS"].attrs["units"] = "Pa"
+        ds["PS"].encoding["dtype"] = np.dtype("float32")
+
+        result = get_cached_fields(cache, ds, ["PS"])
+
+        assert result["PS"].attrs == {"units": "Pa"}
+        assert result["PS"].encoding["dtype"] == np.float32
+
+    def test_leaves_fields_larger_than_max_bytes_lazy(self, cache):
+        # 100 time steps of "PS" are 2400 bytes, over the 200 byte budget.
+        ds = _get_dataset([float(t) for t in range(100)]).chunk({"time": 1})
+
+        result = get_cached_fields(cache, ds, ["PS"])
+
+        assert result["PS"].chunks is not None
+        assert cache.nbytes == 0
+        assert cache.stats.misses == 0
+
+    def test_skips_fields_in_memory(self, cache):
+        ds = _get_dataset([0.5])
+
+        assert get_cached_fields(cache, ds, ["PS", "hyam"]) is ds
+        assert get_cached_fields(None, ds.chunk(), ["PS"])["PS"].chunks is not None
+        assert cache.stats.misses == 0
@@ -0,0 +1,80 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from e3sm_to_cmip.grid_cache import GridCache, get_descriptor, get_key
+
+LAT = np.array([-45.0, 45.0])
+LON = np.array([0.0, 120.0, 240.0])
+
+
+def _compute_grid():
+    return {"lat": LAT, "lat_bnds": np.array([[-90.0, 0.0], [0.0, 90.0]])}
+
+
+class TestGetKey:
+    def test_returns_same_key_for_same_coordinates(self):
+        assert get_key("grid", [LAT, LON]) == get_key("grid", [LAT.copy(), LON])
+
+    def test_returns_different_keys_for_different_coordinates(self):
+        key = get_key("grid", [LAT, LON])
+
+        assert get_key("grid", [LAT, LON[:2]]) != key
+        assert get_key("grid", [LAT.astype("float32"), LON]) != key
+        assert get_key("hybrid", [LAT, LON]) != key
+        assert key.startswith("grid-")
+
+
+class TestGridCache:
+    def test_shares_descriptors_across_processes(self, tmp_path):
+        cache = GridCache(str(tmp_path / "grid_cache"))
+        key = get_key("grid", [LAT, LON])
+        cache.put(key, _compute_grid())
+
+        # Only the path is pickled to the worker processes.
+        worker_cache = pickle.loads(pickle.dumps(cache))
+        descriptor = worker_cache.get(key)
+
+        assert worker_cache._descriptors.keys() == {key}
+        assert isinstance(descriptor["lat_bnds"], np.memmap)
+        np.testing.assert_array_equal(
+            descriptor["lat_bnds"], _compute_grid()["lat_bnds"]
+        )
+
+        with pytest.raises(ValueError):
+            descriptor["lat"][0] = 0.0
+
+    def test_computes_descriptor_once(self, tmp_path):
+        cache = GridCache(str(tmp_path))
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return _compute_grid()
+
+        cache.get_or_compute("grid-a", compute)
+        GridCache(str(tmp_path)).get_or_compute("grid-a", compute)
+
+        assert len(calls) == 1
+
+    def test_keeps_descriptor_stored_first(self, tmp_path):
+        cache = GridCache(str(tmp_path))
+        cache.put("grid-a", {"lat": LAT})
+
+        GridCache(str(tmp_path)).put("grid-a", {"lat": LAT + 1})
+
+        np.testing.assert_array_equal(
+            GridCache(str(tmp_path)).get("grid-a")["lat"], LAT
+        )
+        assert os.listdir(tmp_path) == ["grid-a"]
+
+    def test_returns_none_for_missing_descriptor(self, tmp_path):
+        assert GridCache(str(tmp_path)).get("grid-a") is None
+
+
+def test_get_descriptor_computes_descriptor_without_cache():
+    descriptor = get_descriptor(None, "grid", [LAT], _compute_grid)
+
+    np.testing.assert_array_equal(descriptor["lat"], LAT)
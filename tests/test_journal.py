@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from e3sm_to_cmip.journal import JOURNAL_FILENAME, Journal, compute_checksum
+
+
+class TestJournal:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.output_path = tmp_path
+        self.output = tmp_path / "tas_Amon_185001-185912.nc"
+        self.output.write_bytes(b"cmorized data")
+        self.inputs = ["/input/TREFHT_185001_185912.nc"]
+
+    def test_records_unit_with_output_checksum(self):
+        journal = Journal(str(self.output_path))
+
+        assert journal.record("tas", self.inputs, str(self.output))
+
+        with open(self.output_path / JOURNAL_FILENAME) as infile:
+            entry = json.loads(infile.readline())
+
+        assert entry["handler"] == "tas"
+        assert entry["inputs"] == ["TREFHT_185001_185912.nc"]
+        assert entry["output"] == str(self.output)
+        assert entry["size"] == len(b"cmorized data")
+        assert entry["checksum"] == compute_checksum(str(self.output))
+
+    def test_resumed_journal_skips_completed_units(self):
+        Journal(str(self.output_path)).record("tas", self.inputs, str(self.output))
+
+        journal = Journal(str(self.output_path), resume=True)
+
+        assert journal.is_complete("tas", self.inputs)
+        assert not journal.is_complete("ts", self.inputs)
+        assert not journal.is_complete("tas", ["/input/TREFHT_186001_186912.nc"])
+
+    def test_unit_key_does_not_depend_on_input_order_or_directory(self):
+        inputs = ["/a/PS_185001_185912.nc", "/a/T_185001_185912.nc"]
+        Journal(str(self.output_path)).record("ta", inputs)
+
+        journal = Journal(str(self.output_path), resume=True)
+
+        assert journal.is_complete(
+            "ta", ["/b/T_185001_185912.nc", "/b/PS_185001_185912.nc"]
+        )
+
+    def test_without_resume_no_units_are_complete(self):
+        Journal(str(self.output_path)).record("tas", self.inputs, str(self.output))
+
+        journal = Journal(str(self.output_path))
+
+        assert not journal.is_complete("tas", self.inputs)
+
+    def test_changed_or_missing_output_is_not_complete(self):
+        Journal(str(self.output_path)).record("tas", self.inputs, str(self.output))
+        self.output.write_bytes(b"partial")
+
+        assert not Journal(str(self.output_path), resume=True).is_complete(
+            "tas", self.inputs
+        )
+
+        self.output.unlink()
+
+        assert not Journal(str(self.output_path), resume=True).is_complete(
+            "tas", self.inputs
+        )
+
+    def test_truncated_last_entry_is_ignored(self):
+        journal = Journal(str(self.output_path))
+        journal.record("tas", self.inputs, str(self.output))
+
+        # Simulate a run that was killed while writing an entry.
+        with open(self.output_path / JOURNAL_FILENAME, "a") as outfile:
+            outfile.write('{"key": "ts|TS_1850')
+
+        journal = Journal(str(self.output_path), resume=True)
+        journal.record("ts", ["/input/TS_185001_185912.nc"])
+
+        journal = Journal(str(self.output_path), resume=True)
+
+        assert journal.is_complete("tas", self.inputs)
+        assert journal.is_complete("ts", ["/input/TS_185001_185912.nc"])
+
+    def test_record_returns_false_if_output_is_missing(self):
+        journal = Journal(str(self.output_path))
+
+        assert not journal.record("tas", self.inputs, str(self.output_path / "x.nc"))
+        assert not (self.output_path / JOURNAL_FILENAME).exists()
+
+    def test_read_new_entries_returns_entries_of_other_writers_once(self):
+        Journal(str(self.output_path)).record("ts", ["/input/TS_185001_185912.nc"])
+
+        journal = Journal(str(self.output_path))
+        worker_journal = Journal(str(self.output_path))
+        worker_journal.record("tas", self.inputs, str(self.output))
+
+        # A partially written entry is only read once it is complete.
+        with open(self.output_path / JOURNAL_FILENAME, "a") as outfile:
+            outfile.write('{"key": "pr')
+
+        entries = journal.read_new_entries()
+
+        assert [entry["handler"] for entry in entries] == ["tas"]
+        assert entries[0]["output"] == str(self.output)
+        assert journal.read_new_entries() == []
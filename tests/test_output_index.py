@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from e3sm_to_cmip.output_index import OutputIndex
+
+
+class TestOutputIndex:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.output_path = tmp_path / "CMIP6"
+        self.cache_path = str(tmp_path / "cache" / "index.json")
+
+        self.amon_path = (
+            self.output_path / "CMIP" / "E3SM-Project" / "Amon" / "tas" / "v20240101"
+        )
+        self.lmon_path = (
+            self.output_path / "LS3MIP" / "E3SM-Project" / "Lmon" / "mrso" / "v1"
+        )
+        self.amon_path.mkdir(parents=True)
+        self.lmon_path.mkdir(parents=True)
+
+        for filename in [
+            "tas_Amon_E3SM-2-0_historical_r1i1p1f1_gr_185001-185912.nc",
+            "tas_Amon_E3SM-2-0_historical_r1i1p1f1_gr_186001-186912.nc",
+            "tas_day_E3SM-2-0_historical_r1i1p1f1_gr_18500101-18591231.nc",
+            "README.txt",
+        ]:
+            (self.amon_path / filename).touch()
+
+        (
+            self.lmon_path / "mrso_Lmon_E3SM-2-0_hist_r1i1p1f1_gr_185001-187912.nc"
+        ).touch()
+
+    def test_finds_files_by_variable_table_and_years(self):
+        index = OutputIndex.load_or_build(str(self.output_path), self.cache_path)
+
+        assert index.find("tas", 1850, 1859) == [
+            str(
+                self.amon_path
+                / "tas_Amon_E3SM-2-0_historical_r1i1p1f1_gr_185001-185912.nc"
+            ),
+            str(
+                self.amon_path
+                / "tas_day_E3SM-2-0_historical_r1i1p1f1_gr_18500101-18591231.nc"
+            ),
+        ]
+        assert len(index.find("tas", 1850, 1859, table="day")) == 1
+        assert index.find("tas", 1850, 1869) == []
+        assert index.find("pr", 1850, 1859) == []
+        assert len(index.find("mrso", 1850, 1879)) == 1
+
+    def test_reports_partially_covered_year_ranges(self):
+        index = OutputIndex.load_or_build(str(self.output_path), self.cache_path)
+
+        assert index.get_coverage("tas", 1850, 1869, table="Amon") == [(1850, 1869)]
+        assert index.get_coverage("tas", 1840, 1889) == [(1850, 1869)]
+        assert index.get_coverage("mrso", 1870, 1899) == [(1870, 1879)]
+        assert index.get_coverage("pr", 1850, 1859) == []
+
+    def test_cached_index_only_lists_changed_directories(self, caplog):
+        OutputIndex.load_or_build(str(self.output_path), self.cache_path)
+        assert os.path.exists(self.cache_path)
+
+        new_file = "tas_Amon_E3SM-2-0_historical_r1i1p1f1_gr_187001-187912.nc"
+        (self.amon_path / new_file).touch()
+        os.utime(self.amon_path, ns=(0, 1))
+
+        caplog.set_level("INFO")
+        index = OutputIndex.load_or_build(str(self.output_path), self.cache_path)
+
+        assert "(1 of 11 directories listed)" in caplog.text
+        assert index.find("tas", 1870, 1879) == [str(self.amon_path / new_file)]
+
+    def test_ignores_cached_index_of_another_tree(self, tmp_path):
+        OutputIndex.load_or_build(str(self.output_path), self.cache_path)
+
+        other_path = tmp_path / "other"
+        other_path.mkdir()
+        index = OutputIndex.load_or_build(str(other_path), self.cache_path)
+
+        assert index.find("tas", 1850, 1859) == []
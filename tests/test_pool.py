@@ -0,0 +1,109 @@
+import logging
+import os
+import time
+
+import pytest
+
+from e3sm_to_cmip._logger import _add_filehandler
+from e3sm_to_cmip.pool import HandlerTimeoutError, WorkerDiedError, WorkerPool
+
+
+def _add(x, y):
+    return x + y
+
+
+def _fail(message):
+    raise ValueError(message)
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+
+    return os.getpid()
+
+
+def _exit():
+    os._exit(1)
+
+
+def _log(message):
+    logging.getLogger("e3sm_to_cmip.test").warning(message)
+
+
+class TestWorkerPool:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.pool = WorkerPool(max_workers=2)
+
+        yield
+
+        self.pool.shutdown()
+
+    def test_returns_result_of_task(self):
+        future = self.pool.submit(_add, 1, y=2)
+
+        assert future.result(timeout=30) == 3
+
+    def test_raises_exception_of_task(self):
+        future = self.pool.submit(_fail, "bad input")
+
+        with pytest.raises(ValueError, match="bad input"):
+            future.result(timeout=30)
+
+    def test_kills_worker_of_timed_out_task_and_keeps_running(self):
+        slow = self.pool.submit(_sleep, 60, timeout=0.5)
+        other = self.pool.submit(_sleep, 1)
+
+        with pytest.raises(HandlerTimeoutError):
+            slow.result(timeout=30)
+
+        # The other worker is not interrupted, and the killed worker is
+        # replaced for the next task.
+        assert other.result(timeout=30) != os.getpid()
+        assert self.pool.submit(_add, 2, 3).result(timeout=30) == 5
+        assert self.pool.submit(_add, 3, 4).result(timeout=30) == 7
+
+    def test_raises_worker_died_error_if_worker_exits(self):
+        future = self.pool.submit(_exit)
+
+        with pytest.raises(WorkerDiedError):
+            future.result(timeout=30)
+
+        assert self.pool.submit(_add, 1, 1).result(timeout=30) == 2
+
+    def test_starts_workers_without_forking_the_main_process(self):
+        # The workers are started by the dispatcher threads of the pool.
+        assert self.pool._mp_context.get_start_method() == "forkserver"
+
+    def test_cannot_submit_after_shutdown(self):
+        self.pool.shutdown()
+
+        with pytest.raises(RuntimeError):
+            self.pool.submit(_add, 1, 2)
+
+
+class TestWorkerLogging:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.log_path = tmp_path / "run.log"
+        _add_filehandler(str(self.log_path))
+
+        yield
+
+        for handler in list(logging.root.handlers):
+            if getattr(handler, "baseFilename", None) == str(self.log_path):
+                logging.root.removeHandler(handler)
+                handler.close()
+
+    def test_workers_append_to_log_file_of_main_process(self):
+        _log("from the main process")
+
+        pool = WorkerPool(max_workers=1)
+        try:
+            pool.submit(_log, "from a worker").result(timeout=30)
+        finally:
+            pool.shutdown()
+
+        _log("from the main process again")
+
+        assert self.log_path.read_text().count("from") == 3
@@ -0,0 +1,212 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from e3sm_to_cmip import telemetry
+from e3sm_to_cmip._netcdf_lock import get_netcdf_lock
+from e3sm_to_cmip.prefetch import SegmentPrefetcher, load_segment, readahead_files
+
+
+class Segment:
+    def __init__(self, index: int):
+        self.index = index
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestSegmentPrefetcher:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.opened: list[Segment] = []
+
+    def _open_segment(self, index: int, delay: float = 0.0) -> Segment:
+        time.sleep(delay)
+
+        segment = Segment(index)
+        self.opened.append(segment)
+
+        return segment
+
+    @pytest.mark.parametrize("depth", [0, 1, 2])
+    def test_iterates_over_segments_in_order(self, depth):
+        with SegmentPrefetcher(
+            "tas", self._open_segment, lambda index: [], [0, 2, 3], depth
+        ) as prefetcher:
+            result = [(index, segment.index) for index, segment in prefetcher]
+
+        assert result == [(0, 0), (2, 2), (3, 3)]
+        assert [segment.index for segment in self.opened] == [0, 2, 3]
+        assert prefetcher.stats.segments == 3
+
+    @pytest.mark.parametrize("depth", [0, 1, 2])
+    def test_reads_at_most_depth_segments_ahead(self, depth):
+        with SegmentPrefetcher(
+            "tas", self._open_segment, lambda index: [], range(6), depth
+        ) as prefetcher:
+            for index, _ in prefetcher:
+                # Give the background thread time to read ahead.
+                time.sleep(0.02)
+
+                assert max(segment.index for segment in self.opened) <= index + depth
+
+    def test_overlaps_reads_with_writes(self):
+        with SegmentPrefetcher(
+            "tas",
+            lambda index: self._open_segment(index, delay=0.05),
+            lambda index: [],
+            range(4),
+            depth=1,
+        ) as prefetcher:
+            for _ in prefetcher:
+                time.sleep(0.05)
+
+        stats = prefetcher.stats
+        assert stats.read_elapsed >= 0.2
+        assert stats.overlap > 0.1
+        assert stats.stalled < stats.read_elapsed
+
+    def test_does_not_overlap_reads_without_depth(self):
+        with SegmentPrefetcher(
+            "tas",
+            lambda index: self._open_segment(index, delay=0.02),
+            lambda index: [],
+            range(3),
+            depth=0,
+        ) as prefetcher:
+            for _ in prefetcher:
+                time.sleep(0.02)
+
+        assert prefetcher.stats.overlap == pytest.approx(0.0, abs=0.01)
+
+    def test_records_time_waiting_for_each_segment(self):
+        telemetry.start_collecting()
+
+        with SegmentPrefetcher(
+            "tas", self._open_segment, lambda index: [], range(2)
+        ) as prefetcher:
+            list(prefetcher)
+
+        spans = telemetry.stop_collecting()
+
+        assert [span["phase"] for span in spans] == ["prefetch_wait"] * 2
+        assert all("read_elapsed" in span for span in spans)
+
+    def test_opens_segments_without_holding_netcdf_lock(self):
+        # xarray holds the lock around its own netCDF calls while it opens a
+        # segment, and the lock is not reentrant.
+        def open_segment(index):
+            assert not get_netcdf_lock().locked()
+
+            return self._open_segment(index)
+
+        with SegmentPrefetcher(
+            "tas", open_segment, lambda index: [], range(2)
+        ) as prefetcher:
+            list(prefetcher)
+
+        assert len(self.opened) == 2
+
+    def test_reads_ahead_input_files_only_if_enabled(self, tmp_path):
+        filepath = tmp_path / "PS_185001_185912.nc"
+        filepath.write_bytes(b"x" * 1000)
+
+        with SegmentPrefetcher(
+            "tas", self._open_segment, lambda index: [str(filepath)], range(2)
+        ) as prefetcher:
+            list(prefetcher)
+
+        assert prefetcher.stats.readahead_bytes == 0
+
+        with SegmentPrefetcher(
+            "tas",
+            self._open_segment,
+            lambda index: [str(filepath)],
+            range(2),
+            readahead=True,
+        ) as prefetcher:
+            list(prefetcher)
+
+        assert prefetcher.stats.readahead_bytes == 2000
+
+    def test_closes_segments_that_were_read_ahead_but_not_used(self):
+        with pytest.raises(RuntimeError):
+            with SegmentPrefetcher(
+                "tas", self._open_segment, lambda index: [], range(4), depth=2
+            ) as prefetcher:
+                for _ in prefetcher:
+                    raise RuntimeError("error writing segment")
+
+        # The segments read ahead are closed, or cancelled before they are read.
+        assert [segment.index for segment in self.opened][:1] == [0]
+        assert len(self.opened) <= 3
+        assert [segment.closed for segment in self.opened[1:]] == [True] * (
+            len(self.opened) - 1
+        )
+
+    def test_raises_error_opening_segment(self):
+        def open_segment(index):
+            if index == 1:
+                raise OSError("unable to open segment")
+
+            return self._open_segment(index)
+
+        with pytest.raises(OSError, match="unable to open segment"):
+            with SegmentPrefetcher(
+                "tas", open_segment, lambda index: [], range(3)
+            ) as prefetcher:
+                list(prefetcher)
+
+
+class TestLoadSegment:
+    def _get_dataset(self) -> xr.Dataset:
+        return xr.Dataset(
+            {
+                "CLOUD": (("time", "lat"), np.ones((4, 3))),
+                "PS": (("time", "lat"), np.ones((4, 3))),
+            },
+            coords={"time": np.arange(4.0), "lat": [-45.0, 0.0, 45.0]},
+        ).chunk({"time": 1})
+
+    def test_loads_variables_that_fit(self):
+        result = load_segment(self._get_dataset(), ["CLOUD", "missing"])
+
+        assert result["CLOUD"].chunks is None
+        assert result["PS"].chunks is not None
+
+    def test_keeps_variables_lazy_if_they_do_not_fit(self):
+        ds = self._get_dataset()
+
+        assert load_segment(ds, ["CLOUD", "PS"], max_bytes=100) is ds
+
+
+class TestReadaheadFiles:
+    def test_reads_each_file_once(self, tmp_path):
+        filepath = tmp_path / "PS_185001_185912.nc"
+        filepath.write_bytes(b"x" * 1000)
+
+        assert readahead_files([str(filepath), str(filepath)]) == 1000
+
+    def test_stops_reading_after_max_bytes(self, tmp_path):
+        filepaths = []
+        for name in ["PS", "T"]:
+            filepath = tmp_path / f"{name}_185001_185912.nc"
+            filepath.write_bytes(b"x" * 1000)
+            filepaths.append(str(filepath))
+
+        assert readahead_files(filepaths, max_bytes=1000) == 1000
+
+    def test_stops_reading_once_stop_is_set(self, tmp_path):
+        filepath = tmp_path / "PS_185001_185912.nc"
+        filepath.write_bytes(b"x" * 1000)
+        stop = threading.Event()
+        stop.set()
+
+        assert readahead_files([str(filepath)], stop) == 0
+
+    def test_skips_files_that_cannot_be_read(self, tmp_path):
+        assert readahead_files([str(tmp_path / "missing.nc")]) == 0
@@ -0,0 +1,99 @@
+import os
+
+import dask
+import pytest
+
+from e3sm_to_cmip import profiling
+
+
+def _compute(num: int) -> int:
+    return sum(i * i for i in range(num))
+
+
+def _run_handler(num: int, scheduler: list) -> bool:
+    scheduler.append(dask.config.get("scheduler", None))
+
+    return _compute(num) > 0
+
+
+def _fail_handler():
+    raise ValueError("bad formula")
+
+
+class TestRunProfiled:
+    def test_writes_profile_of_handler(self, tmp_path):
+        path = str(tmp_path / "cl.prof")
+        scheduler: list = []
+
+        run = profiling.run_profiled(path, _run_handler, 1000, scheduler=scheduler)
+
+        assert run.result is True
+        assert os.path.isfile(path)
+        assert scheduler == ["synchronous"]
+
+        stats = profiling.merge_profiles([path], str(tmp_path / "summary.prof"))
+        names = [function.name for function in profiling.get_hot_functions(stats, 50)]  # type: ignore[arg-type]
+        assert any("(_compute)" in name for name in names)
+
+    def test_writes_profile_of_handler_that_raises(self, tmp_path):
+        path = str(tmp_path / "cl.prof")
+
+        with pytest.raises(ValueError):
+            profiling.run_profiled(path, _fail_handler)
+
+        assert os.path.isfile(path)
+
+
+class TestGetProfilePath:
+    def test_returns_path_of_job(self):
+        assert profiling.get_profile_path("/logs/profiles", "tas#0") == (
+            "/logs/profiles/tas#0.prof"
+        )
+        assert profiling.get_profile_path("/logs/profiles", "pr+prc") == (
+            "/logs/profiles/pr+prc.prof"
+        )
+
+    def test_replaces_unsafe_characters(self):
+        assert profiling.get_profile_path("/logs", "a/b c") == "/logs/a_b_c.prof"
+
+
+class TestMergeProfiles:
+    def test_merges_profiles_of_jobs(self, tmp_path):
+        paths = []
+        for name in ["cl", "ta"]:
+            path = str(tmp_path / f"{name}.prof")
+            profiling.run_profiled(path, _run_handler, 1000, scheduler=[])
+            paths.append(path)
+
+        output_path = str(tmp_path / "summary.prof")
+        stats = profiling.merge_profiles(
+            paths + [str(tmp_path / "missing.prof")], output_path
+        )
+
+        assert stats is not None
+        assert os.path.isfile(output_path)
+        assert "_compute" in (tmp_path / "summary.txt").read_text()
+
+        compute = next(
+            function
+            for function in profiling.get_hot_functions(stats, 100)
+            if "(_compute)" in function.name
+        )
+        assert compute.ncalls == 2
+
+    def test_returns_none_without_profiles(self, tmp_path):
+        output_path = str(tmp_path / "summary.prof")
+
+        assert profiling.merge_profiles([], output_path) is None
+        assert not os.path.exists(output_path)
+
+
+def test_get_hot_functions_sorts_by_time(tmp_path):
+    path = str(tmp_path / "cl.prof")
+    profiling.run_profiled(path, _run_handler, 1000, scheduler=[])
+
+    stats = profiling.merge_profiles([path], str(tmp_path / "summary.prof"))
+    functions = profiling.get_hot_functions(stats, 3)  # type: ignore[arg-type]
+
+    assert len(functions) == 3
+    assert functions[0].tottime >= functions[1].tottime >= functions[2].tottime
@@ -0,0 +1,23 @@
+from e3sm_to_cmip.results import HandlerResult, RunResult
+
+
+class TestRunResult:
+    def test_lists_successful_and_failed_handlers(self):
+        result = RunResult(
+            handlers={
+                "tas": HandlerResult("tas", status="success"),
+                "pr": HandlerResult("pr", status="failed"),
+                "so": HandlerResult("so", status="resumed"),
+            }
+        )
+
+        assert result.successful_handlers == ["tas", "so"]
+        assert result.failed_handlers == ["pr"]
+        assert not result.is_successful
+
+    def test_is_not_successful_if_stopped_or_not_completed(self):
+        handlers = {"tas": HandlerResult("tas", status="success")}
+
+        assert RunResult(handlers=handlers).is_successful
+        assert not RunResult(handlers=handlers, is_stopped=True).is_successful
+        assert not RunResult(handlers=handlers, is_completed=False).is_successful
@@ -0,0 +1,65 @@
+import netCDF4
+import numpy as np
+import pytest
+
+from e3sm_to_cmip.runner import E3SMtoCMIP
+
+
+class TestExecute:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.input_path = tmp_path / "input"
+        self.input_path.mkdir()
+        self.metadata_path = tmp_path / "metadata.json"
+        self.metadata_path.write_text("{}")
+        self.tmp_path = tmp_path
+
+        with netCDF4.Dataset(self.input_path / "TS_185001_185912.nc", "w") as ds:
+            ds.createDimension("time", None)
+            ds.createVariable("TS", "f4", ("time",))[:] = np.zeros(2)
+
+    def _get_app(self, var_list: str, on_var_failure: str) -> E3SMtoCMIP:
+        return E3SMtoCMIP(
+            [
+                "-i",
+                str(self.input_path),
+                "-o",
+                str(self.tmp_path / "output"),
+                "-v",
+                var_list,
+                "-t",
+                str(self.tmp_path),
+                "-u",
+                str(self.metadata_path),
+                "--on-var-failure",
+                on_var_failure,
+            ]
+        )
+
+    @pytest.mark.parametrize(
+        ("var_list", "on_var_failure"),
+        [("tas", "ignore"), ("tas", "fail"), ("not_a_variable", "stop")],
+    )
+    def test_returns_stopped_result_without_exiting_for_handler_issues(
+        self, var_list, on_var_failure
+    ):
+        app = self._get_app(var_list, on_var_failure)
+
+        try:
+            result = app.execute()
+        except SystemExit:
+            pytest.fail("execute() exited.")
+
+        assert result.is_stopped
+        assert result.stop_reason is not None
+        assert not result.is_successful
+        assert result.handlers == {}
+        assert result.missing_handlers + result.non_derivable_handlers == [var_list]
+
+    def test_run_exits_with_failure_code_for_handler_issues(self):
+        app = self._get_app("tas", "fail")
+
+        with pytest.raises(SystemExit) as e:
+            app.run()
+
+        assert e.value.code == 1
@@ -0,0 +1,393 @@
+import netCDF4
+import numpy as np
+import pytest
+
+from e3sm_to_cmip import scheduler
+from e3sm_to_cmip.catalog import InputCatalog
+from e3sm_to_cmip.scheduler import (
+    DEFAULT_MEMORY_FACTOR,
+    HYBRID_COST_FACTOR,
+    LEVEL_COST_WEIGHT,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    VERTICAL_COST_FACTOR,
+    AdmissionController,
+    HandlerCost,
+    HandlerRun,
+    MemoryProfile,
+    SegmentTracker,
+    estimate_handler_cost,
+    get_handler_timeout,
+    get_retry_delay,
+    run_measured,
+    sort_by_cost,
+)
+
+
+def _write_file(path, var: str, num_levels: int = 0, size: int = 0):
+    with netCDF4.Dataset(path, "w") as ds:
+        ds.createDimension("time", None)
+        dims: tuple[str, ...] = ("time",)
+
+        if num_levels:
+            ds.createDimension("lev", num_levels)
+            dims = ("time", "lev")
+
+        data = ds.createVariable(var, "f4", dims)
+        data[:] = np.zeros((2, num_levels) if num_levels else (2,))
+
+        if size:
+            ds.createDimension("pad", size)
+            ds.createVariable("pad", "i1", ("pad",))[:] = 0
+
+
+class TestEstimateHandlerCost:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.input_path = tmp_path / "input"
+        self.input_path.mkdir()
+
+        _write_file(self.input_path / "TS_185001_185912.nc", "TS", size=1000)
+        _write_file(self.input_path / "T_185001_185912.nc", "T", 72, size=1000)
+
+        self.catalog = InputCatalog.build(str(self.input_path))
+
+    def test_estimates_cost_from_input_bytes(self):
+        handler = {"name": "ts", "levels": None}
+        vars_to_filepaths = {"TS": self.catalog.get_var_files("TS")}
+
+        cost = estimate_handler_cost(handler, vars_to_filepaths, self.catalog)
+
+        assert cost.input_bytes == self.catalog.get_total_bytes(vars_to_filepaths["TS"])
+        assert cost.num_levels == 0
+        assert not cost.is_vertical
+        assert not cost.is_hybrid
+        assert cost.estimated == cost.input_bytes
+        assert cost.data_bytes == 2 * 4
+        assert cost.predicted_memory == int(cost.data_bytes * DEFAULT_MEMORY_FACTOR)
+
+    def test_weights_cost_by_levels_for_hybrid_sigma_levels(self):
+        handler = {
+            "name": "ta",
+            "levels": {"name": "standard_hybrid_sigma", "e3sm_axis_name": "lev"},
+        }
+        vars_to_filepaths = {"T": self.catalog.get_var_files("T")}
+
+        cost = estimate_handler_cost(handler, vars_to_filepaths, self.catalog)
+
+        assert cost.num_levels == 72
+        assert cost.data_bytes == 2 * 72 * 4
+        assert cost.predicted_memory == int(cost.data_bytes * DEFAULT_MEMORY_FACTOR)
+        assert cost.is_vertical
+        assert cost.is_hybrid
+        assert cost.estimated == pytest.approx(
+            cost.input_bytes * (1 + LEVEL_COST_WEIGHT * 72) * HYBRID_COST_FACTOR
+        )
+
+    def test_weights_cost_for_other_vertical_levels(self):
+        handler = {
+            "name": "ta",
+            "levels": {"name": "plev19", "e3sm_axis_name": "lev"},
+        }
+        vars_to_filepaths = {"T": self.catalog.get_var_files("T")}
+
+        cost = estimate_handler_cost(handler, vars_to_filepaths, self.catalog)
+
+        assert not cost.is_hybrid
+        assert cost.estimated == pytest.approx(
+            cost.input_bytes * (1 + LEVEL_COST_WEIGHT * 72) * VERTICAL_COST_FACTOR
+        )
+
+    def test_records_handlers_and_grid_size_of_segment_job(self):
+        path = self.input_path / "Q_185001_185912.nc"
+        with netCDF4.Dataset(path, "w") as ds:
+            ds.createDimension("time", None)
+            ds.createDimension("lev", 72)
+            ds.createDimension("ncol", 8)
+            ds.createVariable("Q", "f4", ("time", "lev", "ncol"))[:] = np.zeros(
+                (2, 72, 8)
+            )
+
+        job = {
+            "name": "hus#0",
+            "parent": "hus",
+            "levels": {"name": "standard_hybrid_sigma", "e3sm_axis_name": "lev"},
+        }
+
+        cost = estimate_handler_cost(job, {"Q": [str(path)]}, self.catalog)
+
+        assert cost.handlers == ["hus"]
+        assert cost.grid_size == 8
+        assert cost.data_bytes == 2 * 72 * 8 * 4
+
+    def test_adds_memory_of_prefetched_segments_of_group(self, monkeypatch):
+        _write_file(self.input_path / "TS_186001_186912.nc", "TS")
+        _write_file(self.input_path / "TS_187001_187912.nc", "TS")
+        catalog = InputCatalog.build(str(self.input_path))
+        vars_to_filepaths = {"TS": catalog.get_var_files("TS")}
+        group = {"name": "fused-0", "handlers": ["ts", "tas"], "levels": None}
+
+        cost = estimate_handler_cost(
+            group, vars_to_filepaths, catalog, prefetch_depth=1
+        )
+
+        assert cost.data_bytes == 3 * 2 * 4
+        assert cost.prefetch_memory == 2 * 4
+        assert cost.predicted_memory == (
+            int(cost.data_bytes * DEFAULT_MEMORY_FACTOR) + cost.prefetch_memory
+        )
+
+        # Only the other segments can be read ahead.
+        cost = estimate_handler_cost(
+            group, vars_to_filepaths, catalog, prefetch_depth=5
+        )
+
+        assert cost.prefetch_memory == 2 * 2 * 4
+
+        # Larger segments are read in time slabs, as for a single handler.
+        monkeypatch.setattr(scheduler, "PREFETCH_LOAD_MAX_BYTES", 4)
+        cost = estimate_handler_cost(
+            group, vars_to_filepaths, catalog, prefetch_depth=1
+        )
+
+        assert cost.prefetch_memory == 0
+
+    def test_adds_memory_of_prefetched_segments_that_fit(self, monkeypatch):
+        _write_file(self.input_path / "TS_186001_186912.nc", "TS")
+        catalog = InputCatalog.build(str(self.input_path))
+        handler = {"name": "ts", "levels": None}
+        vars_to_filepaths = {"TS": catalog.get_var_files("TS")}
+
+        cost = estimate_handler_cost(
+            handler, vars_to_filepaths, catalog, prefetch_depth=1
+        )
+
+        assert cost.prefetch_memory == 2 * 4
+
+        # Larger segments are read in time slabs while they are written.
+        monkeypatch.setattr(scheduler, "PREFETCH_LOAD_MAX_BYTES", 4)
+        cost = estimate_handler_cost(
+            handler, vars_to_filepaths, catalog, prefetch_depth=1
+        )
+
+        assert cost.prefetch_memory == 0
+
+    def test_missing_files_have_no_cost(self):
+        handler = {"name": "pr", "levels": None}
+
+        cost = estimate_handler_cost(
+            handler, {"PRECC": [str(self.input_path / "missing.nc")]}, self.catalog
+        )
+
+        assert cost.estimated == 0
+
+
+def test_sort_by_cost_orders_handlers_by_descending_cost_and_is_stable():
+    handlers = [{"name": "a"}, {"name": "b"}, {"name": "c"}, {"name": "d"}]
+    costs = {
+        "a": HandlerCost(name="a", estimated=1.0),
+        "b": HandlerCost(name="b", estimated=3.0),
+        "c": HandlerCost(name="c", estimated=1.0),
+        "d": HandlerCost(name="d", estimated=2.0),
+    }
+
+    result = sort_by_cost(handlers, costs)
+
+    assert [h["name"] for h in result] == ["b", "d", "a", "c"]
+
+
+def test_run_measured_returns_result_and_resource_usage():
+    run = run_measured(lambda x, y: x + y, 1, 2)
+
+    assert run.result == 3
+    assert run.elapsed >= 0
+
+
+def test_get_handler_timeout_scales_with_cost_above_one_gib():
+    small = HandlerCost(name="a", estimated=0.1 * 1024**3)
+    large = HandlerCost(name="b", estimated=4 * 1024**3)
+
+    assert get_handler_timeout(small, 60) == 60
+    assert get_handler_timeout(large, 60) == 240
+
+
+def test_get_retry_delay_doubles_up_to_maximum():
+    assert get_retry_delay(1) == RETRY_BASE_DELAY
+    assert get_retry_delay(2) == 2 * RETRY_BASE_DELAY
+    assert get_retry_delay(100) == RETRY_MAX_DELAY
+
+
+class TestMemoryProfile:
+    def test_uses_default_factor_if_handler_is_not_calibrated(self, tmp_path):
+        profile = MemoryProfile(str(tmp_path / "profile.json"))
+
+        assert profile.get_factor(HandlerCost(name="ta")) == DEFAULT_MEMORY_FACTOR
+
+    def test_calibrates_factor_from_observed_peak_memory(self, tmp_path):
+        profile = MemoryProfile(str(tmp_path / "profile.json"))
+        cost = HandlerCost(name="ta", data_bytes=100, grid_size=21600)
+
+        profile.update(cost, HandlerRun(True, 1.0, base_memory=50, peak_memory=250))
+
+        assert cost.peak_memory == 200
+        assert profile.get_factor(cost) == 2.0
+        assert profile.base_memory == 50
+
+        profile.update(cost, HandlerRun(True, 1.0, base_memory=50, peak_memory=450))
+
+        assert profile.get_factor(cost) == 3.0
+
+    def test_keeps_factors_of_grid_sizes_separately(self, tmp_path):
+        profile = MemoryProfile(str(tmp_path / "profile.json"))
+        low = HandlerCost(name="ta", data_bytes=100, grid_size=21600)
+        high = HandlerCost(name="ta", data_bytes=100, grid_size=345600)
+
+        profile.update(low, HandlerRun(True, 1.0, base_memory=50, peak_memory=250))
+        profile.update(high, HandlerRun(True, 1.0, base_memory=50, peak_memory=650))
+
+        assert profile.get_factor(low) == 2.0
+        assert profile.get_factor(high) == 6.0
+
+    def test_shares_factors_of_segments_and_groups_with_their_handlers(self, tmp_path):
+        profile = MemoryProfile(str(tmp_path / "profile.json"))
+        segment = HandlerCost(
+            name="ta#0", handlers=["ta"], data_bytes=100, grid_size=21600
+        )
+        group = HandlerCost(
+            name="fused-0", handlers=["ta", "hus"], data_bytes=100, grid_size=21600
+        )
+
+        profile.update(segment, HandlerRun(True, 1.0, base_memory=50, peak_memory=250))
+
+        assert profile.factors == {"ta@21600": 2.0}
+        assert profile.get_factor(HandlerCost(name="ta", grid_size=21600)) == 2.0
+        # A group uses the largest factor of its handlers.
+        assert profile.get_factor(group) == DEFAULT_MEMORY_FACTOR
+
+        profile.update(group, HandlerRun(True, 1.0, base_memory=50, peak_memory=150))
+
+        assert profile.factors == {"ta@21600": 1.5, "hus@21600": 1.0}
+        assert profile.get_factor(group) == 1.5
+
+    def test_calibrates_factor_without_prefetch_memory(self, tmp_path):
+        profile = MemoryProfile(str(tmp_path / "profile.json"))
+        cost = HandlerCost(
+            name="fused-0",
+            handlers=["ts", "tas"],
+            data_bytes=100,
+            prefetch_memory=50,
+        )
+
+        profile.update(cost, HandlerRun(True, 1.0, base_memory=50, peak_memory=300))
+
+        assert cost.peak_memory == 250
+        assert profile.get_factor(cost) == 2.0
+
+    def test_ignores_runs_without_memory_usage(self, tmp_path):
+        profile = MemoryProfile(str(tmp_path / "profile.json"))
+        cost = HandlerCost(name="ta", data_bytes=100)
+
+        profile.update(cost, HandlerRun(True, 1.0))
+
+        assert cost.peak_memory is None
+        assert profile.factors == {}
+
+    def test_saves_and_loads_profile(self, tmp_path):
+        path = str(tmp_path / "cache" / "profile.json")
+        profile = MemoryProfile(path)
+        cost = HandlerCost(name="ta", data_bytes=100, grid_size=21600)
+        profile.update(cost, HandlerRun(True, 1.0, base_memory=50, peak_memory=250))
+
+        assert profile.save()
+
+        loaded = MemoryProfile(path)
+
+        assert loaded.get_factor(cost) == 2.0
+        assert loaded.base_memory == 50
+
+
+class TestAdmissionController:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.handlers = [{"name": "a"}, {"name": "b"}, {"name": "c"}]
+        self.costs = {
+            "a": HandlerCost(name="a", predicted_memory=60),
+            "b": HandlerCost(name="b", predicted_memory=50),
+            "c": HandlerCost(name="c", predicted_memory=30),
+        }
+
+    def test_admits_every_handler_without_a_budget(self):
+        admission = AdmissionController(None, max_jobs=1, base_memory=0)
+        pending = list(self.handlers)
+
+        assert admission.admit_ready(pending, self.costs) == self.handlers
+        assert pending == []
+
+    def test_admits_handlers_that_fit_in_the_budget(self):
+        admission = AdmissionController(100, max_jobs=3, base_memory=0)
+        pending = list(self.handlers)
+
+        admitted = admission.admit_ready(pending, self.costs)
+
+        assert [h["name"] for h in admitted] == ["a", "c"]
+        assert [h["name"] for h in pending] == ["b"]
+        assert admission.in_use == 90
+
+        admission.release("a")
+
+        admitted = admission.admit_ready(pending, self.costs)
+
+        assert [h["name"] for h in admitted] == ["b"]
+        assert pending == []
+
+    def test_limits_admitted_handlers_to_max_jobs(self):
+        admission = AdmissionController(1000, max_jobs=1, base_memory=0)
+        pending = list(self.handlers)
+
+        admitted = admission.admit_ready(pending, self.costs)
+
+        assert [h["name"] for h in admitted] == ["a"]
+
+    def test_admits_handler_over_the_budget_when_nothing_else_is_running(self):
+        admission = AdmissionController(40, max_jobs=3, base_memory=0)
+        pending = list(self.handlers)
+
+        admitted = admission.admit_ready(pending, self.costs)
+
+        assert [h["name"] for h in admitted] == ["a"]
+
+        admission.release("a")
+
+        admitted = admission.admit_ready(pending, self.costs)
+
+        assert [h["name"] for h in admitted] == ["b"]
+
+
+class TestSegmentTracker:
+    def test_returns_result_once_all_segments_are_complete(self):
+        tracker = SegmentTracker()
+        tracker.add("ta", 3)
+
+        assert tracker.record("ta", 1, True) is None
+        assert tracker.record("ta", 0, False) is None
+        assert tracker.get_incomplete() == ["ta"]
+        assert tracker.record("ta", 2, True) is False
+        assert tracker.get_incomplete() == []
+
+    def test_combines_results_of_groups_of_handlers(self):
+        tracker = SegmentTracker()
+        tracker.add("cl+cli", 2)
+
+        tracker.record("cl+cli", 0, {"cl": True, "cli": False})
+        result = tracker.record("cl+cli", 1, {"cl": True, "cli": True})
+
+        assert result == {"cl": True, "cli": False}
+
+    def test_fails_every_handler_in_group_if_a_segment_raised_an_error(self):
+        tracker = SegmentTracker()
+        tracker.add("cl+cli", 2)
+
+        tracker.record("cl+cli", 0, {"cl": True, "cli": True})
+        result = tracker.record("cl+cli", 1, False)
+
+        assert result == {"cl": False, "cli": False}
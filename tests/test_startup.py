@@ -0,0 +1,64 @@
+import json
+import subprocess
+import sys
+
+from e3sm_to_cmip.runner import _read_git_head
+
+# The heavy dependencies that are deferred until a handler runs.
+HEAVY_MODULES = ["cmor", "xarray", "xcdat", "dask", "pandas", "netCDF4"]
+
+
+class TestStartupImports:
+    def test_importing_cli_does_not_load_heavy_modules(self):
+        code = (
+            "import json, sys\n"
+            "import e3sm_to_cmip.main, e3sm_to_cmip.runner\n"
+            "from e3sm_to_cmip.cmor_handlers.utils import load_all_handlers\n"
+            "load_all_handlers('atm', ['tas', 'pr', 'orog'])\n"
+            "print(json.dumps([\n"
+            "    name for name in json.loads(sys.argv[1])\n"
+            "    if name in sys.modules\n"
+            "    and type(sys.modules[name]).__name__ != '_LazyModule'\n"
+            "]))\n"
+        )
+
+        result = subprocess.run(
+            [sys.executable, "-c", code, json.dumps(HEAVY_MODULES)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+
+class TestReadGitHead:
+    def test_reads_branch_and_commit_from_loose_ref(self, tmp_path):
+        git_dir = tmp_path / ".git"
+        (git_dir / "refs" / "heads").mkdir(parents=True)
+        (git_dir / "HEAD").write_text("ref: refs/heads/main\n")
+        (git_dir / "refs" / "heads" / "main").write_text("abc123\n")
+        (tmp_path / "pkg").mkdir()
+
+        assert _read_git_head(str(tmp_path / "pkg")) == ("main", "abc123")
+
+    def test_reads_commit_from_packed_refs(self, tmp_path):
+        git_dir = tmp_path / ".git"
+        git_dir.mkdir()
+        (git_dir / "HEAD").write_text("ref: refs/heads/feature/x\n")
+        (git_dir / "packed-refs").write_text(
+            "# pack-refs with: peeled fully-peeled sorted\n"
+            "def456 refs/heads/feature/x\n"
+        )
+
+        assert _read_git_head(str(tmp_path)) == ("feature/x", "def456")
+
+    def test_returns_head_for_detached_head(self, tmp_path):
+        git_dir = tmp_path / ".git"
+        git_dir.mkdir()
+        (git_dir / "HEAD").write_text("0123abcd\n")
+
+        assert _read_git_head(str(tmp_path)) == ("HEAD", "0123abcd")
+
+    def test_returns_none_outside_git_repository(self, tmp_path):
+        assert _read_git_head(str(tmp_path)) is None
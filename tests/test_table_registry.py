@@ -0,0 +1,114 @@
+import json
+import os
+
+import pytest
+
+from e3sm_to_cmip import table_registry
+from e3sm_to_cmip.table_registry import TableRegistry, _get_cache_path
+
+
+def _write_table(tables_path, name, variable_entry):
+    with open(os.path.join(tables_path, name), "w") as outfile:
+        json.dump({"Header": {}, "variable_entry": variable_entry}, outfile)
+
+
+@pytest.fixture
+def tables_path(tmp_path):
+    path = tmp_path / "tables"
+    path.mkdir()
+
+    _write_table(
+        path,
+        "CMIP6_Amon.json",
+        {
+            "tas": {
+                "frequency": "mon",
+                "dimensions": "longitude latitude time height2m",
+                "type": "real",
+            },
+            "cl": {
+                "frequency": "mon",
+                "dimensions": "longitude latitude alevel time",
+            },
+        },
+    )
+    _write_table(
+        path,
+        "CMIP6_3hr.json",
+        {"pr": {"frequency": "3hr", "dimensions": "longitude latitude time1"}},
+    )
+    _write_table(
+        path,
+        "CMIP6_fx.json",
+        {"orog": {"frequency": "fx", "dimensions": "longitude latitude"}},
+    )
+    (path / "CMIP6_CV.json").write_text(json.dumps({"CV": {}}))
+
+    return str(path)
+
+
+class TestTableRegistry:
+    def test_indexes_variables_of_tables(self, tables_path):
+        registry = TableRegistry.build(tables_path)
+
+        assert sorted(registry.tables) == [
+            "CMIP6_3hr.json",
+            "CMIP6_Amon.json",
+            "CMIP6_fx.json",
+        ]
+        assert registry.get_variables("CMIP6_Amon.json")["tas"] == {
+            "dimensions": ["longitude", "latitude", "time", "height2m"],
+            "frequency": "mon",
+            "time_dim": "time",
+            "type": "real",
+        }
+        assert registry.get_type("CMIP6_Amon.json", "cl") is None
+        assert registry.get_time_dim("CMIP6_3hr.json", "pr") == "time1"
+        assert registry.get_time_dim("CMIP6_fx.json", "orog") is None
+
+    def test_raises_error_if_table_does_not_exist(self, tables_path):
+        registry = TableRegistry.build(tables_path)
+
+        with pytest.raises(ValueError):
+            registry.get_variables("CMIP6_invalid_table.json")
+
+        with pytest.raises(KeyError):
+            registry.get_time_dim("CMIP6_Amon.json", "pr")
+
+    def test_loads_cached_registry_until_tables_change(self, tables_path, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        TableRegistry.load_or_build(tables_path, cache_dir)
+
+        cache_path = _get_cache_path(tables_path, cache_dir)
+        with open(cache_path, "r") as infile:
+            contents = json.load(infile)
+
+        contents["tables"]["CMIP6_Amon.json"] = {}
+        with open(cache_path, "w") as outfile:
+            json.dump(contents, outfile)
+
+        registry = TableRegistry.load_or_build(tables_path, cache_dir)
+        assert registry.get_variables("CMIP6_Amon.json") == {}
+
+        # A modified table invalidates the cached registry.
+        _write_table(
+            tables_path,
+            "CMIP6_Amon.json",
+            {
+                "ta": {
+                    "frequency": "mon",
+                    "dimensions": "longitude latitude plev19 time",
+                }
+            },
+        )
+
+        registry = TableRegistry.load_or_build(tables_path, cache_dir)
+        assert list(registry.get_variables("CMIP6_Amon.json")) == ["ta"]
+
+
+def test_get_table_registry_loads_registry_once(tables_path, monkeypatch):
+    monkeypatch.setattr(table_registry, "_registries", {})
+
+    registry = table_registry.get_table_registry(tables_path)
+
+    assert table_registry.get_table_registry(tables_path + os.sep) is registry
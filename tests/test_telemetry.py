@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from e3sm_to_cmip import telemetry
+from e3sm_to_cmip.scheduler import run_measured
+
+
+def _run_phases():
+    with telemetry.span("get_mfdataset", "tas") as span:
+        span["bytes_in"] = 4_000_000
+        span["shapes"] = {"TREFHT": [12, 10, 10]}
+
+    with telemetry.span("cmor_write", "tas") as span:
+        span["bytes_out"] = telemetry.get_nbytes(np.zeros((12, 10, 10)))
+
+    return True
+
+
+class TestSpan:
+    def test_does_not_record_spans_outside_of_collection(self):
+        with telemetry.span("cmor_write", "tas") as span:
+            pass
+
+        assert span["elapsed"] >= 0
+        assert telemetry.stop_collecting() == []
+
+    def test_records_spans_while_collecting(self):
+        telemetry.start_collecting()
+        _run_phases()
+        spans = telemetry.stop_collecting()
+
+        assert [span["phase"] for span in spans] == ["get_mfdataset", "cmor_write"]
+        assert spans[0]["handler"] == "tas"
+        assert spans[0]["shapes"] == {"TREFHT": [12, 10, 10]}
+        assert spans[1]["bytes_out"] == 12 * 10 * 10 * 8
+
+    def test_records_span_of_phase_that_raises(self):
+        telemetry.start_collecting()
+
+        with pytest.raises(ValueError):
+            with telemetry.span("get_output_data", "tas"):
+                raise ValueError("bad formula")
+
+        spans = telemetry.stop_collecting()
+
+        assert len(spans) == 1
+        assert spans[0]["mb_per_s"] is None
+
+
+class TestGetThroughput:
+    def test_returns_mb_per_second(self):
+        assert telemetry.get_throughput(10_000_000, 2.0) == 5.0
+
+    def test_returns_none_without_bytes_or_time(self):
+        assert telemetry.get_throughput(0, 2.0) is None
+        assert telemetry.get_throughput(10_000_000, 0.0) is None
+
+
+class TestSummarizeSpans:
+    def test_aggregates_spans_by_phase(self):
+        spans = [
+            {"phase": "get_mfdataset", "elapsed": 1.0, "bytes_in": 3_000_000},
+            {"phase": "cmor_write", "elapsed": 0.5, "bytes_out": 1_000_000},
+            {"phase": "get_mfdataset", "elapsed": 2.0, "bytes_in": 6_000_000},
+        ]
+
+        summaries = telemetry.summarize_spans(spans)
+
+        assert list(summaries) == ["get_mfdataset", "cmor_write"]
+        assert summaries["get_mfdataset"].count == 2
+        assert summaries["get_mfdataset"].elapsed == 3.0
+        assert summaries["get_mfdataset"].throughput == 3.0
+        assert summaries["cmor_write"].throughput == 2.0
+
+
+class TestWriteSpans:
+    def test_appends_spans_as_json_lines(self, tmp_path):
+        path = str(tmp_path / "telemetry.jsonl")
+
+        telemetry.write_spans(path, [{"job": "tas", "phase": "cmor_write"}])
+        telemetry.write_spans(path, [{"job": "pr", "phase": "cmor_write"}])
+        with open(path, "a") as outfile:
+            outfile.write('{"job": "ts", "pha')
+
+        assert [span["job"] for span in telemetry.read_spans(path)] == ["tas", "pr"]
+
+
+def test_run_measured_returns_spans_of_handler():
+    run = run_measured(_run_phases)
+
+    assert run.result is True
+    assert [span["phase"] for span in run.spans] == ["get_mfdataset", "cmor_write"]
+
+    # The spans are no longer collected once the handler returns.
+    with telemetry.span("cmor_write", "pr"):
+        pass
+
+    assert telemetry.stop_collecting() == []
@@ -0,0 +1,115 @@
+import json
+import multiprocessing
+import os
+import time
+
+from e3sm_to_cmip.work_queue import WorkQueue
+
+
+def _run_worker(output_path, keys, results_path):
+    queue = WorkQueue(output_path, "run-1")
+
+    with open(results_path, "w") as outfile:
+        for key in keys:
+            if queue.claim(key):
+                outfile.write(f"{key}\n")
+                queue.complete(key, True)
+
+
+class TestWorkQueue:
+    def test_unit_is_claimed_by_one_queue_until_completed(self, tmp_path):
+        queue = WorkQueue(str(tmp_path), "run-1")
+        other = WorkQueue(str(tmp_path), "run-1")
+        key = WorkQueue.get_unit_key("ta#0", "CMIP6_Amon.json", ["/in/T_1850.nc"])
+
+        assert queue.claim(key)
+        assert queue.claim(key)
+        assert not other.claim(key)
+
+        queue.complete(key, {"ta": True})
+
+        assert not queue.claim(key)
+        assert not other.claim(key)
+        assert other.get_completed()[key]["result"] == {"ta": True}
+
+    def test_released_unit_can_be_claimed_by_another_queue(self, tmp_path):
+        queue = WorkQueue(str(tmp_path), "run-1")
+        other = WorkQueue(str(tmp_path), "run-1")
+
+        assert queue.claim("tas")
+        queue.release("tas")
+
+        assert other.claim("tas")
+
+    def test_runs_do_not_share_units(self, tmp_path):
+        queue = WorkQueue(str(tmp_path), "run-1")
+        queue.claim("tas")
+        queue.complete("tas", True)
+
+        assert WorkQueue(str(tmp_path), "run-2").claim("tas")
+
+    def test_stale_claim_is_taken_over(self, tmp_path):
+        queue = WorkQueue(str(tmp_path), "run-1", lease=60)
+        other = WorkQueue(str(tmp_path), "run-1", lease=60)
+
+        assert queue.claim("tas")
+        assert not other.claim("tas")
+
+        # The claim was not renewed within the lease (e.g., the node crashed).
+        claim_path = os.path.join(queue.path, "tas.claim")
+        stale_time = time.time() - 120
+        os.utime(claim_path, (stale_time, stale_time))
+
+        assert other.claim("tas")
+        assert os.listdir(queue.path) == ["tas.claim"]
+
+    def test_stale_claim_is_taken_over_by_one_of_two_competing_queues(
+        self, tmp_path, monkeypatch
+    ):
+        queue = WorkQueue(str(tmp_path), "run-1", lease=60)
+        first = WorkQueue(str(tmp_path), "run-1", lease=60)
+        second = WorkQueue(str(tmp_path), "run-1", lease=60)
+        first.owner, second.owner = "node1:1", "node2:1"
+
+        assert queue.claim("tas")
+        claim_path = os.path.join(queue.path, "tas.claim")
+        stale_time = time.time() - 120
+        os.utime(claim_path, (stale_time, stale_time))
+
+        # The second queue finds the claim stale, but the first queue takes it
+        # over and creates its own claim before the second queue renames it.
+        rename = os.rename
+
+        def rename_after_first_claim(src, dst):
+            monkeypatch.setattr(os, "rename", rename)
+            assert first.claim("tas")
+
+            rename(src, dst)
+
+        monkeypatch.setattr(os, "rename", rename_after_first_claim)
+
+        assert not second.claim("tas")
+        assert os.listdir(queue.path) == ["tas.claim"]
+        with open(claim_path) as infile:
+            assert json.load(infile)["owner"] == "node1:1"
+
+    def test_processes_run_each_unit_once(self, tmp_path):
+        keys = [f"var{i}" for i in range(100)]
+        results_paths = [str(tmp_path / f"results{i}.txt") for i in range(4)]
+
+        ctx = multiprocessing.get_context("spawn")
+        processes = [
+            ctx.Process(target=_run_worker, args=(str(tmp_path / "output"), keys, path))
+            for path in results_paths
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+
+        claimed = []
+        for path in results_paths:
+            with open(path) as infile:
+                claimed.extend(infile.read().split())
+
+        assert sorted(claimed) == sorted(keys)